@@ -14,12 +14,12 @@ async def scrape_url(scraper: ScraperOrchestrator, url: str):
 
 
 async def main() -> None:
-    scraper = ScraperOrchestrator(with_storage=False)
     urls = [
         "https://example.com",
         "https://www.iana.org/domains/reserved",
     ]
-    results = await asyncio.gather(*(scrape_url(scraper, url) for url in urls), return_exceptions=True)
+    async with ScraperOrchestrator(with_storage=False) as scraper:
+        results = await asyncio.gather(*(scrape_url(scraper, url) for url in urls), return_exceptions=True)
 
     for idx, result in enumerate(results, start=1):
         if isinstance(result, Exception):
@@ -23,19 +23,19 @@ class JobListPage(BaseModel):
 
 
 async def main() -> None:
-    scraper = ScraperOrchestrator()
-    result = await scraper.scrape(
-        url="https://example.com",
-        schema=JobListPage,
-        wait_until="domcontentloaded",
-        full_page=False,
-    )
-
-    if result["success"]:
-        print(f"Registros extraidos: {result['data'].get('total_count', 0)}")
-        print(f"Custo: ${result['metadata']['cost_usd']:.4f}")
-    else:
-        print(f"Erro: {result.get('error')}")
+    async with ScraperOrchestrator() as scraper:
+        result = await scraper.scrape(
+            url="https://example.com",
+            schema=JobListPage,
+            wait_until="domcontentloaded",
+            full_page=False,
+        )
+
+        if result["success"]:
+            print(f"Registros extraidos: {result['data'].get('total_count', 0)}")
+            print(f"Custo: ${result['metadata']['cost_usd']:.4f}")
+        else:
+            print(f"Erro: {result.get('error')}")
 
 
 if __name__ == "__main__":
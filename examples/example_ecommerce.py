@@ -7,21 +7,21 @@ from src.models.product import ProductListPage
 
 
 async def main() -> None:
-    scraper = ScraperOrchestrator()
-    result = await scraper.scrape(
-        url="https://example.com",
-        schema=ProductListPage,
-        system_prompt=SYSTEM_PROMPT_ECOMMERCE,
-        wait_until="domcontentloaded",
-        full_page=True,
-    )
+    async with ScraperOrchestrator() as scraper:
+        result = await scraper.scrape(
+            url="https://example.com",
+            schema=ProductListPage,
+            system_prompt=SYSTEM_PROMPT_ECOMMERCE,
+            wait_until="domcontentloaded",
+            full_page=True,
+        )
 
-    if result["success"]:
-        products = result["data"].get("products", [])
-        print(f"Produtos extraidos: {len(products)}")
-        print(f"Custo: ${result['metadata']['cost_usd']:.4f}")
-    else:
-        print(f"Erro: {result.get('error')}")
+        if result["success"]:
+            products = result["data"].get("products", [])
+            print(f"Produtos extraidos: {len(products)}")
+            print(f"Custo: ${result['metadata']['cost_usd']:.4f}")
+        else:
+            print(f"Erro: {result.get('error')}")
 
 
 if __name__ == "__main__":
@@ -0,0 +1,9 @@
+"""Runner local do servidor fake de chat completions (benchmark offline)."""
+import uvicorn
+
+from src.config.settings import settings
+from src.web.fake_llm import create_fake_llm_app
+
+
+if __name__ == "__main__":
+    uvicorn.run(create_fake_llm_app(), host="127.0.0.1", port=settings.FAKE_LLM_PORT, reload=False)
@@ -10,6 +10,43 @@ class Settings(BaseSettings):
     # OpenAI
     OPENAI_API_KEY: str
     OPENAI_MODEL: str = "gpt-5-mini-2025-08-07"
+    OPENAI_BASE_URL: str = ""  # vazio = API da OpenAI; ex.: http://127.0.0.1:8100/v1 (servidor fake)
+    OPENAI_TIMEOUT_SECONDS: float = 75.0
+    OPENAI_MAX_CONCURRENCY: int = 16
+    OPENAI_MAX_CONNECTIONS: int = 64
+    OPENAI_MAX_KEEPALIVE: int = 32
+    OPENAI_CLIENT_CACHE_SIZE: int = 32
+    # json_object | json_schema (saida estrita derivada do schema Pydantic)
+    OPENAI_RESPONSE_FORMAT: str = "json_object"
+    # Segunda chamada ao modelo quando nem o reparo local recupera o JSON
+    LLM_JSON_REPAIR_CALL: bool = True
+
+    # Context packing (orcamento de tokens da pagina por request)
+    LLM_CONTEXT_TOKEN_BUDGET: int = 16_000
+    LLM_TOKENIZER_ENCODING: str = "o200k_base"
+
+    # Chunked extraction (EXTRACTION_MODE: auto | single | chunked)
+    EXTRACTION_MODE: str = "auto"
+    CHUNK_TOKENS: int = 6_000
+    CHUNK_OVERLAP_TOKENS: int = 300
+    CHUNK_MAX_CONCURRENCY: int = 4
+    CHUNK_MAX_CHUNKS: int = 16
+
+    # Model cascade (primeira passada so texto; escala com screenshot se a qualidade nao basta)
+    CASCADE_ENABLED: bool = False
+    CASCADE_TEXT_MODEL: str = ""  # vazio = OPENAI_MODEL
+    CASCADE_ESCALATION_MODEL: str = ""  # vazio = OPENAI_MODEL
+    CASCADE_MIN_QUALITY: float = 0.8
+
+    # Fake LLM server (run_fake_llm.py; benchmark offline sem chamadas pagas)
+    FAKE_LLM_PORT: int = 8100
+    FAKE_LLM_LATENCY_MS: float = 800.0
+    FAKE_LLM_LATENCY_JITTER_MS: float = 200.0
+    FAKE_LLM_ERROR_RATE: float = 0.0
+    FAKE_LLM_RATE_LIMIT_RATE: float = 0.0
+    FAKE_LLM_RETRY_AFTER_SECONDS: int = 1
+    FAKE_LLM_LIST_ITEMS: int = 5
+    FAKE_LLM_REPLAY_PATH: str = ""  # cache de respostas gravado (LLM_CACHE_PATH) para reproduzir
 
     # Playwright
     HEADLESS: bool = True
@@ -17,10 +54,89 @@ class Settings(BaseSettings):
     VIEWPORT_WIDTH: int = 1920
     VIEWPORT_HEIGHT: int = 1080
 
+    # Browser pool
+    BROWSER_POOL_SIZE: int = 2
+    BROWSER_POOL_CONTEXTS_PER_BROWSER: int = 4
+    BROWSER_POOL_MAX_PAGES_PER_BROWSER: int = 200
+
+    # Capture workers (0 = captura no proprio processo)
+    CAPTURE_WORKERS: int = 0
+    CAPTURE_WORKER_CONCURRENCY: int = 4
+    CAPTURE_WORKER_TIMEOUT_SECONDS: float = 120.0
+
+    # Capture (CAPTURE_PROFILE: auto | text_only | text_ax | vision | full)
+    CAPTURE_PROFILE: str = "auto"
+    CAPTURE_MAX_HTML_CHARS: int = 150_000
+    CAPTURE_MAX_TEXT_CHARS: int = 300_000
+    CAPTURE_MAX_STRUCTURE_NODES: int = 4_000
+    AX_OUTLINE_MAX_CHARS: int = 24_000
+
+    # Vision (screenshot)
+    VISION_TOKEN_BUDGET: int = 765
+    VISION_SKIP_TEXT_CHARS: int = 6_000
+    VISION_MAX_FULL_PAGE_HEIGHT: int = 8_000
+
+    # Resource blocking
+    BLOCKED_RESOURCE_TYPES: list[str] = ["image", "media", "font"]
+    BLOCK_TRACKERS: bool = True
+    BLOCKING_DOMAIN_OVERRIDES: dict[str, dict[str, list[str]]] = {}
+
+    # PDF
+    PDF_MAX_PAGES: int = 300
+    PDF_MAX_BYTES: int = 50_000_000
+    PDF_SPOOL_BYTES: int = 5_000_000
+    PDF_WORKERS: int = 4
+    PDF_PARALLEL_MIN_PAGES: int = 40
+
+    # Smart scroll
+    SCROLL_MODE: str = "events"
+    SCROLL_BUDGET_MS: int = 8_000
+    SCROLL_QUIET_MS: int = 400
+    SCROLL_STEP_TIMEOUT_MS: int = 2_500
+
+    # Sessions
+    SESSION_DIR: str = "./data/sessions"
+    SESSION_CACHE_MAX_DOMAINS: int = 256
+    SESSION_FLUSH_INTERVAL: float = 30.0
+
+    # Block detection
+    BLOCK_DETECTION_MAX_TEXT_CHARS: int = 3_000
+    BLOCK_DETECTION_EXTRA_MARKERS: list[str] = []
+
+    # Capture cache
+    CAPTURE_CACHE_ENABLED: bool = False
+    CAPTURE_CACHE_DIR: str = "./data/capture_cache"
+    CAPTURE_CACHE_TTL_SECONDS: float = 900.0
+    CAPTURE_CACHE_MAX_BYTES: int = 200_000_000
+
+    # LLM response cache
+    LLM_CACHE_ENABLED: bool = True
+    LLM_CACHE_PATH: str = "./data/llm_cache.db"
+    LLM_CACHE_TTL_SECONDS: float = 86_400.0
+    LLM_CACHE_MAX_BYTES: int = 100_000_000
+
+    # Extraction templates (wrapper induction por dominio; pula o LLM em layouts conhecidos)
+    TEMPLATES_ENABLED: bool = False
+    TEMPLATE_DIR: str = "./data/templates"
+    TEMPLATE_MIN_SAMPLES: int = 2  # extracoes do LLM que confirmam o template antes do uso
+    TEMPLATE_MIN_AGREEMENT: float = 0.8
+    TEMPLATE_MIN_QUALITY: float = 0.8
+    TEMPLATE_MIN_RECORDS: int = 2
+
+    # Static-first capture (CAPTURE_MODE: browser | static_first)
+    CAPTURE_MODE: str = "browser"
+    STATIC_FETCH_TIMEOUT: float = 10.0
+    STATIC_MAX_BYTES: int = 5_000_000
+    STATIC_MIN_TEXT_CHARS: int = 500
+    STATIC_MIN_TEXT_DENSITY: float = 0.02
+    HTTP_POOL_SIZE: int = 100
+    HTTP_POOL_PER_HOST: int = 8
+
     # Scraping
     MAX_CONCURRENT_TASKS: int = 3
     RETRY_ATTEMPTS: int = 3
     RETRY_DELAY: int = 2
+    CIRCUIT_BREAKER_COOLDOWN_SECONDS: float = 300.0
 
     # Storage
     DATABASE_URL: str = "sqlite+aiosqlite:///./data/scraper_data.db"
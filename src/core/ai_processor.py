@@ -1,25 +1,163 @@
 """AI processor para extracao estruturada."""
 import asyncio
 import json
-from typing import Any
+import time
+from dataclasses import dataclass
+from functools import lru_cache
+from typing import Any, AsyncIterator
 
 from loguru import logger
-from openai import OpenAI
 from openai import OpenAIError
 from pydantic import BaseModel
 
 from src.config.prompts import SYSTEM_PROMPT_GENERIC
 from src.config.settings import settings
+from src.core.context_packer import CHARS_PER_TOKEN, PackedContext, count_tokens, pack_context
 from src.core.errors import ModelScraperError
+from src.core.json_repair import JSONRepairError, parse_model_json
+from src.core.llm_cache import get_llm_cache, request_key
+from src.core.llm_client import get_llm_pool
+from src.core.pdf_extractor import select_relevant_pages
+from src.core.stream_parser import IncrementalArrayParser, iter_stream_items
+from src.core.validator import DataValidator
 from src.utils.cost_tracker import calculate_cost
 from src.utils.helpers import clean_html
 
 
+# Parametros da chamada que tambem entram na chave do cache de respostas.
+REQUEST_PARAMS: dict[str, Any] = {
+    "response_format": {"type": "json_object"},
+    "max_completion_tokens": 5000,
+}
+# Palavras-chave de JSON Schema recusadas pelo modo estrito de structured outputs.
+STRICT_UNSUPPORTED_KEYWORDS = frozenset({
+    "default", "examples", "format", "minLength", "maxLength",
+    "minimum", "maximum", "exclusiveMinimum", "exclusiveMaximum",
+})
+# Limite de saida da chamada de reduce (resumo final de extracoes em trechos).
+REDUCE_MAX_COMPLETION_TOKENS: dict[str, int] = {"summary": 1000, "list": 1000, "report": 3000}
+
+
+FORMAT_INSTRUCTIONS: dict[str, str] = {
+    "summary": (
+        "FORMATO DE SAIDA: RESUMO EXECUTIVO (CONCISO).\n"
+        "- Foco total no campo 'summary'. Escreva um parágrafo denso e direto sobre o conteudo.\n"
+        "- Use Markdown para destacar pontos chave (negrito).\n"
+        "- Use a lista 'findings' APENAS para topicos cruciais, sem detalhes excessivos.\n"
+        "- Ignore detalhes irrelevantes. Seja breve e direto ao ponto."
+    ),
+    "report": (
+        "FORMATO DE SAIDA: RELATORIO COMPLETO (DETALHADO).\n"
+        "- O campo 'summary' deve ser uma introducao abrangente e rica em contexto. USE MARKDOWN.\n"
+        "- Use # Titulos, **Negrito**, - Listas no 'summary' para estruturar o texto como um documento.\n"
+        "- SE RELEVANTE, inclua imagens no corpo do texto markdown usando: ![alt](url). Escolha as melhores URLs da lista 'Imagens Disponiveis'.\n"
+        "- A lista 'findings' deve ser EXTENSA. Extraia TUDO que for relevante.\n"
+        "- As descricoes devem ser longas, detalhadas e analiticas.\n"
+        "- Nao economize texto. O usuario quer uma analise profunda e extensa.\n"
+        "- Se houver dados tecnicos, use o campo 'extra' para estruturar."
+    ),
+    "list": (
+        "FORMATO DE SAIDA: LISTA ESTRUTURADA (PADRAO).\n"
+        "- Foco principal na lista 'findings'.\n"
+        "- Identifique cada item individualmente.\n"
+        "- Descricoes devem ser objetivas e diretas.\n"
+        "- Mantenha o 'summary' curto, apenas como contexto geral."
+    ),
+}
+
+
+@lru_cache(maxsize=128)
+def schema_json(schema: type[BaseModel]) -> str:
+    """JSON Schema serializado uma vez por classe, com chaves em ordem estavel."""
+    return json.dumps(schema.model_json_schema(), ensure_ascii=False, sort_keys=True, separators=(",", ":"))
+
+
+def _make_strict(node: Any) -> bool:
+    """Ajusta um no do JSON Schema para o modo estrito (in-place).
+
+    Todo objeto passa a exigir todas as propriedades e a recusar chaves extras;
+    campos opcionais continuam aceitando `null`. Retorna False se houver objeto
+    livre (ex.: `dict[str, Any]`), que o modo estrito nao representa.
+    """
+    if isinstance(node, list):
+        return all([_make_strict(value) for value in node])
+    if not isinstance(node, dict):
+        return True
+    for keyword in STRICT_UNSUPPORTED_KEYWORDS & node.keys():
+        del node[keyword]
+    strict = True
+    if node.get("type") == "object":
+        properties = node.get("properties")
+        if properties:
+            node["required"] = list(properties)
+            node["additionalProperties"] = False
+        else:
+            strict = False
+    for key, value in node.items():
+        if key in ("properties", "$defs") and isinstance(value, dict):
+            strict = all([_make_strict(sub) for sub in value.values()]) and strict
+        elif isinstance(value, (dict, list)):
+            strict = _make_strict(value) and strict
+    return strict
+
+
+@lru_cache(maxsize=128)
+def strict_response_format(schema: type[BaseModel]) -> dict[str, Any]:
+    """`response_format` do tipo `json_schema` derivado do schema Pydantic.
+
+    Schemas com objetos livres seguem com `strict: false`: o provedor ainda usa o
+    schema como guia, sem a garantia de decodificacao restrita.
+    """
+    json_schema = json.loads(schema_json(schema))
+    strict = _make_strict(json_schema)
+    return {
+        "type": "json_schema",
+        "json_schema": {"name": schema.__name__, "schema": json_schema, "strict": strict},
+    }
+
+
+def request_params(schema: type[BaseModel]) -> dict[str, Any]:
+    """Parametros da chamada de extracao conforme `OPENAI_RESPONSE_FORMAT`."""
+    if settings.OPENAI_RESPONSE_FORMAT == "json_schema":
+        return {**REQUEST_PARAMS, "response_format": strict_response_format(schema)}
+    return REQUEST_PARAMS
+
+
+@lru_cache(maxsize=256)
+def stable_prefix(prompt: str, schema: type[BaseModel], output_format: str) -> str:
+    """Mensagem de sistema identica byte a byte por (prompt, schema, formato).
+
+    Tudo que varia por request (objetivo, pagina) vai depois, na mensagem do
+    usuario, para o cache automatico de prefixo do provedor reaproveitar este bloco.
+    """
+    format_instruction = FORMAT_INSTRUCTIONS.get(output_format, FORMAT_INSTRUCTIONS["list"])
+    return (
+        f"{prompt}\n\n"
+        "Extraia os dados da pagina enviada pelo usuario e responda APENAS com JSON valido.\n\n"
+        f"{format_instruction}\n\n"
+        f"Schema esperado:\n{schema_json(schema)}"
+    )
+
+
+@dataclass
+class ExtractionRequest:
+    """Mensagens montadas para uma extracao e o que o metadata precisa delas."""
+
+    model: str
+    messages: list[dict[str, Any]]
+    params: dict[str, Any]
+    vision: dict[str, Any]
+    packed: PackedContext
+    prefix: str
+    fixed_tokens: int
+
+
 class AIProcessor:
     """Processa screenshot + HTML com GPT-5 mini."""
 
     def __init__(self, api_key: str | None = None) -> None:
-        self.client = OpenAI(api_key=api_key or settings.OPENAI_API_KEY)
+        # Cliente AsyncOpenAI vem do pool compartilhado (reutilizado por API key)
+        self.api_key = api_key or settings.OPENAI_API_KEY
         self.model = settings.OPENAI_MODEL
 
     async def extract_structured_data(
@@ -34,150 +172,419 @@ class AIProcessor:
         extraction_goal: str | None = None,
         output_format: str = "list",
         max_html_chars: int = 50_000,
+        screenshot_plan: dict[str, Any] | None = None,
+        document_pages: list[str] | None = None,
+        use_cache: bool = True,
+        model: str | None = None,
     ) -> dict[str, Any]:
-        """Extrai dados seguindo schema Pydantic informado."""
+        """Extrai dados seguindo schema Pydantic informado.
+
+        `document_pages` (texto por pagina de um PDF) faz o contexto incluir apenas
+        as paginas mais relevantes para o objetivo em vez do inicio do documento.
+        Mensagens identicas a uma chamada anterior sao respondidas pelo cache
+        persistente (custo zero); `use_cache=False` forca nova chamada.
+        `model` troca o modelo so desta chamada (ex.: camadas da cascata).
+        """
+        request = self._build_request(
+            screenshot_base64=screenshot_base64,
+            html=html,
+            text_content=text_content,
+            schema=schema,
+            accessibility_snapshot=accessibility_snapshot,
+            image_urls=image_urls,
+            system_prompt=system_prompt,
+            extraction_goal=extraction_goal,
+            output_format=output_format,
+            max_html_chars=max_html_chars,
+            screenshot_plan=screenshot_plan,
+            document_pages=document_pages,
+            model=model,
+        )
+        messages = request.messages
+
+        cache = get_llm_cache() if use_cache and settings.LLM_CACHE_ENABLED else None
+        cache_key = ""
+        if cache is not None:
+            cache_key = request_key(request.model, messages, base_url=settings.OPENAI_BASE_URL, **request.params)
+            cached = await cache.get(cache_key)
+            if cached is not None:
+                logger.info("Resposta do modelo servida do cache")
+                return self._cached_result(request, cached)
+
+        logger.info("Chamando OpenAI para extracao estruturada...")
+        llm_started = time.perf_counter()
+        response = await self._run_chat_completion(messages=messages, model=request.model, **request.params)
+        content = response.choices[0].message.content or "{}"
+        tokens = usage_tokens(response.usage)
+        try:
+            data, parse_path = parse_model_json(content)
+        except JSONRepairError as exc:
+            if not settings.LLM_JSON_REPAIR_CALL:
+                raise ModelScraperError("LLM retornou JSON invalido e o reparo local falhou") from exc
+            # Ultimo recurso: reenvia a conversa pedindo para o modelo corrigir o JSON.
+            logger.warning("Reparo local do JSON falhou; pedindo autocorrecao ao modelo")
+            repair_messages = messages + [
+                {
+                    "role": "assistant",
+                    "content": content,
+                },
+                {
+                    "role": "user",
+                    "content": (
+                        "Corrija sua resposta para JSON estrito e valido, sem texto extra. "
+                        "Mantenha o mesmo schema solicitado."
+                    ),
+                },
+            ]
+            repair_response = await self._run_chat_completion(
+                messages=repair_messages, model=request.model, **request.params
+            )
+            repair_tokens = usage_tokens(repair_response.usage)
+            tokens = {key: tokens[key] + repair_tokens[key] for key in tokens}
+            try:
+                data, _ = parse_model_json(repair_response.choices[0].message.content or "{}")
+                parse_path = "llm_repair"
+            except JSONRepairError as repair_exc:
+                raise ModelScraperError("LLM retornou JSON invalido apos tentativa de autocorrecao") from repair_exc
+
+        llm_ms = round((time.perf_counter() - llm_started) * 1000, 1)
+        result = self._fresh_result(request, data, tokens, llm_ms, cache_state="miss" if cache else "bypass")
+        result["metadata"]["json_parse"] = {parse_path: 1}
+        if cache is not None and cacheable_answer(data, schema, parse_path):
+            await cache.put(cache_key, request.model, data, tokens, result["metadata"]["cost_usd"])
+        return result
+
+    async def stream_structured_data(
+        self,
+        screenshot_base64: str,
+        html: str,
+        text_content: str,
+        schema: type[BaseModel],
+        accessibility_snapshot: str = "",
+        image_urls: list[str] | None = None,
+        system_prompt: str | None = None,
+        extraction_goal: str | None = None,
+        output_format: str = "list",
+        screenshot_plan: dict[str, Any] | None = None,
+        use_cache: bool = True,
+        document_pages: list[str] | None = None,
+    ) -> AsyncIterator[dict[str, Any]]:
+        """Versao em streaming de `extract_structured_data`.
+
+        Emite `{"type": "item", "field", "item"}` a cada elemento fechado de
+        `items`/`findings`/`products` e, no fim, `{"type": "result", "data", "metadata"}`
+        no mesmo formato da chamada sem streaming. Em cache hit os itens saem de uma vez.
+        """
+        request = self._build_request(
+            screenshot_base64=screenshot_base64,
+            html=html,
+            text_content=text_content,
+            schema=schema,
+            accessibility_snapshot=accessibility_snapshot,
+            image_urls=image_urls,
+            system_prompt=system_prompt,
+            extraction_goal=extraction_goal,
+            output_format=output_format,
+            screenshot_plan=screenshot_plan,
+            document_pages=document_pages,
+        )
+        cache = get_llm_cache() if use_cache and settings.LLM_CACHE_ENABLED else None
+        cache_key = ""
+        if cache is not None:
+            cache_key = request_key(request.model, request.messages, base_url=settings.OPENAI_BASE_URL, **request.params)
+            cached = await cache.get(cache_key)
+            if cached is not None:
+                for field, item in iter_stream_items(cached["data"]):
+                    yield {"type": "item", "field": field, "item": item}
+                yield {"type": "result", **self._cached_result(request, cached)}
+                return
+
+        logger.info("Chamando OpenAI em streaming para extracao estruturada...")
+        parser = IncrementalArrayParser()
+        llm_started = time.perf_counter()
+        pool = get_llm_pool()
+        client = pool.client(self.api_key)
+        # O stream do modelo e lido numa task propria; os itens saem por uma fila.
+        # Assim nenhum yield acontece dentro do slot nem do timeout: um cliente
+        # SSE lento nao segura o slot nem consome o prazo do modelo.
+        items: asyncio.Queue[tuple[str, dict[str, Any]] | None] = asyncio.Queue()
+
+        async def read_stream() -> Any:
+            usage = None
+            try:
+                async with pool.slot(), asyncio.timeout(settings.OPENAI_TIMEOUT_SECONDS):
+                    stream = await client.chat.completions.create(
+                        model=request.model,
+                        messages=request.messages,
+                        stream=True,
+                        stream_options={"include_usage": True},
+                        **request.params,
+                    )
+                    async for chunk in stream:
+                        usage = chunk.usage or usage
+                        if not chunk.choices:
+                            continue
+                        for entry in parser.feed(chunk.choices[0].delta.content or ""):
+                            items.put_nowait(entry)
+            except TimeoutError as exc:
+                raise ModelScraperError("Timeout ao chamar API do modelo") from exc
+            except OpenAIError as exc:
+                raise ModelScraperError(f"Erro da API do modelo: {exc}") from exc
+            finally:
+                items.put_nowait(None)
+            return usage
+
+        reader = asyncio.create_task(read_stream())
+        try:
+            while (entry := await items.get()) is not None:
+                field, item = entry
+                yield {"type": "item", "field": field, "item": item}
+            usage = await reader
+        finally:
+            reader.cancel()
+
+        try:
+            # Sem chamada de autocorrecao aqui: os itens ja emitidos vieram deste texto.
+            data, parse_path = parse_model_json(parser.text or "{}")
+        except JSONRepairError as exc:
+            raise ModelScraperError("LLM retornou JSON invalido no streaming") from exc
+        llm_ms = round((time.perf_counter() - llm_started) * 1000, 1)
+        tokens = usage_tokens(usage)
+        result = self._fresh_result(request, data, tokens, llm_ms, cache_state="miss" if cache else "bypass")
+        result["metadata"]["json_parse"] = {parse_path: 1}
+        if cache is not None and cacheable_answer(data, schema, parse_path):
+            await cache.put(cache_key, request.model, data, tokens, result["metadata"]["cost_usd"])
+        yield {"type": "result", **result}
+
+    def _build_request(
+        self,
+        screenshot_base64: str,
+        html: str,
+        text_content: str,
+        schema: type[BaseModel],
+        accessibility_snapshot: str = "",
+        image_urls: list[str] | None = None,
+        system_prompt: str | None = None,
+        extraction_goal: str | None = None,
+        output_format: str = "list",
+        max_html_chars: int = 50_000,
+        screenshot_plan: dict[str, Any] | None = None,
+        document_pages: list[str] | None = None,
+        model: str | None = None,
+    ) -> ExtractionRequest:
         html_truncated = clean_html(html, max_chars=max_html_chars)
-        text_cut = text_content[:20_000]
+        budget_chars = settings.LLM_CONTEXT_TOKEN_BUDGET * CHARS_PER_TOKEN
+        if document_pages:
+            text_cut = select_relevant_pages(document_pages, extraction_goal, max_chars=budget_chars)
+        else:
+            # Folga de 2x sobre o orcamento: parte do texto ainda sai na deduplicacao.
+            text_cut = text_content[: budget_chars * 2]
         prompt = system_prompt or SYSTEM_PROMPT_GENERIC
-        
+
         # OPTIMIZATION: Use Accessibility Snapshot if available
-        structure_context = (
-            f"Accessibility Tree (Preferred):\n{accessibility_snapshot[:60000]}"
-            if accessibility_snapshot
-            else f"HTML:\n{html_truncated}"
-        )
-        
-        images_context = ""
-        if image_urls:
-            images_context = f"Imagens Disponiveis:\n{json.dumps(image_urls[:50], indent=2)}"
-
-        if output_format == "summary":
-            format_instruction = (
-                "FORMATO DE SAIDA: RESUMO EXECUTIVO (CONCISO).\n"
-                "- Foco total no campo 'summary'. Escreva um parágrafo denso e direto sobre o conteudo.\n"
-                "- Use Markdown para destacar pontos chave (negrito).\n"
-                "- Use a lista 'findings' APENAS para topicos cruciais, sem detalhes excessivos.\n"
-                "- Ignore detalhes irrelevantes. Seja breve e direto ao ponto."
-            )
-        elif output_format == "report":
-            format_instruction = (
-                "FORMATO DE SAIDA: RELATORIO COMPLETO (DETALHADO).\n"
-                "- O campo 'summary' deve ser uma introducao abrangente e rica em contexto. USE MARKDOWN.\n"
-                "- Use # Titulos, **Negrito**, - Listas no 'summary' para estruturar o texto como um documento.\n"
-                "- SE RELEVANTE, inclua imagens no corpo do texto markdown usando: ![alt](url). Escolha as melhores URLs da lista 'Imagens Disponiveis'.\n"
-                "- A lista 'findings' deve ser EXTENSA. Extraia TUDO que for relevante.\n"
-                "- As descricoes devem ser longas, detalhadas e analiticas.\n"
-                "- Nao economize texto. O usuario quer uma analise profunda e extensa.\n"
-                "- Se houver dados tecnicos, use o campo 'extra' para estruturar."
-            )
-        else:  # list
-            format_instruction = (
-                "FORMATO DE SAIDA: LISTA ESTRUTURADA (PADRAO).\n"
-                "- Foco principal na lista 'findings'.\n"
-                "- Identifique cada item individualmente.\n"
-                "- Descricoes devem ser objetivas e diretas.\n"
-                "- Mantenha o 'summary' curto, apenas como contexto geral."
-            )
+        if accessibility_snapshot:
+            packed = pack_context(accessibility_snapshot, text_cut, image_urls)
+            structure_header = 'Accessibility Tree (Preferred; outline `role "nome" [valor] <url>`)'
+        else:
+            packed = pack_context(html_truncated, text_cut, image_urls, dedupe=False)
+            structure_header = "HTML"
+        structure_context = f"{structure_header}:\n{packed.structure}" if packed.structure else ""
+        images_context = f"Imagens Disponiveis:\n{packed.images}" if packed.images else ""
 
         goal_instruction = (
-            f"Objetivo do usuario (prioritario): {extraction_goal.strip()}\n\n"
-            f"{format_instruction}\n"
+            f"Objetivo do usuario (prioritario): {extraction_goal.strip()}"
             if extraction_goal and extraction_goal.strip()
-            else f"{format_instruction}\n"
+            else ""
         )
 
-        user_content = []
+        plan = screenshot_plan or {}
+        detail = plan.get("detail") or "high"
+        vision = {
+            "sent": bool(screenshot_base64),
+            "detail": detail if screenshot_base64 else None,
+            "estimated_tokens": int(plan.get("estimated_tokens") or 0) if screenshot_base64 else 0,
+            "skip_reason": plan.get("reason"),
+        }
+
+        # Pagina por ultimo: objetivo, screenshot, estrutura, imagens e texto.
+        user_content: list[dict[str, Any]] = []
+        if goal_instruction:
+            user_content.append({"type": "text", "text": goal_instruction})
         if screenshot_base64:
             user_content.append({
                 "type": "image_url",
                 "image_url": {
                     "url": f"data:image/jpeg;base64,{screenshot_base64}",
-                    "detail": "high",
+                    "detail": detail,
                 },
             })
         
         user_content.append({
             "type": "text",
             "text": (
-                "Extraia os dados desta pagina e responda APENAS com JSON valido.\n\n"
-                f"{goal_instruction}"
-                f"Schema esperado:\n{schema.model_json_schema()}\n\n"
                 f"{structure_context}\n\n"
                 f"{images_context}\n\n"
-                f"Texto renderizado:\n{text_cut}"
+                f"Texto renderizado:\n{packed.text}"
             ),
         })
 
+        prefix = stable_prefix(prompt, schema, output_format)
+        fixed_tokens = count_tokens(prefix) + count_tokens(goal_instruction) + vision["estimated_tokens"]
         messages = [
-            {"role": "system", "content": prompt},
+            {"role": "system", "content": prefix},
             {"role": "user", "content": user_content},
         ]
 
-        logger.info("Chamando OpenAI para extracao estruturada...")
-        response = await self._run_chat_completion(messages=messages)
-        content = response.choices[0].message.content or "{}"
-        try:
-            data = json.loads(content)
-        except json.JSONDecodeError:
-            # Segunda tentativa com autocorrecao do JSON para reduzir falhas deterministicas.
-            repair_messages = messages + [
-                {
-                    "role": "assistant",
-                    "content": content,
-                },
-                {
-                    "role": "user",
-                    "content": (
-                        "Corrija sua resposta para JSON estrito e valido, sem texto extra. "
-                        "Mantenha o mesmo schema solicitado."
-                    ),
+        return ExtractionRequest(
+            model=model or self.model,
+            messages=messages,
+            params=request_params(schema),
+            vision=vision,
+            packed=packed,
+            prefix=prefix,
+            fixed_tokens=fixed_tokens,
+        )
+
+    def _cached_result(self, request: ExtractionRequest, cached: dict[str, Any]) -> dict[str, Any]:
+        return {
+            "data": cached["data"],
+            "metadata": {
+                "model": request.model,
+                "tokens_used": {"input": 0, "cached_input": 0, "output": 0, "total": 0},
+                "cost_usd": 0.0,
+                "vision": request.vision,
+                "context": request.packed.report(fixed_tokens=request.fixed_tokens),
+                "llm_cache": {
+                    "state": "hit",
+                    "age_seconds": cached["age_seconds"],
+                    "tokens_saved": cached["tokens_used"].get("total", 0),
+                    "cost_saved_usd": cached["cost_usd"],
                 },
-            ]
-            repair_response = await self._run_chat_completion(messages=repair_messages)
-            repair_content = repair_response.choices[0].message.content or "{}"
-            try:
-                data = json.loads(repair_content)
-                response = repair_response
-            except json.JSONDecodeError as exc:
-                raise ModelScraperError("LLM retornou JSON invalido apos tentativa de autocorrecao") from exc
-
-        usage = response.usage
-        tokens = {
-            "input": usage.prompt_tokens if usage else 0,
-            "output": usage.completion_tokens if usage else 0,
-            "total": usage.total_tokens if usage else 0,
+            },
         }
+
+    def _fresh_result(
+        self,
+        request: ExtractionRequest,
+        data: Any,
+        tokens: dict[str, int],
+        llm_ms: float,
+        cache_state: str,
+    ) -> dict[str, Any]:
         cost_usd = calculate_cost(
             input_tokens=tokens["input"],
             output_tokens=tokens["output"],
-            cached_input_tokens=0,
+            cached_input_tokens=tokens["cached_input"],
+            model=request.model,
         )
-
         return {
             "data": data,
             "metadata": {
-                "model": self.model,
+                "model": request.model,
                 "tokens_used": tokens,
                 "cost_usd": cost_usd,
+                "vision": request.vision,
+                "context": request.packed.report(
+                    actual_input_tokens=tokens["input"], fixed_tokens=request.fixed_tokens
+                ),
+                "llm_cache": {"state": cache_state},
+                "prompt_cache": {
+                    "prefix_chars": len(request.prefix),
+                    "cached_tokens": tokens["cached_input"],
+                    "cached_ratio": round(tokens["cached_input"] / tokens["input"], 4) if tokens["input"] else 0.0,
+                    "llm_ms": llm_ms,
+                },
             },
         }
 
+    async def reduce_summaries(
+        self,
+        summaries: list[str],
+        system_prompt: str | None = None,
+        extraction_goal: str | None = None,
+        output_format: str = "list",
+    ) -> dict[str, Any]:
+        """Junta os resumos parciais dos trechos de uma pagina longa em um resumo unico.
 
-
-    async def _run_chat_completion(self, messages: list[dict[str, Any]]) -> Any:
-        try:
-            return await asyncio.wait_for(
-                asyncio.to_thread(
-                    self.client.chat.completions.create,
-                    model=self.model,
-                    messages=messages,
-                    response_format={"type": "json_object"},
-                    max_completion_tokens=5000,
+        Chamada pequena: recebe so os resumos, nunca o conteudo da pagina.
+        """
+        format_instruction = FORMAT_INSTRUCTIONS.get(output_format, FORMAT_INSTRUCTIONS["list"])
+        goal = f"Objetivo do usuario (prioritario): {extraction_goal.strip()}\n\n" if extraction_goal else ""
+        parts = "\n\n".join(f"[Trecho {index}]\n{summary}" for index, summary in enumerate(summaries, 1))
+        messages = [
+            {
+                "role": "system",
+                "content": (
+                    f"{system_prompt or SYSTEM_PROMPT_GENERIC}\n\n"
+                    "Voce recebe resumos parciais de trechos consecutivos da mesma pagina. Escreva um unico "
+                    "resumo coerente, sem repetir informacoes, e responda APENAS com JSON no formato "
+                    '{"summary": "..."}.\n\n'
+                    f"{format_instruction}"
                 ),
-                timeout=75,
-            )
-        except asyncio.TimeoutError as exc:
-            raise ModelScraperError("Timeout ao chamar API do modelo") from exc
-        except OpenAIError as exc:
-            raise ModelScraperError(f"Erro da API do modelo: {exc}") from exc
+            },
+            {"role": "user", "content": f"{goal}{parts}"},
+        ]
+        max_tokens = REDUCE_MAX_COMPLETION_TOKENS.get(output_format, REDUCE_MAX_COMPLETION_TOKENS["list"])
+        response = await self._run_chat_completion(messages=messages, max_completion_tokens=max_tokens)
+        try:
+            summary = parse_model_json(response.choices[0].message.content or "{}")[0].get("summary")
+        except (JSONRepairError, AttributeError):
+            summary = None
+        tokens = usage_tokens(response.usage)
+        return {
+            # Resposta invalida nao derruba a extracao: os resumos parciais ficam concatenados.
+            "summary": summary if isinstance(summary, str) and summary else "\n\n".join(summaries),
+            "tokens_used": tokens,
+            "cost_usd": calculate_cost(tokens["input"], tokens["output"], tokens["cached_input"], model=self.model),
+        }
+
+    async def _run_chat_completion(
+        self,
+        messages: list[dict[str, Any]],
+        model: str | None = None,
+        **params: Any,
+    ) -> Any:
+        pool = get_llm_pool()
+        client = pool.client(self.api_key)
+        async with pool.slot():
+            try:
+                return await asyncio.wait_for(
+                    client.chat.completions.create(
+                        model=model or self.model,
+                        messages=messages,
+                        **{**REQUEST_PARAMS, **params},
+                    ),
+                    timeout=settings.OPENAI_TIMEOUT_SECONDS,
+                )
+            except asyncio.TimeoutError as exc:
+                raise ModelScraperError("Timeout ao chamar API do modelo") from exc
+            except OpenAIError as exc:
+                raise ModelScraperError(f"Erro da API do modelo: {exc}") from exc
+
+
+def usage_tokens(usage: Any) -> dict[str, int]:
+    """Tokens da resposta, incluindo os de entrada servidos pelo cache de prefixo."""
+    if usage is None:
+        return {"input": 0, "cached_input": 0, "output": 0, "total": 0}
+    details = getattr(usage, "prompt_tokens_details", None)
+    cached = getattr(details, "cached_tokens", None) if details is not None else None
+    if cached is None and isinstance(details, dict):
+        cached = details.get("cached_tokens")
+    return {
+        "input": usage.prompt_tokens or 0,
+        "cached_input": int(cached or 0),
+        "output": usage.completion_tokens or 0,
+        "total": usage.total_tokens or 0,
+    }
+
+
+def cacheable_answer(data: Any, schema: type[BaseModel], parse_path: str) -> bool:
+    """So respostas completas que passam no schema vao para o cache.
 
+    JSON remendado localmente pode ser uma resposta truncada; ela vale para
+    este request, mas nao deve ser repetida como hit durante todo o TTL.
+    """
+    if parse_path == "local_repair" or not isinstance(data, dict):
+        return False
+    validated, _, _ = DataValidator.validate(data, schema=schema)
+    return validated is not None
@@ -0,0 +1,177 @@
+"""Serializacao compacta da arvore de acessibilidade para o contexto do LLM."""
+import json
+from dataclasses import dataclass
+from typing import Any
+
+from src.config.settings import settings
+
+TEXT_ROLES = frozenset({"text", "StaticText", "InlineTextBox"})
+PRUNED_ROLES = frozenset({"generic", "none", "presentation", "group", "LineBreak", "Section", "div", "span"})
+LANDMARK_ROLES = frozenset({
+    "banner", "navigation", "main", "contentinfo", "complementary", "form", "search", "region", "article",
+})
+INTERACTIVE_ROLES = frozenset({
+    "link", "button", "textbox", "searchbox", "combobox", "checkbox", "radio", "slider", "spinbutton",
+    "switch", "tab", "menuitem", "option", "listbox",
+})
+PRIORITY_ROLES = LANDMARK_ROLES | INTERACTIVE_ROLES | {"heading"}
+MAX_NAME_CHARS = 300
+INDENT = "  "
+
+
+@dataclass
+class _Line:
+    text: str
+    parent: int | None
+    priority: int
+
+
+def _clip(value: Any) -> str:
+    text = " ".join(str(value or "").split())
+    return text if len(text) <= MAX_NAME_CHARS else text[: MAX_NAME_CHARS - 3] + "..."
+
+
+def _quote(value: str) -> str:
+    return '"' + value.replace('"', "'") + '"'
+
+
+def _normalize(node: dict[str, Any]) -> list[dict[str, Any]]:
+    """Remove nos estruturais/vazios (promovendo filhos) e junta trechos de texto vizinhos."""
+    role = node.get("role") or "generic"
+    name = _clip(node.get("name"))
+    children: list[dict[str, Any]] = []
+    for child in node.get("children") or []:
+        for normalized in _normalize(child):
+            previous = children[-1] if children else None
+            if (
+                normalized["role"] == "text"
+                and previous is not None
+                and previous["role"] == "text"
+            ):
+                previous["name"] = _clip(f"{previous['name']} {normalized['name']}")
+            else:
+                children.append(normalized)
+
+    if role in TEXT_ROLES:
+        return [{"role": "text", "name": name}] if name else []
+
+    # Nome do no ja cobre o texto unico de um filho: "link 'Ver mais'" em vez de link > text.
+    if len(children) == 1 and children[0]["role"] == "text" and not children[0].get("children"):
+        if not name:
+            name = children[0]["name"]
+            children = []
+        elif children[0]["name"] == name:
+            children = []
+
+    value = _clip(node.get("value"))
+    if role in PRUNED_ROLES and not name and not value:
+        return children
+    if not name and not value and not children and role not in INTERACTIVE_ROLES:
+        return []
+
+    result: dict[str, Any] = {"role": role, "name": name}
+    if value and value != name:
+        result["value"] = value
+    if node.get("level"):
+        result["level"] = node["level"]
+    if node.get("url"):
+        result["url"] = node["url"]
+    if node.get("checked") is not None:
+        result["checked"] = node["checked"]
+    if children:
+        result["children"] = children
+    return [result]
+
+
+def _format(node: dict[str, Any]) -> str:
+    parts = [node["role"]]
+    if node.get("level"):
+        parts[0] = f"{node['role']}{node['level']}"
+    if node.get("name"):
+        parts.append(_quote(node["name"]))
+    if node.get("value"):
+        parts.append(f"[{node['value']}]")
+    if node.get("checked") is not None:
+        parts.append(f"[checked={str(node['checked']).lower()}]")
+    if node.get("url"):
+        parts.append(f"<{node['url']}>")
+    return " ".join(parts)
+
+
+def _flatten(nodes: list[dict[str, Any]], depth: int, parent: int | None, out: list[_Line]) -> None:
+    for node in nodes:
+        index = len(out)
+        priority = 0 if node["role"] in PRIORITY_ROLES else 1
+        out.append(_Line(INDENT * depth + _format(node), parent, priority))
+        _flatten(node.get("children") or [], depth + 1, index, out)
+
+
+def serialize_ax_tree(tree: dict[str, Any] | None, max_chars: int | None = None) -> tuple[str, dict[str, Any]]:
+    """Converte a arvore (formato de `page.accessibility.snapshot`) em outline indentado.
+
+    Cada linha segue `role "nome" [valor]` (headings como `heading2`, links com
+    `<url>`). Se o outline passa de `max_chars`, entram primeiro landmarks,
+    headings e elementos interativos (com seus ancestrais) e depois o restante
+    em ordem de documento; a saida mantem a ordem original. Retorna
+    (outline, estatisticas com tamanho antes/depois).
+    """
+    budget = max_chars or settings.AX_OUTLINE_MAX_CHARS
+    json_chars = len(json.dumps(tree, ensure_ascii=False)) if tree else 0
+    stats: dict[str, Any] = {
+        "format": "outline",
+        "json_chars": json_chars,
+        "outline_chars": 0,
+        "lines": 0,
+        "lines_omitted": 0,
+        "truncated": False,
+    }
+    if not tree:
+        return "", stats
+
+    roots = (tree.get("children") or []) if tree.get("role") in {"WebArea", "RootWebArea"} else [tree]
+    nodes = [normalized for root in roots for normalized in _normalize(root)]
+    lines: list[_Line] = []
+    _flatten(nodes, 0, None, lines)
+
+    total = sum(len(line.text) + 1 for line in lines)
+    if total <= budget:
+        selected = list(range(len(lines)))
+    else:
+        selected_set: set[int] = set()
+        # Reserva espaco para a linha final de omissao.
+        budget -= 40
+        used = 0
+
+        def include(index: int) -> bool:
+            nonlocal used
+            chain = []
+            current: int | None = index
+            while current is not None and current not in selected_set:
+                chain.append(current)
+                current = lines[current].parent
+            cost = sum(len(lines[i].text) + 1 for i in chain)
+            if used + cost > budget:
+                return False
+            selected_set.update(chain)
+            used += cost
+            return True
+
+        for priority in (0, 1):
+            for index, line in enumerate(lines):
+                if line.priority == priority and index not in selected_set:
+                    include(index)
+        selected = sorted(selected_set)
+
+    outline = "\n".join(lines[i].text for i in selected)
+    omitted = len(lines) - len(selected)
+    if omitted:
+        outline += f"\n... ({omitted} linhas omitidas)"
+    stats.update(
+        outline_chars=len(outline),
+        lines=len(selected),
+        lines_omitted=omitted,
+        truncated=bool(omitted),
+        reduction_pct=round(100 * (1 - len(outline) / json_chars), 1) if json_chars else 0.0,
+        estimated_tokens_saved=max(0, (json_chars - len(outline)) // 4),
+    )
+    return outline, stats
@@ -0,0 +1,187 @@
+"""Deteccao de bloqueio/challenge anti-bot a partir de status, headers e DOM inicial."""
+import re
+from dataclasses import dataclass, field
+from typing import Any, Callable
+
+from loguru import logger
+from playwright.async_api import Error as PlaywrightError
+from playwright.async_api import Page
+
+from src.config.settings import settings
+
+BLOCKING_STATUS_CODES = frozenset({401, 403, 429, 503})
+
+# Textos tipicos de paginas de challenge; compilados em uma unica alternancia.
+BLOCK_MARKERS: tuple[str, ...] = (
+    r"\bcaptcha\b",
+    r"attention required",
+    r"just a moment\.\.\.",
+    r"checking your browser",
+    r"verify you are human",
+    r"verifying you are human",
+    r"access denied",
+    r"incapsula incident",
+    r"request unsuccessful\. incapsula",
+    r"bot detection",
+    r"unusual traffic",
+    r"pardon our interruption",
+    r"are you a robot",
+    r"cf-chl-",
+)
+
+# Hosts/caminhos de iframes e scripts servidos por provedores de challenge.
+CHALLENGE_RESOURCE_MARKERS: tuple[str, ...] = (
+    "challenges.cloudflare.com",
+    "/cdn-cgi/challenge-platform/",
+    "captcha-delivery.com",
+    "hcaptcha.com",
+    "google.com/recaptcha",
+    "recaptcha.net",
+    "_incapsula_resource",
+    "px-captcha",
+    "perimeterx.net",
+    "arkoselabs.com",
+    "funcaptcha.com",
+)
+
+# Le apenas o necessario do DOM: titulo, inicio do HTML/texto e origens de iframes/scripts.
+DOM_PROBE_SCRIPT = """
+(maxChars) => {
+    const root = document.documentElement;
+    const body = document.body;
+    const sources = [];
+    for (const el of document.querySelectorAll("iframe[src], script[src]")) {
+        sources.push(el.src);
+        if (sources.length >= 200) break;
+    }
+    return {
+        title: document.title || "",
+        html: root ? root.outerHTML.slice(0, maxChars) : "",
+        text: body ? (body.innerText || "").slice(0, maxChars) : "",
+        textLength: body ? (body.innerText || "").length : 0,
+        sources,
+    };
+}
+"""
+
+
+@dataclass
+class BlockEvidence:
+    """Sinais disponiveis sobre a resposta/pagina em um dado momento da captura."""
+
+    status: int | None = None
+    headers: dict[str, str] = field(default_factory=dict)
+    final_url: str = ""
+    title: str = ""
+    html: str = ""
+    text: str = ""
+    text_length: int | None = None
+    resource_urls: list[str] = field(default_factory=list)
+
+    @property
+    def thin_page(self) -> bool:
+        """Paginas de challenge sao curtas; conteudo longo nao e tratado como bloqueio por texto."""
+        length = self.text_length if self.text_length is not None else len(self.text)
+        return length <= settings.BLOCK_DETECTION_MAX_TEXT_CHARS
+
+
+BlockDetectorFn = Callable[[BlockEvidence], str | None]
+
+
+def detect_by_status(evidence: BlockEvidence) -> str | None:
+    if evidence.status in BLOCKING_STATUS_CODES:
+        return f"Status HTTP indica bloqueio/protecao: {evidence.status}"
+    return None
+
+
+def detect_by_headers(evidence: BlockEvidence) -> str | None:
+    headers = {key.lower(): str(value).lower() for key, value in evidence.headers.items()}
+    if headers.get("cf-mitigated") == "challenge":
+        return "Challenge Cloudflare (cf-mitigated)"
+    if "x-datadome" in headers or "x-dd-b" in headers:
+        if evidence.status and evidence.status >= 400:
+            return "Bloqueio DataDome (headers)"
+    if headers.get("x-amzn-waf-action") in {"captcha", "challenge", "block"}:
+        return f"AWS WAF ({headers['x-amzn-waf-action']})"
+    return None
+
+
+class BlockDetector:
+    """Executa detectores registrados em ordem e devolve o primeiro motivo encontrado.
+
+    Status e headers ficam disponiveis logo no commit da navegacao; marcadores de
+    texto e recursos de challenge so sao considerados em paginas curtas, para nao
+    confundir um site normal que cita "captcha" com uma pagina de bloqueio.
+    """
+
+    def __init__(self, markers: tuple[str, ...] | list[str] = BLOCK_MARKERS) -> None:
+        self.detectors: list[BlockDetectorFn] = [detect_by_status, detect_by_headers]
+        self._marker_re = re.compile("|".join(f"(?:{m})" for m in markers), re.IGNORECASE)
+        self._resource_re = re.compile(
+            "|".join(re.escape(marker) for marker in CHALLENGE_RESOURCE_MARKERS), re.IGNORECASE
+        )
+        self.detectors.extend([self.detect_by_resources, self.detect_by_markers])
+
+    def register(self, detector: BlockDetectorFn, first: bool = False) -> None:
+        """Adiciona um detector customizado (recebe BlockEvidence, retorna motivo ou None)."""
+        if first:
+            self.detectors.insert(0, detector)
+        else:
+            self.detectors.append(detector)
+
+    def detect(self, evidence: BlockEvidence) -> str | None:
+        for detector in self.detectors:
+            reason = detector(evidence)
+            if reason:
+                return reason
+        return None
+
+    def detect_by_resources(self, evidence: BlockEvidence) -> str | None:
+        if not evidence.thin_page:
+            return None
+        for source in evidence.resource_urls:
+            match = self._resource_re.search(source)
+            if match:
+                return f"Recurso de challenge na pagina ({match.group(0).lower()})"
+        return None
+
+    def detect_by_markers(self, evidence: BlockEvidence) -> str | None:
+        if not evidence.thin_page:
+            return None
+        limit = settings.BLOCK_DETECTION_MAX_TEXT_CHARS
+        for candidate in (evidence.title, evidence.text[:limit], evidence.html[: limit * 3], evidence.final_url):
+            match = self._marker_re.search(candidate or "")
+            if match:
+                return f"Possivel bloqueio detectado ({match.group(0).lower()})"
+        return None
+
+
+async def probe_page(page: Page, response: Any) -> BlockEvidence:
+    """Coleta evidencias da pagina com uma unica avaliacao leve no browser."""
+    evidence = BlockEvidence(
+        status=response.status if response else None,
+        headers=dict(response.headers) if response else {},
+        final_url=page.url,
+    )
+    try:
+        probe = await page.evaluate(DOM_PROBE_SCRIPT, settings.BLOCK_DETECTION_MAX_TEXT_CHARS * 3)
+    except PlaywrightError as exc:
+        logger.debug(f"Sonda de bloqueio indisponivel: {exc}")
+        return evidence
+    evidence.title = probe.get("title") or ""
+    evidence.html = probe.get("html") or ""
+    evidence.text = probe.get("text") or ""
+    evidence.text_length = int(probe.get("textLength") or 0)
+    evidence.resource_urls = list(probe.get("sources") or [])
+    return evidence
+
+
+_detector: BlockDetector | None = None
+
+
+def get_block_detector() -> BlockDetector:
+    """Retorna o detector do processo (detectores extras via `register`)."""
+    global _detector
+    if _detector is None:
+        _detector = BlockDetector(markers=(*BLOCK_MARKERS, *settings.BLOCK_DETECTION_EXTRA_MARKERS))
+    return _detector
@@ -0,0 +1,188 @@
+"""Politica declarativa de bloqueio de recursos aplicada no proprio Chromium."""
+from dataclasses import dataclass, field
+from typing import Any
+
+from loguru import logger
+from playwright.async_api import BrowserContext, Page
+from playwright.async_api import Error as PlaywrightError
+
+from src.config.settings import settings
+
+RESOURCE_TYPE_EXTENSIONS: dict[str, tuple[str, ...]] = {
+    "image": ("png", "jpg", "jpeg", "gif", "webp", "avif", "svg", "ico", "bmp"),
+    "font": ("woff", "woff2", "ttf", "otf", "eot"),
+    "media": ("mp4", "webm", "mp3", "m4a", "ogg", "wav", "m3u8", "mov"),
+    "stylesheet": ("css",),
+}
+
+TRACKER_HOSTS: tuple[str, ...] = (
+    "google-analytics.com",
+    "googletagmanager.com",
+    "doubleclick.net",
+    "googlesyndication.com",
+    "googleadservices.com",
+    "connect.facebook.net",
+    "hotjar.com",
+    "clarity.ms",
+    "segment.io",
+    "segment.com",
+    "mixpanel.com",
+    "amplitude.com",
+    "nr-data.net",
+    "fullstory.com",
+    "taboola.com",
+    "outbrain.com",
+    "criteo.com",
+    "criteo.net",
+    "adnxs.com",
+    "scorecardresearch.com",
+    "quantserve.com",
+    "bat.bing.com",
+    "analytics.tiktok.com",
+    "px.ads.linkedin.com",
+    "static.ads-twitter.com",
+)
+
+# Tamanho medio (bytes) por tipo de recurso, usado para estimar economia de banda.
+AVERAGE_RESOURCE_BYTES: dict[str, int] = {
+    "image": 45_000,
+    "font": 35_000,
+    "media": 500_000,
+    "stylesheet": 25_000,
+    "script": 40_000,
+    "xhr": 5_000,
+    "fetch": 5_000,
+}
+
+
+@dataclass
+class BlockingPolicy:
+    """Regras de bloqueio: tipos de recurso, hosts de terceiros e excecoes."""
+
+    blocked_types: set[str] = field(default_factory=lambda: {"image", "media", "font"})
+    block_trackers: bool = True
+    block_hosts: set[str] = field(default_factory=set)
+    allow_hosts: set[str] = field(default_factory=set)
+
+    @classmethod
+    def for_domain(cls, domain: str) -> "BlockingPolicy":
+        """Monta a politica padrao aplicando overrides configurados para o dominio."""
+        policy = cls(
+            blocked_types=set(settings.BLOCKED_RESOURCE_TYPES),
+            block_trackers=settings.BLOCK_TRACKERS,
+        )
+        override = _find_override(domain)
+        if override:
+            policy.blocked_types -= set(override.get("allow_types", []))
+            policy.blocked_types |= set(override.get("block_types", []))
+            policy.block_hosts |= set(override.get("block_hosts", []))
+            policy.allow_hosts |= set(override.get("allow_hosts", []))
+        return policy
+
+    def url_patterns(self) -> list[str]:
+        """Padroes no formato de Network.setBlockedURLs (`*` casa qualquer trecho)."""
+        patterns: list[str] = []
+        for resource_type in sorted(self.blocked_types):
+            for ext in RESOURCE_TYPE_EXTENSIONS.get(resource_type, ()):
+                patterns.extend([f"*.{ext}", f"*.{ext}?*"])
+        hosts = set(self.block_hosts)
+        if self.block_trackers:
+            hosts |= set(TRACKER_HOSTS)
+        for host in sorted(hosts - self.allow_hosts):
+            patterns.extend([f"*://{host}/*", f"*://*.{host}/*"])
+        return patterns
+
+    def route_globs(self) -> list[str]:
+        """Globs equivalentes para `context.route` quando CDP nao esta disponivel."""
+        globs: list[str] = []
+        extensions = [
+            ext for resource_type in sorted(self.blocked_types) for ext in RESOURCE_TYPE_EXTENSIONS.get(resource_type, ())
+        ]
+        if extensions:
+            globs.append(f"**/*.{{{','.join(extensions)}}}")
+        hosts = set(self.block_hosts)
+        if self.block_trackers:
+            hosts |= set(TRACKER_HOSTS)
+        for host in sorted(hosts - self.allow_hosts):
+            globs.extend([f"*://{host}/**", f"*://*.{host}/**"])
+        return globs
+
+
+# Buffer de Resource Timing maior que o padrao (250), para a contagem de permitidos.
+RESOURCE_TIMING_BUFFER_SCRIPT = "performance.setResourceTimingBufferSize(5000);"
+
+
+class BlockingStats:
+    """Conta requests bloqueados/permitidos de uma captura.
+
+    Bloqueados chegam pelo CDP (`Network.loadingFailed`) ou pelo handler de
+    route; permitidos vem do Resource Timing da pagina, lido no bundle de
+    captura. Nenhum request permitido gera callback Python.
+    """
+
+    def __init__(self, method: str, patterns: int) -> None:
+        self.method = method
+        self.patterns = patterns
+        self.allowed = 0
+        self.blocked_by_type: dict[str, int] = {}
+
+    def record_blocked(self, resource_type: str) -> None:
+        self.blocked_by_type[resource_type] = self.blocked_by_type.get(resource_type, 0) + 1
+
+    def _on_loading_failed(self, params: dict[str, Any]) -> None:
+        if params.get("blockedReason") or "BLOCKED_BY_CLIENT" in (params.get("errorText") or ""):
+            self.record_blocked(str(params.get("type") or "other").lower())
+
+    def as_dict(self) -> dict[str, Any]:
+        blocked = sum(self.blocked_by_type.values())
+        return {
+            "method": self.method,
+            "patterns": self.patterns,
+            "blocked": blocked,
+            "allowed": self.allowed,
+            "blocked_by_type": dict(self.blocked_by_type),
+            "bytes_saved_estimate": sum(
+                AVERAGE_RESOURCE_BYTES.get(resource_type, 10_000) * count
+                for resource_type, count in self.blocked_by_type.items()
+            ),
+        }
+
+
+async def apply_blocking_policy(context: BrowserContext, page: Page, policy: BlockingPolicy) -> BlockingStats:
+    """Instala o bloqueio sem callback Python por request.
+
+    Preferencia: `Network.setBlockedURLs` via CDP (o Chromium descarta sozinho).
+    Fallback: `context.route` apenas nos globs bloqueados, de modo que requests
+    permitidos nunca passam pelo Python.
+    """
+    patterns = policy.url_patterns()
+    await page.add_init_script(RESOURCE_TIMING_BUFFER_SCRIPT)
+    try:
+        cdp = await context.new_cdp_session(page)
+        await cdp.send("Network.enable")
+        await cdp.send("Network.setBlockedURLs", {"urls": patterns})
+        stats = BlockingStats(method="cdp", patterns=len(patterns))
+        # So requests que falharam chegam aqui; os permitidos ficam no Chromium.
+        cdp.on("Network.loadingFailed", stats._on_loading_failed)
+    except PlaywrightError as exc:
+        logger.warning(f"CDP indisponivel para bloqueio ({exc}); usando route com globs restritos")
+        globs = policy.route_globs()
+        stats = BlockingStats(method="route", patterns=len(globs))
+
+        async def abort(route: Any) -> None:
+            stats.record_blocked(route.request.resource_type)
+            await route.abort("blockedbyclient")
+
+        for glob in globs:
+            await context.route(glob, abort)
+    return stats
+
+
+def _find_override(domain: str) -> dict[str, list[str]] | None:
+    overrides = settings.BLOCKING_DOMAIN_OVERRIDES
+    domain = domain.lower()
+    while domain:
+        if domain in overrides:
+            return overrides[domain]
+        _, _, domain = domain.partition(".")
+    return None
@@ -1,29 +1,50 @@
 """Browser manager usando Playwright."""
 import asyncio
 import base64
-import re
-from typing import Any
+import os
+import time
+from contextlib import asynccontextmanager
+from typing import Any, AsyncIterator
+from urllib.parse import urlparse
 
 from loguru import logger
 from playwright.async_api import (
-    Browser,
     BrowserContext,
     Page,
-    Playwright,
     TimeoutError as PlaywrightTimeoutError,
-    async_playwright,
 )
 
-from src.core.errors import BlockedScraperError, NetworkScraperError
+from src.core.block_detection import BlockDetector, BlockEvidence, get_block_detector, probe_page
+from src.core.blocking import BlockingPolicy, BlockingStats, apply_blocking_policy
+from src.core.browser_pool import BrowserPool, get_browser_pool
+from src.core.capture import capture_page_bundle
+from src.core.capture_profiles import CaptureProfile, get_capture_profile
+from src.core.errors import BlockedScraperError, NetworkScraperError, NonRecoverableScraperError
+from src.core.pagination import find_next_page
+from src.core.pdf_extractor import PAGE_SEPARATOR, download_pdf_to_tempfile, extract_pdf_pages
+from src.core.scroll import event_driven_scroll
+from src.core.session_store import SessionStore, get_session_store
+from src.core.vision import estimate_vision_tokens, plan_screenshot, should_skip_screenshot
 from src.config.settings import settings
 
 
+READINESS_LADDER = ("commit", "domcontentloaded", "load", "networkidle")
+# Headers da navegacao que nao se repetem no download em streaming (cookies vem do contexto).
+_NOT_FORWARDED_HEADERS = {"host", "connection", "content-length", "accept-encoding", "cookie"}
+
+
 class BrowserManager:
     """Gerencia navegador para captura de paginas."""
 
-    def __init__(self) -> None:
-        self.playwright: Playwright | None = None
-        self.browser: Browser | None = None
+    def __init__(
+        self,
+        pool: BrowserPool | None = None,
+        session_store: SessionStore | None = None,
+        block_detector: BlockDetector | None = None,
+    ) -> None:
+        self.pool = pool
+        self.session_store = session_store or get_session_store()
+        self.block_detector = block_detector or get_block_detector()
 
     async def __aenter__(self) -> "BrowserManager":
         await self.initialize()
@@ -33,19 +54,10 @@ class BrowserManager:
         await self.close()
 
     async def initialize(self) -> None:
-        """Inicializa Playwright e Chromium."""
-        logger.info("Inicializando Playwright...")
-        self.playwright = await async_playwright().start()
-        self.browser = await self.playwright.chromium.launch(
-            headless=settings.HEADLESS,
-            args=[
-                "--no-sandbox",
-                "--disable-setuid-sandbox",
-                "--disable-dev-shm-usage",
-                "--disable-blink-features=AutomationControlled",
-            ],
-        )
-        logger.info("Browser inicializado")
+        """Conecta ao pool de Chromium do processo."""
+        if self.pool is None:
+            self.pool = get_browser_pool()
+        await self.pool.start()
 
     async def navigate_and_capture(
         self,
@@ -58,21 +70,37 @@ class BrowserManager:
         auto_scroll: bool = True,
         scroll_steps: int = 6,
         block_resources: bool = True,
+        capture_profile: str | None = None,
     ) -> tuple[str, str, str, str, list[str], dict[str, Any]]:
-        """Navega para URL e retorna screenshot, html, texto, accessibility, imagens e metadata."""
-        if not self.browser:
+        """Navega para URL e retorna screenshot, html, texto, accessibility, imagens e metadata.
+
+        `capture_profile` (text_only, text_ax, vision, full) limita os artefatos produzidos.
+        """
+        if not self.pool:
             raise RuntimeError("Browser nao inicializado")
 
         timeout = timeout or settings.BROWSER_TIMEOUT
-        # Session Persistence Logic
-        from urllib.parse import urlparse
-        import os
-        
         domain = urlparse(url).netloc.replace("www.", "")
-        session_dir = "data/sessions"
-        os.makedirs(session_dir, exist_ok=True)
-        session_path = f"{session_dir}/{domain}.json"
-        
+        context_args = await self._context_args(domain)
+
+        async with self.pool.lease(**context_args) as context:
+            return await self._capture_in_context(
+                context=context,
+                url=url,
+                wait_until=wait_until,
+                timeout=timeout,
+                screenshot_quality=screenshot_quality,
+                full_page=full_page,
+                execute_js=execute_js,
+                auto_scroll=auto_scroll,
+                scroll_steps=scroll_steps,
+                block_resources=block_resources,
+                domain=domain,
+                profile=get_capture_profile(capture_profile),
+            )
+
+    async def _context_args(self, domain: str) -> dict[str, Any]:
+        """Argumentos do contexto (fingerprint + sessao salva do dominio)."""
         context_args = {
             "viewport": {"width": settings.VIEWPORT_WIDTH, "height": settings.VIEWPORT_HEIGHT},
             "locale": "pt-BR",
@@ -88,22 +116,98 @@ class BrowserManager:
                 "Sec-CH-UA-Platform": '"Windows"',
             },
         }
-        
-        if os.path.exists(session_path):
-            logger.info(f"Carregando sessao existente para {domain}")
-            context_args["storage_state"] = session_path
 
-        context = await self.browser.new_context(**context_args)
+        # Session Persistence: estado vem do cache em memoria, disco so no primeiro acesso
+        storage_state = await self.session_store.get(domain)
+        if storage_state:
+            context_args["storage_state"] = storage_state
+        return context_args
+
+    @asynccontextmanager
+    async def paginated_session(self, url: str, block_resources: bool = True) -> AsyncIterator["PaginatedSession"]:
+        """Empresta um contexto e uma unica aba para percorrer varias paginas do mesmo site."""
+        if not self.pool:
+            raise RuntimeError("Browser nao inicializado")
+        domain = urlparse(url).netloc.replace("www.", "")
+        async with self.pool.lease(**await self._context_args(domain)) as context:
+            page, blocking_stats = await self._prepare_page(context, domain, block_resources)
+            yield PaginatedSession(self, context, page, blocking_stats, domain)
+
+    async def _prepare_page(
+        self,
+        context: BrowserContext,
+        domain: str,
+        block_resources: bool,
+    ) -> tuple[Page, BlockingStats | None]:
         page = await context.new_page()
         await self._apply_stealth(page)
-        
+
+        blocking_stats: BlockingStats | None = None
         if block_resources:
-            await self._block_resources(page)  # OPTIMIZATION: Bloqueio de recursos conditionally
+            # OPTIMIZATION: bloqueio declarativo no Chromium, sem round trip Python por request
+            blocking_stats = await apply_blocking_policy(context, page, BlockingPolicy.for_domain(domain))
+        return page, blocking_stats
+
+    async def _capture_in_context(
+        self,
+        context: BrowserContext,
+        url: str,
+        wait_until: str,
+        timeout: int,
+        screenshot_quality: int,
+        full_page: bool,
+        execute_js: str | None,
+        auto_scroll: bool,
+        scroll_steps: int,
+        block_resources: bool,
+        domain: str,
+        profile: CaptureProfile,
+    ) -> tuple[str, str, str, str, list[str], dict[str, Any]]:
+        page, blocking_stats = await self._prepare_page(context, domain, block_resources)
+        return await self._capture_on_page(
+            context=context,
+            page=page,
+            url=url,
+            wait_until=wait_until,
+            timeout=timeout,
+            screenshot_quality=screenshot_quality,
+            full_page=full_page,
+            execute_js=execute_js,
+            auto_scroll=auto_scroll,
+            scroll_steps=scroll_steps,
+            blocking_stats=blocking_stats,
+            domain=domain,
+            profile=profile,
+        )
 
+    async def _capture_on_page(
+        self,
+        context: BrowserContext,
+        page: Page,
+        url: str,
+        wait_until: str,
+        timeout: int,
+        screenshot_quality: int,
+        full_page: bool,
+        execute_js: str | None,
+        auto_scroll: bool,
+        scroll_steps: int,
+        blocking_stats: BlockingStats | None,
+        domain: str,
+        profile: CaptureProfile,
+        click_selector: str | None = None,
+        detect_next_page: bool = False,
+    ) -> tuple[str, str, str, str, list[str], dict[str, Any]]:
+        started = time.perf_counter()
         try:
+            navigation_info: dict[str, Any] | None = None
             try:
-                response, resolved_wait_until = await self._goto_with_fallback(
-                    page=page, url=url, preferred_wait_until=wait_until, timeout=timeout
+                response, resolved_wait_until, navigation_info = await self._goto_progressive(
+                    page=page,
+                    url=url,
+                    preferred_wait_until=wait_until,
+                    timeout=timeout,
+                    click_selector=click_selector,
                 )
             except Exception as exc:
                 # Se falhar com ERR_ABORTED, pode ser um download (ex: PDF)
@@ -118,33 +222,13 @@ class BrowserManager:
             if response:
                 content_type = response.headers.get("content-type", "").lower()
                 if "application/pdf" in content_type or url.lower().endswith(".pdf"):
-                    logger.info("PDF detectado. Baixando e extraindo texto...")
-                    pdf_data = await response.body()
-                    
-                    import io
-                    from pypdf import PdfReader
-                    
+                    logger.info("PDF detectado. Extraindo texto fora do event loop...")
                     try:
-                        reader = PdfReader(io.BytesIO(pdf_data))
-                        text_list = []
-                        for page_num, pdf_page in enumerate(reader.pages):
-                            text_list.append(pdf_page.extract_text() or "")
-                        text_content = "\n".join(text_list)
-                        html = f"<html><body><h1>Conteudo PDF: {url}</h1><pre>{text_content[:2000]}...</pre></body></html>"
-                        screenshot_base64 = ""
-                        
-                        metadata = {
-                            "requested_url": url,
-                            "final_url": response.url,
-                            "status": response.status,
-                            "title": f"PDF: {url.split('/')[-1]}",
-                            "auto_scroll": False,
-                            "scroll_steps": 0,
-                            "wait_until_used": resolved_wait_until,
-                            "screenshot_mode": "pdf",
-                            "content_type": "application/pdf",
-                        }
-                        return screenshot_base64, html, text_content, "", [], metadata
+                        return await self._capture_pdf(
+                            url=url, page=page, response=response, resolved_wait_until=resolved_wait_until
+                        )
+                    except NonRecoverableScraperError:
+                        raise
                     except Exception as exc:
                         logger.error(f"Erro ao ler PDF: {exc}")
                         if resolved_wait_until == "fetch_fallback":
@@ -166,69 +250,60 @@ class BrowserManager:
                  }
                  return "", html, text_content, "", [], metadata
 
+            scroll_info: dict[str, Any] | None = None
             if auto_scroll:
-                await self._smart_scroll(page=page, max_steps=scroll_steps)  # OPTIMIZATION: Smart Scroll
+                scroll_info = await self._smart_scroll(page=page, max_steps=scroll_steps)  # OPTIMIZATION: Smart Scroll
 
             if execute_js:
                 await page.evaluate(execute_js)
                 await asyncio.sleep(1)
             
-            # Save session state logic
+            # Save session state logic (write-behind, sem disco no caminho do request)
             try:
-                await context.storage_state(path=session_path)
-                logger.info(f"Sessao salva para {domain}")
+                self.session_store.put(domain, await context.storage_state())
             except Exception as e:
                 logger.warning(f"Nao foi possivel salvar sessao: {e}")
 
-            screenshot_bytes, screenshot_mode = await self._capture_with_fallback(
-                page=page,
-                full_page=full_page,
-                screenshot_quality=screenshot_quality,
-            )
-            screenshot_base64 = base64.b64encode(screenshot_bytes).decode("utf-8")
-
-            html = await page.content()
-            
-            # OPTIMIZATION: Accessibility Snapshot
-            try:
-                ax_tree = await page.accessibility.snapshot()
-                import json
-                accessibility_snapshot = json.dumps(ax_tree, ensure_ascii=False) if ax_tree else ""
-            except Exception:
-                accessibility_snapshot = ""
-
-            # OPTIMIZATION: Extract Image URLs (Hybrid Approach)
-            image_urls = await page.evaluate(
-                """
-                () => {
-                    return Array.from(document.querySelectorAll('img'))
-                        .map(img => img.src)
-                        .filter(src => src && src.startsWith('http') && !src.includes('base64'))
-                        .slice(0, 50); // Limit to 50 images
-                }
-                """
-            )
+            # OPTIMIZATION: titulo, texto, imagens, HTML e estrutura em um unico round trip
+            bundle = await capture_page_bundle(page, profile=profile)
+            html = bundle["html"]
+            text_content = bundle["text"]
+            accessibility_snapshot = bundle["accessibility_snapshot"]
+            image_urls = bundle["image_urls"]
+            title = bundle["title"]
+            capture_metrics = bundle["metrics"]
 
-            text_content = await page.evaluate(
-                """
-                () => {
-                    const body = document.body.cloneNode(true);
-                    body.querySelectorAll("script, style, noscript, iframe").forEach(el => el.remove());
-                    return body.innerText || "";
-                }
-                """
-            )
-            title = await page.title()
-            block_reason = self._detect_block_reason(
-                html=html,
-                text_content=text_content,
-                title=title,
-                final_url=page.url,
-                status_code=response.status if response else None,
+            # Challenges renderizados tarde por JS: checagem final antes do screenshot
+            block_reason = self.block_detector.detect(
+                BlockEvidence(
+                    status=response.status if response else None,
+                    headers=dict(response.headers) if response else {},
+                    final_url=page.url,
+                    title=title,
+                    html=html,
+                    text=text_content,
+                )
             )
             if block_reason:
                 raise BlockedScraperError(block_reason)
 
+            # OPTIMIZATION: screenshot dimensionado para o orcamento de tokens de visao
+            if profile.screenshot:
+                screenshot_base64, screenshot_mode, screenshot_info = await self._capture_screenshot_stage(
+                    page=page,
+                    viewport=bundle["viewport"],
+                    full_page=full_page,
+                    screenshot_quality=screenshot_quality,
+                    text_content=text_content,
+                    accessibility_snapshot=accessibility_snapshot,
+                )
+            else:
+                screenshot_base64, screenshot_mode = "", "skipped"
+                screenshot_info = {"skipped": True, "reason": "capture_profile", "estimated_tokens": 0}
+            capture_metrics["bytes"]["screenshot"] = len(screenshot_base64) * 3 // 4
+            if blocking_stats:
+                blocking_stats.allowed = capture_metrics["resource_requests"]
+
             metadata = {
                 "requested_url": url,
                 "final_url": page.url,
@@ -237,37 +312,210 @@ class BrowserManager:
                 "auto_scroll": auto_scroll,
                 "scroll_steps": scroll_steps,
                 "wait_until_used": resolved_wait_until,
+                "navigation": navigation_info,
                 "screenshot_mode": screenshot_mode,
+                "screenshot": screenshot_info,
+                "scroll": scroll_info,
+                "capture": capture_metrics,
+                "html_truncated": capture_metrics["html_truncated"],
+                **_validator_headers(response),
+                "blocking": blocking_stats.as_dict() if blocking_stats else None,
+                "capture_profile": {
+                    **profile.as_dict(),
+                    "duration_ms": round((time.perf_counter() - started) * 1000, 1),
+                    "bytes": sum(capture_metrics["bytes"].values()),
+                },
             }
+            if detect_next_page:
+                metadata["next_page"] = await find_next_page(page)
             return screenshot_base64, html, text_content, accessibility_snapshot, image_urls, metadata
 
         except PlaywrightTimeoutError as exc:
             raise NetworkScraperError(f"Timeout navegando em {url}: {exc}") from exc
-        finally:
-            await context.close()
 
-    async def _goto_with_fallback(
+    async def _capture_pdf(
+        self,
+        url: str,
+        page: Page,
+        response: Any,
+        resolved_wait_until: str,
+    ) -> tuple[str, str, str, str, list[str], dict[str, Any]]:
+        """Extrai o PDF por pagina; arquivos grandes vao para disco em vez da RAM.
+
+        O Playwright so entrega o corpo da navegacao inteiro em memoria. PDFs
+        grandes ou sem `Content-Length` (chunked) sao baixados de novo em
+        streaming, com os headers da navegacao e os cookies do contexto, e o
+        limite `PDF_MAX_BYTES` vale durante o download.
+        """
+        raw_length = response.headers.get("content-length")
+        content_length = int(raw_length) if raw_length and raw_length.isdigit() else None
+        if content_length is not None and content_length > settings.PDF_MAX_BYTES:
+            raise NonRecoverableScraperError(
+                f"PDF de {content_length} bytes excede o limite de {settings.PDF_MAX_BYTES}"
+            )
+
+        spooled = content_length is None or content_length > settings.PDF_SPOOL_BYTES
+        if spooled:
+            path = await download_pdf_to_tempfile(response.url, headers=await _session_headers(page, response))
+            try:
+                content_length = os.path.getsize(path)
+                extraction = await extract_pdf_pages(path=path)
+            finally:
+                os.unlink(path)
+        else:
+            data = await response.body()
+            if len(data) > settings.PDF_MAX_BYTES:
+                raise NonRecoverableScraperError(
+                    f"PDF de {len(data)} bytes excede o limite de {settings.PDF_MAX_BYTES}"
+                )
+            extraction = await extract_pdf_pages(data=data)
+
+        pages = extraction.pop("pages")
+        text_content = PAGE_SEPARATOR.join(pages)[: settings.CAPTURE_MAX_TEXT_CHARS]
+        metadata = {
+            "requested_url": url,
+            "final_url": response.url,
+            "status": response.status,
+            "title": f"PDF: {url.split('/')[-1]}",
+            "auto_scroll": False,
+            "scroll_steps": 0,
+            "wait_until_used": resolved_wait_until,
+            "screenshot_mode": "pdf",
+            "content_type": "application/pdf",
+            "pdf": {**extraction, "bytes": content_length, "spooled": spooled},
+            **_validator_headers(response),
+        }
+        return "", "", text_content, "", [], metadata
+
+    async def _goto_progressive(
         self,
-        page: Any,
+        page: Page,
         url: str,
         preferred_wait_until: str,
         timeout: int,
-    ) -> tuple[Any, str]:
-        wait_modes = [preferred_wait_until, "load", "domcontentloaded", "networkidle"]
-        seen: set[str] = set()
-        ordered_modes = [m for m in wait_modes if not (m in seen or seen.add(m))]
+        click_selector: str | None = None,
+    ) -> tuple[Any, str, dict[str, Any]]:
+        """Navega uma unica vez e escala o nivel de prontidao ate o prazo total.
 
-        last_error: Exception | None = None
-        for mode in ordered_modes:
+        O goto retorna no `commit`; depois aguarda DOMContentLoaded -> load ->
+        networkidle na mesma pagina ate atingir `preferred_wait_until` ou esgotar
+        `timeout` (ms). Retorna o melhor estado alcancado. Com `click_selector`
+        a navegacao e um clique (paginacao por botao), com ou sem troca de URL.
+        """
+        target = preferred_wait_until if preferred_wait_until in READINESS_LADDER else "networkidle"
+        started = time.perf_counter()
+        deadline = started + timeout / 1000
+
+        def elapsed_ms() -> float:
+            return round((time.perf_counter() - started) * 1000, 1)
+
+        if click_selector:
+            logger.info(f"Seguindo paginacao por clique (alvo={target})")
+            response = await self._click_and_commit(page, click_selector, timeout)
+        else:
+            logger.info(f"Navegando com wait_until=commit (alvo={target})")
+            response = await page.goto(url, wait_until="commit", timeout=timeout)
+        reached = "commit"
+        stages_ms = {"commit": elapsed_ms()}
+        # Fail fast: status/headers ja bastam para reconhecer a maioria dos challenges
+        self._raise_if_blocked(BlockEvidence(
+            status=response.status if response else None,
+            headers=dict(response.headers) if response else {},
+            final_url=page.url,
+        ))
+
+        for state in READINESS_LADDER[1 : READINESS_LADDER.index(target) + 1]:
+            remaining_ms = (deadline - time.perf_counter()) * 1000
+            if remaining_ms <= 0:
+                break
+            try:
+                await page.wait_for_load_state(state, timeout=remaining_ms)
+            except PlaywrightTimeoutError:
+                logger.warning(f"Prazo de navegacao esgotado aguardando {state}; usando {reached}")
+                break
+            reached = state
+            stages_ms[state] = elapsed_ms()
+            if state == "domcontentloaded":
+                self._raise_if_blocked(await probe_page(page, response))
+                stages_ms["block_check"] = elapsed_ms()
+
+        return response, reached, {
+            "target": target,
+            "reached": reached,
+            "deadline_ms": timeout,
+            "stages_ms": stages_ms,
+        }
+
+    async def _click_and_commit(self, page: Page, selector: str, timeout: int) -> Any:
+        """Clica no controle de paginacao; retorna a resposta se houve navegacao."""
+        try:
+            async with page.expect_navigation(wait_until="commit", timeout=min(timeout, 5_000)) as navigation:
+                await page.click(selector, timeout=timeout)
+            return await navigation.value
+        except PlaywrightTimeoutError:
+            # Paginacao via JS: o conteudo muda sem navegacao
+            return None
+
+    def _raise_if_blocked(self, evidence: BlockEvidence) -> None:
+        reason = self.block_detector.detect(evidence)
+        if reason:
+            logger.warning(f"Bloqueio detectado antes da captura: {reason}")
+            raise BlockedScraperError(reason)
+
+    async def _capture_screenshot_stage(
+        self,
+        page: Page,
+        viewport: dict[str, Any],
+        full_page: bool,
+        screenshot_quality: int,
+        text_content: str,
+        accessibility_snapshot: str,
+    ) -> tuple[str, str, dict[str, Any]]:
+        """Captura (ou omite) o screenshot conforme o orcamento de tokens de visao.
+
+        Retorna (base64, modo, info). A reducao e feita pelo proprio Chromium via
+        `Page.captureScreenshot` com `clip.scale`, que ja devolve base64.
+        """
+        skip, skip_reason = should_skip_screenshot(text_content, accessibility_snapshot)
+        if skip:
+            logger.info("Screenshot omitido: texto/estrutura ja cobrem a pagina")
+            return "", "skipped", {"skipped": True, "reason": skip_reason, "estimated_tokens": 0}
+
+        width = int(viewport.get("width") or settings.VIEWPORT_WIDTH)
+        height = int(viewport.get("height") or settings.VIEWPORT_HEIGHT)
+        if full_page:
+            width = int(viewport.get("documentWidth") or width)
+            height = min(int(viewport.get("documentHeight") or height), settings.VISION_MAX_FULL_PAGE_HEIGHT)
+        plan = plan_screenshot(width, height)
+        info = {"skipped": False, **plan.as_dict(), "source_width": width, "source_height": height}
+        quality = max(35, min(screenshot_quality, 100))
+        try:
+            cdp = await page.context.new_cdp_session(page)
             try:
-                logger.info(f"Navegando com wait_until={mode}")
-                return await page.goto(url, wait_until=mode, timeout=timeout), mode
-            except PlaywrightTimeoutError as exc:
-                last_error = exc
-                logger.warning(f"Timeout em wait_until={mode}. Tentando fallback...")
-        if last_error:
-            raise last_error
-        return await page.goto(url, wait_until=preferred_wait_until, timeout=timeout), preferred_wait_until
+                result = await cdp.send(
+                    "Page.captureScreenshot",
+                    {
+                        "format": "jpeg",
+                        "quality": quality,
+                        "captureBeyondViewport": full_page,
+                        "clip": {"x": 0, "y": 0, "width": width, "height": height, "scale": plan.scale},
+                    },
+                )
+            finally:
+                await cdp.detach()
+            return result["data"], "budgeted", info
+        except Exception as exc:  # noqa: BLE001
+            logger.warning(f"Falha no screenshot via CDP ({exc}); usando captura padrao")
+
+        screenshot_bytes, screenshot_mode = await self._capture_with_fallback(
+            page=page,
+            full_page=full_page,
+            screenshot_quality=screenshot_quality,
+        )
+        # Sem reducao: o modelo recebe a imagem no tamanho original.
+        info.update({"scale": 1.0, "width": width, "height": height})
+        info["estimated_tokens"] = estimate_vision_tokens(width, height, info["detail"])
+        return base64.b64encode(screenshot_bytes).decode("utf-8"), screenshot_mode, info
 
     async def _capture_with_fallback(
         self,
@@ -307,55 +555,22 @@ class BrowserManager:
             """
         )
 
-    def _detect_block_reason(
-        self,
-        html: str,
-        text_content: str,
-        title: str,
-        final_url: str,
-        status_code: int | None,
-    ) -> str | None:
-        candidate = " ".join(
-            [html[:8_000].lower(), text_content[:4_000].lower(), (title or "").lower(), final_url.lower()]
-        )
-        blockers = [
-            r"\\bcaptcha\\b",
-            r"cloudflare",
-            r"access denied",
-            r"attention required",
-            r"verify you are human",
-            r"incapsula",
-            r"bot detection",
-            r"unusual traffic",
-        ]
-        for pattern in blockers:
-            if re.search(pattern, candidate):
-                return f"Possivel bloqueio detectado ({pattern})"
-        if status_code in {401, 403, 429, 503}:
-            return f"Status HTTP indica bloqueio/protecao: {status_code}"
-        return None
-
-    async def _block_resources(self, page: Page) -> None:
-        """Bloqueia recursos desnecessarios para economizar banda e tempo."""
-        blocked_types = {"image", "font", "media", "stylesheet"}  # Stylesheet opcional, as vezes quebra layout visual
-        # Para visao computacional, TALVEZ precisemos de imagens/css. 
-        # Mas para velocidade, bloquear é melhor. 
-        # Vamos bloquear imagens e fontes por enquanto.
-        
-        async def route_handler(route: Any) -> None:
-            if route.request.resource_type in {"image", "media", "font"}:
-                await route.abort()
-            else:
-                await route.continue_()
-
-        await page.route("**/*", route_handler)
-
-    async def _smart_scroll(self, page: Page, max_steps: int = 20) -> None:
+    async def _smart_scroll(self, page: Page, max_steps: int = 20) -> dict[str, Any]:
         """Scroll inteligente que detecta carregamento de conteudo."""
         logger.info("Iniciando Smart Scroll...")
+        if settings.SCROLL_MODE == "events":
+            return await event_driven_scroll(page=page, max_steps=max_steps)
+        return await self._legacy_scroll(page=page, max_steps=max_steps)
+
+    async def _legacy_scroll(self, page: Page, max_steps: int) -> dict[str, Any]:
+        """Scroll com esperas fixas (comportamento anterior, SCROLL_MODE=legacy)."""
+        started = time.perf_counter()
         last_height = await page.evaluate("document.body.scrollHeight")
-        
+        steps_used = 0
+        stop_reason = "max_steps"
+
         for i in range(max_steps):
+            steps_used = i + 1
             await page.evaluate("window.scrollTo(0, document.body.scrollHeight);")
             
             # Aguarda rede acalmar ou timeout curto
@@ -373,18 +588,105 @@ class BrowserManager:
                 new_height = await page.evaluate("document.body.scrollHeight")
                 if new_height == last_height:
                     logger.info(f"Smart Scroll finalizado no passo {i+1} (fim da pagina).")
+                    stop_reason = "no_new_content"
                     break
             
             last_height = new_height
             
         await page.evaluate("window.scrollTo(0, 0);")
+        return {
+            "mode": "legacy",
+            "steps_used": steps_used,
+            "elapsed_ms": int((time.perf_counter() - started) * 1000),
+            "stop_reason": stop_reason,
+        }
 
     async def close(self) -> None:
-        """Fecha recursos."""
-        if self.browser:
-            await self.browser.close()
-            self.browser = None
-        if self.playwright:
-            await self.playwright.stop()
-            self.playwright = None
-        logger.info("Browser fechado")
+        """Libera o manager; o pool compartilhado continua vivo."""
+        self.pool = None
+
+
+class PaginatedSession:
+    """Aba unica de um contexto emprestado, reaproveitada entre as paginas de uma listagem."""
+
+    def __init__(
+        self,
+        manager: BrowserManager,
+        context: BrowserContext,
+        page: Page,
+        blocking_stats: BlockingStats | None,
+        domain: str,
+    ) -> None:
+        self.manager = manager
+        self.context = context
+        self.page = page
+        self.blocking_stats = blocking_stats
+        self.domain = domain
+        self.pages_captured = 0
+
+    async def capture(
+        self,
+        url: str,
+        next_page: dict[str, Any] | None = None,
+        wait_until: str = "networkidle",
+        timeout: int | None = None,
+        screenshot_quality: int = 70,
+        full_page: bool = False,
+        execute_js: str | None = None,
+        auto_scroll: bool = True,
+        scroll_steps: int = 6,
+        capture_profile: str | None = None,
+    ) -> tuple[str, str, str, str, list[str], dict[str, Any]]:
+        """Captura `url` ou segue `next_page` (detectado na captura anterior) na mesma aba.
+
+        A metadata inclui `next_page` da pagina capturada e `page_number`.
+        """
+        click_selector = None
+        if next_page:
+            if next_page.get("click"):
+                click_selector = next_page["selector"]
+                url = self.page.url
+            else:
+                url = next_page["url"]
+        captured = await self.manager._capture_on_page(
+            context=self.context,
+            page=self.page,
+            url=url,
+            wait_until=wait_until,
+            timeout=timeout or settings.BROWSER_TIMEOUT,
+            screenshot_quality=screenshot_quality,
+            full_page=full_page,
+            execute_js=execute_js,
+            auto_scroll=auto_scroll,
+            scroll_steps=scroll_steps,
+            blocking_stats=self.blocking_stats,
+            domain=self.domain,
+            profile=get_capture_profile(capture_profile),
+            click_selector=click_selector,
+            detect_next_page=True,
+        )
+        self.pages_captured += 1
+        captured[5]["page_number"] = self.pages_captured
+        return captured
+
+
+async def _session_headers(page: Page, response: Any) -> dict[str, str]:
+    """Headers da navegacao e cookies do contexto, para repetir o request com a mesma sessao."""
+    headers: dict[str, str] = {}
+    request = getattr(response, "request", None)  # APIResponse (fetch manual) nao tem request
+    if request is not None:
+        headers = {
+            name: value
+            for name, value in (await request.all_headers()).items()
+            if not name.startswith(":") and name not in _NOT_FORWARDED_HEADERS
+        }
+    cookies = await page.context.cookies([response.url])
+    if cookies:
+        headers["cookie"] = "; ".join(f"{cookie['name']}={cookie['value']}" for cookie in cookies)
+    return headers
+
+
+def _validator_headers(response: Any) -> dict[str, str | None]:
+    """ETag/Last-Modified da resposta principal, usados na revalidacao do cache de captura."""
+    headers = response.headers if response else {}
+    return {"etag": headers.get("etag"), "last_modified": headers.get("last-modified")}
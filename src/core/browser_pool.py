@@ -0,0 +1,236 @@
+"""Pool de instancias Chromium compartilhado pelo processo."""
+import asyncio
+import time
+from contextlib import asynccontextmanager
+from typing import Any, AsyncIterator
+
+from loguru import logger
+from playwright.async_api import Browser, BrowserContext, Playwright, async_playwright
+from playwright.async_api import Error as PlaywrightError
+
+from src.config.settings import settings
+
+CHROMIUM_LAUNCH_ARGS = [
+    "--no-sandbox",
+    "--disable-setuid-sandbox",
+    "--disable-dev-shm-usage",
+    "--disable-blink-features=AutomationControlled",
+]
+
+
+class _PooledBrowser:
+    """Instancia Chromium controlada pelo pool."""
+
+    def __init__(self, slot: int, browser: Browser) -> None:
+        self.slot = slot
+        self.browser = browser
+        self.pages_served = 0
+        self.active_leases = 0
+        self.crashed = False
+        self.launched_at = time.monotonic()
+        browser.on("disconnected", self._on_disconnected)
+
+    def _on_disconnected(self, _browser: Any) -> None:
+        self.crashed = True
+
+    @property
+    def healthy(self) -> bool:
+        return not self.crashed and self.browser.is_connected()
+
+
+class BrowserPool:
+    """Mantem N Chromiums vivos e empresta um contexto isolado por scrape.
+
+    Cada instancia e reciclada apos `max_pages_per_browser` contextos ou quando
+    o processo do browser cai. Instancias em reciclagem deixam de receber novos
+    contextos e so sao fechadas quando o ultimo contexto emprestado termina.
+    """
+
+    def __init__(
+        self,
+        size: int | None = None,
+        contexts_per_browser: int | None = None,
+        max_pages_per_browser: int | None = None,
+        headless: bool | None = None,
+    ) -> None:
+        self.size = max(1, size or settings.BROWSER_POOL_SIZE)
+        self.contexts_per_browser = max(1, contexts_per_browser or settings.BROWSER_POOL_CONTEXTS_PER_BROWSER)
+        self.max_pages_per_browser = max(1, max_pages_per_browser or settings.BROWSER_POOL_MAX_PAGES_PER_BROWSER)
+        self.headless = settings.HEADLESS if headless is None else headless
+        self._playwright: Playwright | None = None
+        self._slots: list[_PooledBrowser | None] = [None] * self.size
+        self._draining: set[_PooledBrowser] = set()
+        self._lock = asyncio.Lock()
+        self._capacity = asyncio.Semaphore(self.size * self.contexts_per_browser)
+        self._closed = False
+        self._launches = 0
+        self._recycles = 0
+        self._crashes = 0
+        self._leases_total = 0
+
+    async def start(self) -> None:
+        """Inicia o driver do Playwright (os browsers sobem sob demanda)."""
+        async with self._lock:
+            await self._ensure_playwright()
+
+    @asynccontextmanager
+    async def lease(self, **context_args: Any) -> AsyncIterator[BrowserContext]:
+        """Empresta um BrowserContext novo; o contexto e fechado na saida."""
+        async with self._capacity:
+            pooled = await self._acquire_browser()
+            pooled.active_leases += 1
+            self._leases_total += 1
+            context: BrowserContext | None = None
+            try:
+                context = await pooled.browser.new_context(**context_args)
+                yield context
+            except PlaywrightError:
+                if not pooled.browser.is_connected():
+                    pooled.crashed = True
+                raise
+            finally:
+                if context is not None:
+                    try:
+                        await context.close()
+                    except PlaywrightError as exc:
+                        logger.warning(f"Falha ao fechar contexto do pool: {exc}")
+                        if not pooled.browser.is_connected():
+                            pooled.crashed = True
+                pooled.active_leases -= 1
+                pooled.pages_served += 1
+                await self._release_browser(pooled)
+
+    async def close(self) -> None:
+        """Fecha todas as instancias e o driver do Playwright."""
+        async with self._lock:
+            self._closed = True
+            instances = [p for p in self._slots if p is not None] + list(self._draining)
+            self._slots = [None] * self.size
+            self._draining.clear()
+            for pooled in instances:
+                await self._close_browser(pooled)
+            if self._playwright:
+                await self._playwright.stop()
+                self._playwright = None
+        logger.info("Pool de browsers encerrado")
+
+    def stats(self) -> dict[str, Any]:
+        """Snapshot do estado do pool para metricas/health."""
+        instances = []
+        for slot, pooled in enumerate(self._slots):
+            if pooled is None:
+                instances.append({"slot": slot, "state": "idle"})
+                continue
+            instances.append(
+                {
+                    "slot": slot,
+                    "state": "healthy" if pooled.healthy else "crashed",
+                    "active_leases": pooled.active_leases,
+                    "pages_served": pooled.pages_served,
+                    "uptime_seconds": round(time.monotonic() - pooled.launched_at, 1),
+                }
+            )
+        return {
+            "size": self.size,
+            "contexts_per_browser": self.contexts_per_browser,
+            "max_pages_per_browser": self.max_pages_per_browser,
+            "active_leases": sum(p.active_leases for p in self._slots if p is not None)
+            + sum(p.active_leases for p in self._draining),
+            "draining": len(self._draining),
+            "launches": self._launches,
+            "recycles": self._recycles,
+            "crashes": self._crashes,
+            "leases_total": self._leases_total,
+            "instances": instances,
+        }
+
+    async def _ensure_playwright(self) -> None:
+        if self._closed:
+            raise RuntimeError("Pool de browsers encerrado")
+        if self._playwright is None:
+            logger.info("Inicializando Playwright...")
+            self._playwright = await async_playwright().start()
+
+    async def _acquire_browser(self) -> _PooledBrowser:
+        async with self._lock:
+            await self._ensure_playwright()
+            for slot, pooled in enumerate(self._slots):
+                if pooled is not None and not pooled.healthy:
+                    self._crashes += 1
+                    logger.warning(f"Browser do slot {slot} caiu; sera relancado")
+                    self._slots[slot] = None
+                    await self._retire(pooled)
+
+            live = [p for p in self._slots if p is not None]
+            best = min(live, key=lambda p: p.active_leases, default=None)
+            free_slot = next((i for i, p in enumerate(self._slots) if p is None), None)
+            if best is not None and (best.active_leases == 0 or free_slot is None):
+                return best
+            if free_slot is None:
+                raise RuntimeError("Pool de browsers sem slots disponiveis")
+            pooled = await self._launch(free_slot)
+            self._slots[free_slot] = pooled
+            return pooled
+
+    async def _release_browser(self, pooled: _PooledBrowser) -> None:
+        async with self._lock:
+            in_slot = self._slots[pooled.slot] is pooled
+            if in_slot and (pooled.crashed or pooled.pages_served >= self.max_pages_per_browser):
+                if pooled.crashed:
+                    self._crashes += 1
+                else:
+                    self._recycles += 1
+                    logger.info(
+                        f"Reciclando browser do slot {pooled.slot} apos {pooled.pages_served} paginas"
+                    )
+                self._slots[pooled.slot] = None
+                await self._retire(pooled)
+            elif pooled in self._draining and pooled.active_leases == 0:
+                self._draining.discard(pooled)
+                await self._close_browser(pooled)
+
+    async def _retire(self, pooled: _PooledBrowser) -> None:
+        if pooled.active_leases == 0:
+            await self._close_browser(pooled)
+        else:
+            self._draining.add(pooled)
+
+    async def _launch(self, slot: int) -> _PooledBrowser:
+        assert self._playwright is not None
+        browser = await self._playwright.chromium.launch(
+            headless=self.headless,
+            args=CHROMIUM_LAUNCH_ARGS,
+        )
+        self._launches += 1
+        logger.info(f"Browser inicializado no slot {slot}")
+        return _PooledBrowser(slot=slot, browser=browser)
+
+    async def _close_browser(self, pooled: _PooledBrowser) -> None:
+        try:
+            await pooled.browser.close()
+        except PlaywrightError as exc:
+            logger.warning(f"Falha ao fechar browser do slot {pooled.slot}: {exc}")
+
+
+_pool: BrowserPool | None = None
+
+
+def get_browser_pool() -> BrowserPool:
+    """Retorna o pool de browsers do processo (criado sob demanda)."""
+    global _pool
+    if _pool is None:
+        _pool = BrowserPool()
+    return _pool
+
+
+def current_browser_pool() -> BrowserPool | None:
+    """Pool do processo se ja existir (metricas nao devem criar um pool novo)."""
+    return _pool
+
+
+async def shutdown_browser_pool() -> None:
+    """Fecha o pool do processo, se existir."""
+    global _pool
+    if _pool is not None:
+        await _pool.close()
+        _pool = None
@@ -0,0 +1,206 @@
+"""Captura de artefatos da pagina em uma unica avaliacao no browser."""
+import time
+from typing import Any
+
+from playwright.async_api import Page
+
+from src.config.settings import settings
+from src.core.ax_serializer import serialize_ax_tree
+from src.core.capture_profiles import CaptureProfile, get_capture_profile
+
+# Coleta titulo, texto renderizado, URLs de imagens, um recorte limpo do HTML e
+# uma arvore semantica (formato compativel com page.accessibility.snapshot,
+# depois serializada como outline compacto) numa unica chamada. Nada e
+# clonado: o texto vem do innerText do body vivo e o HTML e limpo como string
+# antes de atravessar o pipe do CDP.
+CAPTURE_BUNDLE_SCRIPT = """
+(opts) => {
+    const LANDMARKS = {
+        NAV: "navigation", MAIN: "main", HEADER: "banner", FOOTER: "contentinfo",
+        ASIDE: "complementary", FORM: "form", SECTION: "region", ARTICLE: "article",
+    };
+    const ROLES = {
+        A: "link", BUTTON: "button", SELECT: "combobox", TEXTAREA: "textbox",
+        UL: "list", OL: "list", LI: "listitem", TABLE: "table", TR: "row",
+        TD: "cell", TH: "columnheader", IMG: "img", P: "paragraph", DL: "list",
+        DT: "term", DD: "definition", FIGURE: "figure", LABEL: "LabelText",
+    };
+    const INPUT_ROLES = {
+        checkbox: "checkbox", radio: "radio", button: "button", submit: "button",
+        search: "searchbox", range: "slider", number: "spinbutton",
+    };
+    const SKIP = new Set(["SCRIPT", "STYLE", "NOSCRIPT", "TEMPLATE", "IFRAME", "SVG", "CANVAS", "HEAD", "META", "LINK"]);
+    const LEAF = new Set(["link", "button", "heading", "img", "textbox", "combobox", "checkbox", "radio", "searchbox", "slider", "spinbutton"]);
+    const squash = (value) => (value || "").replace(/\\s+/g, " ").trim().slice(0, 300);
+    let nodeCount = 0;
+
+    const roleOf = (el) => {
+        const explicit = el.getAttribute("role");
+        if (explicit) return explicit.split(" ")[0];
+        const tag = el.tagName;
+        if (/^H[1-6]$/.test(tag)) return "heading";
+        if (tag === "A") return el.hasAttribute("href") ? "link" : "generic";
+        if (tag === "INPUT") return INPUT_ROLES[(el.type || "").toLowerCase()] || "textbox";
+        return LANDMARKS[tag] || ROLES[tag] || "generic";
+    };
+
+    const nameOf = (el, role) => {
+        const label = el.getAttribute("aria-label") || el.getAttribute("alt") || el.getAttribute("title");
+        if (label) return squash(label);
+        const labelledBy = el.getAttribute("aria-labelledby");
+        if (labelledBy) {
+            const ref = document.getElementById(labelledBy.split(" ")[0]);
+            if (ref) return squash(ref.textContent);
+        }
+        if (LEAF.has(role)) return squash(el.textContent);
+        return "";
+    };
+
+    const visit = (el, out) => {
+        if (nodeCount >= opts.maxNodes || SKIP.has(el.tagName)) return;
+        if (el.hidden || el.getAttribute("aria-hidden") === "true") return;
+        const role = roleOf(el);
+        if (role === "generic" || role === "none" || role === "presentation") {
+            walk(el, out);
+            return;
+        }
+        nodeCount += 1;
+        const node = { role, name: nameOf(el, role) };
+        if (role === "heading") node.level = Number(el.tagName.slice(1)) || Number(el.getAttribute("aria-level")) || 2;
+        if (role === "link" && el.href) node.url = el.href;
+        if ("value" in el && typeof el.value === "string" && el.value && role !== "button") node.value = squash(el.value);
+        if (!LEAF.has(role)) {
+            const children = [];
+            walk(el, children);
+            if (children.length) node.children = children;
+        }
+        out.push(node);
+    };
+
+    const walk = (el, out) => {
+        for (const child of el.childNodes) {
+            if (nodeCount >= opts.maxNodes) return;
+            if (child.nodeType === Node.TEXT_NODE) {
+                const text = squash(child.textContent);
+                if (text) {
+                    nodeCount += 1;
+                    out.push({ role: "text", name: text });
+                }
+            } else if (child.nodeType === Node.ELEMENT_NODE) {
+                visit(child, out);
+            }
+        }
+    };
+
+    const title = document.title || "";
+    const body = document.body;
+    const text = body ? (body.innerText || "").slice(0, opts.maxTextChars) : "";
+
+    const images = [];
+    const seen = new Set();
+    for (const img of opts.includeImages ? document.images : []) {
+        const src = img.currentSrc || img.src;
+        if (!src || !src.startsWith("http") || src.includes("base64") || seen.has(src)) continue;
+        seen.add(src);
+        images.push(src);
+        if (images.length >= opts.maxImages) break;
+    }
+
+    const structure = { role: "WebArea", name: title, children: [] };
+    if (body && opts.includeStructure) walk(body, structure.children);
+
+    // HTML so quando o perfil pede ou como fallback de uma arvore vazia
+    const wantHtml = opts.includeHtml || (opts.includeStructure && !structure.children.length);
+    const rawHtml = wantHtml && document.documentElement ? document.documentElement.outerHTML : "";
+    const cleanHtml = rawHtml
+        .replace(/<script\\b[^>]*>[\\s\\S]*?<\\/script>/gi, "")
+        .replace(/<style\\b[^>]*>[\\s\\S]*?<\\/style>/gi, "")
+        .replace(/<!--[\\s\\S]*?-->/g, "");
+    const html = cleanHtml.slice(0, opts.maxHtmlChars);
+
+    const scroller = document.scrollingElement || document.documentElement;
+    return {
+        resourceRequests: performance.getEntriesByType("resource").length,
+        title,
+        text,
+        images,
+        html,
+        htmlTotalChars: rawHtml.length,
+        htmlTruncated: cleanHtml.length > html.length,
+        structure,
+        structureNodes: nodeCount,
+        viewport: {
+            width: window.innerWidth,
+            height: window.innerHeight,
+            documentWidth: scroller ? scroller.scrollWidth : window.innerWidth,
+            documentHeight: scroller ? scroller.scrollHeight : window.innerHeight,
+        },
+    };
+}
+"""
+
+
+def _byte_size(value: str) -> int:
+    return len(value.encode("utf-8"))
+
+
+async def capture_page_bundle(
+    page: Page,
+    max_html_chars: int | None = None,
+    max_text_chars: int | None = None,
+    max_images: int = 50,
+    max_nodes: int | None = None,
+    profile: CaptureProfile | None = None,
+) -> dict[str, Any]:
+    """Coleta titulo, texto, imagens, HTML e estrutura em um round trip.
+
+    Artefatos fora do `profile` nao sao calculados na pagina.
+    """
+    profile = profile or get_capture_profile("full")
+    started = time.perf_counter()
+    bundle = await page.evaluate(
+        CAPTURE_BUNDLE_SCRIPT,
+        {
+            "maxHtmlChars": max_html_chars or settings.CAPTURE_MAX_HTML_CHARS,
+            "maxTextChars": max_text_chars or settings.CAPTURE_MAX_TEXT_CHARS,
+            "maxImages": max_images,
+            "maxNodes": max_nodes or settings.CAPTURE_MAX_STRUCTURE_NODES,
+            "includeHtml": profile.html,
+            "includeStructure": profile.structure,
+            "includeImages": profile.images,
+        },
+    )
+    structure = bundle.get("structure") or {}
+    accessibility_snapshot, accessibility_stats = serialize_ax_tree(
+        structure if structure.get("children") else None
+    )
+    image_urls = list(bundle.get("images") or [])
+    html = bundle.get("html") or ""
+    text = bundle.get("text") or ""
+    title = bundle.get("title") or ""
+    return {
+        "title": title,
+        "text": text,
+        "html": html,
+        "image_urls": image_urls,
+        "accessibility_snapshot": accessibility_snapshot,
+        "viewport": bundle.get("viewport") or {},
+        "metrics": {
+            "engine": "bundle",
+            "profile": profile.name,
+            "round_trips": 1,
+            "duration_ms": round((time.perf_counter() - started) * 1000, 1),
+            "html_total_chars": int(bundle.get("htmlTotalChars") or 0),
+            "html_truncated": bool(bundle.get("htmlTruncated")),
+            "structure_nodes": int(bundle.get("structureNodes") or 0),
+            "resource_requests": int(bundle.get("resourceRequests") or 0),
+            "accessibility": accessibility_stats,
+            "bytes": {
+                "title": _byte_size(title),
+                "text": _byte_size(text),
+                "html": _byte_size(html),
+                "image_urls": sum(_byte_size(u) for u in image_urls),
+                "accessibility": _byte_size(accessibility_snapshot),
+            },
+        },
+    }
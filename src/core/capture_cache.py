@@ -0,0 +1,233 @@
+"""Cache em disco das capturas de pagina com TTL, LRU e revalidacao condicional."""
+import asyncio
+import hashlib
+import json
+import os
+import tempfile
+import time
+from collections import OrderedDict
+from pathlib import Path
+from typing import Any
+from urllib.parse import parse_qsl, urlencode, urlsplit, urlunsplit
+
+from loguru import logger
+
+from src.config.settings import settings
+
+PROJECT_ROOT = Path(__file__).resolve().parents[2]
+
+# Opcoes de captura que mudam o resultado e portanto entram na chave.
+CACHE_KEY_OPTIONS = ("full_page", "auto_scroll", "scroll_steps", "execute_js", "capture_profile", "capture_mode")
+_TRACKING_PARAMS = ("utm_", "gclid", "fbclid", "mc_eid", "_ga")
+
+Capture = tuple[str, str, str, str, list[str], dict[str, Any]]
+
+
+def normalize_url(url: str) -> str:
+    """Normaliza esquema/host, remove fragmento e parametros de tracking e ordena a query."""
+    parts = urlsplit(url.strip())
+    query = sorted(
+        (key, value)
+        for key, value in parse_qsl(parts.query, keep_blank_values=True)
+        if not key.lower().startswith(_TRACKING_PARAMS)
+    )
+    path = parts.path or "/"
+    return urlunsplit((parts.scheme.lower(), parts.netloc.lower(), path, urlencode(query), ""))
+
+
+def cache_key(url: str, options: dict[str, Any]) -> str:
+    relevant = {name: options.get(name) for name in CACHE_KEY_OPTIONS}
+    raw = json.dumps({"url": normalize_url(url), "options": relevant}, sort_keys=True, default=str)
+    return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+
+class CaptureCache:
+    """Guarda a tupla de `navigate_and_capture` por URL normalizada + opcoes.
+
+    Dentro do TTL a entrada e servida direto. Depois do TTL, se a resposta
+    original trouxe ETag/Last-Modified, um GET condicional decide: 304 renova a
+    entrada sem abrir o Chromium; qualquer outra resposta descarta a entrada.
+    Alteracoes do indice e de `_total_bytes` passam por `_lock`.
+    """
+
+    def __init__(
+        self,
+        directory: str | None = None,
+        max_bytes: int | None = None,
+        ttl_seconds: float | None = None,
+    ) -> None:
+        cache_dir = Path(directory or settings.CAPTURE_CACHE_DIR)
+        if not cache_dir.is_absolute():
+            cache_dir = PROJECT_ROOT / cache_dir
+        self.directory = cache_dir
+        self.max_bytes = max_bytes or settings.CAPTURE_CACHE_MAX_BYTES
+        self.ttl_seconds = ttl_seconds if ttl_seconds is not None else settings.CAPTURE_CACHE_TTL_SECONDS
+        self._index: OrderedDict[str, dict[str, Any]] | None = None
+        self._total_bytes = 0
+        self._lock = asyncio.Lock()
+        self.counters = {"hits": 0, "misses": 0, "revalidated": 0, "stale": 0, "stores": 0, "evictions": 0}
+
+    async def get(self, url: str, options: dict[str, Any], revalidator: Any = None) -> Capture | None:
+        """Retorna a captura em cache ou None.
+
+        `revalidator(url, etag, last_modified)` deve devolver o status HTTP do GET
+        condicional (ou None se nao foi possivel revalidar).
+        """
+        index = await self._load_index()
+        key = cache_key(url, options)
+        entry = index.get(key)
+        if entry is None:
+            self.counters["misses"] += 1
+            return None
+
+        age = time.time() - entry["stored_at"]
+        state = "hit"
+        if age > self.ttl_seconds:
+            status = None
+            if revalidator and (entry.get("etag") or entry.get("last_modified")):
+                status = await revalidator(entry["url"], entry.get("etag"), entry.get("last_modified"))
+            if status != 304:
+                self.counters["stale"] += 1
+                self.counters["misses"] += 1
+                async with self._lock:
+                    await self._remove(key)
+                return None
+            state = "revalidated"
+            entry["stored_at"] = time.time()
+            await asyncio.to_thread(os.utime, self._path_for(key))
+
+        try:
+            payload = await asyncio.to_thread(self._read, key)
+        except (OSError, json.JSONDecodeError) as exc:
+            logger.warning(f"Entrada de cache ilegivel ({exc}); descartando")
+            self.counters["misses"] += 1
+            async with self._lock:
+                await self._remove(key)
+            return None
+
+        if key in index:
+            index.move_to_end(key)
+        self.counters["revalidated" if state == "revalidated" else "hits"] += 1
+        screenshot, html, text, ax, images, metadata = payload["capture"]
+        metadata = dict(metadata)
+        # Captura reaproveitada: a pagina nao foi aberta de novo neste scrape.
+        metadata["capture_cache"] = {
+            "state": state,
+            "reused": True,
+            "age_seconds": round(age, 1),
+            "ttl_seconds": self.ttl_seconds,
+        }
+        return screenshot, html, text, ax, list(images), metadata
+
+    async def put(self, url: str, options: dict[str, Any], captured: Capture) -> None:
+        """Armazena uma captura bem sucedida e aplica o limite de tamanho."""
+        metadata = captured[5]
+        status = metadata.get("status")
+        if status is not None and status >= 400:
+            return
+        index = await self._load_index()
+        key = cache_key(url, options)
+        payload = {
+            "url": url,
+            "etag": metadata.get("etag"),
+            "last_modified": metadata.get("last_modified"),
+            "capture": list(captured),
+        }
+        async with self._lock:
+            size = await asyncio.to_thread(self._write, key, payload)
+            previous = index.pop(key, None)
+            if previous:
+                self._total_bytes -= previous["size"]
+            index[key] = {
+                "url": url,
+                "size": size,
+                "stored_at": time.time(),
+                "etag": payload["etag"],
+                "last_modified": payload["last_modified"],
+            }
+            self._total_bytes += size
+            self.counters["stores"] += 1
+            while self._total_bytes > self.max_bytes and len(index) > 1:
+                oldest = next(iter(index))
+                self.counters["evictions"] += 1
+                await self._remove(oldest)
+
+    def stats(self) -> dict[str, Any]:
+        lookups = self.counters["hits"] + self.counters["revalidated"] + self.counters["misses"]
+        served = self.counters["hits"] + self.counters["revalidated"]
+        return {
+            **self.counters,
+            "entries": len(self._index or {}),
+            "bytes": self._total_bytes,
+            "hit_ratio": round(served / lookups, 4) if lookups else 0.0,
+        }
+
+    async def _load_index(self) -> OrderedDict[str, dict[str, Any]]:
+        if self._index is None:
+            async with self._lock:
+                if self._index is None:
+                    entries = await asyncio.to_thread(self._scan)
+                    index: OrderedDict[str, dict[str, Any]] = OrderedDict()
+                    total = 0
+                    for key, size, mtime, meta in entries:
+                        index[key] = {"size": size, "stored_at": mtime, **meta}
+                        total += size
+                    self._index, self._total_bytes = index, total
+        return self._index
+
+    async def _remove(self, key: str) -> None:
+        # Chamado com `_lock` adquirido.
+        assert self._index is not None
+        entry = self._index.pop(key, None)
+        if entry:
+            self._total_bytes -= entry["size"]
+        await asyncio.to_thread(self._path_for(key).unlink, missing_ok=True)
+
+    def _path_for(self, key: str) -> Path:
+        return self.directory / f"{key}.json"
+
+    def _scan(self) -> list[tuple[str, int, float, dict[str, Any]]]:
+        if not self.directory.exists():
+            return []
+        entries = []
+        for path in self.directory.glob("*.json"):
+            try:
+                stat = path.stat()
+                with path.open(encoding="utf-8") as fh:
+                    header = json.loads(fh.readline())
+            except (OSError, json.JSONDecodeError):
+                continue
+            entries.append((path.stem, stat.st_size, stat.st_mtime, header))
+        entries.sort(key=lambda item: item[2])
+        return entries
+
+    def _read(self, key: str) -> dict[str, Any]:
+        with self._path_for(key).open(encoding="utf-8") as fh:
+            fh.readline()
+            return json.loads(fh.read())
+
+    def _write(self, key: str, payload: dict[str, Any]) -> int:
+        # Primeira linha: cabecalho pequeno (lido no scan); resto: captura completa.
+        self.directory.mkdir(parents=True, exist_ok=True)
+        header = {k: payload[k] for k in ("url", "etag", "last_modified")}
+        body = json.dumps(header, ensure_ascii=False) + "\n" + json.dumps(payload, ensure_ascii=False)
+        fd, tmp_path = tempfile.mkstemp(dir=self.directory, prefix=".capture-", suffix=".tmp")
+        try:
+            with os.fdopen(fd, "w", encoding="utf-8") as fh:
+                fh.write(body)
+            os.replace(tmp_path, self._path_for(key))
+        except OSError:
+            Path(tmp_path).unlink(missing_ok=True)
+            raise
+        return len(body.encode("utf-8"))
+
+
+_cache: CaptureCache | None = None
+
+
+def get_capture_cache() -> CaptureCache:
+    """Retorna o cache de capturas do processo."""
+    global _cache
+    if _cache is None:
+        _cache = CaptureCache()
+    return _cache
@@ -0,0 +1,120 @@
+"""Perfis de captura: quais artefatos da pagina cada request realmente precisa."""
+from dataclasses import asdict, dataclass, replace
+from typing import Any, get_args
+
+from pydantic import BaseModel
+
+from src.config.settings import settings
+
+
+@dataclass(frozen=True)
+class CaptureProfile:
+    """Artefatos produzidos na captura. Texto e titulo sao sempre coletados.
+
+    Perfis com estrutura (AX) recebem o HTML como fallback quando a arvore vem
+    vazia, que e o unico caso em que o AIProcessor le o HTML.
+    """
+
+    name: str
+    screenshot: bool
+    html: bool
+    structure: bool
+    images: bool
+
+    def skipped(self) -> list[str]:
+        return [artifact for artifact in ("screenshot", "html", "structure", "images") if not getattr(self, artifact)]
+
+    def as_dict(self) -> dict[str, Any]:
+        return {**asdict(self), "skipped": self.skipped()}
+
+
+CAPTURE_PROFILES: dict[str, CaptureProfile] = {
+    "text_only": CaptureProfile("text_only", screenshot=False, html=False, structure=False, images=False),
+    "text_ax": CaptureProfile("text_ax", screenshot=False, html=False, structure=True, images=False),
+    "vision": CaptureProfile("vision", screenshot=True, html=False, structure=True, images=True),
+    "full": CaptureProfile("full", screenshot=True, html=True, structure=True, images=True),
+}
+AUTO_PROFILE = "auto"
+# Sufixo que acrescenta o HTML a um perfil (ex.: `vision+html`, usado pelos templates por dominio).
+HTML_SUFFIX = "+html"
+
+_IMAGE_FIELD_HINTS = ("image", "imagem", "photo", "foto", "thumbnail")
+
+
+def get_capture_profile(name: str | None) -> CaptureProfile:
+    """Perfil pelo nome; None ou desconhecido cai em `full` (comportamento completo)."""
+    base = (name or "full").removesuffix(HTML_SUFFIX)
+    profile = CAPTURE_PROFILES.get(base, CAPTURE_PROFILES["full"])
+    if name and name.endswith(HTML_SUFFIX) and not profile.html:
+        return replace(profile, name=f"{profile.name}{HTML_SUFFIX}", html=True)
+    return profile
+
+
+def schema_wants_images(schema: type[BaseModel], _seen: set[type] | None = None) -> bool:
+    """True se algum campo do schema (inclusive aninhado) tem nome de imagem."""
+    seen = _seen or set()
+    if schema in seen:
+        return False
+    seen.add(schema)
+    for name, field in schema.model_fields.items():
+        if any(hint in name.lower() for hint in _IMAGE_FIELD_HINTS):
+            return True
+        for candidate in (field.annotation, *get_args(field.annotation)):
+            nested = [candidate, *get_args(candidate)]
+            for model in nested:
+                if isinstance(model, type) and issubclass(model, BaseModel) and schema_wants_images(model, seen):
+                    return True
+    return False
+
+
+def infer_capture_profile(schema: type[BaseModel], output_format: str) -> str:
+    """Escolhe o perfil pelo formato de saida e pelos campos do schema.
+
+    `summary` le texto e estrutura; `report` usa imagens no Markdown; `list`
+    mantem o screenshot para layouts (precos, cards).
+    """
+    if output_format == "summary":
+        return "vision" if schema_wants_images(schema) else "text_ax"
+    return "vision"
+
+
+def resolve_capture_profile(
+    requested: str | None,
+    schema: type[BaseModel],
+    output_format: str,
+    needs_html: bool = False,
+) -> str:
+    """Nome efetivo do perfil: o pedido, o padrao configurado ou a inferencia (`auto`).
+
+    `needs_html` garante o HTML na captura (templates por dominio leem o HTML);
+    com arvore AX o AIProcessor continua sem recebe-lo.
+    """
+    name = requested or settings.CAPTURE_PROFILE
+    base = name.removesuffix(HTML_SUFFIX)
+    if name == AUTO_PROFILE or base not in CAPTURE_PROFILES:
+        base = infer_capture_profile(schema, output_format)
+    elif base != name:
+        # Variante `+html` pedida explicitamente (ex.: `vision+html`).
+        needs_html = True
+    if needs_html and not CAPTURE_PROFILES[base].html:
+        return f"{base}{HTML_SUFFIX}"
+    return base
+
+
+def apply_capture_profile(
+    captured: tuple[str, str, str, str, list[str], dict[str, Any]],
+    profile: CaptureProfile,
+) -> tuple[str, str, str, str, list[str], dict[str, Any]]:
+    """Descarta de uma captura pronta (ex.: fast path HTTP) os artefatos fora do perfil."""
+    screenshot, html, text, ax, images, metadata = captured
+    if not profile.html and (ax or not profile.structure):
+        html = ""
+    metadata["capture_profile"] = profile.as_dict()
+    return (
+        screenshot if profile.screenshot else "",
+        html,
+        text,
+        ax if profile.structure else "",
+        images if profile.images else [],
+        metadata,
+    )
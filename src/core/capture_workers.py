@@ -0,0 +1,289 @@
+"""Captura em processos filhos, cada um com seu Playwright/Chromium, particionada por dominio."""
+import asyncio
+import hashlib
+import itertools
+import multiprocessing
+import queue
+import time
+from dataclasses import dataclass, field
+from typing import Any, Awaitable, Callable
+
+from loguru import logger
+
+from src.config.settings import settings
+from src.core import errors
+from src.core.errors import NetworkScraperError, ScraperError, host_from_url
+
+# Intervalo da checagem de vida dos processos filhos.
+WORKER_CHECK_INTERVAL_SECONDS = 0.5
+
+Capture = tuple[str, str, str, str, list[str], dict[str, Any]]
+CaptureHandler = Callable[[str, dict[str, Any]], Awaitable[Capture]]
+
+
+async def browser_capture(url: str, options: dict[str, Any]) -> Capture:
+    """Handler padrao dos workers: captura com o pool de browsers do proprio processo."""
+    from src.core.browser import BrowserManager
+
+    async with BrowserManager() as browser:
+        return await browser.navigate_and_capture(url=url, **options)
+
+
+def shard_for(url: str, shards: int) -> int:
+    """Shard estavel por dominio: o mesmo host sempre cai no mesmo processo."""
+    domain = host_from_url(url).removeprefix("www.")
+    return int(hashlib.sha1(domain.encode("utf-8")).hexdigest(), 16) % max(1, shards)
+
+
+def _rebuild_error(name: str, message: str) -> Exception:
+    error_cls = getattr(errors, name, None)
+    if isinstance(error_cls, type) and issubclass(error_cls, ScraperError):
+        return error_cls(message)
+    if "Timeout" in name or name == "Error":
+        # Erros do Playwright no filho: mesma classificacao de rede do processo principal
+        return NetworkScraperError(f"{name}: {message}")
+    return ScraperError(f"{name}: {message}")
+
+
+def _worker_main(
+    shard: int,
+    jobs: Any,
+    results: Any,
+    handler: CaptureHandler,
+    concurrency: int,
+) -> None:
+    from src.utils.logger import configure_logging
+
+    configure_logging()
+    logger.info(f"Worker de captura {shard} iniciado")
+    asyncio.run(_serve(shard, jobs, results, handler, concurrency))
+
+
+async def _serve(shard: int, jobs: Any, results: Any, handler: CaptureHandler, concurrency: int) -> None:
+    from src.core.browser_pool import shutdown_browser_pool
+    from src.core.session_store import shutdown_session_store
+
+    semaphore = asyncio.Semaphore(max(1, concurrency))
+    running: set[asyncio.Task] = set()
+
+    async def run(job_id: int, url: str, options: dict[str, Any]) -> None:
+        started = time.perf_counter()
+        try:
+            captured = await handler(url, options)
+            results.put((job_id, shard, True, captured, None, time.perf_counter() - started))
+        except Exception as exc:  # noqa: BLE001
+            error = (type(exc).__name__, str(exc))
+            results.put((job_id, shard, False, None, error, time.perf_counter() - started))
+        finally:
+            semaphore.release()
+
+    while True:
+        job = await asyncio.to_thread(jobs.get)
+        if job is None:
+            break
+        await semaphore.acquire()
+        task = asyncio.create_task(run(*job))
+        running.add(task)
+        task.add_done_callback(running.discard)
+    if running:
+        await asyncio.gather(*running, return_exceptions=True)
+    await shutdown_browser_pool()
+    await shutdown_session_store()
+
+
+@dataclass
+class ShardStats:
+    """Contadores de um shard vistos pelo processo principal."""
+
+    shard: int
+    submitted: int = 0
+    completed: int = 0
+    failed: int = 0
+    restarts: int = 0
+    busy_seconds: float = 0.0
+    started_at: float = field(default_factory=time.monotonic)
+
+    @property
+    def queue_depth(self) -> int:
+        return self.submitted - self.completed - self.failed
+
+    def as_dict(self, pid: int | None, alive: bool) -> dict[str, Any]:
+        done = self.completed + self.failed
+        uptime = max(time.monotonic() - self.started_at, 1e-6)
+        return {
+            "shard": self.shard,
+            "pid": pid,
+            "alive": alive,
+            "submitted": self.submitted,
+            "completed": self.completed,
+            "failed": self.failed,
+            "queue_depth": self.queue_depth,
+            "restarts": self.restarts,
+            "avg_capture_ms": round(self.busy_seconds / done * 1000, 1) if done else 0.0,
+            "throughput_per_min": round(done / uptime * 60, 2),
+        }
+
+
+class CaptureWorkerPool:
+    """Distribui capturas entre N processos filhos via filas locais.
+
+    Cada URL vai para o shard do seu dominio, entao limites por dominio e o
+    estado de sessao ficam em um unico processo. Cada filho roda seu proprio
+    loop asyncio e pool de Chromium, tirando JSON/regex/base64 do loop principal.
+    Um filho que morre tem suas capturas pendentes falhadas (recuperaveis) e e
+    relancado; a checagem roda num timer proprio, independente dos resultados.
+    """
+
+    def __init__(
+        self,
+        workers: int | None = None,
+        concurrency: int | None = None,
+        handler: CaptureHandler | None = None,
+    ) -> None:
+        self.workers = max(1, workers or settings.CAPTURE_WORKERS)
+        self.concurrency = max(1, concurrency or settings.CAPTURE_WORKER_CONCURRENCY)
+        self.handler = handler or browser_capture
+        self.timeout_seconds = settings.CAPTURE_WORKER_TIMEOUT_SECONDS
+        self._ctx = multiprocessing.get_context("spawn")
+        self._job_queues: list[Any] = []
+        self._processes: list[Any] = []
+        self._results: Any = None
+        self._stats = [ShardStats(shard) for shard in range(self.workers)]
+        self._pending: dict[int, tuple[int, asyncio.Future]] = {}
+        self._ids = itertools.count(1)
+        self._collector: asyncio.Task | None = None
+        self._monitor: asyncio.Task | None = None
+        self._lock = asyncio.Lock()
+        self._closing = False
+
+    async def start(self) -> None:
+        async with self._lock:
+            if self._processes:
+                return
+            self._results = self._ctx.Queue()
+            for shard in range(self.workers):
+                self._job_queues.append(self._ctx.Queue())
+                self._processes.append(self._spawn(shard))
+            self._collector = asyncio.create_task(self._collect())
+            self._monitor = asyncio.create_task(self._watch_workers())
+            logger.info(f"{self.workers} workers de captura iniciados")
+
+    async def capture(self, url: str, **options: Any) -> Capture:
+        """Envia a captura ao shard do dominio e aguarda o resultado."""
+        await self.start()
+        shard = shard_for(url, self.workers)
+        job_id = next(self._ids)
+        future = asyncio.get_running_loop().create_future()
+        self._pending[job_id] = (shard, future)
+        self._stats[shard].submitted += 1
+        self._job_queues[shard].put((job_id, url, options))
+        try:
+            return await asyncio.wait_for(future, self.timeout_seconds)
+        except TimeoutError as exc:
+            raise NetworkScraperError(
+                f"Captura no worker {shard} sem resposta em {self.timeout_seconds:.0f}s: {url}"
+            ) from exc
+        finally:
+            self._pending.pop(job_id, None)
+
+    def stats(self) -> dict[str, Any]:
+        shards = []
+        for shard, shard_stats in enumerate(self._stats):
+            process = self._processes[shard] if shard < len(self._processes) else None
+            alive = bool(process and process.is_alive())
+            shards.append(shard_stats.as_dict(process.pid if process else None, alive))
+        return {
+            "workers": self.workers,
+            "concurrency_per_worker": self.concurrency,
+            "queue_depth": sum(s["queue_depth"] for s in shards),
+            "shards": shards,
+        }
+
+    async def close(self) -> None:
+        self._closing = True
+        for jobs in self._job_queues:
+            jobs.put(None)
+        for process in self._processes:
+            await asyncio.to_thread(process.join, 30)
+            if process.is_alive():
+                process.terminate()
+        for task in (self._collector, self._monitor):
+            if task:
+                task.cancel()
+                await asyncio.gather(task, return_exceptions=True)
+        for shard, future in list(self._pending.values()):
+            if not future.done():
+                future.set_exception(NetworkScraperError(f"Worker de captura {shard} encerrado"))
+        self._processes.clear()
+        self._job_queues.clear()
+
+    def _spawn(self, shard: int) -> Any:
+        process = self._ctx.Process(
+            target=_worker_main,
+            args=(shard, self._job_queues[shard], self._results, self.handler, self.concurrency),
+            name=f"capture-worker-{shard}",
+            daemon=True,
+        )
+        process.start()
+        return process
+
+    async def _collect(self) -> None:
+        while True:
+            try:
+                item = await asyncio.to_thread(self._results.get, True, 0.5)
+            except queue.Empty:
+                continue
+            job_id, shard, ok, captured, error, elapsed = item
+            shard_stats = self._stats[shard]
+            shard_stats.busy_seconds += elapsed
+            if ok:
+                shard_stats.completed += 1
+            else:
+                shard_stats.failed += 1
+            entry = self._pending.get(job_id)
+            if entry is None or entry[1].done():
+                continue
+            if ok:
+                entry[1].set_result(captured)
+            else:
+                entry[1].set_exception(_rebuild_error(*error))
+
+    async def _watch_workers(self) -> None:
+        # Timer proprio: um shard ativo nao pode esconder a queda de outro.
+        while True:
+            await asyncio.sleep(WORKER_CHECK_INTERVAL_SECONDS)
+            self._check_workers()
+
+    def _check_workers(self) -> None:
+        if self._closing:
+            return
+        for shard, process in enumerate(self._processes):
+            if process.is_alive():
+                continue
+            logger.error(f"Worker de captura {shard} caiu (exitcode={process.exitcode}); relancando")
+            for pending_shard, future in list(self._pending.values()):
+                if pending_shard == shard and not future.done():
+                    self._stats[shard].failed += 1
+                    future.set_exception(NetworkScraperError(f"Worker de captura {shard} caiu"))
+            self._stats[shard].restarts += 1
+            # Fila nova: jobs antigos ja foram falhados e nao devem ser reprocessados.
+            self._job_queues[shard] = self._ctx.Queue()
+            self._processes[shard] = self._spawn(shard)
+
+
+_workers: CaptureWorkerPool | None = None
+
+
+def get_capture_workers() -> CaptureWorkerPool:
+    """Retorna o pool de workers de captura do processo."""
+    global _workers
+    if _workers is None:
+        _workers = CaptureWorkerPool()
+    return _workers
+
+
+async def shutdown_capture_workers() -> None:
+    global _workers
+    if _workers is not None:
+        await _workers.close()
+        _workers = None
@@ -0,0 +1,254 @@
+"""Extracao map-reduce para paginas longas: trechos em paralelo, merge e resumo final."""
+import asyncio
+import json
+import time
+from typing import Any, get_args
+
+from loguru import logger
+from pydantic import BaseModel
+
+from src.config.settings import settings
+from src.core.ai_processor import AIProcessor
+from src.core.context_packer import CHARS_PER_TOKEN, count_tokens
+
+EXTRACTION_MODES = ("auto", "single", "chunked")
+# Campos de lista que concentram os registros extraidos (em ordem de preferencia).
+RECORD_FIELDS = ("items", "findings", "products")
+
+
+def record_field(schema: type[BaseModel]) -> str | None:
+    """Campo de lista de objetos do schema que pode ser dividido entre trechos."""
+    for name in RECORD_FIELDS:
+        field = schema.model_fields.get(name)
+        if field is None:
+            continue
+        for arg in get_args(field.annotation) or (field.annotation,):
+            if isinstance(arg, type) and issubclass(arg, BaseModel):
+                return name
+    return None
+
+
+def should_chunk(mode: str | None, schema: type[BaseModel], text: str) -> bool:
+    """Decide entre chamada unica e map-reduce.
+
+    `auto` divide quando o schema tem lista de registros e o texto nao cabe em
+    um trecho; `chunked` forca a divisao (se o schema permitir); `single` nunca.
+    """
+    effective = mode if mode in EXTRACTION_MODES else settings.EXTRACTION_MODE
+    if effective == "single" or record_field(schema) is None:
+        return False
+    if effective == "chunked":
+        return True
+    return count_tokens(text) > settings.CHUNK_TOKENS
+
+
+def split_into_chunks(text: str, chunk_tokens: int, overlap_tokens: int) -> list[str]:
+    """Divide o texto por linhas em trechos de ate `chunk_tokens`.
+
+    As ultimas linhas de um trecho (ate `overlap_tokens`) repetem no inicio do
+    seguinte, para que um registro cortado na fronteira apareca inteiro em um deles.
+    """
+    lines: list[tuple[str, int]] = []
+    max_line_chars = chunk_tokens * CHARS_PER_TOKEN
+    for line in text.splitlines():
+        # Linhas gigantes (texto sem quebras) viram pedacos menores.
+        for start in range(0, max(len(line), 1), max_line_chars):
+            piece = line[start : start + max_line_chars]
+            lines.append((piece, count_tokens(piece) + 1))
+
+    chunks: list[str] = []
+    current: list[tuple[str, int]] = []
+    used = 0
+    for line, tokens in lines:
+        if current and used + tokens > chunk_tokens:
+            chunks.append("\n".join(piece for piece, _ in current))
+            overlap: list[tuple[str, int]] = []
+            overlap_used = 0
+            for previous in reversed(current):
+                if overlap_used + previous[1] > overlap_tokens:
+                    break
+                overlap.insert(0, previous)
+                overlap_used += previous[1]
+            current, used = overlap, overlap_used
+        current.append((line, tokens))
+        used += tokens
+    if current:
+        chunks.append("\n".join(piece for piece, _ in current))
+    return [chunk for chunk in chunks if chunk.strip()]
+
+
+def _identity_key(item: Any) -> str | None:
+    """Chave forte (url/link/id): o mesmo registro em qualquer trecho."""
+    if isinstance(item, dict):
+        for key in ("url", "link", "id"):
+            if item.get(key):
+                return f"{key}:{item[key]}"
+    return None
+
+
+def _overlap_key(item: Any) -> str:
+    """Chave fraca (nome/titulo ou o registro inteiro), so para a sobreposicao entre trechos."""
+    if isinstance(item, dict):
+        for key in ("name", "title"):
+            if isinstance(item.get(key), str) and item[key].strip():
+                return f"{key}:{' '.join(item[key].split()).casefold()}"
+    return json.dumps(item, sort_keys=True, default=str)
+
+
+def merge_chunk_results(results: list[dict[str, Any]]) -> tuple[dict[str, Any], int]:
+    """Junta os dados dos trechos; retorna o merge e quantos registros vieram antes da deduplicacao.
+
+    Listas sao concatenadas sem repetir registros: com url/id, em qualquer
+    trecho; sem eles, so quando o nome/titulo ja veio do trecho anterior (a
+    sobreposicao repete os mesmos itens), entao registros distintos com o mesmo
+    titulo no mesmo trecho ficam. `total_count` e recalculado a partir da maior
+    lista reunida; os demais campos vem do primeiro trecho que os preencheu.
+    """
+    merged: dict[str, Any] = {}
+    seen: dict[str, set[str]] = {}
+    previous_chunk: dict[str, set[str]] = {}
+    raw_records = 0
+    for data in results:
+        for key, value in data.items():
+            if isinstance(value, list):
+                bucket = merged.setdefault(key, [])
+                keys = seen.setdefault(key, set())
+                overlap = previous_chunk.get(key, set())
+                current: set[str] = set()
+                raw_records += len(value)
+                for item in value:
+                    identity = _identity_key(item)
+                    if identity is not None:
+                        if identity in keys:
+                            continue
+                        keys.add(identity)
+                    else:
+                        weak = _overlap_key(item)
+                        current.add(weak)
+                        if weak in overlap:
+                            continue
+                    bucket.append(item)
+                previous_chunk[key] = current
+            elif key == "total_count":
+                merged[key] = 0
+            elif merged.get(key) in (None, ""):
+                merged[key] = value
+    if "total_count" in merged:
+        merged["total_count"] = max((len(value) for value in merged.values() if isinstance(value, list)), default=0)
+    return merged, raw_records
+
+
+async def extract_chunked(
+    processor: AIProcessor,
+    screenshot_base64: str,
+    html: str,
+    text_content: str,
+    schema: type[BaseModel],
+    accessibility_snapshot: str = "",
+    image_urls: list[str] | None = None,
+    system_prompt: str | None = None,
+    extraction_goal: str | None = None,
+    output_format: str = "list",
+    screenshot_plan: dict[str, Any] | None = None,
+    use_cache: bool = True,
+    model: str | None = None,
+) -> dict[str, Any]:
+    """Map: cada trecho do texto vira uma extracao independente, ate
+    `CHUNK_MAX_CONCURRENCY` ao mesmo tempo. Reduce: merge local das listas e,
+    se o schema tem `summary`, uma chamada pequena que junta os resumos parciais.
+
+    O primeiro trecho leva screenshot, estrutura e imagens (o topo da pagina);
+    os demais so texto. Trechos que falham sao registrados e ignorados, desde
+    que ao menos um tenha dado certo.
+    """
+    started = time.perf_counter()
+    chunks = split_into_chunks(text_content, settings.CHUNK_TOKENS, settings.CHUNK_OVERLAP_TOKENS) or [text_content]
+    dropped = max(0, len(chunks) - settings.CHUNK_MAX_CHUNKS)
+    chunks = chunks[: settings.CHUNK_MAX_CHUNKS]
+    total = len(chunks)
+    semaphore = asyncio.Semaphore(max(1, settings.CHUNK_MAX_CONCURRENCY))
+    goal = (extraction_goal or "").strip()
+    logger.info(f"Extracao em {total} trechos (concorrencia={settings.CHUNK_MAX_CONCURRENCY})")
+
+    async def run(index: int, chunk: str) -> dict[str, Any]:
+        notice = (
+            f"Trecho {index + 1} de {total} de uma pagina longa: extraia apenas o que aparece neste trecho."
+        )
+        first = index == 0
+        async with semaphore:
+            return await processor.extract_structured_data(
+                screenshot_base64=screenshot_base64 if first else "",
+                html=html if first else "",
+                text_content=chunk,
+                accessibility_snapshot=accessibility_snapshot if first else "",
+                image_urls=image_urls if first else None,
+                schema=schema,
+                system_prompt=system_prompt,
+                extraction_goal=f"{goal}\n\n{notice}" if goal else notice,
+                output_format=output_format,
+                screenshot_plan=screenshot_plan if first else None,
+                use_cache=use_cache,
+                model=model,
+            )
+
+    outcomes = await asyncio.gather(*(run(i, chunk) for i, chunk in enumerate(chunks)), return_exceptions=True)
+    map_ms = round((time.perf_counter() - started) * 1000, 1)
+    succeeded = [outcome for outcome in outcomes if not isinstance(outcome, BaseException)]
+    failures = [outcome for outcome in outcomes if isinstance(outcome, BaseException)]
+    if not succeeded:
+        raise failures[0]
+    for failure in failures:
+        logger.warning(f"Trecho da extracao falhou: {failure}")
+
+    data, raw_records = merge_chunk_results([result["data"] for result in succeeded])
+    tokens = {"input": 0, "cached_input": 0, "output": 0, "total": 0}
+    cost_usd = 0.0
+    json_parse: dict[str, int] = {}
+    for result in succeeded:
+        cost_usd += result["metadata"]["cost_usd"]
+        for key in tokens:
+            tokens[key] += result["metadata"]["tokens_used"].get(key, 0)
+        for path, count in (result["metadata"].get("json_parse") or {}).items():
+            json_parse[path] = json_parse.get(path, 0) + count
+
+    reduce_ms = 0.0
+    summaries = [
+        result["data"]["summary"].strip()
+        for result in succeeded
+        if isinstance(result["data"].get("summary"), str) and result["data"]["summary"].strip()
+    ]
+    if "summary" in schema.model_fields and len(summaries) > 1:
+        reduce_started = time.perf_counter()
+        reduced = await processor.reduce_summaries(summaries, system_prompt, extraction_goal, output_format)
+        reduce_ms = round((time.perf_counter() - reduce_started) * 1000, 1)
+        data["summary"] = reduced["summary"]
+        cost_usd += reduced["cost_usd"]
+        for key in tokens:
+            tokens[key] += reduced["tokens_used"].get(key, 0)
+
+    first_meta = succeeded[0]["metadata"]
+    cache_states = {result["metadata"].get("llm_cache", {}).get("state") for result in succeeded}
+    return {
+        "data": data,
+        "metadata": {
+            "model": first_meta["model"],
+            "tokens_used": tokens,
+            "cost_usd": cost_usd,
+            "vision": first_meta.get("vision"),
+            "context": first_meta.get("context"),
+            "llm_cache": {"state": cache_states.pop() if len(cache_states) == 1 else "partial"},
+            "json_parse": json_parse,
+            "chunked": {
+                "chunks": total,
+                "chunks_dropped": dropped,
+                "chunks_failed": len(failures),
+                "chunk_tokens": settings.CHUNK_TOKENS,
+                "overlap_tokens": settings.CHUNK_OVERLAP_TOKENS,
+                "concurrency": settings.CHUNK_MAX_CONCURRENCY,
+                "records_before_dedupe": raw_records,
+                "records_after_dedupe": sum(len(v) for v in data.values() if isinstance(v, list)),
+                "map_ms": map_ms,
+                "reduce_ms": reduce_ms,
+            },
+        },
+    }
@@ -0,0 +1,176 @@
+"""Montagem do contexto da pagina dentro de um orcamento unico de tokens de entrada."""
+import math
+import re
+from dataclasses import dataclass, field
+from functools import lru_cache
+from typing import Any
+
+from src.config.settings import settings
+
+try:  # tokenizacao exata quando o tiktoken esta instalado
+    import tiktoken
+except ImportError:  # pragma: no cover - depende do ambiente
+    tiktoken = None
+
+CHARS_PER_TOKEN = 4
+# Fatias minimas do orcamento; o que uma secao nao usa vai para as seguintes.
+STRUCTURE_SHARE = 0.6
+IMAGES_SHARE = 0.05
+MIN_DEDUP_CHARS = 12
+_QUOTED = re.compile(r'"([^"]+)"')
+
+
+@lru_cache(maxsize=1)
+def _encoding() -> Any:
+    if tiktoken is None:
+        return None
+    try:
+        return tiktoken.get_encoding(settings.LLM_TOKENIZER_ENCODING)
+    except Exception:  # noqa: BLE001 - encoding indisponivel offline
+        return None
+
+
+def tokenizer_name() -> str:
+    return settings.LLM_TOKENIZER_ENCODING if _encoding() is not None else "chars/4"
+
+
+def count_tokens(text: str) -> int:
+    """Tokens do texto (tiktoken) ou estimativa por caracteres."""
+    if not text:
+        return 0
+    encoding = _encoding()
+    if encoding is not None:
+        return len(encoding.encode(text, disallowed_special=()))
+    return math.ceil(len(text) / CHARS_PER_TOKEN)
+
+
+def truncate_to_tokens(text: str, max_tokens: int) -> str:
+    """Mantem o inicio do texto dentro de `max_tokens`, cortando em fim de linha quando possivel."""
+    if max_tokens <= 0:
+        return ""
+    if count_tokens(text) <= max_tokens:
+        return text
+    encoding = _encoding()
+    if encoding is not None:
+        cut = encoding.decode(encoding.encode(text, disallowed_special=())[:max_tokens])
+    else:
+        cut = text[: max_tokens * CHARS_PER_TOKEN]
+    newline = cut.rfind("\n")
+    return cut[:newline] if newline > len(cut) // 2 else cut
+
+
+def _dedup_key(line: str) -> str:
+    return " ".join(line.split()).casefold()
+
+
+def dedupe_against_structure(text: str, structure: str) -> tuple[str, int]:
+    """Remove do texto renderizado as linhas que ja aparecem como nome na arvore AX.
+
+    Retorna o texto restante e quantas linhas foram removidas. Linhas curtas
+    (rotulos, numeros) ficam, pois o custo e baixo e ajudam a leitura.
+    """
+    names = {_dedup_key(match) for match in _QUOTED.findall(structure)}
+    if not names:
+        return text, 0
+    kept: list[str] = []
+    removed = 0
+    for line in text.splitlines():
+        key = _dedup_key(line)
+        if len(key) >= MIN_DEDUP_CHARS and key in names:
+            removed += 1
+            continue
+        kept.append(line)
+    return "\n".join(kept), removed
+
+
+def compact_image_list(image_urls: list[str]) -> str:
+    """Uma URL por linha, sem repeticoes."""
+    return "\n".join(dict.fromkeys(url.strip() for url in image_urls if url and url.strip()))
+
+
+@dataclass
+class PackedContext:
+    """Secoes prontas para a mensagem do usuario e a contabilidade de tokens."""
+
+    structure: str
+    images: str
+    text: str
+    budget_tokens: int
+    sections: dict[str, dict[str, Any]] = field(default_factory=dict)
+    dedup_lines_removed: int = 0
+    dedup_tokens_saved: int = 0
+
+    @property
+    def packed_tokens(self) -> int:
+        return sum(section["packed_tokens"] for section in self.sections.values())
+
+    def report(self, actual_input_tokens: int | None = None, fixed_tokens: int = 0) -> dict[str, Any]:
+        """Divisao estimada por secao e, com o `usage` da resposta, a divisao real proporcional.
+
+        `fixed_tokens` e a estimativa do que nao e pagina (prefixo, objetivo, screenshot).
+        """
+        estimated_total = self.packed_tokens + fixed_tokens
+        sections = {name: dict(values) for name, values in self.sections.items()}
+        if actual_input_tokens and estimated_total:
+            scale = actual_input_tokens / estimated_total
+            for values in sections.values():
+                values["actual_tokens"] = round(values["packed_tokens"] * scale)
+        return {
+            "tokenizer": tokenizer_name(),
+            "budget_tokens": self.budget_tokens,
+            "sections": sections,
+            "fixed_tokens": fixed_tokens,
+            "estimated_input_tokens": estimated_total,
+            "actual_input_tokens": actual_input_tokens,
+            "dedup_lines_removed": self.dedup_lines_removed,
+            "dedup_tokens_saved": self.dedup_tokens_saved,
+        }
+
+
+def pack_context(
+    structure: str,
+    text: str,
+    image_urls: list[str] | None,
+    budget_tokens: int | None = None,
+    dedupe: bool = True,
+) -> PackedContext:
+    """Distribui o orcamento entre imagens, estrutura (AX ou HTML) e texto.
+
+    Cada secao tem uma fatia minima; a sobra de secoes menores vai, por ordem de
+    prioridade, para estrutura e depois texto. O texto e deduplicado contra a
+    parte da estrutura que efetivamente entrou no contexto (`dedupe`, so faz
+    sentido para o outline AX, cujos nomes vem entre aspas).
+    """
+    budget = max(0, budget_tokens if budget_tokens is not None else settings.LLM_CONTEXT_TOKEN_BUDGET)
+    packed = PackedContext(structure="", images="", text="", budget_tokens=budget)
+
+    images_raw = compact_image_list(image_urls or [])
+    images_tokens = count_tokens(images_raw)
+    images = truncate_to_tokens(images_raw, min(images_tokens, int(budget * IMAGES_SHARE)))
+    packed.images = images
+    remaining = budget - count_tokens(images)
+
+    structure_tokens = count_tokens(structure)
+    text_tokens = count_tokens(text)
+    structure_alloc = min(structure_tokens, max(int(remaining * STRUCTURE_SHARE), remaining - text_tokens))
+    packed.structure = truncate_to_tokens(structure, structure_alloc)
+    remaining -= count_tokens(packed.structure)
+
+    deduped, removed = dedupe_against_structure(text, packed.structure) if dedupe else (text, 0)
+    deduped_tokens = count_tokens(deduped)
+    packed.dedup_lines_removed = removed
+    packed.dedup_tokens_saved = max(0, text_tokens - deduped_tokens) if removed else 0
+    packed.text = truncate_to_tokens(deduped, remaining)
+
+    for name, raw_tokens, value in (
+        ("images", images_tokens, packed.images),
+        ("structure", structure_tokens, packed.structure),
+        ("text", text_tokens, packed.text),
+    ):
+        packed_tokens = count_tokens(value)
+        packed.sections[name] = {
+            "raw_tokens": raw_tokens,
+            "packed_tokens": packed_tokens,
+            "truncated": packed_tokens < (deduped_tokens if name == "text" else raw_tokens),
+        }
+    return packed
@@ -21,6 +21,10 @@ class BlockedScraperError(RecoverableScraperError):
     """Sinal de bloqueio anti-bot/captcha/challenge."""
 
 
+class CircuitOpenError(BlockedScraperError):
+    """Dominio recusado pelo circuit breaker, sem tentativa de acesso."""
+
+
 class ValidationScraperError(NonRecoverableScraperError):
     """Dados extraidos nao bateram com o schema esperado."""
 
@@ -0,0 +1,234 @@
+"""Templates de extracao por dominio: aprendidos das respostas do LLM, usados no lugar dele."""
+import asyncio
+import hashlib
+import json
+import os
+import tempfile
+import time
+from pathlib import Path
+from typing import Any
+
+from loguru import logger
+from pydantic import BaseModel
+
+from src.config.settings import settings
+from src.core.errors import host_from_url
+from src.core.model_cascade import tier_quality
+from src.core.validator import DataValidator
+from src.core.wrapper_induction import apply_template, induce_template, template_agreement
+
+PROJECT_ROOT = Path(__file__).resolve().parents[2]
+
+
+def templates_enabled(use_templates: bool | None) -> bool:
+    return settings.TEMPLATES_ENABLED if use_templates is None else use_templates
+
+
+def template_key(schema: type[BaseModel], extraction_goal: str | None) -> str:
+    """Um template por schema e objetivo: objetivos diferentes extraem campos diferentes."""
+    goal = " ".join((extraction_goal or "").split()).casefold()
+    return f"{schema.__name__}:{hashlib.sha256(goal.encode('utf-8')).hexdigest()[:12]}"
+
+
+class TemplateStore:
+    """Templates por dominio em memoria, com um arquivo JSON por dominio em disco.
+
+    Cada entrada guarda o template, o estado (`candidate` ate ser confirmado em
+    `TEMPLATE_MIN_SAMPLES` extracoes do LLM, depois `active`) e contadores de uso.
+    """
+
+    def __init__(self, directory: str | None = None) -> None:
+        template_dir = Path(directory or settings.TEMPLATE_DIR)
+        if not template_dir.is_absolute():
+            template_dir = PROJECT_ROOT / template_dir
+        self.directory = template_dir
+        self._domains: dict[str, dict[str, dict[str, Any]]] = {}
+        self.counters = {
+            "hits": 0,
+            "fallbacks": 0,
+            "learned": 0,
+            "confirmed": 0,
+            "not_learnable": 0,
+        }
+
+    async def get(self, domain: str, key: str) -> dict[str, Any] | None:
+        return (await self._load(domain)).get(key)
+
+    async def put(self, domain: str, key: str, entry: dict[str, Any]) -> None:
+        templates = await self._load(domain)
+        templates[key] = entry
+        await asyncio.to_thread(self._write, domain, dict(templates))
+
+    async def discard(self, domain: str, key: str) -> None:
+        templates = await self._load(domain)
+        if templates.pop(key, None) is not None:
+            await asyncio.to_thread(self._write, domain, dict(templates))
+
+    def stats(self) -> dict[str, Any]:
+        entries = [entry for templates in self._domains.values() for entry in templates.values()]
+        return {
+            "domains_loaded": len(self._domains),
+            "active": sum(entry["state"] == "active" for entry in entries),
+            "candidates": sum(entry["state"] == "candidate" for entry in entries),
+            **self.counters,
+        }
+
+    async def _load(self, domain: str) -> dict[str, dict[str, Any]]:
+        if domain not in self._domains:
+            self._domains[domain] = await asyncio.to_thread(self._read, domain)
+        return self._domains[domain]
+
+    def _path_for(self, domain: str) -> Path:
+        return self.directory / f"{domain.replace(':', '_')}.json"
+
+    def _read(self, domain: str) -> dict[str, dict[str, Any]]:
+        path = self._path_for(domain)
+        if not path.exists():
+            return {}
+        try:
+            return json.loads(path.read_text(encoding="utf-8"))
+        except (OSError, json.JSONDecodeError) as exc:
+            logger.warning(f"Templates invalidos para {domain}: {exc}")
+            return {}
+
+    def _write(self, domain: str, templates: dict[str, dict[str, Any]]) -> None:
+        self.directory.mkdir(parents=True, exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=self.directory, prefix=".template-", suffix=".tmp")
+        try:
+            with os.fdopen(fd, "w", encoding="utf-8") as fh:
+                json.dump(templates, fh, ensure_ascii=False)
+            os.replace(tmp_path, self._path_for(domain))
+        except OSError:
+            Path(tmp_path).unlink(missing_ok=True)
+            raise
+
+
+async def extract_with_template(
+    store: TemplateStore,
+    html: str,
+    url: str,
+    schema: type[BaseModel],
+    extraction_goal: str | None,
+    next_page: Any = None,
+) -> tuple[dict[str, Any] | None, dict[str, Any] | None]:
+    """Extrai com o template ativo do dominio, sem chamar o modelo.
+
+    Retorna `(resultado no formato do AIProcessor, None)` quando o resultado passa
+    no `DataValidator` com score >= `TEMPLATE_MIN_QUALITY`. Se nao passar, o
+    template e descartado (o LLM assume e um novo e aprendido) e volta
+    `(None, detalhes do fallback)`; sem template ativo, `(None, None)`.
+    """
+    domain, key = host_from_url(url), template_key(schema, extraction_goal)
+    entry = await store.get(domain, key)
+    if entry is None or entry["state"] != "active":
+        return None, None
+
+    started = time.perf_counter()
+    data = await asyncio.to_thread(apply_template, html, entry["template"], url)
+    if "has_next_page" in schema.model_fields:
+        data["has_next_page"] = bool(next_page)
+    extract_ms = round((time.perf_counter() - started) * 1000, 1)
+    score, flags = tier_quality(data, schema)
+    if score < settings.TEMPLATE_MIN_QUALITY:
+        store.counters["fallbacks"] += 1
+        await store.discard(domain, key)
+        logger.info(f"Template de {domain} descartado (score={score}): {flags}")
+        return None, {"state": "fallback", "quality_score": score, "quality_flags": flags, "extract_ms": extract_ms}
+
+    store.counters["hits"] += 1
+    entry["uses"] = entry.get("uses", 0) + 1
+    entry["last_used_at"] = time.time()
+    return {
+        "data": data,
+        "metadata": {
+            "model": "template",
+            "tokens_used": {"input": 0, "cached_input": 0, "output": 0, "total": 0},
+            "cost_usd": 0.0,
+            "vision": None,
+            "template": {
+                "state": "hit",
+                "domain": domain,
+                "extract_ms": extract_ms,
+                "quality_score": score,
+                "uses": entry["uses"],
+                "learned_at": entry.get("learned_at"),
+            },
+        },
+    }, None
+
+
+async def learn_from_extraction(
+    store: TemplateStore,
+    html: str,
+    url: str,
+    schema: type[BaseModel],
+    extraction_goal: str | None,
+    ai_result: dict[str, Any],
+) -> dict[str, Any]:
+    """Aprende (ou confirma) o template do dominio a partir de uma extracao do LLM.
+
+    Um template novo nasce `candidate`; cada extracao seguinte que ele reproduz
+    com concordancia >= `TEMPLATE_MIN_AGREEMENT` conta como amostra, e com
+    `TEMPLATE_MIN_SAMPLES` amostras ele passa a `active`. Se nao reproduz, e
+    reinduzido a partir da pagina atual.
+    """
+    validated, _, _ = DataValidator.validate(ai_result["data"], schema=schema)
+    score, _ = tier_quality(ai_result["data"], schema)
+    if validated is None or score < settings.TEMPLATE_MIN_QUALITY:
+        return {"state": "skipped", "quality_score": score}
+    expected = json.loads(json.dumps(validated, default=str))
+    domain, key = host_from_url(url), template_key(schema, extraction_goal)
+    entry = await store.get(domain, key)
+    if entry is not None and entry["state"] == "active":
+        return {"state": "active"}
+
+    if entry is not None:
+        agreement = await asyncio.to_thread(template_agreement, html, entry["template"], expected, url)
+        if agreement >= settings.TEMPLATE_MIN_AGREEMENT:
+            entry["samples"] += 1
+            if entry["samples"] >= settings.TEMPLATE_MIN_SAMPLES:
+                entry["state"] = "active"
+                store.counters["confirmed"] += 1
+                logger.info(f"Template de {domain} confirmado em {entry['samples']} paginas")
+            await store.put(domain, key, entry)
+            return {"state": "confirmed" if entry["state"] == "active" else "candidate", "samples": entry["samples"]}
+
+    template = await asyncio.to_thread(
+        induce_template,
+        html,
+        expected,
+        schema,
+        url,
+        settings.TEMPLATE_MIN_RECORDS,
+        settings.TEMPLATE_MIN_AGREEMENT,
+    )
+    if template is None:
+        store.counters["not_learnable"] += 1
+        return {"state": "not_learnable"}
+    active = settings.TEMPLATE_MIN_SAMPLES <= 1
+    await store.put(domain, key, {
+        "state": "active" if active else "candidate",
+        "template": template,
+        "samples": 1,
+        "uses": 0,
+        "learned_at": time.time(),
+        "learned_from": url,
+    })
+    store.counters["learned"] += 1
+    return {"state": "learned" if active else "candidate", "samples": 1, "fields": sorted(template["fields"])}
+
+
+_store: TemplateStore | None = None
+
+
+def get_template_store() -> TemplateStore:
+    """Retorna o store de templates do processo (criado sob demanda)."""
+    global _store
+    if _store is None:
+        _store = TemplateStore()
+    return _store
+
+
+def shutdown_template_store() -> None:
+    global _store
+    _store = None
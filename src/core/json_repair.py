@@ -0,0 +1,135 @@
+"""Reparo local de JSON malformado devolvido pelo modelo."""
+import json
+import re
+from typing import Any
+
+_FENCE = re.compile(r"```(?:json|JSON)?\s*(.*?)(?:```|$)", re.DOTALL)
+_CLOSERS = {"{": "}", "[": "]"}
+# Quantos pontos de corte (virgulas) tentar de tras para frente num JSON truncado.
+MAX_CUT_ATTEMPTS = 64
+
+
+class JSONRepairError(ValueError):
+    """Texto sem JSON recuperavel."""
+
+
+def _strip_wrapping(text: str) -> str:
+    """Remove cercas de codigo e prosa antes do primeiro `{`/`[` e depois do ultimo fechamento."""
+    fenced = _FENCE.search(text)
+    if fenced:
+        text = fenced.group(1)
+    starts = [index for index in (text.find("{"), text.find("[")) if index >= 0]
+    if not starts:
+        raise JSONRepairError("Nenhum objeto JSON na resposta")
+    text = text[min(starts) :]
+    end = max(text.rfind("}"), text.rfind("]"))
+    # So corta o final se o documento parece fechado; truncado fica inteiro para o reparo.
+    if end >= 0:
+        try:
+            json.loads(text[: end + 1])
+            return text[: end + 1]
+        except json.JSONDecodeError:
+            pass
+    return text
+
+
+def _scan(text: str) -> tuple[str, list[str], list[tuple[int, list[str]]], bool]:
+    """Copia o texto removendo virgulas antes de fechamentos.
+
+    Retorna o texto limpo, a pilha de containers abertos no fim, os pontos de
+    corte (posicao de cada virgula fora de strings e logo apos cada `[`, com a
+    pilha naquele ponto) e se o texto terminou dentro de uma string.
+    """
+    out: list[str] = []
+    stack: list[str] = []
+    cuts: list[tuple[int, list[str]]] = []
+    in_string = False
+    escape = False
+    for char in text:
+        if in_string:
+            out.append(char)
+            if escape:
+                escape = False
+            elif char == "\\":
+                escape = True
+            elif char == '"':
+                in_string = False
+            continue
+        if char == '"':
+            in_string = True
+        elif char in "{[":
+            stack.append(char)
+        elif char in "}]":
+            while out and out[-1].isspace():
+                out.pop()
+            if out and out[-1] == ",":
+                out.pop()
+            if stack:
+                stack.pop()
+        elif char == ",":
+            cuts.append((len(out), list(stack)))
+        out.append(char)
+        if char == "[":
+            # Cortar logo apos o `[` deixa a lista vazia quando o primeiro elemento esta incompleto.
+            cuts.append((len(out), list(stack)))
+    return "".join(out), stack, cuts, in_string
+
+
+def _close(text: str, stack: list[str]) -> str:
+    text = text.rstrip()
+    while text.endswith((",", ":")):
+        text = text[:-1].rstrip()
+    return text + "".join(_CLOSERS[opener] for opener in reversed(stack))
+
+
+def _record_list_depth(cleaned: str, stack: list[str], in_string: bool) -> int | None:
+    """Profundidade da lista cujo ultimo elemento ficou incompleto no corte (None se nao ha).
+
+    Prefere a lista de registros (`[` seguido de `{`) mais interna; sem ela, a
+    lista aberta mais interna. Um elemento que acabou de fechar (`}`, `]` ou
+    string) na propria lista esta completo.
+    """
+    depth = next((k + 1 for k in range(len(stack) - 2, -1, -1) if stack[k : k + 2] == ["[", "{"]), None)
+    if depth is None and stack and stack[-1] == "[":
+        depth = len(stack)
+    if depth is None:
+        return None
+    if depth == len(stack) and not in_string and cleaned.rstrip()[-1:] in ("}", "]", '"'):
+        return None
+    return depth
+
+
+def repair_json(text: str) -> Any:
+    """Decodifica JSON tolerando cercas de codigo, prosa em volta, virgulas sobrando
+    e respostas truncadas (strings, listas e objetos abertos).
+
+    Truncado dentro de uma lista de registros, descarta o ultimo elemento
+    incompleto (corte na virgula anterior): um `"price": 12` cortado pode ser
+    120. Fora de listas (ex.: `summary` no topo), fecha o que esta aberto; se
+    nao basta, tenta os demais cortes de tras para frente.
+    """
+    body = _strip_wrapping(text.strip())
+    cleaned, stack, cuts, in_string = _scan(body)
+    recent = list(reversed(cuts[-MAX_CUT_ATTEMPTS:]))
+    depth = _record_list_depth(cleaned, stack, in_string)
+    first = [cut for cut in recent if depth is not None and cut[1] == stack[:depth]]
+    candidates = [_close(cleaned[:position], cut_stack) for position, cut_stack in first]
+    candidates.append(_close(cleaned + ('"' if in_string else ""), stack))
+    candidates.extend(_close(cleaned[:position], cut_stack) for position, cut_stack in recent)
+    for candidate in candidates:
+        try:
+            return json.loads(candidate)
+        except json.JSONDecodeError:
+            continue
+    raise JSONRepairError("JSON irrecuperavel localmente")
+
+
+def parse_model_json(text: str) -> tuple[Any, str]:
+    """Decodifica a resposta do modelo: `(dados, "direct")` ou `(dados, "local_repair")`.
+
+    Levanta `JSONRepairError` quando nem o reparo local recupera o documento.
+    """
+    try:
+        return json.loads(text), "direct"
+    except json.JSONDecodeError:
+        return repair_json(text), "local_repair"
@@ -0,0 +1,211 @@
+"""Cache persistente (SQLite) das respostas do modelo, enderecado pelo hash das mensagens."""
+import asyncio
+import hashlib
+import json
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import Any
+
+from loguru import logger
+
+from src.config.settings import settings
+
+PROJECT_ROOT = Path(__file__).resolve().parents[2]
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS llm_cache (
+    key TEXT PRIMARY KEY,
+    model TEXT NOT NULL,
+    created_at REAL NOT NULL,
+    last_access REAL NOT NULL,
+    size INTEGER NOT NULL,
+    tokens_total INTEGER NOT NULL,
+    cost_usd REAL NOT NULL,
+    payload TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_llm_cache_last_access ON llm_cache (last_access);
+"""
+
+
+def request_key(model: str, messages: list[dict[str, Any]], base_url: str = "", **params: Any) -> str:
+    """Hash das mensagens finais + modelo + parametros que mudam a resposta.
+
+    `base_url` (OPENAI_BASE_URL) separa respostas de outros endpoints, como o
+    servidor fake de benchmark; vazio (API oficial) mantem as chaves antigas.
+    """
+    payload: dict[str, Any] = {"model": model, "messages": messages, "params": params}
+    if base_url:
+        payload["base_url"] = base_url.rstrip("/")
+    raw = json.dumps(
+        payload,
+        sort_keys=True,
+        ensure_ascii=False,
+        default=str,
+    )
+    return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+
+class LLMResponseCache:
+    """Respostas ja validadas como JSON, com TTL e LRU limitado por bytes.
+
+    As operacoes SQLite rodam em thread (`asyncio.to_thread`) sobre uma unica
+    conexao protegida por lock; o arquivo sobrevive a reinicios do processo.
+    """
+
+    def __init__(
+        self,
+        path: str | None = None,
+        max_bytes: int | None = None,
+        ttl_seconds: float | None = None,
+    ) -> None:
+        db_path = Path(path or settings.LLM_CACHE_PATH)
+        if not db_path.is_absolute():
+            db_path = PROJECT_ROOT / db_path
+        self.path = db_path
+        self.max_bytes = max_bytes or settings.LLM_CACHE_MAX_BYTES
+        self.ttl_seconds = ttl_seconds if ttl_seconds is not None else settings.LLM_CACHE_TTL_SECONDS
+        self._conn: sqlite3.Connection | None = None
+        self._lock = threading.Lock()
+        self.counters = {"hits": 0, "misses": 0, "expired": 0, "stores": 0, "evictions": 0}
+        self.tokens_saved = 0
+        self.cost_saved_usd = 0.0
+
+    async def get(self, key: str) -> dict[str, Any] | None:
+        """Retorna `{"data", "tokens_used", "cost_usd", "age_seconds"}` ou None."""
+        row = await asyncio.to_thread(self._get_sync, key)
+        if row is None:
+            self.counters["misses"] += 1
+            return None
+        self.counters["hits"] += 1
+        self.tokens_saved += int(row["tokens_used"].get("total", 0))
+        self.cost_saved_usd += float(row["cost_usd"])
+        return row
+
+    async def put(
+        self,
+        key: str,
+        model: str,
+        data: Any,
+        tokens_used: dict[str, int],
+        cost_usd: float,
+    ) -> None:
+        payload = json.dumps({"data": data, "tokens_used": tokens_used}, ensure_ascii=False, default=str)
+        try:
+            await asyncio.to_thread(self._put_sync, key, model, payload, tokens_used, cost_usd)
+        except sqlite3.Error as exc:
+            logger.warning(f"Falha ao gravar cache LLM: {exc}")
+            return
+        self.counters["stores"] += 1
+
+    def stats(self) -> dict[str, Any]:
+        entries, total_bytes = 0, 0
+        if self._conn is not None:
+            with self._lock:
+                entries, total_bytes = self._conn.execute(
+                    "SELECT COUNT(*), COALESCE(SUM(size), 0) FROM llm_cache"
+                ).fetchone()
+        lookups = self.counters["hits"] + self.counters["misses"]
+        return {
+            **self.counters,
+            "entries": entries,
+            "bytes": total_bytes,
+            "max_bytes": self.max_bytes,
+            "ttl_seconds": self.ttl_seconds,
+            "hit_ratio": round(self.counters["hits"] / lookups, 4) if lookups else 0.0,
+            "tokens_saved": self.tokens_saved,
+            "cost_saved_usd": round(self.cost_saved_usd, 6),
+        }
+
+    def close(self) -> None:
+        with self._lock:
+            if self._conn is not None:
+                self._conn.close()
+            self._conn = None
+
+    def _connect(self) -> sqlite3.Connection:
+        if self._conn is None:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            conn = sqlite3.connect(self.path, check_same_thread=False)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.executescript(_SCHEMA)
+            self._conn = conn
+        return self._conn
+
+    def _get_sync(self, key: str) -> dict[str, Any] | None:
+        now = time.time()
+        with self._lock:
+            conn = self._connect()
+            row = conn.execute(
+                "SELECT created_at, cost_usd, payload FROM llm_cache WHERE key = ?", (key,)
+            ).fetchone()
+            if row is None:
+                return None
+            created_at, cost_usd, payload = row
+            if now - created_at > self.ttl_seconds:
+                conn.execute("DELETE FROM llm_cache WHERE key = ?", (key,))
+                conn.commit()
+                self.counters["expired"] += 1
+                return None
+            conn.execute("UPDATE llm_cache SET last_access = ? WHERE key = ?", (now, key))
+            conn.commit()
+        stored = json.loads(payload)
+        return {
+            "data": stored["data"],
+            "tokens_used": stored["tokens_used"],
+            "cost_usd": cost_usd,
+            "age_seconds": round(now - created_at, 1),
+        }
+
+    def _put_sync(
+        self,
+        key: str,
+        model: str,
+        payload: str,
+        tokens_used: dict[str, int],
+        cost_usd: float,
+    ) -> None:
+        now = time.time()
+        size = len(payload.encode("utf-8"))
+        with self._lock:
+            conn = self._connect()
+            conn.execute(
+                "INSERT OR REPLACE INTO llm_cache "
+                "(key, model, created_at, last_access, size, tokens_total, cost_usd, payload) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                (key, model, now, now, size, int(tokens_used.get("total", 0)), float(cost_usd), payload),
+            )
+            expired = conn.execute(
+                "DELETE FROM llm_cache WHERE created_at < ?", (now - self.ttl_seconds,)
+            ).rowcount
+            self.counters["expired"] += max(expired, 0)
+            total = conn.execute("SELECT COALESCE(SUM(size), 0) FROM llm_cache").fetchone()[0]
+            if total > self.max_bytes:
+                for old_key, old_size in conn.execute(
+                    "SELECT key, size FROM llm_cache WHERE key != ? ORDER BY last_access ASC", (key,)
+                ).fetchall():
+                    if total <= self.max_bytes:
+                        break
+                    conn.execute("DELETE FROM llm_cache WHERE key = ?", (old_key,))
+                    total -= old_size
+                    self.counters["evictions"] += 1
+            conn.commit()
+
+
+_cache: LLMResponseCache | None = None
+
+
+def get_llm_cache() -> LLMResponseCache:
+    """Retorna o cache de respostas do modelo do processo."""
+    global _cache
+    if _cache is None:
+        _cache = LLMResponseCache()
+    return _cache
+
+
+def shutdown_llm_cache() -> None:
+    global _cache
+    if _cache is not None:
+        _cache.close()
+        _cache = None
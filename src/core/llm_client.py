@@ -0,0 +1,143 @@
+"""Clientes AsyncOpenAI reutilizados por API key sobre um pool HTTP compartilhado."""
+import asyncio
+import hashlib
+from collections import OrderedDict
+from contextlib import asynccontextmanager
+from typing import Any, AsyncIterator
+
+import httpx
+from loguru import logger
+from openai import AsyncOpenAI
+
+from src.config.settings import settings
+
+
+class LLMClientPool:
+    """Cache LRU de `AsyncOpenAI` por API key, todos sobre o mesmo `httpx.AsyncClient`.
+
+    O limite de chamadas simultaneas (`max_concurrency`) vale para o processo
+    inteiro; quem excede espera um slot em vez de ocupar uma thread.
+    """
+
+    def __init__(
+        self,
+        max_clients: int | None = None,
+        max_concurrency: int | None = None,
+        max_connections: int | None = None,
+        max_keepalive: int | None = None,
+    ) -> None:
+        self.max_clients = max(1, max_clients or settings.OPENAI_CLIENT_CACHE_SIZE)
+        self.max_concurrency = max(1, max_concurrency or settings.OPENAI_MAX_CONCURRENCY)
+        self.max_connections = max_connections or settings.OPENAI_MAX_CONNECTIONS
+        self.max_keepalive = max_keepalive or settings.OPENAI_MAX_KEEPALIVE
+        self._clients: OrderedDict[str, AsyncOpenAI] = OrderedDict()
+        self._http_client: httpx.AsyncClient | None = None
+        self._semaphore: asyncio.Semaphore | None = None
+        self._loop: asyncio.AbstractEventLoop | None = None
+        self.in_flight = 0
+        self.waiting = 0
+        self.calls = 0
+        self.evictions = 0
+
+    def client(self, api_key: str | None = None) -> AsyncOpenAI:
+        """Cliente para a API key (ou a padrao), criado uma vez e reaproveitado."""
+        self._bind_loop()
+        key = api_key or settings.OPENAI_API_KEY
+        cache_key = hashlib.sha256(key.encode("utf-8")).hexdigest()
+        client = self._clients.get(cache_key)
+        if client is not None:
+            self._clients.move_to_end(cache_key)
+            return client
+        client = AsyncOpenAI(
+            api_key=key,
+            base_url=settings.OPENAI_BASE_URL or None,
+            http_client=self._get_http_client(),
+            timeout=settings.OPENAI_TIMEOUT_SECONDS,
+        )
+        self._clients[cache_key] = client
+        while len(self._clients) > self.max_clients:
+            # O http client e compartilhado: descartar a referencia basta.
+            self._clients.popitem(last=False)
+            self.evictions += 1
+        return client
+
+    @asynccontextmanager
+    async def slot(self) -> AsyncIterator[None]:
+        """Reserva um slot de chamada ao modelo, contabilizando espera e in-flight."""
+        self._bind_loop()
+        assert self._semaphore is not None
+        self.waiting += 1
+        try:
+            await self._semaphore.acquire()
+        finally:
+            self.waiting -= 1
+        self.in_flight += 1
+        self.calls += 1
+        try:
+            yield
+        finally:
+            self.in_flight -= 1
+            self._semaphore.release()
+
+    def stats(self) -> dict[str, Any]:
+        return {
+            "in_flight": self.in_flight,
+            "waiting": self.waiting,
+            "max_concurrency": self.max_concurrency,
+            "clients_cached": len(self._clients),
+            "client_evictions": self.evictions,
+            "calls": self.calls,
+            "max_connections": self.max_connections,
+        }
+
+    async def close(self) -> None:
+        self._clients.clear()
+        if self._http_client is not None:
+            await self._http_client.aclose()
+        self._http_client = None
+
+    def _get_http_client(self) -> httpx.AsyncClient:
+        if self._http_client is None:
+            self._http_client = httpx.AsyncClient(
+                limits=httpx.Limits(
+                    max_connections=self.max_connections,
+                    max_keepalive_connections=self.max_keepalive,
+                    keepalive_expiry=30,
+                ),
+                timeout=httpx.Timeout(settings.OPENAI_TIMEOUT_SECONDS, connect=10.0),
+            )
+        return self._http_client
+
+    def _bind_loop(self) -> None:
+        # Conexoes httpx e o semaforo pertencem a um loop; outro loop (ex.: CLI
+        # chamando asyncio.run varias vezes) recebe pool novo.
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            return
+        if loop is self._loop:
+            return
+        if self._loop is not None:
+            logger.debug("Event loop mudou; recriando pool HTTP do LLM")
+        self._loop = loop
+        self._clients.clear()
+        self._http_client = None
+        self._semaphore = asyncio.Semaphore(self.max_concurrency)
+
+
+_pool: LLMClientPool | None = None
+
+
+def get_llm_pool() -> LLMClientPool:
+    """Retorna o pool de clientes LLM do processo."""
+    global _pool
+    if _pool is None:
+        _pool = LLMClientPool()
+    return _pool
+
+
+async def shutdown_llm_pool() -> None:
+    global _pool
+    if _pool is not None:
+        await _pool.close()
+        _pool = None
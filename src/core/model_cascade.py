@@ -0,0 +1,137 @@
+"""Cascata de modelos: passada barata so com texto, escalando quando a qualidade nao basta."""
+import time
+from typing import Any, Awaitable, Callable
+
+from loguru import logger
+from pydantic import BaseModel
+
+from src.config.settings import settings
+from src.core.chunked_extraction import record_field
+from src.core.errors import ScraperError
+from src.core.validator import DataValidator
+
+# extract(model=..., with_screenshot=...) -> resultado de AIProcessor.extract_structured_data
+Extractor = Callable[..., Awaitable[dict[str, Any]]]
+
+
+def cascade_enabled(use_cascade: bool | None) -> bool:
+    return settings.CASCADE_ENABLED if use_cascade is None else use_cascade
+
+
+def tier_quality(data: Any, schema: type[BaseModel]) -> tuple[float, list[str]]:
+    """Score usado para aceitar uma camada.
+
+    Falha de schema ou lista de registros vazia (`items`/`findings`/`products`)
+    valem zero: e o caso tipico de conteudo que so aparece no screenshot.
+    """
+    if not isinstance(data, dict):
+        return 0.0, ["schema_validation_error"]
+    validated, _, quality = DataValidator.validate(data, schema=schema)
+    if validated is None:
+        return 0.0, quality["quality_flags"]
+    field = record_field(schema)
+    if field and not validated.get(field):
+        return 0.0, [*quality["quality_flags"], f"empty_records:{field}"]
+    return quality["quality_score"], quality["quality_flags"]
+
+
+def _tier_report(tier: str, model: str, with_screenshot: bool, result: dict[str, Any], ms: float) -> dict[str, Any]:
+    metadata = result["metadata"]
+    return {
+        "tier": tier,
+        "model": model,
+        "screenshot": with_screenshot,
+        "llm_ms": ms,
+        "cost_usd": metadata["cost_usd"],
+        "tokens_total": metadata["tokens_used"].get("total", 0),
+        "llm_cache": (metadata.get("llm_cache") or {}).get("state"),
+    }
+
+
+def _merge_costs(final: dict[str, Any], previous: dict[str, Any]) -> None:
+    """Soma tokens, custo e caminhos de parse da camada descartada no resultado final."""
+    metadata = final["metadata"]
+    metadata["cost_usd"] += previous["metadata"]["cost_usd"]
+    metadata["tokens_used"] = {
+        key: value + previous["metadata"]["tokens_used"].get(key, 0)
+        for key, value in metadata["tokens_used"].items()
+    }
+    json_parse = dict(metadata.get("json_parse") or {})
+    for path, count in (previous["metadata"].get("json_parse") or {}).items():
+        json_parse[path] = json_parse.get(path, 0) + count
+    metadata["json_parse"] = json_parse
+
+
+async def extract_with_cascade(
+    extract: Extractor,
+    schema: type[BaseModel],
+    has_screenshot: bool,
+    min_quality: float | None = None,
+) -> dict[str, Any]:
+    """Roda a camada `text` (sem screenshot, `CASCADE_TEXT_MODEL`) e aceita o
+    resultado se passar no `DataValidator` com score >= `min_quality`.
+
+    Senao escala para `escalated` (screenshot + `CASCADE_ESCALATION_MODEL`).
+    Tokens e custo somam as duas camadas; o detalhe por camada fica em
+    `metadata.cascade`.
+    """
+    threshold = settings.CASCADE_MIN_QUALITY if min_quality is None else min_quality
+    text_model = settings.CASCADE_TEXT_MODEL or settings.OPENAI_MODEL
+    escalation_model = settings.CASCADE_ESCALATION_MODEL or settings.OPENAI_MODEL
+    # Sem screenshot e com o mesmo modelo a segunda camada repetiria a primeira.
+    can_escalate = has_screenshot or escalation_model != text_model
+    tiers: list[dict[str, Any]] = []
+
+    started = time.perf_counter()
+    try:
+        text_result = await extract(model=text_model, with_screenshot=False)
+    except ScraperError as exc:
+        if not can_escalate:
+            raise
+        logger.warning(f"Camada de texto da cascata falhou, escalando: {exc}")
+        text_result = None
+        tiers.append({
+            "tier": "text",
+            "model": text_model,
+            "screenshot": False,
+            "llm_ms": round((time.perf_counter() - started) * 1000, 1),
+            "cost_usd": 0.0,
+            "tokens_total": 0,
+            "outcome": "failed",
+            "error": str(exc),
+        })
+        reason = "text_tier_error"
+    else:
+        score, flags = tier_quality(text_result["data"], schema)
+        accepted = score >= threshold or not can_escalate
+        report = _tier_report("text", text_model, False, text_result, round((time.perf_counter() - started) * 1000, 1))
+        report.update(quality_score=score, quality_flags=flags, outcome="accepted" if accepted else "escalated")
+        tiers.append(report)
+        if accepted:
+            text_result["metadata"]["cascade"] = {
+                "final_tier": "text",
+                "escalated": False,
+                "min_quality": threshold,
+                "tiers": tiers,
+            }
+            return text_result
+        reason = "validation_failed" if "schema_validation_error" in flags else "low_quality"
+        logger.info(f"Cascata escalando (score={score}, min={threshold}): {flags}")
+
+    started = time.perf_counter()
+    result = await extract(model=escalation_model, with_screenshot=has_screenshot)
+    report = _tier_report(
+        "escalated", escalation_model, has_screenshot, result, round((time.perf_counter() - started) * 1000, 1)
+    )
+    report["outcome"] = "accepted"
+    tiers.append(report)
+    if text_result is not None:
+        _merge_costs(result, text_result)
+    result["metadata"]["cascade"] = {
+        "final_tier": "escalated",
+        "escalated": True,
+        "reason": reason,
+        "min_quality": threshold,
+        "tiers": tiers,
+    }
+    return result
@@ -1,7 +1,9 @@
 """Orquestrador do fluxo completo de scraping."""
 import asyncio
+import functools
 import time
-from typing import Any
+import weakref
+from typing import Any, AsyncIterator
 
 from loguru import logger
 from pydantic import BaseModel
@@ -10,19 +12,67 @@ from tenacity import retry, retry_if_exception_type, stop_after_attempt, wait_ex
 from src.config.settings import settings
 from src.core.ai_processor import AIProcessor
 from src.core.browser import BrowserManager
+from src.core.browser_pool import shutdown_browser_pool
+from src.core.capture_cache import get_capture_cache
+from src.core.capture_profiles import (
+    HTML_SUFFIX,
+    apply_capture_profile,
+    get_capture_profile,
+    resolve_capture_profile,
+)
+from src.core.capture_workers import get_capture_workers, shutdown_capture_workers
+from src.core.chunked_extraction import extract_chunked, should_chunk
 from src.core.errors import (
-    BlockedScraperError,
+    CircuitOpenError,
     RecoverableScraperError,
     classify_exception,
     host_from_url,
 )
+from src.core.extraction_templates import (
+    extract_with_template,
+    get_template_store,
+    learn_from_extraction,
+    shutdown_template_store,
+    templates_enabled,
+)
+from src.core.llm_cache import shutdown_llm_cache
+from src.core.llm_client import shutdown_llm_pool
+from src.core.model_cascade import cascade_enabled, extract_with_cascade
+from src.core.pagination import merge_page_results, model_says_last_page
+from src.core.pdf_extractor import PAGE_SEPARATOR, shutdown_pdf_executor
+from src.core.session_store import shutdown_session_store
+from src.core.static_fetcher import get_static_fetcher, shutdown_static_fetcher
 from src.core.storage import StorageManager
 from src.core.validator import DataValidator
 from src.utils.logger import configure_logging
 
 
+# Bloqueios/falhas de rede finais seguidos (apos os retries) que abrem o circuito de um dominio.
+CIRCUIT_BREAKER_FAILURES = 4
+
+# Orquestradores vivos e nao fechados; o ultimo a fechar encerra os recursos compartilhados.
+_open_orchestrators: "weakref.WeakSet[ScraperOrchestrator]" = weakref.WeakSet()
+
+
+async def shutdown_shared_resources() -> None:
+    """Fecha os recursos compartilhados do processo (browsers, sessoes, clientes e caches)."""
+    await shutdown_capture_workers()
+    await shutdown_browser_pool()
+    await shutdown_session_store()
+    await shutdown_static_fetcher()
+    await shutdown_llm_pool()
+    shutdown_llm_cache()
+    shutdown_template_store()
+    shutdown_pdf_executor()
+
+
 class ScraperOrchestrator:
-    """Executa pipeline completo: browser -> IA -> validacao -> storage."""
+    """Executa pipeline completo: browser -> IA -> validacao -> storage.
+
+    Fora do servidor web use `async with ScraperOrchestrator() as scraper:` (ou
+    `close()`) para encerrar o Chromium e gravar as sessoes antes de sair. Os
+    recursos do processo so fecham junto com o ultimo orquestrador aberto.
+    """
 
     def __init__(self, with_storage: bool = True, api_key: str | None = None) -> None:
         configure_logging()
@@ -31,6 +81,24 @@ class ScraperOrchestrator:
         self.storage = StorageManager() if with_storage else None
         self._domain_locks: dict[str, asyncio.Semaphore] = {}
         self._domain_failure_count: dict[str, int] = {}
+        self._circuit_opened_at: dict[str, float] = {}
+        _open_orchestrators.add(self)
+
+    async def __aenter__(self) -> "ScraperOrchestrator":
+        return self
+
+    async def __aexit__(self, *exc: Any) -> None:
+        await self.close()
+
+    async def close(self) -> None:
+        """Fecha o storage; sem outro orquestrador aberto, tambem os recursos compartilhados."""
+        _open_orchestrators.discard(self)
+        if self.storage:
+            await self.storage.close()
+        if len(_open_orchestrators) == 0:
+            await shutdown_shared_resources()
+        else:
+            logger.debug(f"Recursos compartilhados mantidos: {len(_open_orchestrators)} orquestrador(es) aberto(s)")
 
     async def scrape(
         self,
@@ -40,19 +108,40 @@ class ScraperOrchestrator:
         extraction_goal: str | None = None,
         output_format: str = "list",
         extra_metadata: dict[str, Any] | None = None,
+        max_pages: int = 1,
+        use_llm_cache: bool = True,
+        extraction_mode: str | None = None,
+        use_cascade: bool | None = None,
+        use_templates: bool | None = None,
         **browser_options: Any,
     ) -> dict[str, Any]:
-        """Executa scraping completo em uma URL e persiste a tentativa."""
+        """Executa scraping completo em uma URL e persiste a tentativa.
+
+        Com `max_pages > 1` segue a paginacao da listagem no mesmo browser.
+        `use_llm_cache=False` ignora respostas do modelo ja em cache.
+        `extraction_mode` (auto | single | chunked) controla a extracao em trechos.
+        `use_cascade` liga/desliga a cascata texto -> screenshot (padrao: `CASCADE_ENABLED`).
+        `use_templates` liga/desliga os templates por dominio (padrao: `TEMPLATES_ENABLED`).
+        """
         if self.storage:
             await self.storage.initialize()
 
         try:
-            result = await self._scrape_with_retry(
+            # Antes do retry: com o circuito aberto nao ha o que retentar.
+            self._check_circuit(host_from_url(url))
+            scrape_fn = self._scrape_with_retry
+            if max_pages > 1:
+                scrape_fn = functools.partial(self._scrape_paginated, max_pages=max_pages)
+            result = await scrape_fn(
                 url=url,
                 schema=schema,
                 system_prompt=system_prompt,
                 extraction_goal=extraction_goal,
                 output_format=output_format,
+                use_llm_cache=use_llm_cache,
+                extraction_mode=extraction_mode,
+                use_cascade=use_cascade,
+                use_templates=use_templates,
                 **browser_options,
             )
             # Merge extra_metadata into result metadata if success
@@ -61,6 +150,7 @@ class ScraperOrchestrator:
 
         except Exception as exc:
             error_type, retryable = classify_exception(exc)
+            self._record_domain_failure(host_from_url(url), exc)
             logger.exception(f"Falha final no scraping ({error_type}): {exc}")
             result = {
                 "success": False,
@@ -87,6 +177,140 @@ class ScraperOrchestrator:
         result["record_id"] = record_id
         return result
 
+    def _check_circuit(self, domain: str) -> None:
+        """Recusa o dominio com o circuito aberto.
+
+        Passado `CIRCUIT_BREAKER_COOLDOWN_SECONDS`, deixa uma tentativa passar
+        (half-open): sucesso fecha o circuito, nova falha reabre por outro cooldown.
+        """
+        failure_count = self._domain_failure_count.get(domain, 0)
+        if failure_count < CIRCUIT_BREAKER_FAILURES:
+            return
+        now = time.monotonic()
+        remaining = self._circuit_opened_at.get(domain, now) + settings.CIRCUIT_BREAKER_COOLDOWN_SECONDS - now
+        if remaining > 0:
+            raise CircuitOpenError(
+                f"Circuit breaker ativo para dominio {domain} "
+                f"(falhas consecutivas={failure_count}, nova tentativa em {remaining:.0f}s)"
+            )
+        # Half-open: esta tentativa segue; as concorrentes aguardam um novo cooldown.
+        self._circuit_opened_at[domain] = now
+        logger.info(f"Circuit breaker de {domain} em half-open: testando o dominio")
+
+    def _record_domain_failure(self, domain: str, exc: Exception) -> None:
+        """Conta so bloqueios e falhas de rede; recusas do proprio circuito nao contam."""
+        if isinstance(exc, CircuitOpenError) or classify_exception(exc)[0] not in ("blocked", "network"):
+            return
+        failure_count = self._domain_failure_count.get(domain, 0) + 1
+        self._domain_failure_count[domain] = failure_count
+        if failure_count >= CIRCUIT_BREAKER_FAILURES:
+            self._circuit_opened_at[domain] = time.monotonic()
+
+    async def scrape_stream(
+        self,
+        url: str,
+        schema: type[BaseModel],
+        system_prompt: str | None = None,
+        extraction_goal: str | None = None,
+        output_format: str = "list",
+        extra_metadata: dict[str, Any] | None = None,
+        use_llm_cache: bool = True,
+        **browser_options: Any,
+    ) -> AsyncIterator[dict[str, Any]]:
+        """Versao em streaming de `scrape` para uma pagina.
+
+        Sem retry, paginacao, map-reduce, cascata de modelos nem templates por
+        dominio; o circuit breaker do dominio vale como em `scrape`.
+
+        Emite `{"event": "capture"}` apos a captura, `{"event": "item"}` para cada
+        registro que passa no schema do item assim que o modelo o fecha e, por
+        ultimo, `{"event": "result"}` com o mesmo payload persistido por `scrape`.
+        """
+        if self.storage:
+            await self.storage.initialize()
+
+        start = time.perf_counter()
+        logger.info(f"Iniciando scraping em streaming: {url}")
+        browser_options["capture_profile"] = resolve_capture_profile(
+            browser_options.get("capture_profile"), schema, output_format
+        )
+        domain = host_from_url(url)
+        lock = self._domain_locks.setdefault(domain, asyncio.Semaphore(max(1, min(settings.MAX_CONCURRENT_TASKS, 3))))
+        streaming = {"time_to_first_item_ms": None, "items_streamed": 0, "items_invalid": 0}
+        try:
+            self._check_circuit(domain)
+            async with lock:
+                captured = await self._capture(url=url, **browser_options)
+                screenshot_b64, html, text_content, ax_snapshot, image_urls, page_metadata = captured
+                yield {
+                    "event": "capture",
+                    "url": url,
+                    "final_url": page_metadata.get("final_url"),
+                    "capture_path": page_metadata.get("capture_path"),
+                    "elapsed_ms": round((time.perf_counter() - start) * 1000, 1),
+                }
+                ai_result: dict[str, Any] = {}
+                async for event in self.ai_processor.stream_structured_data(
+                    screenshot_base64=screenshot_b64,
+                    html=html,
+                    text_content=text_content,
+                    accessibility_snapshot=ax_snapshot,
+                    image_urls=image_urls,
+                    schema=schema,
+                    system_prompt=system_prompt,
+                    extraction_goal=extraction_goal,
+                    output_format=output_format,
+                    screenshot_plan=page_metadata.get("screenshot"),
+                    use_cache=use_llm_cache,
+                    document_pages=(
+                        text_content.split(PAGE_SEPARATOR)
+                        if page_metadata.get("content_type") == "application/pdf"
+                        else None
+                    ),
+                ):
+                    if event["type"] == "result":
+                        ai_result = event
+                        continue
+                    item = self.validator.validate_item(event["item"], schema=schema, field=event["field"])
+                    if item is None:
+                        streaming["items_invalid"] += 1
+                        continue
+                    if streaming["time_to_first_item_ms"] is None:
+                        streaming["time_to_first_item_ms"] = round((time.perf_counter() - start) * 1000, 1)
+                    streaming["items_streamed"] += 1
+                    yield {"event": "item", "field": event["field"], "item": item}
+            result = self._build_result(
+                url, schema, ai_result, page_metadata, time.perf_counter() - start, extraction_goal, domain
+            )
+        except Exception as exc:
+            error_type, retryable = classify_exception(exc)
+            self._record_domain_failure(domain, exc)
+            logger.exception(f"Falha no scraping em streaming ({error_type}): {exc}")
+            result = {
+                "success": False,
+                "error": str(exc),
+                "metadata": {
+                    "url": url,
+                    "duration_seconds": time.perf_counter() - start,
+                    "extraction_goal": extraction_goal,
+                    "error_type": error_type,
+                    "retryable": retryable,
+                },
+            }
+
+        result["metadata"]["streaming"] = streaming
+        if extra_metadata:
+            result["metadata"].update(extra_metadata)
+        record_id: int | None = None
+        if self.storage:
+            record_id = await self.storage.save_attempt(
+                payload=result,
+                url=url,
+                cost_usd=float(result["metadata"].get("cost_usd", 0) or 0),
+            )
+        result["record_id"] = record_id
+        yield {"event": "result", **result}
+
     @retry(
         stop=stop_after_attempt(settings.RETRY_ATTEMPTS),
         wait=wait_exponential(multiplier=settings.RETRY_DELAY, min=1, max=16) + wait_random(0, 1.5),
@@ -100,39 +324,222 @@ class ScraperOrchestrator:
         system_prompt: str | None = None,
         extraction_goal: str | None = None,
         output_format: str = "list",
+        use_llm_cache: bool = True,
+        extraction_mode: str | None = None,
+        use_cascade: bool | None = None,
+        use_templates: bool | None = None,
         **browser_options: Any,
     ) -> dict[str, Any]:
         start = time.perf_counter()
         logger.info(f"Iniciando scraping: {url}")
+        browser_options["capture_profile"] = resolve_capture_profile(
+            browser_options.get("capture_profile"), schema, output_format, needs_html=templates_enabled(use_templates)
+        )
         domain = host_from_url(url)
         domain_limit = max(1, min(settings.MAX_CONCURRENT_TASKS, 3))
         lock = self._domain_locks.setdefault(domain, asyncio.Semaphore(domain_limit))
-        failure_count = self._domain_failure_count.get(domain, 0)
-        if failure_count >= 4:
-            raise BlockedScraperError(
-                f"Circuit breaker ativo para dominio {domain} (falhas consecutivas={failure_count})"
-            )
 
         async with lock:
-            async with BrowserManager() as browser:
-                screenshot_b64, html, text_content, ax_snapshot, image_urls, page_metadata = await browser.navigate_and_capture(
-                    url=url,
-                    **browser_options,
-                )
-
-            ai_result = await self.ai_processor.extract_structured_data(
-                screenshot_base64=screenshot_b64,
-                html=html,
-                text_content=text_content,
-                accessibility_snapshot=ax_snapshot,
-                image_urls=image_urls,
+            captured = await self._capture(url=url, **browser_options)
+            page_metadata = captured[5]
+            ai_result = await self._extract(
+                captured,
                 schema=schema,
                 system_prompt=system_prompt,
                 extraction_goal=extraction_goal,
                 output_format=output_format,
+                use_cache=use_llm_cache,
+                extraction_mode=extraction_mode,
+                use_cascade=use_cascade,
+                use_templates=use_templates,
             )
-        duration = time.perf_counter() - start
+        return self._build_result(
+            url, schema, ai_result, page_metadata, time.perf_counter() - start, extraction_goal, domain
+        )
+
+    @retry(
+        stop=stop_after_attempt(settings.RETRY_ATTEMPTS),
+        wait=wait_exponential(multiplier=settings.RETRY_DELAY, min=1, max=16) + wait_random(0, 1.5),
+        retry=retry_if_exception_type((RecoverableScraperError,)),
+        reraise=True,
+    )
+    async def _scrape_paginated(
+        self,
+        url: str,
+        schema: type[BaseModel],
+        system_prompt: str | None = None,
+        extraction_goal: str | None = None,
+        output_format: str = "list",
+        max_pages: int = 2,
+        use_llm_cache: bool = True,
+        extraction_mode: str | None = None,
+        use_cascade: bool | None = None,
+        use_templates: bool | None = None,
+        capture_mode: str | None = None,
+        use_capture_cache: bool = True,
+        block_resources: bool = True,
+        **browser_options: Any,
+    ) -> dict[str, Any]:
+        """Percorre ate `max_pages` paginas no mesmo contexto do browser.
+
+        A extracao da pagina N roda enquanto a pagina N+1 e capturada. A proxima
+        pagina vem do DOM (rel=next, links/botoes de paginacao); a resposta do
+        modelo com `has_next_page=false` encerra o percurso. Falhas apos a
+        primeira pagina encerram a paginacao mantendo o que ja foi extraido.
+        Paginacao sempre usa o Chromium (sem fast path HTTP nem cache de captura).
+        """
+        start = time.perf_counter()
+        logger.info(f"Iniciando scraping paginado (max_pages={max_pages}): {url}")
+        browser_options["capture_profile"] = resolve_capture_profile(
+            browser_options.get("capture_profile"), schema, output_format, needs_html=templates_enabled(use_templates)
+        )
+        domain = host_from_url(url)
+        lock = self._domain_locks.setdefault(domain, asyncio.Semaphore(max(1, min(settings.MAX_CONCURRENT_TASKS, 3))))
+        pages: list[dict[str, Any]] = []
+        page_data: list[dict[str, Any]] = []
+        tokens = {"input": 0, "cached_input": 0, "output": 0, "total": 0}
+        json_parse: dict[str, int] = {}
+        cost_usd = 0.0
+        model_used = None
+        stop_reason = "max_pages"
+
+        async with lock, BrowserManager() as browser:
+            async with browser.paginated_session(url, block_resources=block_resources) as session:
+                captured = await session.capture(url=url, **browser_options)
+                for page_number in range(1, max_pages + 1):
+                    page_metadata = captured[5]
+                    next_page = page_metadata.get("next_page")
+                    extraction = asyncio.create_task(
+                        self._extract(
+                            captured,
+                            schema,
+                            system_prompt,
+                            extraction_goal,
+                            output_format,
+                            use_cache=use_llm_cache,
+                            extraction_mode=extraction_mode,
+                            use_cascade=use_cascade,
+                            use_templates=use_templates,
+                        )
+                    )
+                    next_capture: asyncio.Task | None = None
+                    if next_page and page_number < max_pages:
+                        # OPTIMIZATION: captura da pagina N+1 sobrepoe a chamada ao LLM da pagina N
+                        next_capture = asyncio.create_task(
+                            session.capture(url=url, next_page=next_page, **browser_options)
+                        )
+
+                    try:
+                        ai_result = await extraction
+                        validated, errors, quality = self.validator.validate(ai_result["data"], schema=schema)
+                    except Exception as exc:
+                        await _cancel(next_capture)
+                        if page_number == 1:
+                            raise
+                        logger.warning(f"Extracao da pagina {page_number} falhou: {exc}")
+                        pages.append({"page_number": page_number, "error": str(exc), "page": page_metadata})
+                        stop_reason = "extraction_error"
+                        break
+
+                    meta = ai_result["metadata"]
+                    model_used = meta["model"]
+                    cost_usd += meta["cost_usd"]
+                    for key in tokens:
+                        tokens[key] += meta["tokens_used"].get(key, 0)
+                    for path, count in (meta.get("json_parse") or {}).items():
+                        json_parse[path] = json_parse.get(path, 0) + count
+                    pages.append({
+                        "page_number": page_number,
+                        "url": page_metadata.get("final_url"),
+                        "tokens_used": meta["tokens_used"],
+                        "cost_usd": meta["cost_usd"],
+                        "llm_cache": meta.get("llm_cache"),
+                        "prompt_cache": meta.get("prompt_cache"),
+                        "chunked": meta.get("chunked"),
+                        "cascade": meta.get("cascade"),
+                        "template": meta.get("template"),
+                        "quality": quality,
+                        "validation_errors": errors,
+                        "page": page_metadata,
+                    })
+                    if validated is None:
+                        await _cancel(next_capture)
+                        if page_number == 1:
+                            logger.error(f"Falha na validacao: {errors}")
+                            return {
+                                "success": False,
+                                "error": "Validation failed",
+                                "validation_errors": errors,
+                                "metadata": {
+                                    "url": url,
+                                    "model_used": model_used,
+                                    "tokens_used": tokens,
+                                    "cost_usd": cost_usd,
+                                    "duration_seconds": time.perf_counter() - start,
+                                    "pages": pages,
+                                    "json_parse": json_parse,
+                                    "extraction_goal": extraction_goal,
+                                    "error_type": "validation",
+                                    "retryable": False,
+                                    "quality": quality,
+                                },
+                            }
+                        stop_reason = "validation_error"
+                        break
+                    page_data.append(validated)
+
+                    if model_says_last_page(validated):
+                        await _cancel(next_capture)
+                        stop_reason = "model_last_page"
+                        break
+                    if next_capture is None:
+                        stop_reason = "max_pages" if page_number >= max_pages else "no_next_link"
+                        break
+                    try:
+                        captured = await next_capture
+                    except Exception as exc:
+                        logger.warning(f"Captura da pagina {page_number + 1} falhou: {exc}")
+                        stop_reason = "capture_error"
+                        pages.append({"page_number": page_number + 1, "error": str(exc)})
+                        break
+
+        merged = merge_page_results(page_data)
+        validated_merged, _, quality = self.validator.validate(merged, schema=schema)
+        self._domain_failure_count[domain] = 0
+        return {
+            "success": True,
+            "data": validated_merged if validated_merged is not None else merged,
+            "metadata": {
+                "url": url,
+                "model_used": model_used,
+                "tokens_used": tokens,
+                "cost_usd": cost_usd,
+                "duration_seconds": time.perf_counter() - start,
+                "page": pages[0]["page"],
+                "pages": pages,
+                "json_parse": json_parse,
+                "pagination": {
+                    "max_pages": max_pages,
+                    "pages_extracted": len(page_data),
+                    "stop_reason": stop_reason,
+                },
+                "extraction_goal": extraction_goal,
+                "error_type": None,
+                "retryable": False,
+                "quality": quality,
+            },
+        }
 
+    def _build_result(
+        self,
+        url: str,
+        schema: type[BaseModel],
+        ai_result: dict[str, Any],
+        page_metadata: dict[str, Any],
+        duration: float,
+        extraction_goal: str | None,
+        domain: str,
+    ) -> dict[str, Any]:
         validated_data, errors, quality = self.validator.validate(ai_result["data"], schema=schema)
         if errors or validated_data is None:
             logger.error(f"Falha na validacao: {errors}")
@@ -145,6 +552,8 @@ class ScraperOrchestrator:
                     "model_used": ai_result["metadata"]["model"],
                     "tokens_used": ai_result["metadata"]["tokens_used"],
                     "cost_usd": ai_result["metadata"]["cost_usd"],
+                    "json_parse": ai_result["metadata"].get("json_parse"),
+                    "template": ai_result["metadata"].get("template"),
                     "duration_seconds": duration,
                     "page": page_metadata,
                     "extraction_goal": extraction_goal,
@@ -159,6 +568,14 @@ class ScraperOrchestrator:
             "model_used": ai_result["metadata"]["model"],
             "tokens_used": ai_result["metadata"]["tokens_used"],
             "cost_usd": ai_result["metadata"]["cost_usd"],
+            "vision": ai_result["metadata"].get("vision"),
+            "llm_cache": ai_result["metadata"].get("llm_cache"),
+            "prompt_cache": ai_result["metadata"].get("prompt_cache"),
+            "json_parse": ai_result["metadata"].get("json_parse"),
+            "cascade": ai_result["metadata"].get("cascade"),
+            "template": ai_result["metadata"].get("template"),
+            "context": ai_result["metadata"].get("context"),
+            "chunked": ai_result["metadata"].get("chunked"),
             "duration_seconds": duration,
             "page": page_metadata,
             "extraction_goal": extraction_goal,
@@ -169,3 +586,126 @@ class ScraperOrchestrator:
         self._domain_failure_count[domain] = 0
         return {"success": True, "data": validated_data, "metadata": result_metadata}
 
+    async def _extract(
+        self,
+        captured: tuple[str, str, str, str, list[str], dict[str, Any]],
+        schema: type[BaseModel],
+        system_prompt: str | None,
+        extraction_goal: str | None,
+        output_format: str,
+        use_cache: bool = True,
+        extraction_mode: str | None = None,
+        use_cascade: bool | None = None,
+        use_templates: bool | None = None,
+    ) -> dict[str, Any]:
+        screenshot_b64, html, text_content, ax_snapshot, image_urls, page_metadata = captured
+        profile_name = (page_metadata.get("capture_profile") or {}).get("name") or ""
+        # HTML pedido so para os templates nao entra no prompt de perfis sem estrutura (text_only).
+        llm_html = "" if profile_name.endswith(HTML_SUFFIX) and not get_capture_profile(profile_name).structure else html
+        options: dict[str, Any] = {
+            "screenshot_base64": screenshot_b64,
+            "html": llm_html,
+            "text_content": text_content,
+            "accessibility_snapshot": ax_snapshot,
+            "image_urls": image_urls,
+            "schema": schema,
+            "system_prompt": system_prompt,
+            "extraction_goal": extraction_goal,
+            "output_format": output_format,
+            "screenshot_plan": page_metadata.get("screenshot"),
+            "use_cache": use_cache,
+        }
+        document_pages = (
+            text_content.split(PAGE_SEPARATOR) if page_metadata.get("content_type") == "application/pdf" else None
+        )
+
+        async def extract(model: str | None = None, with_screenshot: bool = True) -> dict[str, Any]:
+            tier_options = {**options, "model": model}
+            if not with_screenshot:
+                tier_options.update(screenshot_base64="", screenshot_plan=None)
+            if should_chunk(extraction_mode, schema, text_content):
+                return await extract_chunked(self.ai_processor, **tier_options)
+            return await self.ai_processor.extract_structured_data(**tier_options, document_pages=document_pages)
+
+        page_url = page_metadata.get("final_url")
+        store = get_template_store() if templates_enabled(use_templates) and html and page_url else None
+        fallback = None
+        skipped = None
+        if store is not None and page_metadata.get("html_truncated"):
+            # HTML cortado em CAPTURE_MAX_HTML_CHARS: o template veria so parte dos registros.
+            store, skipped = None, {"state": "skipped", "reason": "html_truncated"}
+        if store is not None:
+            template_result, fallback = await extract_with_template(
+                store, html, page_url, schema, extraction_goal, page_metadata.get("next_page")
+            )
+            if template_result is not None:
+                logger.info(f"Template do dominio atendeu {page_url} sem LLM")
+                return template_result
+
+        if cascade_enabled(use_cascade):
+            ai_result = await extract_with_cascade(extract, schema, has_screenshot=bool(screenshot_b64))
+        else:
+            ai_result = await extract()
+        if store is not None:
+            learned = await learn_from_extraction(store, html, page_url, schema, extraction_goal, ai_result)
+            ai_result["metadata"]["template"] = {**learned, "fallback": fallback} if fallback else learned
+        elif skipped is not None:
+            ai_result["metadata"]["template"] = skipped
+        return ai_result
+
+    async def _capture(
+        self,
+        url: str,
+        capture_mode: str | None = None,
+        use_capture_cache: bool = True,
+        **browser_options: Any,
+    ) -> tuple[str, str, str, str, list[str], dict[str, Any]]:
+        """Captura a pagina pelo caminho mais barato que atenda o request."""
+        cache = get_capture_cache() if use_capture_cache and settings.CAPTURE_CACHE_ENABLED else None
+        # Captura HTTP (sem screenshot/arvore AX) nao pode atender quem pediu o browser.
+        cache_options = {**browser_options, "capture_mode": capture_mode or settings.CAPTURE_MODE}
+        if cache is not None:
+            cached = await cache.get(url, cache_options, revalidator=get_static_fetcher().revalidate)
+            if cached is not None:
+                logger.info(f"Captura servida do cache ({cached[5]['capture_cache']['state']}): {url}")
+                return cached
+
+        captured = await self._capture_fresh(url, capture_mode, **browser_options)
+        captured[5]["capture_cache"] = {"state": "miss" if cache is not None else "bypass", "reused": False}
+        if cache is not None:
+            await cache.put(url, cache_options, captured)
+        return captured
+
+    async def _capture_fresh(
+        self,
+        url: str,
+        capture_mode: str | None = None,
+        **browser_options: Any,
+    ) -> tuple[str, str, str, str, list[str], dict[str, Any]]:
+        mode = capture_mode or settings.CAPTURE_MODE
+        static_check: dict[str, Any] | None = None
+        if mode == "static_first" and not browser_options.get("execute_js"):
+            captured, static_check = await get_static_fetcher().capture(
+                url=url,
+                timeout=browser_options.get("timeout"),
+            )
+            if captured is not None:
+                logger.info(f"Fast path HTTP atendeu {url} sem Chromium")
+                return apply_capture_profile(captured, get_capture_profile(browser_options.get("capture_profile")))
+
+        if settings.CAPTURE_WORKERS > 0:
+            captured = await get_capture_workers().capture(url, **browser_options)
+        else:
+            async with BrowserManager() as browser:
+                captured = await browser.navigate_and_capture(url=url, **browser_options)
+        page_metadata = captured[5]
+        page_metadata.setdefault("capture_path", "browser")
+        if static_check is not None:
+            page_metadata["static_check"] = static_check
+        return captured
+
+
+async def _cancel(task: asyncio.Task | None) -> None:
+    if task is not None and not task.done():
+        task.cancel()
+        await asyncio.gather(task, return_exceptions=True)
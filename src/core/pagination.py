@@ -0,0 +1,118 @@
+"""Deteccao de proxima pagina e merge dos resultados de um scrape paginado."""
+import json
+from typing import Any
+
+from loguru import logger
+from playwright.async_api import Error as PlaywrightError
+from playwright.async_api import Page
+
+NEXT_MARKER_ATTR = "data-toolzz-next"
+
+# Procura, em ordem de confianca: rel=next, links/botoes de paginacao por
+# aria-label/classe e por texto ("proxima", "next", "»"). Links retornam a URL;
+# botoes sem href sao marcados para clique.
+NEXT_PAGE_SCRIPT = """
+(marker) => {
+    const TEXT = /^(pr[oó]xim[ao]|seguinte|next|avan[cç]ar|mais resultados|›|»|>|→)(\\s*(p[aá]gina|page)?\\s*[›»>→]?)?$/i;
+    const LABEL = /(pr[oó]xim|next|seguinte)/i;
+    const visible = (el) => {
+        const rect = el.getBoundingClientRect();
+        return rect.width > 0 && rect.height > 0;
+    };
+    const disabled = (el) =>
+        el.disabled || el.getAttribute("aria-disabled") === "true" || /\\bdisabled\\b/i.test(el.className || "");
+    const result = (el, source) => {
+        const href = el.tagName === "A" || el.tagName === "LINK" ? el.href : "";
+        if (href && !href.startsWith("javascript:") && href !== location.href && href.split("#")[0] !== location.href.split("#")[0]) {
+            return { url: href, source, click: false };
+        }
+        if (el.tagName === "LINK") return null;
+        el.setAttribute(marker, "1");
+        return { url: null, source, click: true, selector: `[${marker}="1"]` };
+    };
+
+    for (const el of document.querySelectorAll(`[${marker}]`)) el.removeAttribute(marker);
+    const rel = document.querySelector('link[rel~="next"][href], a[rel~="next"][href]');
+    if (rel) {
+        const found = result(rel, "rel_next");
+        if (found) return found;
+    }
+    const candidates = document.querySelectorAll(
+        'a, button, [role="button"], [role="link"]'
+    );
+    for (const el of candidates) {
+        if (disabled(el) || !visible(el)) continue;
+        const label = el.getAttribute("aria-label") || el.getAttribute("title") || "";
+        const cls = `${el.className || ""} ${(el.parentElement && el.parentElement.className) || ""}`;
+        if (LABEL.test(label) || /(^|[\\s_-])(next|pagination-next|next-page)([\\s_-]|$)/i.test(cls)) {
+            const found = result(el, "label");
+            if (found) return found;
+        }
+    }
+    for (const el of candidates) {
+        if (disabled(el) || !visible(el)) continue;
+        const text = (el.innerText || el.textContent || "").replace(/\\s+/g, " ").trim();
+        if (text && text.length <= 30 && TEXT.test(text)) {
+            const found = result(el, "text");
+            if (found) return found;
+        }
+    }
+    return null;
+}
+"""
+
+
+async def find_next_page(page: Page) -> dict[str, Any] | None:
+    """Retorna `{url, source, click, selector}` da proxima pagina ou None."""
+    try:
+        return await page.evaluate(NEXT_PAGE_SCRIPT, NEXT_MARKER_ATTR)
+    except PlaywrightError as exc:
+        logger.debug(f"Deteccao de proxima pagina falhou: {exc}")
+        return None
+
+
+def model_says_last_page(data: dict[str, Any] | None) -> bool:
+    """True quando a resposta do modelo declara explicitamente que nao ha proxima pagina."""
+    return isinstance(data, dict) and data.get("has_next_page") is False
+
+
+def _item_key(item: Any) -> str:
+    if isinstance(item, dict):
+        for key in ("url", "link", "id"):
+            if item.get(key):
+                return f"{key}:{item[key]}"
+    return json.dumps(item, sort_keys=True, default=str)
+
+
+def merge_page_results(pages: list[dict[str, Any]]) -> dict[str, Any]:
+    """Junta os dados validados de cada pagina em um unico resultado.
+
+    Listas sao concatenadas sem repetir itens (pela url/id ou conteudo);
+    `total_count` vira o maior valor entre o informado e os itens reunidos;
+    `page`/`has_next_page` refletem a ultima pagina; os demais campos vem da
+    primeira pagina que os preencheu.
+    """
+    if not pages:
+        return {}
+    merged: dict[str, Any] = {}
+    seen: dict[str, set[str]] = {}
+    for data in pages:
+        for key, value in data.items():
+            if isinstance(value, list):
+                bucket = merged.setdefault(key, [])
+                keys = seen.setdefault(key, set())
+                for item in value:
+                    item_key = _item_key(item)
+                    if item_key not in keys:
+                        keys.add(item_key)
+                        bucket.append(item)
+            elif key in ("page", "has_next_page"):
+                merged[key] = value
+            elif key == "total_count" and isinstance(value, int):
+                merged[key] = max(merged.get(key) or 0, value)
+            elif merged.get(key) in (None, ""):
+                merged[key] = value
+    if "total_count" in merged:
+        longest = max((len(value) for value in merged.values() if isinstance(value, list)), default=0)
+        merged["total_count"] = max(merged["total_count"] or 0, longest)
+    return merged
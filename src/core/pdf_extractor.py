@@ -0,0 +1,181 @@
+"""Extracao de texto de PDF fora do event loop, paralela e com limites de memoria."""
+import asyncio
+import io
+import multiprocessing
+import os
+import re
+import tempfile
+import time
+import unicodedata
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any
+
+import aiohttp
+from loguru import logger
+
+from src.config.settings import settings
+from src.core.errors import NonRecoverableScraperError
+
+PAGE_SEPARATOR = "\f"
+
+_executor: ProcessPoolExecutor | None = None
+
+
+def _extract_range(source: str | bytes, start: int, end: int) -> list[str]:
+    """Extrai o texto das paginas [start, end). Executa em thread ou processo filho."""
+    from pypdf import PdfReader
+
+    reader = PdfReader(io.BytesIO(source) if isinstance(source, bytes) else source)
+    return [(reader.pages[index].extract_text() or "") for index in range(start, end)]
+
+
+def _count_pages(source: str | bytes) -> int:
+    from pypdf import PdfReader
+
+    reader = PdfReader(io.BytesIO(source) if isinstance(source, bytes) else source)
+    return len(reader.pages)
+
+
+def _get_executor() -> ProcessPoolExecutor:
+    global _executor
+    if _executor is None:
+        _executor = ProcessPoolExecutor(
+            max_workers=max(1, settings.PDF_WORKERS),
+            mp_context=multiprocessing.get_context("spawn"),
+        )
+    return _executor
+
+
+def shutdown_pdf_executor() -> None:
+    """Encerra o pool de processos de PDF, se iniciado."""
+    global _executor
+    if _executor is not None:
+        _executor.shutdown(wait=False, cancel_futures=True)
+        _executor = None
+
+
+async def extract_pdf_pages(data: bytes | None = None, path: str | None = None) -> dict[str, Any]:
+    """Extrai texto por pagina de um PDF em memoria (`data`) ou em disco (`path`).
+
+    Documentos pequenos rodam em uma thread; a partir de PDF_PARALLEL_MIN_PAGES
+    paginas o trabalho e dividido em faixas entre processos. O numero de paginas
+    lidas e limitado por PDF_MAX_PAGES.
+    """
+    if data is None and path is None:
+        raise ValueError("Informe data ou path")
+    started = time.perf_counter()
+    spooled_path: str | None = None
+    source: str | bytes = path if path is not None else data  # type: ignore[assignment]
+    try:
+        page_count = await asyncio.to_thread(_count_pages, source)
+        pages_to_read = min(page_count, settings.PDF_MAX_PAGES)
+        workers = 1
+        if pages_to_read >= settings.PDF_PARALLEL_MIN_PAGES and settings.PDF_WORKERS > 1:
+            if isinstance(source, bytes):
+                # Processos recebem o caminho, nao uma copia dos bytes.
+                spooled_path = await asyncio.to_thread(_spool_bytes, source)
+                source = spooled_path
+            workers = min(settings.PDF_WORKERS, pages_to_read)
+            step = -(-pages_to_read // workers)
+            loop = asyncio.get_running_loop()
+            executor = _get_executor()
+            chunks = await asyncio.gather(
+                *(
+                    loop.run_in_executor(executor, _extract_range, source, start, min(start + step, pages_to_read))
+                    for start in range(0, pages_to_read, step)
+                )
+            )
+            pages = [text for chunk in chunks for text in chunk]
+        else:
+            pages = await asyncio.to_thread(_extract_range, source, 0, pages_to_read)
+    finally:
+        if spooled_path:
+            os.unlink(spooled_path)
+
+    return {
+        "pages": pages,
+        "page_count": page_count,
+        "pages_extracted": len(pages),
+        "truncated": page_count > len(pages),
+        "workers": workers,
+        "duration_ms": round((time.perf_counter() - started) * 1000, 1),
+    }
+
+
+async def download_pdf_to_tempfile(url: str, headers: dict[str, str] | None = None) -> str:
+    """Baixa o PDF em streaming direto para um arquivo temporario (limite PDF_MAX_BYTES)."""
+    fd, path = tempfile.mkstemp(prefix="toolzz-pdf-", suffix=".pdf")
+    written = 0
+    try:
+        timeout = aiohttp.ClientTimeout(total=settings.BROWSER_TIMEOUT / 1000 * 2)
+        with os.fdopen(fd, "wb") as fh:
+            async with aiohttp.ClientSession(headers=headers, timeout=timeout) as session:
+                async with session.get(url) as response:
+                    response.raise_for_status()
+                    async for chunk in response.content.iter_chunked(256 * 1024):
+                        written += len(chunk)
+                        if written > settings.PDF_MAX_BYTES:
+                            raise NonRecoverableScraperError(
+                                f"PDF excede o limite de {settings.PDF_MAX_BYTES} bytes"
+                            )
+                        fh.write(chunk)
+    except BaseException:
+        os.unlink(path)
+        raise
+    logger.info(f"PDF de {written} bytes salvo em disco para extracao")
+    return path
+
+
+def select_relevant_pages(pages: list[str], goal: str | None, max_chars: int) -> str:
+    """Monta o contexto com as paginas mais relevantes para o objetivo.
+
+    Paginas sao pontuadas pela ocorrencia dos termos do objetivo; a primeira
+    pagina entra sempre. O resultado preserva a ordem do documento e marca cada
+    pagina com `[Pagina N]`.
+    """
+    terms = _terms(goal or "")
+    scored: list[tuple[float, int]] = []
+    for index, text in enumerate(pages):
+        if not text.strip():
+            continue
+        normalized = _normalize(text)
+        score = sum(normalized.count(term) for term in terms) if terms else 0
+        if index == 0:
+            score += 1_000_000
+        scored.append((score, index))
+    if terms:
+        scored.sort(key=lambda item: (-item[0], item[1]))
+    else:
+        scored.sort(key=lambda item: item[1])
+
+    chosen: list[int] = []
+    used = 0
+    for _, index in scored:
+        cost = len(pages[index]) + 16
+        if used + cost > max_chars:
+            if not chosen:
+                chosen.append(index)
+            continue
+        chosen.append(index)
+        used += cost
+
+    parts = []
+    for index in sorted(chosen):
+        parts.append(f"[Pagina {index + 1}]\n{pages[index].strip()}")
+    return "\n\n".join(parts)[:max_chars]
+
+
+def _spool_bytes(data: bytes) -> str:
+    fd, path = tempfile.mkstemp(prefix="toolzz-pdf-", suffix=".pdf")
+    with os.fdopen(fd, "wb") as fh:
+        fh.write(data)
+    return path
+
+
+def _normalize(text: str) -> str:
+    decomposed = unicodedata.normalize("NFKD", text.lower())
+    return "".join(ch for ch in decomposed if not unicodedata.combining(ch))
+
+
+def _terms(goal: str) -> set[str]:
+    return {term for term in re.findall(r"\w+", _normalize(goal)) if len(term) >= 4}
@@ -0,0 +1,178 @@
+"""Scroll orientado a eventos da pagina, com orcamento de tempo."""
+import asyncio
+from typing import Any
+
+from loguru import logger
+from playwright.async_api import Page
+
+from src.config.settings import settings
+
+# Executa o loop de scroll inteiro dentro da pagina. Cada passo rola ate o fim e
+# espera apenas enquanto ha sinal de carregamento: conteudo novo abaixo da
+# viewport ou fetch/XHR pendentes. O scroll termina assim que um passo nao traz
+# conteudo novo (altura, nos que passam do fim da viewport ou o ultimo item
+# empurrado para cima) ou quando o orcamento total acaba. Mutacoes dentro da
+# area visivel (anuncios, carrosseis, relogios) nao contam como crescimento.
+# Os patches de fetch/XHR e os observers sao desfeitos em `window.__smartScrollCleanup`,
+# chamado no `finally` e, se o evaluate estourar o prazo, pelo lado Python.
+SMART_SCROLL_SCRIPT = """
+async (opts) => {
+    const now = () => performance.now();
+    const started = now();
+    const deadline = started + opts.budgetMs;
+    const sleep = (ms) => new Promise((resolve) => setTimeout(resolve, ms));
+    const scroller = document.scrollingElement || document.documentElement;
+    let cancelled = false;
+
+    let addedNodes = 0;
+    let lastMutationAt = 0;
+    const growsPage = (node) =>
+        node.nodeType === 1 && node.getBoundingClientRect().bottom > window.innerHeight;
+    const mutationObserver = new MutationObserver((records) => {
+        let grown = 0;
+        for (const record of records) {
+            for (const node of record.addedNodes) if (growsPage(node)) grown += 1;
+        }
+        if (grown) {
+            addedNodes += grown;
+            lastMutationAt = now();
+        }
+    });
+    mutationObserver.observe(document.body || document.documentElement, { childList: true, subtree: true });
+
+    let pending = 0;
+    const originalFetch = window.fetch;
+    const originalSend = XMLHttpRequest.prototype.send;
+    if (originalFetch) {
+        window.fetch = function (...args) {
+            pending += 1;
+            return originalFetch.apply(this, args).finally(() => { pending -= 1; });
+        };
+    }
+    XMLHttpRequest.prototype.send = function (...args) {
+        pending += 1;
+        this.addEventListener("loadend", () => { pending -= 1; }, { once: true });
+        return originalSend.apply(this, args);
+    };
+
+    let anchorSeen = false;
+    let anchorLeft = false;
+    const intersectionObserver = new IntersectionObserver((entries) => {
+        for (const entry of entries) {
+            if (entry.isIntersecting) anchorSeen = true;
+            // So conta o ultimo item empurrado para cima (lista virtualizada), nao um slide que saiu de lado.
+            else if (anchorSeen && entry.boundingClientRect.bottom <= 0) anchorLeft = true;
+        }
+    });
+
+    const cleanup = () => {
+        cancelled = true;
+        mutationObserver.disconnect();
+        intersectionObserver.disconnect();
+        if (originalFetch && window.fetch !== originalFetch) window.fetch = originalFetch;
+        XMLHttpRequest.prototype.send = originalSend;
+        if (window.__smartScrollCleanup === cleanup) delete window.__smartScrollCleanup;
+    };
+    window.__smartScrollCleanup = cleanup;
+
+    let steps = 0;
+    let reason = "max_steps";
+    try {
+        while (steps < opts.maxSteps) {
+            if (cancelled) {
+                reason = "cancelled";
+                break;
+            }
+            if (now() >= deadline) {
+                reason = "budget";
+                break;
+            }
+            const heightBefore = scroller.scrollHeight;
+            const addedBefore = addedNodes;
+            window.scrollTo(0, scroller.scrollHeight);
+            steps += 1;
+            const scrolledAt = now();
+
+            intersectionObserver.disconnect();
+            anchorSeen = false;
+            anchorLeft = false;
+            const anchor = document.elementFromPoint(window.innerWidth / 2, window.innerHeight - 4);
+            if (anchor) intersectionObserver.observe(anchor);
+
+            const stepDeadline = Math.min(deadline, scrolledAt + opts.stepTimeoutMs);
+            while (now() < stepDeadline && !cancelled) {
+                await sleep(opts.pollMs);
+                const quietSince = Math.max(lastMutationAt, scrolledAt);
+                if (pending <= 0 && now() - quietSince >= opts.quietMs) break;
+            }
+
+            const grew = scroller.scrollHeight > heightBefore || addedNodes > addedBefore || anchorLeft;
+            if (!grew) {
+                reason = "no_new_content";
+                break;
+            }
+        }
+    } finally {
+        cleanup();
+        window.scrollTo(0, 0);
+    }
+
+    return {
+        steps,
+        reason,
+        elapsedMs: Math.round(now() - started),
+        finalHeight: scroller.scrollHeight,
+        addedNodes,
+        pendingRequests: Math.max(pending, 0),
+    };
+}
+"""
+CLEANUP_SCRIPT = "() => { if (window.__smartScrollCleanup) window.__smartScrollCleanup(); }"
+# Margem para o round trip do evaluate; o script ja respeita o orcamento internamente.
+EVALUATE_MARGIN_SECONDS = 2.0
+
+
+async def event_driven_scroll(
+    page: Page,
+    max_steps: int,
+    budget_ms: int | None = None,
+    quiet_ms: int | None = None,
+    step_timeout_ms: int | None = None,
+) -> dict[str, Any]:
+    """Rola a pagina ate o conteudo parar de chegar ou o orcamento acabar."""
+    budget_ms = budget_ms or settings.SCROLL_BUDGET_MS
+    options = {
+        "maxSteps": max_steps,
+        "budgetMs": budget_ms,
+        "quietMs": quiet_ms or settings.SCROLL_QUIET_MS,
+        "stepTimeoutMs": step_timeout_ms or settings.SCROLL_STEP_TIMEOUT_MS,
+        "pollMs": 50,
+    }
+    try:
+        result = await asyncio.wait_for(
+            page.evaluate(SMART_SCROLL_SCRIPT, options),
+            timeout=budget_ms / 1000 + EVALUATE_MARGIN_SECONDS,
+        )
+    except asyncio.TimeoutError:
+        logger.warning("Smart Scroll excedeu o orcamento de tempo")
+        # A pagina segue para a captura: desfaz patches de fetch/XHR e observers.
+        try:
+            await asyncio.wait_for(page.evaluate(CLEANUP_SCRIPT), timeout=2)
+        except Exception as exc:
+            logger.warning(f"Falha ao limpar o Smart Scroll: {exc}")
+        return {"mode": "events", "steps_used": 0, "elapsed_ms": budget_ms, "stop_reason": "timeout"}
+
+    logger.info(
+        f"Smart Scroll finalizado no passo {result['steps']} "
+        f"({result['reason']}, {result['elapsedMs']} ms)."
+    )
+    return {
+        "mode": "events",
+        "steps_used": int(result["steps"]),
+        "elapsed_ms": int(result["elapsedMs"]),
+        "stop_reason": result["reason"],
+        "budget_ms": budget_ms,
+        "final_height": result["finalHeight"],
+        "added_nodes": result["addedNodes"],
+        "pending_requests": result["pendingRequests"],
+    }
@@ -0,0 +1,205 @@
+"""Cache em memoria de storage state por dominio com persistencia write-behind."""
+import asyncio
+import json
+import os
+import tempfile
+import time
+from collections import OrderedDict
+from pathlib import Path
+from typing import Any
+from urllib.parse import urlsplit
+
+from loguru import logger
+
+from src.config.settings import settings
+
+PROJECT_ROOT = Path(__file__).resolve().parents[2]
+
+# Marca dominios sem sessao em disco para nao repetir a leitura.
+_MISSING: dict[str, Any] = {}
+
+
+class SessionStore:
+    """Mantem o storage state (cookies/localStorage) de cada dominio em memoria.
+
+    Leituras de disco acontecem apenas no primeiro acesso a um dominio. Escritas
+    sao agrupadas e gravadas em background a cada `flush_interval` segundos
+    (ou no `close`), sempre via arquivo temporario + rename atomico.
+    """
+
+    def __init__(
+        self,
+        directory: str | None = None,
+        max_domains: int | None = None,
+        flush_interval: float | None = None,
+    ) -> None:
+        session_dir = Path(directory or settings.SESSION_DIR)
+        if not session_dir.is_absolute():
+            session_dir = PROJECT_ROOT / session_dir
+        self.directory = session_dir
+        self.max_domains = max(1, max_domains or settings.SESSION_CACHE_MAX_DOMAINS)
+        self.flush_interval = flush_interval or settings.SESSION_FLUSH_INTERVAL
+        self._entries: OrderedDict[str, dict[str, Any]] = OrderedDict()
+        self._dirty: set[str] = set()
+        self._evicted_dirty: dict[str, dict[str, Any]] = {}
+        self._flush_task: asyncio.Task[None] | None = None
+        self._hits = 0
+        self._disk_reads = 0
+        self._disk_writes = 0
+
+    async def get(self, domain: str) -> dict[str, Any] | None:
+        """Retorna o storage state do dominio (None se nao houver sessao)."""
+        if domain in self._entries:
+            self._entries.move_to_end(domain)
+            self._hits += 1
+            state = self._entries[domain]
+            return None if state is _MISSING else state
+        if domain in self._evicted_dirty:
+            state = self._evicted_dirty.pop(domain)
+            self._remember(domain, state)
+            self._dirty.add(domain)
+            return state
+
+        self._disk_reads += 1
+        state = await asyncio.to_thread(self._read, domain)
+        self._remember(domain, state if state is not None else _MISSING)
+        return state
+
+    async def cookie_header(self, url: str) -> str | None:
+        """Header Cookie da sessao do dominio valido para a URL (None sem cookies)."""
+        parts = urlsplit(url)
+        host = (parts.hostname or "").lower()
+        state = await self.get(parts.netloc.replace("www.", ""))
+        now = time.time()
+        pairs = []
+        for cookie in (state or {}).get("cookies", []):
+            cookie_domain = cookie.get("domain", "").lstrip(".").lower()
+            if host != cookie_domain and not host.endswith(f".{cookie_domain}"):
+                continue
+            if not (parts.path or "/").startswith(cookie.get("path") or "/"):
+                continue
+            if cookie.get("secure") and parts.scheme != "https":
+                continue
+            if 0 < cookie.get("expires", -1) < now:
+                continue
+            pairs.append(f"{cookie['name']}={cookie['value']}")
+        return "; ".join(pairs) or None
+
+    def put(self, domain: str, state: dict[str, Any]) -> None:
+        """Atualiza o estado em memoria; a gravacao em disco fica para o flush."""
+        self._remember(domain, state)
+        self._dirty.add(domain)
+        self._ensure_flusher()
+
+    async def flush(self) -> None:
+        """Grava em disco todos os dominios alterados desde o ultimo flush.
+
+        Os dominios so deixam de ser pendentes depois da gravacao; com `OSError`
+        continuam marcados e entram no proximo flush. Um `put` feito durante a
+        gravacao tambem continua pendente.
+        """
+        pending = dict(self._evicted_dirty)
+        for domain in self._dirty:
+            state = self._entries.get(domain)
+            if state is not None and state is not _MISSING:
+                pending[domain] = state
+        if not pending:
+            return
+        await asyncio.to_thread(self._write_many, pending)
+        for domain, state in pending.items():
+            if self._evicted_dirty.get(domain) is state:
+                del self._evicted_dirty[domain]
+            if self._entries.get(domain) is state:
+                self._dirty.discard(domain)
+        self._disk_writes += len(pending)
+        logger.debug(f"Sessoes gravadas em disco: {len(pending)}")
+
+    async def close(self) -> None:
+        """Interrompe o flush periodico e grava o que estiver pendente."""
+        if self._flush_task:
+            self._flush_task.cancel()
+            try:
+                await self._flush_task
+            except asyncio.CancelledError:
+                pass
+            self._flush_task = None
+        try:
+            await self.flush()
+        except OSError as exc:
+            logger.warning(f"Falha ao gravar sessoes no encerramento ({self.stats()['dirty']} pendentes): {exc}")
+
+    def stats(self) -> dict[str, Any]:
+        return {
+            "domains_cached": len(self._entries),
+            "dirty": len(self._dirty) + len(self._evicted_dirty),
+            "hits": self._hits,
+            "disk_reads": self._disk_reads,
+            "disk_writes": self._disk_writes,
+        }
+
+    def _remember(self, domain: str, state: dict[str, Any]) -> None:
+        self._entries[domain] = state
+        self._entries.move_to_end(domain)
+        while len(self._entries) > self.max_domains:
+            evicted, evicted_state = self._entries.popitem(last=False)
+            if evicted in self._dirty:
+                self._dirty.discard(evicted)
+                self._evicted_dirty[evicted] = evicted_state
+
+    def _ensure_flusher(self) -> None:
+        if self._flush_task is None or self._flush_task.done():
+            self._flush_task = asyncio.get_running_loop().create_task(self._flush_loop())
+
+    async def _flush_loop(self) -> None:
+        while True:
+            await asyncio.sleep(self.flush_interval)
+            try:
+                await self.flush()
+            except OSError as exc:
+                logger.warning(f"Falha ao gravar sessoes: {exc}")
+
+    def _path_for(self, domain: str) -> Path:
+        return self.directory / f"{domain.replace(':', '_')}.json"
+
+    def _read(self, domain: str) -> dict[str, Any] | None:
+        path = self._path_for(domain)
+        if not path.exists():
+            return None
+        try:
+            logger.info(f"Carregando sessao existente para {domain}")
+            return json.loads(path.read_text(encoding="utf-8"))
+        except (OSError, json.JSONDecodeError) as exc:
+            logger.warning(f"Sessao invalida para {domain}: {exc}")
+            return None
+
+    def _write_many(self, states: dict[str, dict[str, Any]]) -> None:
+        self.directory.mkdir(parents=True, exist_ok=True)
+        for domain, state in states.items():
+            path = self._path_for(domain)
+            fd, tmp_path = tempfile.mkstemp(dir=self.directory, prefix=".session-", suffix=".tmp")
+            try:
+                with os.fdopen(fd, "w", encoding="utf-8") as fh:
+                    json.dump(state, fh, ensure_ascii=False)
+                os.replace(tmp_path, path)
+            except OSError:
+                Path(tmp_path).unlink(missing_ok=True)
+                raise
+
+
+_store: SessionStore | None = None
+
+
+def get_session_store() -> SessionStore:
+    """Retorna o session store do processo (criado sob demanda)."""
+    global _store
+    if _store is None:
+        _store = SessionStore()
+    return _store
+
+
+async def shutdown_session_store() -> None:
+    """Grava sessoes pendentes e descarta o store do processo."""
+    global _store
+    if _store is not None:
+        await _store.close()
+        _store = None
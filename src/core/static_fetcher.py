@@ -0,0 +1,239 @@
+"""Fast path HTTP: busca estatica com pool keep-alive e decisao de renderizacao."""
+import asyncio
+import re
+import time
+from typing import Any
+
+import aiohttp
+from loguru import logger
+
+from src.config.settings import settings
+from src.core.block_detection import BlockEvidence, get_block_detector
+from src.core.session_store import get_session_store
+from src.utils.helpers import clean_html
+from src.utils.html_content import extract_html_content
+
+DEFAULT_HEADERS = {
+    "User-Agent": (
+        "Mozilla/5.0 (Windows NT 10.0; Win64; x64) "
+        "AppleWebKit/537.36 (KHTML, like Gecko) "
+        "Chrome/133.0.0.0 Safari/537.36"
+    ),
+    "Accept": "text/html,application/xhtml+xml,application/xml;q=0.9,*/*;q=0.8",
+    "Accept-Language": "pt-BR,pt;q=0.9,en-US;q=0.8,en;q=0.7",
+    "Upgrade-Insecure-Requests": "1",
+}
+
+_FRAMEWORK_BOOTSTRAPS = re.compile(
+    r"__NEXT_DATA__|window\.__NUXT__|__INITIAL_STATE__|__APOLLO_STATE__|__PRELOADED_STATE__"
+    r"|ng-version=|data-reactroot|data-server-rendered|webpackJsonp|__remixContext",
+    re.IGNORECASE,
+)
+_NOSCRIPT_JS_WARNING = re.compile(
+    r"enable javascript|javascript (is )?(required|disabled)|habilite o javascript"
+    r"|ative o javascript|javascript (esta|está) desativado|you need to enable javascript",
+    re.IGNORECASE,
+)
+
+
+def assess_static_html(html: str, content: dict[str, Any], status: int) -> dict[str, Any]:
+    """Decide se o HTML estatico ja basta ou se a pagina precisa de Chromium."""
+    text_chars = len(content["text"])
+    html_chars = max(len(html), 1)
+    density = round(text_chars / html_chars, 4)
+    bootstrap = bool(_FRAMEWORK_BOOTSTRAPS.search(html[:200_000]))
+    signals = {
+        "status": status,
+        "text_chars": text_chars,
+        "html_chars": len(html),
+        "text_density": density,
+        "spa_roots": content["spa_roots"][:5],
+        "framework_bootstrap": bootstrap,
+        "script_count": content["script_count"],
+    }
+
+    min_text = settings.STATIC_MIN_TEXT_CHARS
+    reason: str | None = None
+    if status >= 400:
+        reason = f"status_{status}"
+    elif _NOSCRIPT_JS_WARNING.search(content["noscript_text"]):
+        reason = "noscript_requires_js"
+    elif text_chars < min_text:
+        reason = "low_text"
+    elif content["spa_roots"] and text_chars < min_text * 3:
+        reason = "spa_root_with_little_text"
+    elif bootstrap and density < settings.STATIC_MIN_TEXT_DENSITY * 2:
+        reason = "framework_bootstrap_low_density"
+    elif density < settings.STATIC_MIN_TEXT_DENSITY:
+        reason = "low_text_density"
+
+    return {"sufficient": reason is None, "reason": reason or "ok", "signals": signals}
+
+
+async def _read_limited(response: aiohttp.ClientResponse, max_bytes: int) -> bytes:
+    chunks: list[bytes] = []
+    total = 0
+    async for chunk in response.content.iter_chunked(64 * 1024):
+        chunks.append(chunk)
+        total += len(chunk)
+        if total >= max_bytes:
+            break
+    return b"".join(chunks)[:max_bytes]
+
+
+async def _session_headers(url: str) -> dict[str, str]:
+    """Cookie da sessao salva do dominio (a mesma que o Chromium usaria), se houver."""
+    cookie = await get_session_store().cookie_header(url)
+    return {"Cookie": cookie} if cookie else {}
+
+
+class StaticFetcher:
+    """Busca HTML via aiohttp reaproveitando conexoes keep-alive."""
+
+    def __init__(self) -> None:
+        self._session: aiohttp.ClientSession | None = None
+        self._lock = asyncio.Lock()
+        self._served = 0
+        self._escalated = 0
+
+    async def capture(
+        self,
+        url: str,
+        timeout: int | None = None,
+    ) -> tuple[tuple[str, str, str, str, list[str], dict[str, Any]] | None, dict[str, Any]]:
+        """Tenta capturar sem browser, com os cookies da sessao salva do dominio.
+
+        Retorna (captura, avaliacao). A captura e None quando a pagina precisa
+        de renderizacao; a avaliacao explica o motivo.
+        """
+        started = time.perf_counter()
+        timeout_s = (timeout or settings.BROWSER_TIMEOUT) / 1000
+        try:
+            session = await self._get_session()
+            async with session.get(
+                url,
+                headers=await _session_headers(url),
+                timeout=aiohttp.ClientTimeout(total=min(timeout_s, settings.STATIC_FETCH_TIMEOUT)),
+                allow_redirects=True,
+            ) as response:
+                content_type = response.headers.get("content-type", "").lower()
+                if "html" not in content_type:
+                    self._escalated += 1
+                    return None, {"sufficient": False, "reason": "not_html", "signals": {"content_type": content_type}}
+                raw = await _read_limited(response, settings.STATIC_MAX_BYTES)
+                html = raw.decode(response.get_encoding() or "utf-8", errors="replace")
+                status = response.status
+                final_url = str(response.url)
+                headers = dict(response.headers)
+                validators = {
+                    "etag": response.headers.get("etag"),
+                    "last_modified": response.headers.get("last-modified"),
+                }
+        except (aiohttp.ClientError, asyncio.TimeoutError, UnicodeDecodeError, LookupError) as exc:
+            logger.info(f"Fast path HTTP falhou para {url}: {exc}")
+            self._escalated += 1
+            return None, {"sufficient": False, "reason": "fetch_error", "signals": {"error": str(exc)[:200]}}
+
+        content = extract_html_content(html, base_url=final_url)
+        block_reason = get_block_detector().detect(
+            BlockEvidence(
+                status=status,
+                headers=headers,
+                final_url=final_url,
+                title=content["title"],
+                html=html,
+                text=content["text"],
+            )
+        )
+        if block_reason:
+            # O Chromium pode passar por challenges JS que o cliente HTTP nao resolve.
+            self._escalated += 1
+            logger.info(f"Fast path HTTP bloqueado ({block_reason}); escalando para Chromium")
+            return None, {"sufficient": False, "reason": "blocked", "signals": {"block_reason": block_reason}}
+        assessment = assess_static_html(html, content, status)
+        assessment["signals"]["fetch_ms"] = round((time.perf_counter() - started) * 1000, 1)
+        if not assessment["sufficient"]:
+            self._escalated += 1
+            logger.info(f"HTML estatico insuficiente ({assessment['reason']}); escalando para Chromium")
+            return None, assessment
+
+        self._served += 1
+        metadata = {
+            "requested_url": url,
+            "final_url": final_url,
+            "status": status,
+            "title": content["title"],
+            "auto_scroll": False,
+            "scroll_steps": 0,
+            "wait_until_used": "http",
+            "screenshot_mode": "none",
+            "capture_path": "http",
+            "static_check": assessment,
+            **validators,
+        }
+        cleaned = clean_html(html, max_chars=len(html))
+        html_subset = cleaned[: settings.CAPTURE_MAX_HTML_CHARS]
+        metadata["html_truncated"] = len(cleaned) > len(html_subset)
+        text = content["text"][: settings.CAPTURE_MAX_TEXT_CHARS]
+        return ("", html_subset, text, "", content["image_urls"], metadata), assessment
+
+    async def revalidate(self, url: str, etag: str | None, last_modified: str | None) -> int | None:
+        """GET condicional com If-None-Match/If-Modified-Since; retorna o status ou None.
+
+        Envia os cookies da sessao salva do dominio, como a captura no Chromium faria.
+        """
+        headers = await _session_headers(url)
+        if etag:
+            headers["If-None-Match"] = etag
+        if last_modified:
+            headers["If-Modified-Since"] = last_modified
+        try:
+            session = await self._get_session()
+            async with session.get(
+                url,
+                headers=headers,
+                timeout=aiohttp.ClientTimeout(total=settings.STATIC_FETCH_TIMEOUT),
+                allow_redirects=True,
+            ) as response:
+                return response.status
+        except (aiohttp.ClientError, asyncio.TimeoutError) as exc:
+            logger.info(f"Revalidacao condicional falhou para {url}: {exc}")
+            return None
+
+    def stats(self) -> dict[str, int]:
+        return {"served": self._served, "escalated": self._escalated}
+
+    async def close(self) -> None:
+        if self._session and not self._session.closed:
+            await self._session.close()
+        self._session = None
+
+    async def _get_session(self) -> aiohttp.ClientSession:
+        async with self._lock:
+            if self._session is None or self._session.closed:
+                connector = aiohttp.TCPConnector(
+                    limit=settings.HTTP_POOL_SIZE,
+                    limit_per_host=settings.HTTP_POOL_PER_HOST,
+                    ttl_dns_cache=300,
+                    keepalive_timeout=30,
+                )
+                self._session = aiohttp.ClientSession(connector=connector, headers=DEFAULT_HEADERS)
+            return self._session
+
+
+_fetcher: StaticFetcher | None = None
+
+
+def get_static_fetcher() -> StaticFetcher:
+    """Retorna o fetcher HTTP do processo (sessao keep-alive compartilhada)."""
+    global _fetcher
+    if _fetcher is None:
+        _fetcher = StaticFetcher()
+    return _fetcher
+
+
+async def shutdown_static_fetcher() -> None:
+    global _fetcher
+    if _fetcher is not None:
+        await _fetcher.close()
+        _fetcher = None
@@ -0,0 +1,83 @@
+"""Parser incremental de JSON: emite cada elemento das listas de registros assim que fecha."""
+import json
+from typing import Any, Iterator
+
+STREAM_FIELDS = ("items", "findings", "products")
+
+
+def iter_stream_items(data: Any, fields: tuple[str, ...] = STREAM_FIELDS) -> Iterator[tuple[str, Any]]:
+    """Itens de uma resposta ja completa, na mesma forma que o parser incremental emite."""
+    if not isinstance(data, dict):
+        return
+    for field in fields:
+        for item in data.get(field) or []:
+            if isinstance(item, dict):
+                yield field, item
+
+
+class IncrementalArrayParser:
+    """Acompanha o texto do modelo token a token sem reparsear o documento.
+
+    Guarda profundidade, strings e a ultima chave do objeto raiz. Quando um
+    objeto dentro de uma lista de `fields` (no nivel raiz) fecha, o trecho e
+    decodificado com `json.loads` e devolvido por `feed`. O texto completo fica
+    em `text` para o parse final.
+    """
+
+    def __init__(self, fields: tuple[str, ...] = STREAM_FIELDS) -> None:
+        self.fields = frozenset(fields)
+        self.text = ""
+        self._pos = 0
+        self._depth = 0
+        self._in_string = False
+        self._escape = False
+        self._string_start = -1
+        self._last_key = ""
+        self._active_field: str | None = None
+        self._item_start = -1
+
+    def feed(self, chunk: str) -> list[tuple[str, dict[str, Any]]]:
+        """Acrescenta um trecho do stream e retorna os itens completados nele."""
+        self.text += chunk
+        completed: list[tuple[str, dict[str, Any]]] = []
+        text = self.text
+        for index in range(self._pos, len(text)):
+            char = text[index]
+            if self._in_string:
+                if self._escape:
+                    self._escape = False
+                elif char == "\\":
+                    self._escape = True
+                elif char == '"':
+                    self._in_string = False
+                    if self._depth == 1:
+                        self._last_key = text[self._string_start + 1 : index]
+                continue
+            if char == '"':
+                self._in_string = True
+                self._string_start = index
+            elif char in "{[":
+                if char == "[" and self._depth == 1 and self._last_key in self.fields:
+                    self._active_field = self._last_key
+                elif char == "{" and self._depth == 2 and self._active_field:
+                    self._item_start = index
+                self._depth += 1
+            elif char in "}]":
+                self._depth -= 1
+                if char == "}" and self._depth == 2 and self._active_field and self._item_start >= 0:
+                    item = self._decode(text[self._item_start : index + 1])
+                    if item is not None:
+                        completed.append((self._active_field, item))
+                    self._item_start = -1
+                elif char == "]" and self._depth == 1:
+                    self._active_field = None
+        self._pos = len(text)
+        return completed
+
+    @staticmethod
+    def _decode(raw: str) -> dict[str, Any] | None:
+        try:
+            value = json.loads(raw)
+        except json.JSONDecodeError:
+            return None
+        return value if isinstance(value, dict) else None
@@ -1,5 +1,5 @@
 """Validacao de dados extraidos."""
-from typing import Any
+from typing import Any, get_args
 
 from pydantic import BaseModel, ValidationError
 
@@ -30,6 +30,36 @@ def _collect_url_flags(obj: Any, path: str = "") -> list[str]:
     return flags
 
 
+def _coerce_item(item: dict[str, Any], item_model: type[BaseModel] | None = None) -> dict[str, Any]:
+    """Normaliza um registro (titulo/descricao, URL, extra); com `item_model`, so os campos dele."""
+    item_copy = dict(item)
+
+    def has(key: str) -> bool:
+        return key in item_copy and (item_model is None or key in item_model.model_fields)
+
+    for key in ("title", "description"):
+        if has(key) and item_copy[key] is not None and not isinstance(item_copy[key], str):
+            item_copy[key] = str(item_copy[key])
+
+    # Coercao de URL: se for string vazia ou invalida, setar None para passar na validacao HttpUrl
+    if has("url") and isinstance(item_copy["url"], str):
+        val = item_copy["url"].strip()
+        if not val or val.lower() in ("n/a", "none"):
+            item_copy["url"] = None
+        elif not val.startswith(("http://", "https://")):
+            # Se nao comeca com http, tenta consertar ou anula
+            if val.startswith("www."):
+                item_copy["url"] = f"https://{val}"
+            else:
+                # URL relativa ou lixo -> anula para nao falhar validacao
+                item_copy["url"] = None
+
+    extra = item_copy.get("extra") if has("extra") else None
+    if isinstance(extra, dict):
+        item_copy["extra"] = {str(k): (v if isinstance(v, (str, int, float, bool)) or v is None else str(v)) for k, v in extra.items()}
+    return item_copy
+
+
 def _coerce_guided_string_fields(data: dict[str, Any]) -> dict[str, Any]:
     """Normaliza campos comuns do modo guiado para reduzir falhas de schema."""
     out = dict(data)
@@ -39,35 +69,7 @@ def _coerce_guided_string_fields(data: dict[str, Any]) -> dict[str, Any]:
 
     findings = out.get("findings")
     if isinstance(findings, list):
-        normalized: list[Any] = []
-        for item in findings:
-            if isinstance(item, dict):
-                item_copy = dict(item)
-                if "title" in item_copy and item_copy["title"] is not None and not isinstance(item_copy["title"], str):
-                    item_copy["title"] = str(item_copy["title"])
-                if "description" in item_copy and item_copy["description"] is not None and not isinstance(item_copy["description"], str):
-                    item_copy["description"] = str(item_copy["description"])
-                
-                # Coercao de URL: se for string vazia ou invalida, setar None para passar na validacao HttpUrl
-                if "url" in item_copy and isinstance(item_copy["url"], str):
-                    val = item_copy["url"].strip()
-                    if not val or val.lower() in ("n/a", "none"):
-                        item_copy["url"] = None
-                    elif not val.startswith(("http://", "https://")):
-                        # Se nao comeca com http, tenta consertar ou anula
-                        if val.startswith("www."):
-                            item_copy["url"] = f"https://{val}"
-                        else:
-                            # URL relativa ou lixo -> anula para nao falhar validacao
-                            item_copy["url"] = None
-
-                extra = item_copy.get("extra")
-                if isinstance(extra, dict):
-                    item_copy["extra"] = {str(k): (v if isinstance(v, (str, int, float, bool)) or v is None else str(v)) for k, v in extra.items()}
-                normalized.append(item_copy)
-            else:
-                normalized.append(item)
-        out["findings"] = normalized
+        out["findings"] = [_coerce_item(item) if isinstance(item, dict) else item for item in findings]
     return out
 
 
@@ -96,6 +98,29 @@ class DataValidator:
                 errors = [err["msg"] for err in exc.errors()]
                 return None, errors, {"quality_score": 0.0, "quality_flags": ["schema_validation_error"]}
 
+    @staticmethod
+    def validate_item(
+        item: dict[str, Any],
+        schema: type[BaseModel],
+        field: str,
+    ) -> dict[str, Any] | None:
+        """Valida um registro isolado de `schema.<field>` (ex.: item recebido em streaming)."""
+        annotation = schema.model_fields[field].annotation if field in schema.model_fields else None
+        item_model = next(
+            (arg for arg in get_args(annotation) if isinstance(arg, type) and issubclass(arg, BaseModel)),
+            None,
+        )
+        if item_model is None:
+            return None
+        try:
+            return item_model(**item).model_dump()
+        except ValidationError:
+            coerced = _coerce_item(item, item_model)
+            try:
+                return item_model(**coerced).model_dump()
+            except ValidationError:
+                return None
+
     @staticmethod
     def assess_quality(data: dict[str, Any], schema: type[BaseModel]) -> dict[str, Any]:
         """Calcula score simples de qualidade para dados validados."""
@@ -109,7 +134,8 @@ class DataValidator:
                 flags.append(f"missing_required:{field_name}")
             else:
                 present_required += 1
-        completeness_ratio = present_required / required_total
+        # Schema sem campos obrigatorios nao perde pontos por completude.
+        completeness_ratio = present_required / required_total if required else 1.0
 
         url_flags = _collect_url_flags(data)
         flags.extend(url_flags)
@@ -0,0 +1,75 @@
+"""Orcamento de tokens de visao para o screenshot enviado ao modelo."""
+import math
+from dataclasses import asdict, dataclass
+from typing import Any
+
+from src.config.settings import settings
+
+TILE_SIZE = 512
+BASE_TOKENS = 85
+TILE_TOKENS = 170
+
+
+def estimate_vision_tokens(width: int, height: int, detail: str) -> int:
+    """Estimativa de tokens de imagem segundo as regras de tiles da OpenAI."""
+    if width <= 0 or height <= 0:
+        return 0
+    if detail == "low":
+        return BASE_TOKENS
+    w, h = float(width), float(height)
+    fit = min(1.0, 2048 / max(w, h))
+    w, h = w * fit, h * fit
+    shortest = min(1.0, 768 / min(w, h))
+    w, h = w * shortest, h * shortest
+    tiles = math.ceil(w / TILE_SIZE) * math.ceil(h / TILE_SIZE)
+    return BASE_TOKENS + TILE_TOKENS * tiles
+
+
+@dataclass
+class ScreenshotPlan:
+    """Dimensoes finais, escala de captura e detail escolhidos para o screenshot."""
+
+    detail: str
+    scale: float
+    width: int
+    height: int
+    estimated_tokens: int
+
+    def as_dict(self) -> dict[str, Any]:
+        return asdict(self)
+
+
+def plan_screenshot(width: int, height: int, budget_tokens: int | None = None) -> ScreenshotPlan:
+    """Escolhe escala e detail para caber no orcamento de tokens de visao.
+
+    A imagem ja sai do browser no tamanho que o modelo usaria (lado menor <= 768,
+    lado maior <= 2048), reduzindo bytes e tokens. Quando o orcamento nao comporta
+    nem um tile em `high`, usa `low` com a imagem reduzida a 512px.
+    """
+    budget = budget_tokens or settings.VISION_TOKEN_BUDGET
+    width, height = max(int(width), 1), max(int(height), 1)
+
+    if budget < BASE_TOKENS + TILE_TOKENS or max(width, height) <= TILE_SIZE:
+        scale = min(1.0, TILE_SIZE / max(width, height))
+        w, h = max(1, int(width * scale)), max(1, int(height * scale))
+        return ScreenshotPlan("low", round(scale, 4), w, h, BASE_TOKENS)
+
+    scale = min(1.0, 2048 / max(width, height), 768 / min(width, height))
+    while scale > 0.05:
+        w, h = max(1, int(width * scale)), max(1, int(height * scale))
+        tokens = estimate_vision_tokens(w, h, "high")
+        if tokens <= budget:
+            return ScreenshotPlan("high", round(scale, 4), w, h, tokens)
+        scale *= 0.9
+    w, h = max(1, int(width * scale)), max(1, int(height * scale))
+    return ScreenshotPlan("low", round(scale, 4), w, h, BASE_TOKENS)
+
+
+def should_skip_screenshot(text_content: str, accessibility_snapshot: str) -> tuple[bool, str | None]:
+    """Indica se texto + estrutura ja cobrem a pagina e a imagem pode ser omitida."""
+    threshold = settings.VISION_SKIP_TEXT_CHARS
+    if threshold <= 0:
+        return False, None
+    if len(text_content.strip()) >= threshold and accessibility_snapshot:
+        return True, "text_covers_content"
+    return False, None
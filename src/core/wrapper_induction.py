@@ -0,0 +1,583 @@
+"""Inducao de wrappers: seletores que reproduzem, a partir do HTML, o que o modelo extraiu.
+
+Seletores sao cadeias de passos filho-a-filho `[assinatura, n]`, onde a
+assinatura e `tag#id.classe...` (so ids/classes estaveis) e `n` o indice entre
+irmaos com a mesma assinatura (`None` = todos, para campos lista). Listagens
+(`items`/`products`/`findings`) viram um seletor de registro + caminhos
+relativos por campo; paginas de objeto unico (ex.: `Article`) viram caminhos a
+partir do ancestral com assinatura unica mais proximo.
+"""
+import re
+from collections import Counter
+from dataclasses import dataclass, field
+from html.parser import HTMLParser
+from typing import Any, Union, get_args
+from urllib.parse import urljoin
+
+from pydantic import BaseModel
+
+from src.core.chunked_extraction import record_field
+
+TEMPLATE_VERSION = 1
+_SKIP_TAGS = {"script", "style", "noscript", "template", "svg"}
+_VOID_TAGS = {"area", "base", "br", "col", "embed", "hr", "img", "input", "link", "meta", "source", "track", "wbr"}
+_VALUE_ATTRS = ("href", "src", "data-src", "content", "datetime", "title", "alt", "value")
+_STABLE_TOKEN = re.compile(r"^[A-Za-z][A-Za-z_-]{0,39}$")
+_WHITESPACE = re.compile(r"\s+")
+_NUMBER = re.compile(r"\d[\d.,]*\d|\d")
+_NUMERIC_STRING = re.compile(r"^-?\d+(\.\d+)?$")
+_ISO_DATE = re.compile(r"^\d{4}-\d{2}-\d{2}")
+# Maior subida a partir do campo-chave ao procurar o container de cada registro.
+MAX_RECORD_DEPTH = 8
+MAX_ANCHOR_DEPTH = 6
+# Textos longos (ex.: corpo do artigo) casam pelo inicio e por tamanho parecido.
+LONG_TEXT_CHARS = 80
+LONG_TEXT_PREFIX = 60
+MAX_INDEXED_TEXT = 400
+MIN_FIELD_SUPPORT = 0.6
+
+
+@dataclass(eq=False)
+class Node:
+    tag: str
+    attrs: dict[str, str]
+    parent: "Node | None" = None
+    content: list[Union[str, "Node"]] = field(default_factory=list)
+    depth: int = 0
+    nth: int = 0
+    text: str = ""
+
+    @property
+    def signature(self) -> str:
+        return _signature(self.tag, self.attrs)
+
+    @property
+    def children(self) -> list["Node"]:
+        return [child for child in self.content if isinstance(child, Node)]
+
+    def ancestors(self) -> list["Node"]:
+        chain = []
+        node = self.parent
+        while node is not None:
+            chain.append(node)
+            node = node.parent
+        return chain
+
+    def contains(self, other: "Node") -> bool:
+        node = other
+        while node is not None:
+            if node is self:
+                return True
+            node = node.parent
+        return False
+
+
+def _signature(tag: str, attrs: dict[str, str]) -> str:
+    element_id = attrs.get("id", "")
+    classes = sorted({token for token in attrs.get("class", "").split() if _STABLE_TOKEN.match(token)})[:3]
+    return tag + (f"#{element_id}" if _STABLE_TOKEN.match(element_id) else "") + "".join(f".{c}" for c in classes)
+
+
+class _TreeBuilder(HTMLParser):
+    def __init__(self) -> None:
+        super().__init__(convert_charrefs=True)
+        self.root = Node(tag="#document", attrs={})
+        self.nodes: list[Node] = []
+        self._stack: list[Node] = [self.root]
+        self._skip_depth = 0
+        self._sibling_counts: list[Counter[str]] = [Counter()]
+
+    def handle_starttag(self, tag: str, attrs: list[tuple[str, str | None]]) -> None:
+        if self._skip_depth:
+            if tag in _SKIP_TAGS:
+                self._skip_depth += 1
+            return
+        if tag in _SKIP_TAGS:
+            self._skip_depth = 1
+            return
+        parent = self._stack[-1]
+        node = Node(tag=tag, attrs={k: (v or "") for k, v in attrs}, parent=parent, depth=len(self._stack))
+        counts = self._sibling_counts[-1]
+        node.nth = counts[node.signature]
+        counts[node.signature] += 1
+        parent.content.append(node)
+        self.nodes.append(node)
+        if tag not in _VOID_TAGS:
+            self._stack.append(node)
+            self._sibling_counts.append(Counter())
+
+    def handle_endtag(self, tag: str) -> None:
+        if self._skip_depth:
+            if tag in _SKIP_TAGS:
+                self._skip_depth -= 1
+            return
+        # Fecha ate a tag correspondente; fechamentos orfaos sao ignorados.
+        for index in range(len(self._stack) - 1, 0, -1):
+            if self._stack[index].tag == tag:
+                del self._stack[index:]
+                del self._sibling_counts[index:]
+                return
+
+    def handle_data(self, data: str) -> None:
+        if not self._skip_depth and data.strip():
+            self._stack[-1].content.append(data)
+
+
+@dataclass
+class Document:
+    root: Node
+    nodes: list[Node]
+    base_url: str
+    signature_counts: Counter[str]
+    by_text: dict[str, list[Node]]
+    by_url: dict[str, list[tuple[Node, str]]]
+    by_attr_text: dict[str, list[tuple[Node, str]]]
+
+
+def parse_document(html: str, base_url: str = "") -> Document:
+    """Arvore do HTML com textos normalizados e indices para busca de valores."""
+    builder = _TreeBuilder()
+    builder.feed(html)
+    builder.close()
+    nodes = builder.nodes
+    # Ordem do documento invertida: filhos antes dos pais.
+    for node in reversed(nodes):
+        pieces = [part if isinstance(part, str) else part.text for part in node.content]
+        node.text = _WHITESPACE.sub(" ", " ".join(pieces)).strip()
+    by_text: dict[str, list[Node]] = {}
+    by_url: dict[str, list[tuple[Node, str]]] = {}
+    by_attr_text: dict[str, list[tuple[Node, str]]] = {}
+    for node in nodes:
+        if node.text and len(node.text) <= MAX_INDEXED_TEXT:
+            by_text.setdefault(node.text.casefold(), []).append(node)
+        for attr in _VALUE_ATTRS:
+            value = node.attrs.get(attr, "").strip()
+            if not value:
+                continue
+            if attr in ("href", "src", "data-src", "content"):
+                by_url.setdefault(_url_key(urljoin(base_url, value)), []).append((node, attr))
+            by_attr_text.setdefault(_normalize(value), []).append((node, attr))
+    return Document(
+        root=builder.root,
+        nodes=nodes,
+        base_url=base_url,
+        signature_counts=Counter(node.signature for node in nodes),
+        by_text=by_text,
+        by_url=by_url,
+        by_attr_text=by_attr_text,
+    )
+
+
+def _normalize(value: str) -> str:
+    return _WHITESPACE.sub(" ", value).strip().casefold()
+
+
+def _url_key(url: str) -> str:
+    return url.strip().rstrip("/")
+
+
+def parse_number(text: str) -> float | None:
+    """Numero em texto de preco/contagem: `R$ 1.299,90`, `$1,299.90`, `4.5`."""
+    match = _NUMBER.search(text or "")
+    if not match:
+        return None
+    raw = match.group(0)
+    if "," in raw and "." in raw:
+        decimal = "," if raw.rfind(",") > raw.rfind(".") else "."
+    elif "," in raw or "." in raw:
+        separator = "," if "," in raw else "."
+        # Tres digitos depois do unico separador (ou varios separadores) = milhar.
+        tail = raw.rsplit(separator, 1)[1]
+        decimal = "" if len(tail) == 3 or raw.count(separator) > 1 else separator
+    else:
+        decimal = ""
+    thousands = {",": ".", ".": ",", "": ",."}[decimal]
+    for char in thousands:
+        raw = raw.replace(char, "")
+    try:
+        return float(raw.replace(",", ".") if decimal == "," else raw)
+    except ValueError:
+        return None
+
+
+def value_kind(value: Any) -> str | None:
+    """Tipo usado para casar e converter um valor extraido; None = campo nao aprendido."""
+    if isinstance(value, bool) or value is None:
+        return None
+    if isinstance(value, (int, float)):
+        return "number"
+    if isinstance(value, str):
+        if not value.strip():
+            return None
+        if _NUMERIC_STRING.match(value.strip()):
+            return "number"
+        if value.startswith(("http://", "https://")):
+            return "url"
+        if _ISO_DATE.match(value):
+            return "date"
+        return "text"
+    if isinstance(value, list) and value and all(value_kind(item) in ("url", "text") for item in value):
+        return "list"
+    return None
+
+
+def values_equal(expected: Any, actual: Any, kind: str) -> bool:
+    if expected is None or actual is None:
+        return False
+    if kind == "number":
+        expected_number = float(expected) if not isinstance(expected, str) else parse_number(expected)
+        actual_number = actual if isinstance(actual, (int, float)) else parse_number(str(actual))
+        if expected_number is None or actual_number is None:
+            return False
+        return abs(expected_number - actual_number) < 0.01
+    if kind == "url":
+        return _url_key(str(expected)) == _url_key(str(actual))
+    if kind == "date":
+        return str(actual)[:10] == str(expected)[:10]
+    if kind == "list":
+        normalized = [_normalize(str(item)) for item in expected]
+        return isinstance(actual, list) and normalized == [_normalize(str(item)) for item in actual]
+    expected_text, actual_text = _normalize(str(expected)), _normalize(str(actual))
+    if len(expected_text) >= LONG_TEXT_CHARS:
+        return actual_text.startswith(expected_text[:LONG_TEXT_PREFIX])
+    return expected_text == actual_text
+
+
+def _deepest(candidates: list[tuple[Node, str]]) -> list[tuple[Node, str]]:
+    """Descarta candidatos que sao ancestrais de outro candidato (ex.: `<a><span>Nome`)."""
+    nodes = [node for node, _ in candidates]
+    return [
+        (node, source)
+        for node, source in candidates
+        if not any(other is not node and node.contains(other) for other in nodes)
+    ]
+
+
+def find_value(doc: Document, value: Any, kind: str) -> list[tuple[Node, str]]:
+    """Nos (e a fonte: `text` ou `@atributo`) cujo conteudo reproduz `value`."""
+    if kind == "url":
+        return [(node, f"@{attr}") for node, attr in doc.by_url.get(_url_key(str(value)), [])]
+    if kind == "date":
+        day = str(value)[:10]
+        return [
+            (node, f"@{attr}")
+            for node in doc.nodes
+            for attr in ("datetime", "content")
+            if node.attrs.get(attr, "").startswith(day)
+        ]
+    if kind == "number":
+        target = float(value) if not isinstance(value, str) else parse_number(value)
+        candidates = [
+            (node, "text")
+            for node in doc.nodes
+            if node.text and len(node.text) <= 40 and values_equal(target, parse_number(node.text), "number")
+        ]
+        return _deepest(candidates)
+    text = _normalize(str(value))
+    if len(text) >= LONG_TEXT_CHARS:
+        prefix = text[:LONG_TEXT_PREFIX]
+        candidates = [
+            (node, "text")
+            for node in doc.nodes
+            if 0.7 * len(text) <= len(node.text) <= 1.5 * len(text) and node.text.casefold().startswith(prefix)
+        ]
+        return _deepest(candidates)
+    candidates = [(node, "text") for node in doc.by_text.get(text, [])]
+    candidates += [(node, f"@{attr}") for node, attr in doc.by_attr_text.get(text, [])]
+    return _deepest(candidates)
+
+
+def _path(ancestor: Node, node: Node, collect: bool = False) -> list[list[Any]]:
+    """Passos de `ancestor` (exclusivo) ate `node`; `collect` deixa o ultimo passo em todos os irmaos."""
+    steps: list[list[Any]] = []
+    current = node
+    while current is not ancestor and current is not None:
+        steps.append([current.signature, current.nth])
+        current = current.parent
+    steps.reverse()
+    if collect and steps:
+        steps[-1][1] = None
+    return steps
+
+
+def select(context: Node, path: list[list[Any]]) -> list[Node]:
+    nodes = [context]
+    for signature, nth in path:
+        matched: list[Node] = []
+        for node in nodes:
+            children = [child for child in node.children if child.signature == signature]
+            if nth is None:
+                matched.extend(children)
+            elif nth < len(children):
+                matched.append(children[nth])
+        nodes = matched
+    return nodes
+
+
+def _read(node: Node, source: str, kind: str, base_url: str) -> Any:
+    raw = node.attrs.get(source[1:], "") if source.startswith("@") else node.text
+    if not raw:
+        return None
+    if kind == "number":
+        return parse_number(raw)
+    if kind == "url" or (kind == "list" and source.startswith("@")):
+        return urljoin(base_url, raw.strip())
+    return raw.strip()
+
+
+def read_field(context: Node, spec: dict[str, Any], base_url: str) -> Any:
+    if spec["source"] == "page_url":
+        return base_url or None
+    nodes = select(context, spec["path"])
+    if spec["kind"] == "list":
+        values = [_read(node, spec["source"], "list", base_url) for node in nodes]
+        return [value for value in values if value]
+    return _read(nodes[0], spec["source"], spec["kind"], base_url) if nodes else None
+
+
+def _vote(samples: list[tuple[list[list[Any]], str]], total: int) -> tuple[list[list[Any]], str, float] | None:
+    if not samples or not total:
+        return None
+    counts = Counter((repr(path), source) for path, source in samples)
+    (path_repr, source), hits = counts.most_common(1)[0]
+    path = next(path for path, src in samples if repr(path) == path_repr and src == source)
+    return path, source, hits / total
+
+
+def _record_items(data: dict[str, Any], field_name: str) -> list[dict[str, Any]]:
+    return [item for item in data.get(field_name) or [] if isinstance(item, dict)]
+
+
+def _key_field(schema: type[BaseModel], field_name: str, records: list[dict[str, Any]]) -> str | None:
+    """Campo que identifica cada registro: o primeiro obrigatorio de texto do item."""
+    annotation = schema.model_fields[field_name].annotation
+    item_model = next(
+        (arg for arg in get_args(annotation) if isinstance(arg, type) and issubclass(arg, BaseModel)),
+        None,
+    )
+    names = [name for name, info in item_model.model_fields.items() if info.is_required()] if item_model else []
+    names += ["name", "title"]
+    for name in names:
+        if records and all(value_kind(record.get(name)) == "text" for record in records):
+            return name
+    return None
+
+
+def _induce_records(
+    doc: Document,
+    data: dict[str, Any],
+    schema: type[BaseModel],
+    min_records: int,
+) -> dict[str, Any] | None:
+    field_name = record_field(schema)
+    records = _record_items(data, field_name) if field_name else []
+    if len(records) < min_records:
+        return None
+    key = _key_field(schema, field_name, records)
+    if key is None:
+        return None
+
+    anchors: list[tuple[int, Node]] = []
+    for index, record in enumerate(records):
+        found = find_value(doc, record[key], "text")
+        if found:
+            anchors.append((index, found[0][0]))
+    if len(anchors) < min_records:
+        return None
+
+    # Sobe ate o maior ancestral que ainda separa registros e tem a mesma assinatura.
+    best: tuple[list[tuple[int, Node]], str, str] | None = None
+    for depth in range(1, MAX_RECORD_DEPTH + 1):
+        containers = []
+        for index, node in anchors:
+            ancestors = node.ancestors()
+            if len(ancestors) < depth or ancestors[depth - 1] is doc.root:
+                break
+            containers.append((index, ancestors[depth - 1]))
+        if len(containers) < len(anchors) or len({id(node) for _, node in containers}) < len(containers):
+            break
+        signature, count = Counter(node.signature for _, node in containers).most_common(1)[0]
+        parents = Counter(node.parent.signature for _, node in containers if node.parent is not None)
+        if count / len(containers) >= 0.8 and parents:
+            matching = [(index, node) for index, node in containers if node.signature == signature]
+            best = (matching, signature, parents.most_common(1)[0][0])
+    if best is None:
+        return None
+    containers, record_signature, parent_signature = best
+
+    fields: dict[str, dict[str, Any]] = {}
+    for name in sorted({name for record in records for name in record}):
+        kinds = Counter(value_kind(records[i].get(name)) for i, _ in containers)
+        kinds.pop(None, None)
+        if not kinds:
+            continue
+        kind = kinds.most_common(1)[0][0]
+        samples: list[tuple[list[list[Any]], str]] = []
+        with_value = 0
+        for index, container in containers:
+            value = records[index].get(name)
+            if value_kind(value) != kind:
+                continue
+            with_value += 1
+            lookup = value[0] if kind == "list" else value
+            lookup_kind = value_kind(lookup) if kind == "list" else kind
+            found = find_value(doc, lookup, lookup_kind)
+            inside = [(node, source) for node, source in found if container.contains(node)]
+            if inside:
+                node, source = inside[0]
+                samples.append((_path(container, node, collect=kind == "list"), source))
+        voted = _vote(samples, with_value)
+        if voted and voted[2] >= MIN_FIELD_SUPPORT:
+            fields[name] = {"path": voted[0], "source": voted[1], "kind": kind}
+    if key not in fields:
+        return None
+    return {
+        "version": TEMPLATE_VERSION,
+        "kind": "records",
+        "schema": schema.__name__,
+        "record": {"field": field_name, "signature": record_signature, "parent": parent_signature, "key": key},
+        "fields": fields,
+    }
+
+
+def _anchor(doc: Document, node: Node) -> Node:
+    """Ancestral mais proximo (ou o proprio no) com assinatura unica na pagina."""
+    current: Node | None = node
+    for _ in range(MAX_ANCHOR_DEPTH):
+        if current is None or current is doc.root:
+            break
+        if doc.signature_counts[current.signature] == 1:
+            return current
+        current = current.parent
+    return doc.root
+
+
+def _induce_object(doc: Document, data: dict[str, Any], schema: type[BaseModel]) -> dict[str, Any] | None:
+    fields: dict[str, dict[str, Any]] = {}
+    for name, value in data.items():
+        if name not in schema.model_fields:
+            continue
+        kind = value_kind(value)
+        if kind is None:
+            continue
+        if kind == "url" and doc.base_url and values_equal(value, doc.base_url, "url"):
+            fields[name] = {"source": "page_url", "kind": "url"}
+            continue
+        lookup = value[0] if kind == "list" else value
+        found = find_value(doc, lookup, value_kind(lookup) if kind == "list" else kind)
+        if not found:
+            continue
+        node, source = found[0]
+        anchor = _anchor(doc, node)
+        fields[name] = {
+            "anchor": _path(doc.root, anchor),
+            "path": _path(anchor, node, collect=kind == "list"),
+            "source": source,
+            "kind": kind,
+        }
+    if not fields:
+        return None
+    return {"version": TEMPLATE_VERSION, "kind": "object", "schema": schema.__name__, "fields": fields}
+
+
+def _apply(doc: Document, template: dict[str, Any]) -> dict[str, Any]:
+    if template["kind"] == "records":
+        record = template["record"]
+        containers = [
+            node
+            for node in doc.nodes
+            if node.signature == record["signature"]
+            and node.parent is not None
+            and node.parent.signature == record["parent"]
+        ]
+        items = []
+        for container in containers:
+            item = {name: read_field(container, spec, doc.base_url) for name, spec in template["fields"].items()}
+            if item.get(record["key"]):
+                items.append({name: value for name, value in item.items() if value not in (None, [])})
+        return {record["field"]: items, "total_count": len(items)}
+
+    data: dict[str, Any] = {}
+    for name, spec in template["fields"].items():
+        if spec["source"] == "page_url":
+            data[name] = doc.base_url or None
+            continue
+        anchors = select(doc.root, spec["anchor"])
+        value = read_field(anchors[0], spec, doc.base_url) if anchors else None
+        if value not in (None, []):
+            data[name] = value
+    return data
+
+
+def apply_template(html: str, template: dict[str, Any], base_url: str = "") -> dict[str, Any]:
+    """Extracao deterministica com um template aprendido (sem chamada ao modelo)."""
+    return _apply(parse_document(html, base_url), template)
+
+
+def score_template(
+    doc: Document,
+    template: dict[str, Any],
+    expected: dict[str, Any],
+) -> tuple[float, dict[str, float]]:
+    """Concordancia do template com uma extracao validada: (geral, por campo)."""
+    actual = _apply(doc, template)
+    per_field: dict[str, float] = {}
+    if template["kind"] == "records":
+        record = template["record"]
+        expected_items = _record_items(expected, record["field"])
+        actual_items = actual[record["field"]]
+        by_key = {_normalize(str(item.get(record["key"]))): item for item in actual_items}
+        pairs = [
+            (item, by_key[_normalize(str(item.get(record["key"])))])
+            for item in expected_items
+            if _normalize(str(item.get(record["key"]))) in by_key
+        ]
+        key_score = len(pairs) / max(len(expected_items), len(actual_items), 1)
+        for name, spec in template["fields"].items():
+            relevant = [(e, a) for e, a in pairs if value_kind(e.get(name)) == spec["kind"]]
+            hits = sum(values_equal(e[name], a.get(name), spec["kind"]) for e, a in relevant)
+            per_field[name] = hits / len(relevant) if relevant else 1.0
+        field_score = sum(per_field.values()) / len(per_field) if per_field else 0.0
+        return min(key_score, field_score), per_field
+
+    for name, spec in template["fields"].items():
+        per_field[name] = 1.0 if values_equal(expected.get(name), actual.get(name), spec["kind"]) else 0.0
+    return (sum(per_field.values()) / len(per_field) if per_field else 0.0), per_field
+
+
+def induce_template(
+    html: str,
+    data: dict[str, Any],
+    schema: type[BaseModel],
+    base_url: str = "",
+    min_records: int = 2,
+    min_agreement: float = 0.8,
+) -> dict[str, Any] | None:
+    """Aprende um template que reproduz `data` (extracao validada, em JSON) a partir de `html`.
+
+    Campos que nao se reproduzem ao reaplicar o template na mesma pagina sao
+    descartados; sem o campo-chave (listagens) ou sem nenhum campo, retorna None.
+    """
+    doc = parse_document(html, base_url)
+    template = (
+        _induce_records(doc, data, schema, min_records) if record_field(schema) else _induce_object(doc, data, schema)
+    )
+    if template is None:
+        return None
+    _, per_field = score_template(doc, template, data)
+    key = template.get("record", {}).get("key")
+    for name, score in per_field.items():
+        if score < min_agreement and name != key:
+            del template["fields"][name]
+    if not template["fields"]:
+        return None
+    agreement, _ = score_template(doc, template, data)
+    if agreement < min_agreement:
+        return None
+    template["agreement"] = round(agreement, 3)
+    return template
+
+
+def template_agreement(html: str, template: dict[str, Any], expected: dict[str, Any], base_url: str = "") -> float:
+    """Concordancia de um template com a extracao do modelo de outra pagina do dominio."""
+    return score_template(parse_document(html, base_url), template, expected)[0]
@@ -1,15 +1,32 @@
 """Calculo simples de custos de token."""
 
+# USD por 1M de tokens: (entrada, entrada em cache, saida). Prefixo mais longo vence.
+MODEL_PRICING: dict[str, tuple[float, float, float]] = {
+    "gpt-5-nano": (0.05, 0.005, 0.40),
+    "gpt-5-mini": (0.25, 0.025, 2.00),
+    "gpt-5": (1.25, 0.125, 10.00),
+}
+DEFAULT_PRICING = MODEL_PRICING["gpt-5-mini"]
+
+
+def model_pricing(model: str | None) -> tuple[float, float, float]:
+    """Precos do modelo; modelos desconhecidos usam os do GPT-5 mini."""
+    if not model:
+        return DEFAULT_PRICING
+    matches = [prefix for prefix in MODEL_PRICING if model.startswith(prefix)]
+    return MODEL_PRICING[max(matches, key=len)] if matches else DEFAULT_PRICING
+
 
 def calculate_cost(
     input_tokens: int,
     output_tokens: int,
     cached_input_tokens: int = 0,
+    model: str | None = None,
 ) -> float:
-    """Calcula custo estimado em USD para GPT-5 mini."""
+    """Calcula custo estimado em USD (GPT-5 mini quando `model` nao e informado)."""
+    input_price, cached_price, output_price = model_pricing(model)
     normal_input = max(input_tokens - cached_input_tokens, 0)
-    input_cost = (normal_input / 1_000_000) * 0.25
-    cached_cost = (cached_input_tokens / 1_000_000) * 0.025
-    output_cost = (output_tokens / 1_000_000) * 2.00
+    input_cost = (normal_input / 1_000_000) * input_price
+    cached_cost = (cached_input_tokens / 1_000_000) * cached_price
+    output_cost = (output_tokens / 1_000_000) * output_price
     return input_cost + cached_cost + output_cost
-
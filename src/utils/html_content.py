@@ -0,0 +1,99 @@
+"""Extracao de conteudo de HTML estatico (sem browser)."""
+import re
+from html.parser import HTMLParser
+from typing import Any
+from urllib.parse import urljoin
+
+_SKIP_TAGS = {"script", "style", "noscript", "template", "svg", "canvas", "iframe", "head"}
+_BLOCK_TAGS = {
+    "p", "div", "li", "ul", "ol", "br", "tr", "table", "section", "article", "header",
+    "footer", "nav", "main", "aside", "form", "h1", "h2", "h3", "h4", "h5", "h6",
+    "dt", "dd", "blockquote", "pre", "figure", "figcaption",
+}
+_VOID_TAGS = {"area", "base", "br", "col", "embed", "hr", "img", "input", "link", "meta", "source", "track", "wbr"}
+_SPA_ROOT_IDS = {"root", "app", "__next", "__nuxt", "___gatsby", "svelte", "q-app"}
+_SPA_ROOT_TAGS = {"app-root"}
+_WHITESPACE = re.compile(r"[ \t\r\f\v]+")
+_BLANK_LINES = re.compile(r"\n\s*\n+")
+
+
+class _ContentParser(HTMLParser):
+    def __init__(self, base_url: str, max_images: int) -> None:
+        super().__init__(convert_charrefs=True)
+        self.base_url = base_url
+        self.max_images = max_images
+        self.title = ""
+        self.chunks: list[str] = []
+        self.image_urls: list[str] = []
+        self.noscript_text: list[str] = []
+        self.spa_roots: list[str] = []
+        self.script_count = 0
+        self.script_chars = 0
+        self._skip_stack: list[str] = []
+        self._in_title = False
+        self._seen_images: set[str] = set()
+
+    def handle_starttag(self, tag: str, attrs: list[tuple[str, str | None]]) -> None:
+        attributes = {k: (v or "") for k, v in attrs}
+        if tag == "body" and "head" in self._skip_stack:
+            # </head> e opcional em HTML5
+            self._skip_stack.clear()
+        if tag == "title":
+            self._in_title = True
+        if tag == "script":
+            self.script_count += 1
+        if tag in _SPA_ROOT_TAGS or attributes.get("id", "") in _SPA_ROOT_IDS or "ng-app" in attributes:
+            self.spa_roots.append(attributes.get("id") or tag)
+        if tag == "img" and len(self.image_urls) < self.max_images:
+            src = attributes.get("src") or attributes.get("data-src") or ""
+            if src and "base64" not in src:
+                absolute = urljoin(self.base_url, src)
+                if absolute.startswith("http") and absolute not in self._seen_images:
+                    self._seen_images.add(absolute)
+                    self.image_urls.append(absolute)
+        if tag in _SKIP_TAGS and tag not in _VOID_TAGS:
+            self._skip_stack.append(tag)
+        elif tag in _BLOCK_TAGS:
+            self.chunks.append("\n")
+
+    def handle_endtag(self, tag: str) -> None:
+        if tag == "title":
+            self._in_title = False
+        if self._skip_stack and self._skip_stack[-1] == tag:
+            self._skip_stack.pop()
+        elif tag in _BLOCK_TAGS:
+            self.chunks.append("\n")
+
+    def handle_data(self, data: str) -> None:
+        if self._in_title:
+            self.title += data
+            return
+        if self._skip_stack:
+            current = self._skip_stack[-1]
+            if current == "script":
+                self.script_chars += len(data)
+            elif current == "noscript":
+                self.noscript_text.append(data)
+            return
+        self.chunks.append(data)
+
+
+def extract_html_content(html: str, base_url: str = "", max_images: int = 50) -> dict[str, Any]:
+    """Extrai titulo, texto visivel, imagens e sinais estruturais de um HTML."""
+    parser = _ContentParser(base_url=base_url, max_images=max_images)
+    try:
+        parser.feed(html)
+        parser.close()
+    except Exception:  # noqa: BLE001 - HTML quebrado: usa o que ja foi lido
+        pass
+    lines = [_WHITESPACE.sub(" ", line).strip() for line in "".join(parser.chunks).split("\n")]
+    text = _BLANK_LINES.sub("\n", "\n".join(line for line in lines if line)).strip()
+    return {
+        "title": _WHITESPACE.sub(" ", parser.title).strip(),
+        "text": text,
+        "image_urls": parser.image_urls,
+        "noscript_text": " ".join(" ".join(parser.noscript_text).split()),
+        "spa_roots": parser.spa_roots,
+        "script_count": parser.script_count,
+        "script_chars": parser.script_chars,
+    }
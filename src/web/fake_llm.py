@@ -0,0 +1,294 @@
+"""Servidor fake compativel com chat completions da OpenAI, para benchmark offline.
+
+Responde JSON valido para o schema pedido (gerado a partir do JSON Schema do
+request ou reproduzido do cache de respostas gravado em chamadas reais), com
+latencia, uso de tokens e taxas de erro/429 configuraveis. Aponte
+`OPENAI_BASE_URL` para `http://127.0.0.1:8100/v1` e rode `run_fake_llm.py`.
+"""
+import asyncio
+import hashlib
+import json
+import random
+import time
+from typing import Any, AsyncIterator
+from uuid import uuid4
+
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse, StreamingResponse
+
+from src.config.settings import settings
+from src.core.context_packer import count_tokens
+from src.core.llm_cache import LLMResponseCache, request_key
+
+SCHEMA_MARKER = "Schema esperado:\n"
+# Tokens cobrados por imagem (equivalente a um screenshot em detalhe alto).
+IMAGE_TOKENS = 765
+# O cache de prefixo do provedor so vale a partir de 1024 tokens, em blocos de 128.
+PREFIX_CACHE_MIN_TOKENS = 1024
+PREFIX_CACHE_BLOCK = 128
+STREAM_CHUNK_CHARS = 24
+# Campos do corpo que nao fazem parte da chave do cache de respostas.
+NON_KEY_FIELDS = ("model", "messages", "stream", "stream_options")
+
+
+def _resolve(node: dict[str, Any], defs: dict[str, Any]) -> dict[str, Any]:
+    ref = node.get("$ref")
+    if isinstance(ref, str) and ref.startswith("#/$defs/"):
+        return defs.get(ref.rsplit("/", 1)[-1], {})
+    return node
+
+
+def _clamp(value: float, node: dict[str, Any]) -> float:
+    """Respeita minimum/maximum (ex.: `rating` entre 0 e 5)."""
+    if "maximum" in node:
+        value = min(value, node["maximum"])
+    if "exclusiveMaximum" in node:
+        value = min(value, node["exclusiveMaximum"] - 1)
+    if "minimum" in node:
+        value = max(value, node["minimum"])
+    if "exclusiveMinimum" in node:
+        value = max(value, node["exclusiveMinimum"] + 1)
+    return value
+
+
+def sample_from_schema(
+    node: dict[str, Any],
+    defs: dict[str, Any] | None = None,
+    name: str = "valor",
+    index: int = 0,
+    list_items: int = 3,
+) -> Any:
+    """Instancia de exemplo que passa na validacao do JSON Schema (e do modelo Pydantic)."""
+    defs = defs if defs is not None else node.get("$defs", {})
+    node = _resolve(node, defs)
+    variants = node.get("anyOf") or node.get("oneOf")
+    if variants:
+        concrete = [variant for variant in variants if variant.get("type") != "null"] or variants
+        return sample_from_schema(concrete[0], defs, name, index, list_items)
+    if "enum" in node:
+        return node["enum"][0]
+    if "const" in node:
+        return node["const"]
+    kind = node.get("type")
+    if kind == "object" or "properties" in node:
+        return {
+            key: sample_from_schema(value, defs, key, index, list_items)
+            for key, value in (node.get("properties") or {}).items()
+        }
+    if kind == "array":
+        return [
+            sample_from_schema(node.get("items") or {}, defs, name, item, list_items)
+            for item in range(list_items)
+        ]
+    if kind == "integer":
+        return int(_clamp(list_items if name == "total_count" else index + 1, node))
+    if kind == "number":
+        return _clamp(round(10.0 + index * 1.5, 2), node)
+    if kind == "boolean":
+        # `has_next_page` falso encerra a paginacao em benchmarks.
+        return False
+    lowered = name.lower()
+    if node.get("format") == "uri" or "url" in lowered or "link" in lowered or lowered == "images":
+        return f"https://example.com/{lowered}/{index + 1}"
+    if node.get("format") == "date-time":
+        return "2024-01-01T00:00:00Z"
+    return f"{name} {index + 1}"
+
+
+def schema_from_request(body: dict[str, Any]) -> dict[str, Any] | None:
+    """JSON Schema do request: `response_format=json_schema` ou o fim da mensagem de sistema."""
+    response_format = body.get("response_format") or {}
+    if response_format.get("type") == "json_schema":
+        return (response_format.get("json_schema") or {}).get("schema")
+    for message in body.get("messages") or []:
+        content = message.get("content")
+        if message.get("role") == "system" and isinstance(content, str) and SCHEMA_MARKER in content:
+            raw = content.split(SCHEMA_MARKER, 1)[1]
+            try:
+                schema, _ = json.JSONDecoder().raw_decode(raw)
+                return schema
+            except json.JSONDecodeError:
+                return None
+    return None
+
+
+def _message_text(message: dict[str, Any]) -> tuple[str, int]:
+    content = message.get("content")
+    if isinstance(content, str):
+        return content, 0
+    texts: list[str] = []
+    images = 0
+    for part in content or []:
+        if part.get("type") == "text":
+            texts.append(part.get("text") or "")
+        elif part.get("type") == "image_url":
+            images += 1
+    return "\n".join(texts), images
+
+
+class FakeLLM:
+    """Estado do servidor fake: configuracao, prefixos ja vistos e contadores."""
+
+    def __init__(
+        self,
+        latency_ms: float | None = None,
+        latency_jitter_ms: float | None = None,
+        error_rate: float | None = None,
+        rate_limit_rate: float | None = None,
+        list_items: int | None = None,
+        replay_path: str | None = None,
+        seed: int | None = None,
+    ) -> None:
+        self.latency_ms = settings.FAKE_LLM_LATENCY_MS if latency_ms is None else latency_ms
+        self.latency_jitter_ms = settings.FAKE_LLM_LATENCY_JITTER_MS if latency_jitter_ms is None else latency_jitter_ms
+        self.error_rate = settings.FAKE_LLM_ERROR_RATE if error_rate is None else error_rate
+        self.rate_limit_rate = settings.FAKE_LLM_RATE_LIMIT_RATE if rate_limit_rate is None else rate_limit_rate
+        self.list_items = settings.FAKE_LLM_LIST_ITEMS if list_items is None else list_items
+        replay_path = settings.FAKE_LLM_REPLAY_PATH if replay_path is None else replay_path
+        # Reproduz respostas gravadas pelo cache do AIProcessor (mesma chave de request).
+        self.replay = LLMResponseCache(path=replay_path, ttl_seconds=10**9) if replay_path else None
+        self.random = random.Random(seed)
+        self._seen_prefixes: set[str] = set()
+        self.counters = {
+            "requests": 0,
+            "errors": 0,
+            "rate_limited": 0,
+            "replayed": 0,
+            "generated": 0,
+            "streamed": 0,
+        }
+
+    async def content_for(self, body: dict[str, Any]) -> str:
+        if self.replay is not None:
+            params = {key: value for key, value in body.items() if key not in NON_KEY_FIELDS}
+            cached = await self.replay.get(request_key(body.get("model", ""), body.get("messages") or [], **params))
+            if cached is not None:
+                self.counters["replayed"] += 1
+                return json.dumps(cached["data"], ensure_ascii=False)
+        self.counters["generated"] += 1
+        schema = schema_from_request(body)
+        if schema is not None:
+            data = sample_from_schema(schema, list_items=self.list_items)
+        elif any('"summary"' in _message_text(message)[0] for message in body.get("messages") or []):
+            # Chamada de reduce dos resumos parciais.
+            data = {"summary": "Resumo gerado pelo servidor fake."}
+        else:
+            data = {}
+        return json.dumps(data, ensure_ascii=False)
+
+    def usage(self, body: dict[str, Any], content: str) -> dict[str, Any]:
+        prompt_tokens = 0
+        prefix = ""
+        for message in body.get("messages") or []:
+            text, images = _message_text(message)
+            prompt_tokens += count_tokens(text) + images * IMAGE_TOKENS
+            if message.get("role") == "system":
+                prefix = text
+        prefix_tokens = count_tokens(prefix)
+        prefix_hash = hashlib.sha256(prefix.encode("utf-8")).hexdigest()
+        cached = 0
+        if prefix_hash in self._seen_prefixes and prefix_tokens >= PREFIX_CACHE_MIN_TOKENS:
+            cached = prefix_tokens // PREFIX_CACHE_BLOCK * PREFIX_CACHE_BLOCK
+        self._seen_prefixes.add(prefix_hash)
+        completion_tokens = count_tokens(content)
+        return {
+            "prompt_tokens": prompt_tokens,
+            "completion_tokens": completion_tokens,
+            "total_tokens": prompt_tokens + completion_tokens,
+            "prompt_tokens_details": {"cached_tokens": cached},
+        }
+
+    def latency_seconds(self) -> float:
+        jitter = self.random.uniform(-self.latency_jitter_ms, self.latency_jitter_ms)
+        return max(self.latency_ms + jitter, 0.0) / 1000
+
+    def failure(self) -> JSONResponse | None:
+        """Resposta de erro sorteada conforme as taxas configuradas (ou None)."""
+        roll = self.random.random()
+        if roll < self.rate_limit_rate:
+            self.counters["rate_limited"] += 1
+            return JSONResponse(
+                status_code=429,
+                headers={"retry-after": str(settings.FAKE_LLM_RETRY_AFTER_SECONDS)},
+                content={"error": {"message": "Rate limit (fake)", "type": "rate_limit_error", "code": None}},
+            )
+        if roll < self.rate_limit_rate + self.error_rate:
+            self.counters["errors"] += 1
+            return JSONResponse(
+                status_code=500,
+                content={"error": {"message": "Erro interno (fake)", "type": "server_error", "code": None}},
+            )
+        return None
+
+
+def create_fake_llm_app(fake: FakeLLM | None = None) -> FastAPI:
+    """App FastAPI com `/v1/chat/completions` (com e sem streaming) e `/stats`."""
+    fake = fake or FakeLLM()
+    fake_app = FastAPI(title="Fake LLM", description="Chat completions fake para benchmark offline.")
+
+    @fake_app.post("/v1/chat/completions", response_model=None)
+    async def chat_completions(request: Request) -> JSONResponse | StreamingResponse:
+        body = await request.json()
+        fake.counters["requests"] += 1
+        failure = fake.failure()
+        if failure is not None:
+            return failure
+        content = await fake.content_for(body)
+        usage = fake.usage(body, content)
+        latency = fake.latency_seconds()
+        completion_id = f"chatcmpl-fake-{uuid4().hex[:12]}"
+        model = body.get("model", "fake")
+        created = int(time.time())
+
+        if not body.get("stream"):
+            await asyncio.sleep(latency)
+            return JSONResponse({
+                "id": completion_id,
+                "object": "chat.completion",
+                "created": created,
+                "model": model,
+                "choices": [{
+                    "index": 0,
+                    "message": {"role": "assistant", "content": content},
+                    "finish_reason": "stop",
+                }],
+                "usage": usage,
+            })
+
+        fake.counters["streamed"] += 1
+        pieces = [content[start : start + STREAM_CHUNK_CHARS] for start in range(0, len(content), STREAM_CHUNK_CHARS)]
+
+        async def events() -> AsyncIterator[str]:
+            # Um quarto da latencia ate o primeiro token; o resto distribuido entre os trechos.
+            await asyncio.sleep(latency / 4)
+            delay = latency * 3 / 4 / max(len(pieces), 1)
+            for piece in pieces:
+                chunk = {
+                    "id": completion_id,
+                    "object": "chat.completion.chunk",
+                    "created": created,
+                    "model": model,
+                    "choices": [{"index": 0, "delta": {"content": piece}, "finish_reason": None}],
+                }
+                yield f"data: {json.dumps(chunk, ensure_ascii=False)}\n\n"
+                await asyncio.sleep(delay)
+            if (body.get("stream_options") or {}).get("include_usage"):
+                final = {
+                    "id": completion_id,
+                    "object": "chat.completion.chunk",
+                    "created": created,
+                    "model": model,
+                    "choices": [],
+                    "usage": usage,
+                }
+                yield f"data: {json.dumps(final)}\n\n"
+            yield "data: [DONE]\n\n"
+
+        return StreamingResponse(events(), media_type="text/event-stream")
+
+    @fake_app.get("/stats")
+    async def stats() -> dict[str, Any]:
+        """Contadores de requests, erros sorteados, 429 e respostas reproduzidas."""
+        return dict(fake.counters)
+
+    return fake_app
@@ -1,20 +1,27 @@
 """API web para o scraper inteligente."""
 import time
 from uuid import uuid4
-from typing import Any
+from typing import Any, AsyncIterator
 
 from fastapi import FastAPI, Request
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import Response
+from fastapi.responses import Response, StreamingResponse
 from pydantic import BaseModel, ConfigDict, Field
-from prometheus_client import CONTENT_TYPE_LATEST, Counter, Histogram, generate_latest
+from prometheus_client import CONTENT_TYPE_LATEST, Counter, Gauge, Histogram, generate_latest
 
 from src.config.prompts import (
     SYSTEM_PROMPT_ECOMMERCE,
     SYSTEM_PROMPT_GENERIC,
     SYSTEM_PROMPT_NEWS,
 )
-from src.core.orchestrator import ScraperOrchestrator
+from src.config.settings import settings
+from src.core.browser_pool import current_browser_pool
+from src.core.capture_cache import get_capture_cache
+from src.core.capture_workers import get_capture_workers
+from src.core.extraction_templates import get_template_store
+from src.core.llm_cache import get_llm_cache
+from src.core.llm_client import get_llm_pool
+from src.core.orchestrator import ScraperOrchestrator, shutdown_shared_resources
 from src.core.storage import StorageManager
 from src.models.article import Article
 from src.models.custom import GenericListPage, GuidedExtractionResult
@@ -57,6 +64,126 @@ SCRAPE_VALIDATION_FAILURES_TOTAL = Counter(
     "scrape_validation_failures_total",
     "Falhas de validacao de schema",
 )
+SCRAPE_VISION_TOKENS_TOTAL = Counter(
+    "scrape_vision_tokens_total",
+    "Tokens de imagem (estimados) enviados ao modelo",
+    ["detail"],
+)
+SCRAPE_CAPTURE_PATH_TOTAL = Counter(
+    "scrape_capture_path_total",
+    "Capturas por caminho (http = fast path estatico, browser = Chromium, cache = cache de captura)",
+    ["path"],
+)
+SCRAPE_CAPTURE_CACHE_TOTAL = Counter(
+    "scrape_capture_cache_total",
+    "Consultas ao cache de captura por resultado (hit, revalidated, miss, bypass)",
+    ["state"],
+)
+SCRAPE_CAPTURE_BYTES_TOTAL = Counter(
+    "scrape_capture_bytes_total",
+    "Bytes de artefatos produzidos na captura por perfil",
+    ["profile"],
+)
+SCRAPE_CAPTURE_DURATION_SECONDS = Histogram(
+    "scrape_capture_duration_seconds",
+    "Tempo de browser por captura, por perfil",
+    ["profile"],
+)
+CAPTURE_WORKER_QUEUE_DEPTH = Gauge(
+    "capture_worker_queue_depth",
+    "Capturas pendentes por shard de worker",
+    ["shard"],
+)
+CAPTURE_WORKER_COMPLETED = Gauge(
+    "capture_worker_completed",
+    "Capturas concluidas por shard de worker",
+    ["shard"],
+)
+SCRAPE_LLM_CACHE_TOTAL = Counter(
+    "scrape_llm_cache_total",
+    "Consultas ao cache de respostas do modelo por estado",
+    ["state"],
+)
+SCRAPE_LLM_TOKENS_SAVED_TOTAL = Counter(
+    "scrape_llm_tokens_saved_total",
+    "Tokens nao cobrados por respostas servidas do cache",
+)
+SCRAPE_TIME_TO_FIRST_ITEM_SECONDS = Histogram(
+    "scrape_time_to_first_item_seconds",
+    "Tempo ate o primeiro item validado no scraping em streaming",
+)
+SCRAPE_EXTRACTION_CHUNKS = Histogram(
+    "scrape_extraction_chunks",
+    "Trechos por extracao map-reduce",
+    buckets=(2, 3, 4, 6, 8, 12, 16),
+)
+SCRAPE_LLM_CACHED_INPUT_TOKENS_TOTAL = Counter(
+    "scrape_llm_cached_input_tokens_total",
+    "Tokens de entrada servidos pelo cache de prefixo do provedor",
+)
+SCRAPE_LLM_LATENCY_SECONDS = Histogram(
+    "scrape_llm_latency_seconds",
+    "Latencia da chamada de extracao ao modelo",
+    ["prompt_cache"],
+)
+SCRAPE_LLM_JSON_PARSE_TOTAL = Counter(
+    "scrape_llm_json_parse_total",
+    "Respostas do modelo decodificadas por caminho (direct, local_repair, llm_repair)",
+    ["path"],
+)
+SCRAPE_CASCADE_TIER_TOTAL = Counter(
+    "scrape_cascade_tier_total",
+    "Camadas da cascata de modelos por resultado (accepted, escalated, failed)",
+    ["tier", "outcome"],
+)
+SCRAPE_CASCADE_TIER_LATENCY_SECONDS = Histogram(
+    "scrape_cascade_tier_latency_seconds",
+    "Latencia de cada camada da cascata de modelos",
+    ["tier"],
+)
+SCRAPE_CASCADE_TIER_COST_USD_TOTAL = Counter(
+    "scrape_cascade_tier_cost_usd_total",
+    "Custo por camada da cascata de modelos",
+    ["tier"],
+)
+SCRAPE_TEMPLATE_TOTAL = Counter(
+    "scrape_template_total",
+    "Paginas por estado do template do dominio (hit, fallback, learned, candidate, confirmed, not_learnable)",
+    ["state"],
+)
+LLM_IN_FLIGHT = Gauge(
+    "llm_calls_in_flight",
+    "Chamadas ao modelo em andamento",
+)
+LLM_IN_FLIGHT.set_function(lambda: get_llm_pool().stats()["in_flight"])
+LLM_WAITING = Gauge(
+    "llm_calls_waiting",
+    "Chamadas ao modelo aguardando slot de concorrencia",
+)
+LLM_WAITING.set_function(lambda: get_llm_pool().stats()["waiting"])
+
+
+def _browser_pool_stat(key: str) -> int:
+    """Contador do pool existente; 0 quando o pool ainda nao subiu ou ja foi encerrado."""
+    pool = current_browser_pool()
+    return pool.stats()[key] if pool is not None else 0
+
+
+BROWSER_POOL_ACTIVE_LEASES = Gauge(
+    "browser_pool_active_leases",
+    "Contextos de browser emprestados no momento",
+)
+BROWSER_POOL_ACTIVE_LEASES.set_function(lambda: _browser_pool_stat("active_leases"))
+BROWSER_POOL_RECYCLES = Gauge(
+    "browser_pool_recycles",
+    "Browsers reciclados por limite de paginas",
+)
+BROWSER_POOL_RECYCLES.set_function(lambda: _browser_pool_stat("recycles"))
+BROWSER_POOL_CRASHES = Gauge(
+    "browser_pool_crashes",
+    "Browsers do pool que cairam",
+)
+BROWSER_POOL_CRASHES.set_function(lambda: _browser_pool_stat("crashes"))
 
 
 
@@ -78,6 +205,32 @@ class ScrapeRequest(BaseModel):
     output_format: str = Field(default="list", pattern="^(list|summary|report)$")
     api_key: str | None = Field(default=None, description="Optional OpenAI API Key override")
     source: str | None = Field(default="scraper_manual", description="Source of the scrape request (e.g. library:google_maps)")
+    capture_mode: str | None = Field(
+        default=None,
+        pattern="^(browser|static_first)$",
+        description="browser = sempre Chromium; static_first = tenta HTTP antes (padrao: CAPTURE_MODE)",
+    )
+    capture_profile: str | None = Field(
+        default=None,
+        pattern=r"^(auto|full|(text_only|text_ax|vision)(\+html)?)$",
+        description="Artefatos capturados; auto infere pelo schema e output_format, `+html` inclui o HTML (padrao: CAPTURE_PROFILE)",
+    )
+    max_pages: int = Field(default=1, ge=1, le=20, description="Segue a paginacao ate N paginas no mesmo browser")
+    use_capture_cache: bool = Field(default=True, description="False forca nova captura ignorando o cache")
+    use_llm_cache: bool = Field(default=True, description="False forca nova chamada ao modelo ignorando o cache")
+    extraction_mode: str | None = Field(
+        default=None,
+        pattern="^(auto|single|chunked)$",
+        description="chunked = map-reduce em trechos para paginas longas (padrao: EXTRACTION_MODE)",
+    )
+    use_cascade: bool | None = Field(
+        default=None,
+        description="Passada so com texto antes, screenshot apenas se a qualidade nao basta (padrao: CASCADE_ENABLED)",
+    )
+    use_templates: bool | None = Field(
+        default=None,
+        description="Extrai com o template aprendido do dominio, sem LLM, quando existir (padrao: TEMPLATES_ENABLED)",
+    )
 
 
 app.add_middleware(
@@ -118,12 +271,59 @@ async def home() -> dict[str, str]:
     }
 
 
+@app.on_event("shutdown")
+async def shutdown() -> None:
+    """Fecha recursos compartilhados do processo."""
+    await shutdown_shared_resources()
+
+
 @app.get("/health")
 async def health() -> dict[str, str]:
     """Health check simples para diagnostico local."""
     return {"status": "ok"}
 
 
+@app.get("/health/browser-pool")
+async def browser_pool_health() -> dict[str, Any]:
+    """Estado do pool de browsers (instancias, contextos, reciclagens)."""
+    pool = current_browser_pool()
+    return pool.stats() if pool is not None else {"running": False}
+
+
+@app.get("/health/capture-workers")
+async def capture_workers_health() -> dict[str, Any]:
+    """Vazao e profundidade de fila por shard dos workers de captura."""
+    if settings.CAPTURE_WORKERS <= 0:
+        return {"workers": 0, "shards": []}
+    return get_capture_workers().stats()
+
+
+@app.get("/health/llm")
+async def llm_health() -> dict[str, Any]:
+    """Chamadas ao modelo em andamento/aguardando e clientes em cache."""
+    return get_llm_pool().stats()
+
+
+@app.get("/health/capture-cache")
+async def capture_cache_health() -> dict[str, Any]:
+    """Contadores do cache de captura (hits, revalidacoes, misses, tamanho)."""
+    if not settings.CAPTURE_CACHE_ENABLED:
+        return {"enabled": False}
+    return {"enabled": True, **get_capture_cache().stats()}
+
+
+@app.get("/health/llm-cache")
+async def llm_cache_health() -> dict[str, Any]:
+    """Hit ratio, tokens economizados e tamanho do cache de respostas do modelo."""
+    return get_llm_cache().stats()
+
+
+@app.get("/health/templates")
+async def templates_health() -> dict[str, Any]:
+    """Templates por dominio carregados e contadores de hits, fallbacks e aprendizado."""
+    return get_template_store().stats()
+
+
 import json
 import os
 from pathlib import Path
@@ -175,6 +375,86 @@ async def update_prompts(payload: PromptUpdateRequest) -> dict[str, bool]:
 
 # ... (update scrape function to use get_effective_prompt)
 
+def _scrape_kwargs(payload: ScrapeRequest) -> dict[str, Any]:
+    return {
+        "url": payload.url,
+        "extraction_goal": payload.user_prompt,
+        "wait_until": payload.wait_until,
+        "timeout": payload.timeout,
+        "full_page": payload.full_page,
+        "screenshot_quality": payload.screenshot_quality,
+        "auto_scroll": payload.auto_scroll,
+        "scroll_steps": payload.scroll_steps,
+        "output_format": payload.output_format,
+        "capture_mode": payload.capture_mode,
+        "capture_profile": payload.capture_profile,
+        "use_capture_cache": payload.use_capture_cache,
+        "use_llm_cache": payload.use_llm_cache,
+        "extra_metadata": {"source": payload.source},
+    }
+
+
+def _record_scrape_metrics(result: dict[str, Any], elapsed: float) -> None:
+    """Atualiza as metricas Prometheus a partir do resultado de um scrape."""
+    SCRAPE_DURATION_SECONDS.observe(elapsed)
+    metadata = result.get("metadata", {})
+    page_metadata = metadata.get("page") or {}
+    cache_state = (page_metadata.get("capture_cache") or {}).get("state")
+    if cache_state:
+        SCRAPE_CAPTURE_CACHE_TOTAL.labels(state=cache_state).inc()
+    capture_path = page_metadata.get("capture_path")
+    if cache_state in ("hit", "revalidated"):
+        capture_path = "cache"
+    if capture_path:
+        SCRAPE_CAPTURE_PATH_TOTAL.labels(path=capture_path).inc()
+    profile = page_metadata.get("capture_profile") or {}
+    if profile.get("duration_ms") is not None and cache_state not in ("hit", "revalidated"):
+        SCRAPE_CAPTURE_BYTES_TOTAL.labels(profile=profile["name"]).inc(profile.get("bytes") or 0)
+        SCRAPE_CAPTURE_DURATION_SECONDS.labels(profile=profile["name"]).observe(profile["duration_ms"] / 1000)
+    llm_cache = metadata.get("llm_cache") or {}
+    if llm_cache.get("state"):
+        SCRAPE_LLM_CACHE_TOTAL.labels(state=llm_cache["state"]).inc()
+        SCRAPE_LLM_TOKENS_SAVED_TOTAL.inc(llm_cache.get("tokens_saved") or 0)
+    for path, count in (metadata.get("json_parse") or {}).items():
+        SCRAPE_LLM_JSON_PARSE_TOTAL.labels(path=path).inc(count)
+    for tier in (metadata.get("cascade") or {}).get("tiers", []):
+        SCRAPE_CASCADE_TIER_TOTAL.labels(tier=tier["tier"], outcome=tier["outcome"]).inc()
+        SCRAPE_CASCADE_TIER_LATENCY_SECONDS.labels(tier=tier["tier"]).observe(tier["llm_ms"] / 1000)
+        SCRAPE_CASCADE_TIER_COST_USD_TOTAL.labels(tier=tier["tier"]).inc(tier["cost_usd"])
+    for template in [metadata.get("template"), *(page.get("template") for page in metadata.get("pages") or [])]:
+        if template:
+            SCRAPE_TEMPLATE_TOTAL.labels(state=template["state"]).inc()
+            if template.get("fallback"):
+                SCRAPE_TEMPLATE_TOTAL.labels(state="fallback").inc()
+    chunked = metadata.get("chunked") or {}
+    if chunked.get("chunks"):
+        SCRAPE_EXTRACTION_CHUNKS.observe(chunked["chunks"])
+    prompt_cache = metadata.get("prompt_cache") or {}
+    if prompt_cache.get("llm_ms") is not None:
+        cached_tokens = prompt_cache.get("cached_tokens") or 0
+        SCRAPE_LLM_CACHED_INPUT_TOKENS_TOTAL.inc(cached_tokens)
+        SCRAPE_LLM_LATENCY_SECONDS.labels(prompt_cache="hit" if cached_tokens else "miss").observe(
+            prompt_cache["llm_ms"] / 1000
+        )
+    vision = metadata.get("vision") or {}
+    if vision.get("sent"):
+        SCRAPE_VISION_TOKENS_TOTAL.labels(detail=vision.get("detail") or "high").inc(vision.get("estimated_tokens") or 0)
+    cost = float(metadata.get("cost_usd", 0) or 0)
+    if cost > 0:
+        SCRAPE_COST_USD_TOTAL.inc(cost)
+    if result.get("success"):
+        SCRAPE_REQUESTS_TOTAL.labels(status="success", error_type="none").inc()
+    else:
+        err = str(metadata.get("error_type", "unknown"))
+        SCRAPE_REQUESTS_TOTAL.labels(status="error", error_type=err).inc()
+        if err == "validation":
+            SCRAPE_VALIDATION_FAILURES_TOTAL.inc()
+
+
+def _sse(event: str, data: dict[str, Any]) -> str:
+    return f"event: {event}\ndata: {json.dumps(data, ensure_ascii=False, default=str)}\n\n"
+
+
 @app.post("/api/scrape")
 async def scrape(payload: ScrapeRequest) -> dict[str, Any]:
     """Executa scraping com parametros enviados pela interface."""
@@ -188,35 +468,53 @@ async def scrape(payload: ScrapeRequest) -> dict[str, Any]:
     scraper = ScraperOrchestrator(with_storage=True, api_key=payload.api_key)
     # ... (rest of the function)
     result = await scraper.scrape(
-        url=payload.url,
         schema=schema_cls,
         system_prompt=system_prompt,
-        extraction_goal=payload.user_prompt,
-        wait_until=payload.wait_until,
-        timeout=payload.timeout,
-        full_page=payload.full_page,
-        screenshot_quality=payload.screenshot_quality,
-        auto_scroll=payload.auto_scroll,
-        scroll_steps=payload.scroll_steps,
-        output_format=payload.output_format,
-        extra_metadata={"source": payload.source},
+        extraction_mode=payload.extraction_mode,
+        use_cascade=payload.use_cascade,
+        use_templates=payload.use_templates,
+        max_pages=payload.max_pages,
+        **_scrape_kwargs(payload),
     )
-    elapsed = time.perf_counter() - start
-    SCRAPE_DURATION_SECONDS.observe(elapsed)
-    metadata = result.get("metadata", {})
-    cost = float(metadata.get("cost_usd", 0) or 0)
-    if cost > 0:
-        SCRAPE_COST_USD_TOTAL.inc(cost)
-    if result.get("success"):
-        SCRAPE_REQUESTS_TOTAL.labels(status="success", error_type="none").inc()
-    else:
-        err = str(metadata.get("error_type", "unknown"))
-        SCRAPE_REQUESTS_TOTAL.labels(status="error", error_type=err).inc()
-        if err == "validation":
-            SCRAPE_VALIDATION_FAILURES_TOTAL.inc()
+    _record_scrape_metrics(result, time.perf_counter() - start)
     return result
 
 
+@app.post("/api/scrape/stream", response_model=None)
+async def scrape_stream(payload: ScrapeRequest) -> StreamingResponse | dict[str, Any]:
+    """Scraping com os itens enviados por Server-Sent Events conforme o modelo os gera.
+
+    Eventos: `capture`, um `item` por registro validado e `result` (payload final
+    igual ao de `/api/scrape`). Uma pagina, sem retry. Nao se aplicam: `max_pages`
+    (paginacao), `extraction_mode` (map-reduce), `use_cascade` e `use_templates`.
+    PDFs usam as paginas mais relevantes para o objetivo, como em `/api/scrape`.
+    """
+    schema_cls = SCHEMA_MAP.get(payload.schema_name)
+    if not schema_cls:
+        return {"success": False, "error": f"Schema invalido: {payload.schema_name}"}
+
+    system_prompt = get_effective_prompt(payload.prompt)
+    scraper = ScraperOrchestrator(with_storage=True, api_key=payload.api_key)
+
+    async def events() -> AsyncIterator[str]:
+        start = time.perf_counter()
+        stream = scraper.scrape_stream(schema=schema_cls, system_prompt=system_prompt, **_scrape_kwargs(payload))
+        async for event in stream:
+            name = event.pop("event")
+            if name == "result":
+                _record_scrape_metrics(event, time.perf_counter() - start)
+                first_item_ms = event["metadata"]["streaming"]["time_to_first_item_ms"]
+                if first_item_ms is not None:
+                    SCRAPE_TIME_TO_FIRST_ITEM_SECONDS.observe(first_item_ms / 1000)
+            yield _sse(name, event)
+
+    return StreamingResponse(
+        events(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
 @app.get("/api/history")
 async def history(limit: int = 20, success: bool | None = None, domain: str | None = None) -> dict[str, Any]:
     """Retorna historico recente salvo no SQLite."""
@@ -230,6 +528,10 @@ async def history(limit: int = 20, success: bool | None = None, domain: str | No
 @app.get("/metrics")
 async def metrics() -> Response:
     """Endpoint Prometheus."""
+    if settings.CAPTURE_WORKERS > 0:
+        for shard in get_capture_workers().stats()["shards"]:
+            CAPTURE_WORKER_QUEUE_DEPTH.labels(shard=str(shard["shard"])).set(shard["queue_depth"])
+            CAPTURE_WORKER_COMPLETED.labels(shard=str(shard["shard"])).set(shard["completed"])
     return Response(generate_latest(), media_type=CONTENT_TYPE_LATEST)
 
 
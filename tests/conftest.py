@@ -0,0 +1,9 @@
+"""Configuracao comum dos testes."""
+import os
+import tempfile
+
+# Settings exige a chave; os testes nao fazem chamadas reais ao modelo.
+os.environ.setdefault("OPENAI_API_KEY", "test-key")
+
+# Log dos testes fora de logs/ (o arquivo do repositorio nao deve mudar a cada execucao).
+os.environ["LOG_FILE"] = os.path.join(tempfile.mkdtemp(prefix="scraper-tests-"), "scraper.log")
@@ -0,0 +1,64 @@
+import json
+
+from src.core.ax_serializer import serialize_ax_tree
+
+TREE = {
+    "role": "WebArea",
+    "name": "Loja",
+    "children": [
+        {"role": "navigation", "name": "", "children": [
+            {"role": "link", "name": "Inicio", "url": "https://loja.com/"},
+            {"role": "generic", "name": "", "children": [
+                {"role": "link", "name": "", "url": "https://loja.com/ofertas", "children": [
+                    {"role": "text", "name": "Ofertas"},
+                ]},
+            ]},
+        ]},
+        {"role": "main", "name": "", "children": [
+            {"role": "heading", "name": "Produtos", "level": 1},
+            {"role": "generic", "name": "", "children": []},
+            {"role": "paragraph", "name": "", "children": [
+                {"role": "text", "name": "Preco"},
+                {"role": "text", "name": "R$ 10"},
+            ]},
+            {"role": "textbox", "name": "Buscar", "value": "tenis"},
+        ]},
+    ],
+}
+
+
+def test_outline_prunes_generic_nodes_and_merges_text():
+    outline, stats = serialize_ax_tree(TREE, max_chars=10_000)
+    assert outline.splitlines() == [
+        "navigation",
+        '  link "Inicio" <https://loja.com/>',
+        '  link "Ofertas" <https://loja.com/ofertas>',
+        "main",
+        '  heading1 "Produtos"',
+        '  paragraph "Preco R$ 10"',
+        '  textbox "Buscar" [tenis]',
+    ]
+    assert stats["json_chars"] == len(json.dumps(TREE, ensure_ascii=False))
+    assert stats["outline_chars"] < stats["json_chars"]
+    assert not stats["truncated"]
+
+
+def test_budget_keeps_priority_nodes_first():
+    tree = {
+        "role": "WebArea",
+        "name": "",
+        "children": [{"role": "paragraph", "name": f"Texto longo {i} " * 5} for i in range(50)]
+        + [{"role": "main", "name": "", "children": [{"role": "button", "name": "Comprar"}]}],
+    }
+    outline, stats = serialize_ax_tree(tree, max_chars=400)
+    assert len(outline) <= 400
+    assert 'button "Comprar"' in outline
+    assert outline.index("paragraph") < outline.index("main")
+    assert stats["truncated"] and stats["lines_omitted"] > 0
+    assert outline.endswith("linhas omitidas)")
+
+
+def test_empty_tree_returns_empty_outline():
+    outline, stats = serialize_ax_tree(None)
+    assert outline == ""
+    assert stats["outline_chars"] == 0
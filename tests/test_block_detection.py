@@ -0,0 +1,37 @@
+from src.core.block_detection import BlockDetector, BlockEvidence
+
+
+def test_captcha_word_boundary_matches():
+    detector = BlockDetector()
+    assert detector.detect(BlockEvidence(status=200, title="Captcha", text="Resolva o captcha abaixo"))
+    assert detector.detect(BlockEvidence(status=200, text="recaptchaless widget")) is None
+
+
+def test_status_and_headers_fail_fast_without_dom():
+    detector = BlockDetector()
+    assert "429" in detector.detect(BlockEvidence(status=429))
+    reason = detector.detect(BlockEvidence(status=200, headers={"CF-Mitigated": "challenge"}))
+    assert "cloudflare" in reason.lower()
+
+
+def test_challenge_resources_on_thin_page():
+    detector = BlockDetector()
+    evidence = BlockEvidence(
+        status=200,
+        text="Um momento",
+        resource_urls=["https://example.com/cdn-cgi/challenge-platform/h/b/orchestrate/jsch/v1"],
+    )
+    assert "challenge-platform" in detector.detect(evidence)
+
+
+def test_long_content_page_is_not_flagged_by_markers():
+    detector = BlockDetector()
+    article = "Como funciona um captcha e por que sites o usam. " * 200
+    evidence = BlockEvidence(status=200, title="Blog", text=article, resource_urls=["https://www.google.com/recaptcha/api.js"])
+    assert detector.detect(evidence) is None
+
+
+def test_custom_detector_can_be_registered():
+    detector = BlockDetector()
+    detector.register(lambda ev: "paywall" if "assine" in ev.text else None, first=True)
+    assert detector.detect(BlockEvidence(status=200, text="Assine para continuar".lower())) == "paywall"
@@ -0,0 +1,74 @@
+import asyncio
+
+from src.config.settings import settings
+from src.core.blocking import BlockingPolicy, apply_blocking_policy
+
+
+def test_default_policy_blocks_types_and_trackers():
+    patterns = BlockingPolicy.for_domain("loja.com.br").url_patterns()
+    assert "*.woff2" in patterns
+    assert "*.png?*" in patterns
+    assert "*://*.doubleclick.net/*" in patterns
+    assert "*.css" not in patterns
+
+
+def test_domain_override_applies_to_subdomains(monkeypatch):
+    monkeypatch.setattr(
+        settings,
+        "BLOCKING_DOMAIN_OVERRIDES",
+        {"loja.com.br": {"allow_types": ["image"], "allow_hosts": ["googletagmanager.com"]}},
+    )
+    patterns = BlockingPolicy.for_domain("www.loja.com.br").url_patterns()
+    assert "*.png" not in patterns
+    assert "*://googletagmanager.com/*" not in patterns
+    assert "*.woff2" in patterns
+
+
+class _FakeCDP:
+    def __init__(self):
+        self.sent = []
+        self.handlers = {}
+
+    async def send(self, method, params=None):
+        self.sent.append(method)
+
+    def on(self, event, handler):
+        self.handlers[event] = handler
+
+
+class _FakeContext:
+    def __init__(self, cdp):
+        self.cdp = cdp
+
+    async def new_cdp_session(self, page):
+        return self.cdp
+
+
+class _FakePage:
+    """Sem `on`: nenhum listener por request pode ser registrado na pagina."""
+
+    def __init__(self):
+        self.init_scripts = []
+
+    async def add_init_script(self, script):
+        self.init_scripts.append(script)
+
+
+def test_cdp_blocking_counts_only_failed_requests_in_python():
+    cdp = _FakeCDP()
+    page = _FakePage()
+
+    stats = asyncio.run(apply_blocking_policy(_FakeContext(cdp), page, BlockingPolicy()))
+    failed = cdp.handlers["Network.loadingFailed"]
+    failed({"type": "Image", "errorText": "net::ERR_BLOCKED_BY_CLIENT", "blockedReason": "inspector"})
+    failed({"type": "Font", "errorText": "net::ERR_BLOCKED_BY_CLIENT"})
+    failed({"type": "XHR", "errorText": "net::ERR_CONNECTION_RESET"})
+    stats.allowed = 12
+
+    assert cdp.sent == ["Network.enable", "Network.setBlockedURLs"]
+    assert list(cdp.handlers) == ["Network.loadingFailed"]
+    assert "setResourceTimingBufferSize" in page.init_scripts[0]
+    summary = stats.as_dict()
+    assert summary["blocked_by_type"] == {"image": 1, "font": 1}
+    assert summary["allowed"] == 12
+    assert summary["bytes_saved_estimate"] == 80_000
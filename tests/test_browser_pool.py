@@ -0,0 +1,162 @@
+import asyncio
+import gc
+
+from src.core import browser_pool as browser_pool_module
+from src.core.browser_pool import BrowserPool
+from src.core.orchestrator import ScraperOrchestrator
+
+
+class _FakeContext:
+    def __init__(self, browser):
+        self.browser = browser
+
+    async def close(self):
+        self.browser.open_contexts -= 1
+
+
+class _FakeBrowser:
+    def __init__(self, number):
+        self.number = number
+        self.connected = True
+        self.closed = False
+        self.open_contexts = 0
+        self._on_disconnected = None
+
+    def on(self, event, callback):
+        assert event == "disconnected"
+        self._on_disconnected = callback
+
+    def is_connected(self):
+        return self.connected
+
+    async def new_context(self, **_):
+        self.open_contexts += 1
+        return _FakeContext(self)
+
+    async def close(self):
+        self.closed = True
+
+    def crash(self):
+        self.connected = False
+        self._on_disconnected(self)
+
+
+class _FakePlaywright:
+    def __init__(self):
+        self.browsers = []
+        self.stopped = False
+        self.chromium = self
+
+    async def launch(self, **_):
+        browser = _FakeBrowser(len(self.browsers) + 1)
+        self.browsers.append(browser)
+        return browser
+
+    async def start(self):
+        return self
+
+    async def stop(self):
+        self.stopped = True
+
+
+def _pool(monkeypatch, **options):
+    playwright = _FakePlaywright()
+    monkeypatch.setattr(browser_pool_module, "async_playwright", lambda: playwright)
+    return BrowserPool(**options), playwright
+
+
+def test_leases_reuse_browser_and_recycle_after_page_limit(monkeypatch):
+    pool, playwright = _pool(monkeypatch, size=1, contexts_per_browser=2, max_pages_per_browser=2)
+
+    async def run():
+        for _ in range(3):
+            async with pool.lease() as context:
+                assert context.browser.open_contexts == 1
+        stats = pool.stats()
+        await pool.close()
+        return stats
+
+    stats = asyncio.run(run())
+
+    assert [browser.number for browser in playwright.browsers] == [1, 2]
+    assert playwright.browsers[0].closed
+    assert stats["launches"] == 2
+    assert stats["recycles"] == 1
+    assert stats["leases_total"] == 3
+    assert playwright.stopped
+
+
+def test_recycled_browser_drains_before_closing(monkeypatch):
+    pool, playwright = _pool(monkeypatch, size=1, contexts_per_browser=2, max_pages_per_browser=1)
+
+    async def run():
+        first_done = asyncio.Event()
+        states = {}
+
+        async def short():
+            async with pool.lease():
+                pass
+            first_done.set()
+
+        async def long():
+            async with pool.lease():
+                await first_done.wait()
+                browser = playwright.browsers[0]
+                states["during"] = (browser.closed, pool.stats()["draining"])
+            states["after"] = (playwright.browsers[0].closed, pool.stats()["draining"])
+
+        await asyncio.gather(long(), short())
+        await pool.close()
+        return states
+
+    states = asyncio.run(run())
+
+    # Reciclado com um contexto ainda emprestado: so fecha quando ele termina.
+    assert states["during"] == (False, 1)
+    assert states["after"] == (True, 0)
+    assert len(playwright.browsers) == 1
+
+
+def test_crashed_browser_is_replaced_on_next_lease(monkeypatch):
+    pool, playwright = _pool(monkeypatch, size=1, contexts_per_browser=1, max_pages_per_browser=100)
+
+    async def run():
+        async with pool.lease():
+            pass
+        playwright.browsers[0].crash()
+        assert pool.stats()["instances"][0]["state"] == "crashed"
+        async with pool.lease() as context:
+            number = context.browser.number
+        stats = pool.stats()
+        await pool.close()
+        return number, stats
+
+    number, stats = asyncio.run(run())
+
+    assert number == 2
+    assert stats["crashes"] == 1
+    assert playwright.browsers[0].closed
+
+
+def test_orchestrator_close_shuts_down_shared_pool_only_when_last(monkeypatch):
+    playwright = _FakePlaywright()
+    monkeypatch.setattr(browser_pool_module, "async_playwright", lambda: playwright)
+    # Orquestradores de outros testes, ja fora de uso, nao seguram os recursos.
+    gc.collect()
+
+    async def run():
+        other = ScraperOrchestrator(with_storage=False)
+        async with ScraperOrchestrator(with_storage=False):
+            async with browser_pool_module.get_browser_pool().lease():
+                pass
+        still_running = browser_pool_module.current_browser_pool() is not None
+        await other.close()
+        return still_running
+
+    still_running = asyncio.run(run())
+
+    # O primeiro a fechar nao derruba o pool que `other` ainda usa.
+    assert still_running
+    assert playwright.stopped
+    assert playwright.browsers[0].closed
+    assert browser_pool_module.current_browser_pool() is None
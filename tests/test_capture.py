@@ -0,0 +1,78 @@
+import asyncio
+
+from src.core.capture import CAPTURE_BUNDLE_SCRIPT, capture_page_bundle
+from src.core.capture_profiles import get_capture_profile
+
+TREE = {
+    "role": "WebArea",
+    "name": "Loja",
+    "children": [{
+        "role": "main",
+        "name": "",
+        "children": [
+            {"role": "heading", "name": "Celular", "level": 1},
+            {"role": "link", "name": "Comprar", "url": "https://x.com/p"},
+        ],
+    }],
+}
+
+
+class _StubPage:
+    """Responde ao evaluate como o script do bundle, respeitando as flags do perfil."""
+
+    def __init__(self, structure):
+        self.structure = structure
+        self.calls = []
+
+    async def evaluate(self, script, opts):
+        assert script == CAPTURE_BUNDLE_SCRIPT
+        self.calls.append(opts)
+        structure = self.structure if opts["includeStructure"] else {"role": "WebArea", "children": []}
+        want_html = opts["includeHtml"] or (opts["includeStructure"] and not structure["children"])
+        return {
+            "title": "Loja ç",
+            "text": "Celular Comprar",
+            "images": ["https://x.com/a.png"] if opts["includeImages"] else [],
+            "html": "<main><h1>Celular</h1></main>" if want_html else "",
+            "htmlTotalChars": 120 if want_html else 0,
+            "structure": structure,
+            "structureNodes": 3,
+            "resourceRequests": 7,
+            "viewport": {"width": 1920, "height": 1080},
+        }
+
+
+def test_bundle_serializes_structure_and_measures_bytes():
+    page = _StubPage(TREE)
+
+    bundle = asyncio.run(capture_page_bundle(page, profile=get_capture_profile("vision")))
+
+    assert page.calls[0]["includeHtml"] is False
+    assert page.calls[0]["includeStructure"] is True
+    assert page.calls[0]["includeImages"] is True
+    assert bundle["accessibility_snapshot"] == 'main\n  heading1 "Celular"\n  link "Comprar" <https://x.com/p>'
+    assert bundle["html"] == ""
+    assert bundle["image_urls"] == ["https://x.com/a.png"]
+    metrics = bundle["metrics"]
+    assert metrics["profile"] == "vision"
+    assert metrics["round_trips"] == 1
+    assert metrics["structure_nodes"] == 3
+    assert metrics["resource_requests"] == 7
+    assert metrics["accessibility"]["lines"] == 3
+    assert metrics["bytes"]["title"] == len("Loja ç".encode("utf-8"))
+    assert metrics["bytes"]["accessibility"] == len(bundle["accessibility_snapshot"])
+    assert metrics["bytes"]["image_urls"] == len("https://x.com/a.png")
+
+
+def test_empty_structure_falls_back_to_html():
+    page = _StubPage({"role": "WebArea", "name": "Loja", "children": []})
+
+    bundle = asyncio.run(capture_page_bundle(page, profile=get_capture_profile("text_ax")))
+
+    assert bundle["accessibility_snapshot"] == ""
+    assert bundle["html"] == "<main><h1>Celular</h1></main>"
+    assert bundle["image_urls"] == []
+    assert bundle["metrics"]["html_total_chars"] == 120
+    assert bundle["metrics"]["html_truncated"] is False
+    assert bundle["metrics"]["bytes"]["html"] == len(bundle["html"])
+    assert bundle["metrics"]["bytes"]["accessibility"] == 0
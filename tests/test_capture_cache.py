@@ -0,0 +1,124 @@
+import asyncio
+
+from src.core.capture_cache import CaptureCache, cache_key, normalize_url
+
+OPTIONS = {"full_page": False, "auto_scroll": True, "scroll_steps": 6, "execute_js": None}
+
+
+def _capture(text: str, etag: str | None = '"v1"', status: int = 200):
+    metadata = {"status": status, "etag": etag, "last_modified": None, "capture_path": "browser"}
+    return "b64", "<html></html>", text, "", ["https://img/1.png"], metadata
+
+
+def test_normalize_url_drops_fragment_and_tracking_params():
+    assert normalize_url("HTTPS://Example.com?b=2&utm_source=x&a=1#top") == "https://example.com/?a=1&b=2"
+
+
+def test_key_ignores_options_that_do_not_change_capture():
+    base = cache_key("https://example.com/", OPTIONS)
+    assert cache_key("https://example.com/", {**OPTIONS, "timeout": 5000}) == base
+    assert cache_key("https://example.com/", {**OPTIONS, "full_page": True}) != base
+    # Captura do caminho HTTP nao serve a quem pediu o browser.
+    static = cache_key("https://example.com/", {**OPTIONS, "capture_mode": "static_first"})
+    assert static != cache_key("https://example.com/", {**OPTIONS, "capture_mode": "browser"})
+
+
+def test_hit_within_ttl_and_survives_restart(tmp_path):
+    async def scenario():
+        cache = CaptureCache(directory=str(tmp_path), ttl_seconds=60)
+        assert await cache.get("https://example.com", OPTIONS) is None
+        await cache.put("https://example.com", OPTIONS, _capture("conteudo"))
+        hit = await cache.get("https://example.com/#x", OPTIONS)
+        reopened = CaptureCache(directory=str(tmp_path), ttl_seconds=60)
+        return hit, await reopened.get("https://example.com", OPTIONS), cache.stats()
+
+    hit, reloaded, stats = asyncio.run(scenario())
+    assert hit[2] == "conteudo"
+    assert hit[5]["capture_cache"]["state"] == "hit"
+    assert reloaded[2] == "conteudo"
+    assert stats["hits"] == 1 and stats["misses"] == 1
+
+
+def test_stale_entry_is_reused_on_304_and_dropped_otherwise(tmp_path):
+    calls = []
+
+    async def not_modified(url, etag, last_modified):
+        calls.append(etag)
+        return 304
+
+    async def changed(url, etag, last_modified):
+        return 200
+
+    async def scenario():
+        cache = CaptureCache(directory=str(tmp_path), ttl_seconds=0)
+        await cache.put("https://a.com", OPTIONS, _capture("a"))
+        revalidated = await cache.get("https://a.com", OPTIONS, revalidator=not_modified)
+        await cache.put("https://b.com", OPTIONS, _capture("b"))
+        dropped = await cache.get("https://b.com", OPTIONS, revalidator=changed)
+        return revalidated, dropped, cache.stats()
+
+    revalidated, dropped, stats = asyncio.run(scenario())
+    assert calls == ['"v1"']
+    assert revalidated[5]["capture_cache"]["state"] == "revalidated"
+    assert dropped is None
+    assert stats["revalidated"] == 1 and stats["stale"] == 1 and stats["entries"] == 1
+
+
+def test_size_cap_evicts_least_recently_used(tmp_path):
+    async def scenario():
+        cache = CaptureCache(directory=str(tmp_path), ttl_seconds=60)
+        await cache.put("https://a.com", OPTIONS, _capture("a" * 200))
+        cache.max_bytes = cache.stats()["bytes"] * 2 + 10
+        await cache.put("https://b.com", OPTIONS, _capture("b" * 200))
+        await cache.get("https://a.com", OPTIONS)
+        await cache.put("https://c.com", OPTIONS, _capture("c" * 200))
+        return [await cache.get(u, OPTIONS) is not None for u in ("https://a.com", "https://b.com", "https://c.com")], cache.stats()
+
+    present, stats = asyncio.run(scenario())
+    assert present == [True, False, True]
+    assert stats["evictions"] >= 1
+    assert stats["entries"] == 2
+
+
+def test_error_responses_are_not_cached(tmp_path):
+    async def scenario():
+        cache = CaptureCache(directory=str(tmp_path), ttl_seconds=60)
+        await cache.put("https://x.com", OPTIONS, _capture("erro", status=503))
+        return await cache.get("https://x.com", OPTIONS)
+
+    assert asyncio.run(scenario()) is None
+
+
+def test_hit_reports_reuse_in_metadata(tmp_path):
+    async def scenario():
+        cache = CaptureCache(directory=str(tmp_path), ttl_seconds=60)
+        await cache.put("https://example.com", OPTIONS, _capture("conteudo"))
+        return await cache.get("https://example.com", OPTIONS)
+
+    info = asyncio.run(scenario())[5]["capture_cache"]
+    assert info["reused"] is True
+    assert info["ttl_seconds"] == 60
+    assert info["age_seconds"] >= 0
+
+
+def test_concurrent_puts_and_drops_keep_index_consistent(tmp_path):
+    async def changed(url, etag, last_modified):
+        return 200
+
+    async def scenario():
+        seeded = CaptureCache(directory=str(tmp_path), ttl_seconds=60)
+        await seeded.put("https://antigo.com", OPTIONS, _capture("antigo"))
+        # Processo novo: o primeiro acesso carrega o indice enquanto outros gravam.
+        cache = CaptureCache(directory=str(tmp_path), ttl_seconds=60)
+        urls = [f"https://site{i % 5}.com" for i in range(30)]
+        await asyncio.gather(*(cache.put(url, OPTIONS, _capture(url * (i + 1))) for i, url in enumerate(urls)))
+        stored = cache.stats()
+        cache.ttl_seconds = 0
+        await asyncio.gather(*(cache.get(url, OPTIONS, revalidator=changed) for url in urls[:10]))
+        return stored, cache.stats()
+
+    stored, dropped = asyncio.run(scenario())
+    sizes = [path.stat().st_size for path in tmp_path.glob("*.json")]
+    assert stored["entries"] == 6
+    assert dropped["entries"] == len(sizes) == 1
+    assert dropped["bytes"] == sum(sizes)
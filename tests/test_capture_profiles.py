@@ -0,0 +1,46 @@
+from src.core.capture_profiles import (
+    apply_capture_profile,
+    get_capture_profile,
+    resolve_capture_profile,
+    schema_wants_images,
+)
+from src.models.custom import GenericListPage, GuidedExtractionResult
+from src.models.product import ProductListPage
+
+
+def test_schema_image_fields_are_found_in_nested_models():
+    assert schema_wants_images(ProductListPage)
+    assert not schema_wants_images(GuidedExtractionResult)
+
+
+def test_auto_profile_follows_output_format_and_schema():
+    assert resolve_capture_profile("auto", GenericListPage, "summary") == "text_ax"
+    assert resolve_capture_profile("auto", ProductListPage, "summary") == "vision"
+    assert resolve_capture_profile(None, GenericListPage, "report") == "vision"
+    assert resolve_capture_profile("text_only", GenericListPage, "report") == "text_only"
+
+
+def test_needs_html_adds_html_to_profiles_without_it():
+    assert resolve_capture_profile("auto", GenericListPage, "summary", needs_html=True) == "text_ax+html"
+    assert resolve_capture_profile("full", GenericListPage, "list", needs_html=True) == "full"
+    profile = get_capture_profile("vision+html")
+    assert profile.html and profile.screenshot and profile.name == "vision+html"
+    assert "html" not in profile.skipped()
+
+
+def test_explicit_html_variant_is_kept():
+    assert resolve_capture_profile("vision+html", GenericListPage, "summary") == "vision+html"
+    assert resolve_capture_profile("text_ax+html", GenericListPage, "list") == "text_ax+html"
+    assert resolve_capture_profile("full+html", GenericListPage, "list") == "full"
+    assert resolve_capture_profile("nada+html", GenericListPage, "summary") == "text_ax"
+
+
+def test_apply_profile_keeps_html_only_as_structure_fallback():
+    captured = ("b64", "<p>x</p>", "texto", "", ["https://img/1.png"], {})
+    screenshot, html, text, ax, images, metadata = apply_capture_profile(captured, get_capture_profile("text_ax"))
+    assert (screenshot, html, text, ax, images) == ("", "<p>x</p>", "texto", "", [])
+    assert metadata["capture_profile"]["skipped"] == ["screenshot", "html", "images"]
+
+    with_ax = ("", "<p>x</p>", "texto", 'main\n  heading1 "X"', [], {})
+    assert apply_capture_profile(with_ax, get_capture_profile("vision"))[1] == ""
+    assert apply_capture_profile(captured, get_capture_profile("text_only"))[1] == ""
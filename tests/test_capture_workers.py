@@ -0,0 +1,102 @@
+import asyncio
+import os
+import time
+
+from src.core.capture_workers import CaptureWorkerPool, shard_for
+from src.core.errors import BlockedScraperError, NetworkScraperError
+
+
+async def fake_capture(url, options):
+    if "blocked" in url:
+        raise BlockedScraperError("challenge")
+    await asyncio.sleep(0.01)
+    return "", "", f"{url} via {os.getpid()}", "", [], {"pid": os.getpid(), **options}
+
+
+def test_shard_is_stable_per_domain():
+    assert shard_for("https://www.loja.com/a", 4) == shard_for("https://loja.com/b?x=1", 4)
+    assert {shard_for(f"https://site{i}.com", 4) for i in range(40)} == {0, 1, 2, 3}
+
+
+def test_workers_capture_in_child_processes_and_rebuild_errors():
+    async def scenario():
+        pool = CaptureWorkerPool(workers=2, concurrency=2, handler=fake_capture)
+        try:
+            results = await asyncio.gather(
+                *(pool.capture(f"https://site{i}.com/p", full_page=True) for i in range(6))
+            )
+            try:
+                await pool.capture("https://blocked.com/")
+            except BlockedScraperError as exc:
+                blocked = str(exc)
+            return results, blocked, pool.stats()
+        finally:
+            await pool.close()
+
+    results, blocked, stats = asyncio.run(scenario())
+    assert all(meta["pid"] != os.getpid() and meta["full_page"] for *_, meta in results)
+    assert blocked == "challenge"
+    assert sum(shard["completed"] for shard in stats["shards"]) == 6
+    assert sum(shard["failed"] for shard in stats["shards"]) == 1
+    assert stats["queue_depth"] == 0
+
+
+async def crashing_or_slow_capture(url, options):
+    if "crash" in url:
+        await asyncio.sleep(0.1)
+        os._exit(1)
+    await asyncio.sleep(2 if "slow" in url else 0.05)
+    return "", "", url, "", [], {"pid": os.getpid()}
+
+
+def _url_on_shard(prefix, shard, shards=2):
+    return next(
+        f"https://{prefix}{i}.com/" for i in range(100) if shard_for(f"https://{prefix}{i}.com/", shards) == shard
+    )
+
+
+def test_crash_is_detected_while_other_shard_keeps_returning_results():
+    crash_url = _url_on_shard("crash", 0)
+    busy_url = _url_on_shard("busy", 1)
+
+    async def scenario():
+        pool = CaptureWorkerPool(workers=2, concurrency=1, handler=crashing_or_slow_capture)
+        try:
+            await pool.start()
+            stop = asyncio.Event()
+
+            async def keep_busy():
+                while not stop.is_set():
+                    await pool.capture(busy_url)
+
+            busy = asyncio.create_task(keep_busy())
+            started = time.monotonic()
+            try:
+                await pool.capture(crash_url)
+            except NetworkScraperError as exc:
+                error, elapsed = str(exc), time.monotonic() - started
+            stop.set()
+            await busy
+            return error, elapsed, pool.stats()
+        finally:
+            await pool.close()
+
+    error, elapsed, stats = asyncio.run(scenario())
+    assert "caiu" in error
+    assert elapsed < 3
+    assert stats["shards"][0]["restarts"] == 1
+    assert stats["shards"][1]["completed"] > 0
+
+
+def test_capture_without_answer_times_out():
+    async def scenario():
+        pool = CaptureWorkerPool(workers=1, concurrency=1, handler=crashing_or_slow_capture)
+        pool.timeout_seconds = 0.5
+        try:
+            await pool.capture("https://slow.com/")
+        except NetworkScraperError as exc:
+            return str(exc)
+        finally:
+            await pool.close()
+
+    assert "sem resposta" in asyncio.run(scenario())
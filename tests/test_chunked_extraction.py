@@ -0,0 +1,120 @@
+import asyncio
+
+from src.config.settings import settings
+from src.core.chunked_extraction import (
+    extract_chunked,
+    merge_chunk_results,
+    should_chunk,
+    split_into_chunks,
+)
+from src.core.context_packer import count_tokens
+from src.models.article import Article
+from src.models.custom import GenericListPage, GuidedExtractionResult
+
+LONG_TEXT = "\n".join(f"Produto {i}: descricao do item numero {i} da listagem" for i in range(3_000))
+
+
+def test_chunks_respect_size_and_overlap():
+    chunks = split_into_chunks(LONG_TEXT, chunk_tokens=500, overlap_tokens=50)
+    assert len(chunks) > 2
+    assert all(count_tokens(chunk) <= 500 for chunk in chunks)
+    # A ultima linha de um trecho reaparece no inicio do seguinte.
+    assert chunks[0].splitlines()[-1] in chunks[1].splitlines()[:5]
+
+
+def test_merge_dedupes_overlap_and_recomputes_total():
+    merged, raw = merge_chunk_results([
+        {"items": [{"title": "A"}, {"title": "B "}], "total_count": 2},
+        {"items": [{"title": "b"}, {"title": "C", "url": "https://x/c"}], "total_count": 40},
+    ])
+    assert [item["title"] for item in merged["items"]] == ["A", "B ", "C"]
+    assert merged["total_count"] == 3
+    assert raw == 4
+
+
+def test_merge_keeps_same_title_records_outside_the_overlap():
+    variant = {"name": "Camiseta", "extra": {"cor": "azul"}}
+    merged, _ = merge_chunk_results([
+        {"items": [{"name": "Camiseta"}, variant, {"title": "Rodape"}]},
+        {"items": [{"name": "camiseta"}, {"title": "Meio"}]},
+        {"items": [{"title": "Rodape"}, {"title": "Meio"}]},
+    ])
+    # Mesmo titulo no mesmo trecho: registros distintos. Entre trechos vizinhos: sobreposicao.
+    # "Rodape" volta dois trechos depois, fora da sobreposicao, e e mantido.
+    assert merged["items"] == [{"name": "Camiseta"}, variant, {"title": "Rodape"}, {"title": "Meio"}, {"title": "Rodape"}]
+
+
+def test_should_chunk_only_long_pages_with_record_lists():
+    assert should_chunk("auto", GenericListPage, LONG_TEXT)
+    assert not should_chunk("auto", GenericListPage, "curto")
+    assert not should_chunk("single", GenericListPage, LONG_TEXT)
+    assert not should_chunk("chunked", Article, LONG_TEXT)
+
+
+class FakeProcessor:
+    def __init__(self):
+        self.active = 0
+        self.peak = 0
+        self.calls = []
+        self.reduced = None
+
+    async def extract_structured_data(self, **kwargs):
+        self.calls.append(kwargs)
+        index = len(self.calls)
+        self.active += 1
+        self.peak = max(self.peak, self.active)
+        await asyncio.sleep(0.01)
+        self.active -= 1
+        if index == 3:
+            raise RuntimeError("falha no trecho")
+        return {
+            "data": {
+                "objective": "x",
+                "summary": f"resumo {index}",
+                "findings": [{"title": f"item {index}"}, {"title": "repetido"}],
+                "total_count": 2,
+            },
+            "metadata": {
+                "model": "m",
+                "tokens_used": {"input": 100, "cached_input": 0, "output": 10, "total": 110},
+                "cost_usd": 0.01,
+                "vision": None,
+                "llm_cache": {"state": "miss"},
+            },
+        }
+
+    async def reduce_summaries(self, summaries, system_prompt, extraction_goal, output_format):
+        self.reduced = summaries
+        return {
+            "summary": "resumo final",
+            "tokens_used": {"input": 20, "cached_input": 0, "output": 5, "total": 25},
+            "cost_usd": 0.001,
+        }
+
+
+def test_extract_chunked_maps_concurrently_and_reduces_summary(monkeypatch):
+    monkeypatch.setattr(settings, "CHUNK_TOKENS", 2_000)
+    monkeypatch.setattr(settings, "CHUNK_MAX_CONCURRENCY", 2)
+    processor = FakeProcessor()
+
+    result = asyncio.run(extract_chunked(
+        processor,
+        screenshot_base64="b64",
+        html="",
+        text_content=LONG_TEXT,
+        schema=GuidedExtractionResult,
+        accessibility_snapshot="main",
+        output_format="report",
+    ))
+
+    chunked = result["metadata"]["chunked"]
+    assert processor.peak == 2
+    assert processor.calls[0]["screenshot_base64"] == "b64"
+    assert all(call["screenshot_base64"] == "" for call in processor.calls[1:])
+    assert chunked["chunks_failed"] == 1
+    assert result["data"]["summary"] == "resumo final"
+    assert len(processor.reduced) == chunked["chunks"] - 1
+    titles = [item["title"] for item in result["data"]["findings"]]
+    assert titles.count("repetido") == 1
+    assert result["data"]["total_count"] == len(titles)
+    assert result["metadata"]["tokens_used"]["total"] == 110 * (chunked["chunks"] - 1) + 25
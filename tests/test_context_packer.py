@@ -0,0 +1,61 @@
+from src.core.context_packer import (
+    compact_image_list,
+    count_tokens,
+    dedupe_against_structure,
+    pack_context,
+    truncate_to_tokens,
+)
+
+AX = '\n'.join([
+    'main',
+    '  heading1 "Notebook Gamer Ultra 15 polegadas"',
+    '  text "Processador de ultima geracao com 16 GB de RAM"',
+    '  link "Comprar" </comprar>',
+])
+TEXT = "\n".join([
+    "Notebook Gamer Ultra 15 polegadas",
+    "Processador de ultima geracao com 16 GB de RAM",
+    "Frete gratis para todo o Brasil em compras acima de R$ 200",
+    "Comprar",
+])
+
+
+def test_text_lines_already_in_ax_tree_are_removed():
+    text, removed = dedupe_against_structure(TEXT, AX)
+    assert removed == 2
+    assert "Frete gratis" in text
+    # Rotulos curtos ficam mesmo repetidos.
+    assert "Comprar" in text
+
+
+def test_image_list_is_compact_and_deduplicated():
+    listing = compact_image_list(["https://a/1.png", "https://a/1.png", " ", "https://a/2.png"])
+    assert listing == "https://a/1.png\nhttps://a/2.png"
+
+
+def test_truncate_respects_token_budget():
+    text = "\n".join(f"linha {i} com algum conteudo" for i in range(500))
+    cut = truncate_to_tokens(text, 100)
+    assert count_tokens(cut) <= 100
+    assert text.startswith(cut)
+
+
+def test_pack_fills_single_budget_and_reports_split():
+    structure = "\n".join(f'  link "Produto numero {i} em destaque" </p/{i}>' for i in range(2000))
+    text = "\n".join(f"Descricao longa do item {i} na listagem" for i in range(2000))
+    images = [f"https://cdn.example.com/img/{i}.jpg" for i in range(500)]
+
+    packed = pack_context(structure, text, images, budget_tokens=4_000)
+    report = packed.report(actual_input_tokens=5_000, fixed_tokens=1_000)
+
+    assert packed.packed_tokens <= 4_000
+    assert all(section["truncated"] for section in report["sections"].values())
+    assert report["sections"]["structure"]["packed_tokens"] >= report["sections"]["text"]["packed_tokens"]
+    assert report["estimated_input_tokens"] == packed.packed_tokens + 1_000
+    assert sum(s["actual_tokens"] for s in report["sections"].values()) <= 5_000
+
+
+def test_small_sections_leave_budget_to_the_others():
+    packed = pack_context("", "texto " * 3_000, [], budget_tokens=2_000)
+    assert packed.sections["structure"]["packed_tokens"] == 0
+    assert packed.sections["text"]["packed_tokens"] > 1_900
@@ -1,3 +1,8 @@
+from types import SimpleNamespace
+
+from src.config.prompts import SYSTEM_PROMPT_GENERIC
+from src.core.ai_processor import schema_json, stable_prefix, usage_tokens
+from src.models.custom import GenericListPage
 from src.utils.cost_tracker import calculate_cost
 
 
@@ -7,3 +12,24 @@ def test_calculate_cost_with_cache_is_lower():
     assert with_cache < no_cache
     assert with_cache > 0
 
+
+
+def test_usage_tokens_reads_cached_prompt_tokens():
+    usage = SimpleNamespace(
+        prompt_tokens=18_000,
+        completion_tokens=2_000,
+        total_tokens=20_000,
+        prompt_tokens_details=SimpleNamespace(cached_tokens=16_000),
+    )
+    tokens = usage_tokens(usage)
+    assert tokens == {"input": 18_000, "cached_input": 16_000, "output": 2_000, "total": 20_000}
+    legacy = SimpleNamespace(prompt_tokens=10, completion_tokens=1, total_tokens=11)
+    assert usage_tokens(legacy)["cached_input"] == 0
+    assert usage_tokens(None)["total"] == 0
+
+
+def test_stable_prefix_is_shared_across_pages_and_goals():
+    first = stable_prefix(SYSTEM_PROMPT_GENERIC, GenericListPage, "list")
+    assert first is stable_prefix(SYSTEM_PROMPT_GENERIC, GenericListPage, "list")
+    assert first.endswith(schema_json(GenericListPage))
+    assert stable_prefix(SYSTEM_PROMPT_GENERIC, GenericListPage, "summary") != first
@@ -0,0 +1,201 @@
+import asyncio
+
+from src.config.settings import settings
+from src.core import orchestrator as orchestrator_module
+from src.core.capture_profiles import get_capture_profile
+from src.core.extraction_templates import (
+    TemplateStore,
+    extract_with_template,
+    learn_from_extraction,
+)
+from src.core.orchestrator import ScraperOrchestrator
+from src.core.wrapper_induction import apply_template, induce_template, parse_number
+from src.models.article import Article
+from src.models.product import ProductListPage
+
+URL = "https://loja.example.com/celulares?page=1"
+
+
+def _listing(products, card_class="card"):
+    cards = "".join(
+        f'<li class="{card_class}"><a href="/p/{slug}"><h2 class="name">{name}</h2></a>'
+        f'<span class="price">R$ {price}</span><img src="/img/{slug}.jpg"></li>'
+        for slug, name, price in products
+    )
+    return f'<html><body><nav><a href="/">Inicio</a></nav><ul class="grid">{cards}</ul></body></html>'
+
+
+def _expected(products):
+    return {
+        "products": [
+            {
+                "name": name,
+                "price": parse_number(price),
+                "images": [f"https://loja.example.com/img/{slug}.jpg"],
+                "url": f"https://loja.example.com/p/{slug}",
+            }
+            for slug, name, price in products
+        ],
+        "total_count": len(products),
+        "page": 1,
+        "has_next_page": False,
+    }
+
+
+PAGE_1 = [("moto-g", "Moto G", "1.299,90"), ("galaxy-a", "Galaxy A", "1.899,00"), ("redmi", "Redmi 13", "999,90")]
+PAGE_2 = [("iphone", "iPhone 15", "5.499,00"), ("pixel", "Pixel 8", "3.999,00")]
+
+
+def _ai_result(data):
+    tokens = {"input": 1000, "cached_input": 0, "output": 100, "total": 1100}
+    return {"data": data, "metadata": {"model": "gpt-5-mini", "tokens_used": tokens, "cost_usd": 0.002}}
+
+
+def test_parse_number_handles_brazilian_and_us_formats():
+    assert parse_number("R$ 1.299,90") == 1299.9
+    assert parse_number("$1,299.90") == 1299.9
+    assert parse_number("999,90") == 999.9
+    assert parse_number("sem preco") is None
+
+
+def test_product_template_reproduces_other_pages():
+    template = induce_template(_listing(PAGE_1), _expected(PAGE_1), ProductListPage, URL)
+
+    assert template is not None
+    assert template["kind"] == "records"
+    assert {"name", "price", "url", "images"} <= set(template["fields"])
+    data = apply_template(_listing(PAGE_2), template, URL)
+    assert [product["name"] for product in data["products"]] == ["iPhone 15", "Pixel 8"]
+    assert data["products"][0]["price"] == 5499.0
+    assert data["products"][1]["url"] == "https://loja.example.com/p/pixel"
+    assert ProductListPage.model_validate(data).total_count == 2
+
+
+def test_article_template_reads_single_fields():
+    def article(title, author, body):
+        return (
+            f'<html><head><link rel="canonical" href="https://news.example.com/{title.lower()}"></head><body>'
+            f'<article><h1 class="headline">{title}</h1><span class="byline">{author}</span>'
+            f'<div class="article-body"><p>{body}</p></div></article></body></html>'
+        )
+
+    body = "Texto longo da materia sobre a economia brasileira e seus efeitos no consumo das familias."
+    data = {
+        "title": "Inflacao",
+        "author": "Ana Souza",
+        "content": body,
+        "url": "https://news.example.com/inflacao",
+    }
+    template = induce_template(article("Inflacao", "Ana Souza", body), data, Article, "https://news.example.com/inflacao")
+
+    assert template is not None
+    assert template["kind"] == "object"
+    other = "Outra materia, agora sobre juros e credito, com bastante texto para o corpo do artigo."
+    applied = apply_template(article("Juros", "Bruno Lima", other), template, "https://news.example.com/juros")
+    assert applied["title"] == "Juros"
+    assert applied["author"] == "Bruno Lima"
+    assert applied["content"] == other
+
+
+def test_store_learns_confirms_serves_and_falls_back(tmp_path, monkeypatch):
+    monkeypatch.setattr(settings, "TEMPLATE_MIN_SAMPLES", 2)
+    store = TemplateStore(directory=str(tmp_path))
+
+    async def run():
+        states = []
+        hit, _ = await extract_with_template(store, _listing(PAGE_1), URL, ProductListPage, None)
+        assert hit is None
+        learned = await learn_from_extraction(
+            store, _listing(PAGE_1), URL, ProductListPage, None, _ai_result(_expected(PAGE_1))
+        )
+        states.append(learned["state"])
+        # Candidato ainda nao atende sem o LLM.
+        hit, _ = await extract_with_template(store, _listing(PAGE_2), URL, ProductListPage, None)
+        assert hit is None
+        confirmed = await learn_from_extraction(
+            store, _listing(PAGE_2), URL, ProductListPage, None, _ai_result(_expected(PAGE_2))
+        )
+        states.append(confirmed["state"])
+
+        # Novo processo: o template ativo vem do disco.
+        reloaded = TemplateStore(directory=str(tmp_path))
+        hit, _ = await extract_with_template(reloaded, _listing(PAGE_2), URL, ProductListPage, None, "/p2")
+        assert hit["metadata"]["template"]["state"] == "hit"
+        assert hit["metadata"]["cost_usd"] == 0.0
+        assert hit["data"]["has_next_page"] is True
+        assert len(hit["data"]["products"]) == 2
+
+        # Layout mudou: nenhum card encontrado, o template e descartado.
+        hit, fallback = await extract_with_template(
+            reloaded, _listing(PAGE_2, card_class="tile"), URL, ProductListPage, None
+        )
+        assert hit is None
+        assert fallback["state"] == "fallback"
+        relearned = await learn_from_extraction(
+            reloaded, _listing(PAGE_2, card_class="tile"), URL, ProductListPage, None, _ai_result(_expected(PAGE_2))
+        )
+        states.append(relearned["state"])
+        return states, reloaded.stats()
+
+    states, stats = asyncio.run(run())
+
+    assert states == ["candidate", "confirmed", "candidate"]
+    assert stats["hits"] == 1
+    assert stats["fallbacks"] == 1
+    assert stats["candidates"] == 1
+
+
+def test_low_quality_extraction_is_not_learned(tmp_path):
+    store = TemplateStore(directory=str(tmp_path))
+    empty = {"products": [], "total_count": 0}
+
+    result = asyncio.run(
+        learn_from_extraction(store, _listing(PAGE_1), URL, ProductListPage, None, _ai_result(empty))
+    )
+
+    assert result["state"] == "skipped"
+    assert not list(tmp_path.iterdir())
+
+
+def test_orchestrator_learns_and_serves_templates_with_default_profile(tmp_path, monkeypatch):
+    monkeypatch.setattr(settings, "CAPTURE_PROFILE", "auto")
+    monkeypatch.setattr(settings, "TEMPLATE_MIN_SAMPLES", 2)
+    store = TemplateStore(directory=str(tmp_path))
+    monkeypatch.setattr(orchestrator_module, "get_template_store", lambda: store)
+    scraper = ScraperOrchestrator(with_storage=False)
+    pages = {"1": PAGE_1, "2": PAGE_2, "3": PAGE_1, "4": PAGE_2}
+    llm_calls = []
+
+    async def fake_capture(url, capture_profile=None, **_):
+        # Como a captura real: sem HTML quando o perfil nao pede e a arvore AX existe.
+        profile = get_capture_profile(capture_profile)
+        number = url[-1]
+        html = _listing(pages[number]) if profile.html else ""
+        # Pagina 4: HTML maior que CAPTURE_MAX_HTML_CHARS, cortado na captura.
+        metadata = {"final_url": url, "capture_profile": profile.as_dict(), "html_truncated": number == "4"}
+        return ("", html, number, 'main\n  heading "Celulares"', [], metadata)
+
+    async def fake_extract(text_content, **options):
+        llm_calls.append(options["html"])
+        return _ai_result(_expected(pages[text_content]))
+
+    monkeypatch.setattr(scraper, "_capture", fake_capture)
+    monkeypatch.setattr(scraper.ai_processor, "extract_structured_data", fake_extract)
+
+    async def run():
+        return [
+            await scraper.scrape(f"https://loja.example.com/celulares?page={number}", ProductListPage, use_templates=True)
+            for number in "1234"
+        ]
+
+    first, second, third, truncated = asyncio.run(run())
+
+    assert first["metadata"]["page"]["capture_profile"]["name"] == "vision+html"
+    assert first["metadata"]["template"]["state"] == "candidate"
+    assert second["metadata"]["template"]["state"] == "confirmed"
+    assert third["metadata"]["template"]["state"] == "hit"
+    assert third["metadata"]["cost_usd"] == 0.0
+    assert len(third["data"]["products"]) == 3
+    assert truncated["metadata"]["template"] == {"state": "skipped", "reason": "html_truncated"}
+    # Dois scrapes pelo LLM, o terceiro so pelo template, o quarto (HTML cortado) de volta ao LLM.
+    assert len(llm_calls) == 3
@@ -0,0 +1,98 @@
+import asyncio
+
+import httpx
+
+from src.config.settings import settings
+from src.core import llm_cache, llm_client
+from src.core.ai_processor import AIProcessor
+from src.core.llm_cache import LLMResponseCache
+from src.core.llm_client import LLMClientPool
+from src.core.validator import DataValidator
+from src.models.custom import GenericListPage
+from src.models.product import ProductListPage
+from src.web.fake_llm import FakeLLM, create_fake_llm_app, sample_from_schema
+
+
+def test_samples_validate_against_pydantic_schemas():
+    for schema in (ProductListPage, GenericListPage):
+        data = sample_from_schema(schema.model_json_schema(), list_items=2)
+        validated, errors, _ = DataValidator.validate(data, schema)
+        assert validated is not None, errors
+    assert sample_from_schema(GenericListPage.model_json_schema(), list_items=2)["total_count"] == 2
+
+
+def _with_fake(monkeypatch, fake, scenario):
+    monkeypatch.setattr(settings, "OPENAI_BASE_URL", "http://fake-llm/v1")
+
+    async def run():
+        pool = LLMClientPool()
+        monkeypatch.setattr(llm_client, "_pool", pool)
+        pool.client()
+        pool._http_client = httpx.AsyncClient(transport=httpx.ASGITransport(app=create_fake_llm_app(fake)))
+        pool._clients.clear()
+        try:
+            return await scenario()
+        finally:
+            await pool.close()
+
+    return asyncio.run(run())
+
+
+def test_pipeline_runs_against_fake_server(monkeypatch):
+    fake = FakeLLM(latency_ms=0, latency_jitter_ms=0, list_items=3, seed=1)
+
+    async def scenario():
+        processor = AIProcessor(api_key="sk-fake")
+        kwargs = dict(screenshot_base64="", html="", text_content="texto", schema=ProductListPage, use_cache=False)
+        result = await processor.extract_structured_data(**kwargs)
+        events = [event async for event in processor.stream_structured_data(**kwargs)]
+        return result, events
+
+    result, events = _with_fake(monkeypatch, fake, scenario)
+    validated, errors, _ = DataValidator.validate(result["data"], ProductListPage)
+    assert validated is not None, errors
+    assert len(validated["products"]) == 3
+    assert result["metadata"]["tokens_used"]["input"] > 0
+    assert [event["type"] for event in events] == ["item", "item", "item", "result"]
+    assert fake.counters == {
+        "requests": 2, "errors": 0, "rate_limited": 0, "replayed": 0, "generated": 2, "streamed": 1,
+    }
+
+
+def test_replays_recorded_responses(tmp_path, monkeypatch):
+    path = str(tmp_path / "llm.db")
+    monkeypatch.setattr(llm_cache, "_cache", LLMResponseCache(path=path, ttl_seconds=60))
+    kwargs = dict(screenshot_base64="", html="", text_content="texto", schema=GenericListPage)
+
+    async def record():
+        # Gravacao como numa chamada real: chave sem OPENAI_BASE_URL (API oficial).
+        monkeypatch.setattr(settings, "OPENAI_BASE_URL", "")
+        return await AIProcessor(api_key="sk-fake").extract_structured_data(**kwargs)
+
+    recorded = _with_fake(monkeypatch, FakeLLM(latency_ms=0, latency_jitter_ms=0, list_items=1), record)
+    replayer = FakeLLM(latency_ms=0, latency_jitter_ms=0, list_items=4, replay_path=path)
+
+    async def replay():
+        return await AIProcessor(api_key="sk-fake").extract_structured_data(**kwargs, use_cache=False)
+
+    replayed = _with_fake(monkeypatch, replayer, replay)
+    assert replayer.counters["replayed"] == 1
+    assert replayed["data"] == recorded["data"]
+
+
+def test_error_and_rate_limit_rates():
+    fake = FakeLLM(latency_ms=0, latency_jitter_ms=0, error_rate=0.5, rate_limit_rate=0.5, seed=3)
+
+    async def scenario():
+        transport = httpx.ASGITransport(app=create_fake_llm_app(fake))
+        async with httpx.AsyncClient(transport=transport, base_url="http://fake") as client:
+            body = {"model": "m", "messages": [{"role": "user", "content": "oi"}]}
+            responses = [await client.post("/v1/chat/completions", json=body) for _ in range(20)]
+            stats = (await client.get("/stats")).json()
+        return responses, stats
+
+    responses, stats = asyncio.run(scenario())
+    statuses = {response.status_code for response in responses}
+    assert statuses == {429, 500}
+    assert next(r for r in responses if r.status_code == 429).headers["retry-after"] == "1"
+    assert stats["rate_limited"] + stats["errors"] == 20
@@ -0,0 +1,97 @@
+import asyncio
+import json
+from types import SimpleNamespace
+
+import pytest
+
+from src.config.settings import settings
+from src.core.ai_processor import AIProcessor, request_params, strict_response_format
+from src.core.errors import ModelScraperError
+from src.core.json_repair import JSONRepairError, parse_model_json, repair_json
+from src.models.custom import GenericListPage
+from src.models.product import ProductListPage
+
+
+def test_repairs_fences_prose_and_trailing_commas():
+    text = 'Claro! Aqui esta:\n```json\n{"items": [{"title": "a",}, {"title": "b"},],}\n```\nAlgo mais?'
+    assert repair_json(text) == {"items": [{"title": "a"}, {"title": "b"}]}
+    assert repair_json('Resultado: {"title": "x, y}"} fim.') == {"title": "x, y}"}
+
+
+def test_repairs_truncated_string_array_and_object():
+    # String no topo: fechar e o melhor que da.
+    assert repair_json('{"summary": "texto cortado no me') == {"summary": "texto cortado no me"}
+    # Registro cortado no meio de uma lista: descartado inteiro, nunca fechado pela metade.
+    truncated = '{"items": [{"title": "a", "url": "https://x/a"}, {"title": "b", "pri'
+    assert repair_json(truncated) == {"items": [{"title": "a", "url": "https://x/a"}]}
+    assert repair_json('{"items": [{"name": "A", "price": 10}, {"name": "B", "price": 12') == {
+        "items": [{"name": "A", "price": 10}]
+    }
+    assert repair_json('{"items": [{"name": "B", "url": "https://x.com/pro') == {"items": []}
+    assert repair_json('{"items": [{"title": "a"}') == {"items": [{"title": "a"}]}
+    assert repair_json('{"items": [{"title": "a"}], "total_count":') == {"items": [{"title": "a"}]}
+
+
+def test_parse_reports_path_and_rejects_text_without_json():
+    assert parse_model_json('{"a": 1}') == ({"a": 1}, "direct")
+    assert parse_model_json('{"a": [1, 2,') == ({"a": [1, 2]}, "local_repair")
+    with pytest.raises(JSONRepairError):
+        parse_model_json("desculpe, nao consegui")
+
+
+def test_strict_response_format_requires_every_field():
+    response_format = strict_response_format(ProductListPage)
+    schema = response_format["json_schema"]["schema"]
+    assert response_format["type"] == "json_schema"
+    assert response_format["json_schema"]["strict"] is True
+    assert schema["additionalProperties"] is False
+    assert set(schema["required"]) == set(schema["properties"])
+    assert "default" not in json.dumps(schema)
+    # `extra: dict[str, Any]` nao cabe no modo estrito; o schema segue como guia.
+    assert strict_response_format(GenericListPage)["json_schema"]["strict"] is False
+
+
+def test_request_params_follow_setting(monkeypatch):
+    assert request_params(GenericListPage)["response_format"] == {"type": "json_object"}
+    monkeypatch.setattr(settings, "OPENAI_RESPONSE_FORMAT", "json_schema")
+    assert request_params(GenericListPage)["response_format"]["type"] == "json_schema"
+
+
+def _response(content):
+    usage = SimpleNamespace(prompt_tokens=100, completion_tokens=10, total_tokens=110)
+    return SimpleNamespace(choices=[SimpleNamespace(message=SimpleNamespace(content=content))], usage=usage)
+
+
+def _run(monkeypatch, replies):
+    calls = []
+
+    async def fake_completion(self, messages, **params):
+        calls.append(messages)
+        return _response(replies[len(calls) - 1])
+
+    monkeypatch.setattr(AIProcessor, "_run_chat_completion", fake_completion)
+
+    async def scenario():
+        return await AIProcessor(api_key="sk-test").extract_structured_data(
+            screenshot_base64="", html="", text_content="texto", schema=GenericListPage, use_cache=False
+        )
+
+    return asyncio.run(scenario()), calls
+
+
+def test_truncated_reply_is_repaired_without_second_call(monkeypatch):
+    result, calls = _run(monkeypatch, ['{"items": [{"title": "a"}, {"title": "b'])
+    assert len(calls) == 1
+    assert result["data"]["items"][0] == {"title": "a"}
+    assert result["metadata"]["json_parse"] == {"local_repair": 1}
+
+
+def test_llm_repair_is_last_resort_and_tokens_add_up(monkeypatch):
+    result, calls = _run(monkeypatch, ["nao sei responder", '{"items": []}'])
+    assert len(calls) == 2
+    assert result["metadata"]["json_parse"] == {"llm_repair": 1}
+    assert result["metadata"]["tokens_used"]["total"] == 220
+
+    monkeypatch.setattr(settings, "LLM_JSON_REPAIR_CALL", False)
+    with pytest.raises(ModelScraperError):
+        _run(monkeypatch, ["nao sei responder"])
@@ -0,0 +1,118 @@
+import asyncio
+from types import SimpleNamespace
+
+from src.core import llm_cache
+from src.core.ai_processor import AIProcessor
+from src.core.llm_cache import LLMResponseCache, request_key
+from src.models.custom import GenericListPage
+
+TOKENS = {"input": 900, "output": 100, "total": 1000}
+
+
+def test_key_depends_on_messages_and_params():
+    messages = [{"role": "user", "content": "pagina"}]
+    base = request_key("m", messages, max_completion_tokens=10)
+    assert request_key("m", [dict(messages[0])], max_completion_tokens=10) == base
+    assert request_key("m", [{"role": "user", "content": "outra"}], max_completion_tokens=10) != base
+    assert request_key("m", messages, max_completion_tokens=20) != base
+    assert request_key("m2", messages, max_completion_tokens=10) != base
+    # Endpoint alternativo (ex.: servidor fake) nao compartilha respostas com a API oficial.
+    fake = request_key("m", messages, base_url="http://127.0.0.1:8100/v1", max_completion_tokens=10)
+    assert fake != base
+    assert request_key("m", messages, base_url="", max_completion_tokens=10) == base
+
+
+def test_hit_survives_restart_and_expires_after_ttl(tmp_path):
+    path = str(tmp_path / "llm.db")
+
+    async def scenario():
+        cache = LLMResponseCache(path=path, ttl_seconds=60)
+        assert await cache.get("k") is None
+        await cache.put("k", "m", {"items": [1]}, TOKENS, 0.01)
+        cache.close()
+        reopened = LLMResponseCache(path=path, ttl_seconds=60)
+        hit = await reopened.get("k")
+        expired = LLMResponseCache(path=path, ttl_seconds=0)
+        await asyncio.sleep(0.01)
+        return hit, reopened.stats(), await expired.get("k"), expired.stats()
+
+    hit, stats, gone, expired_stats = asyncio.run(scenario())
+    assert hit["data"] == {"items": [1]} and hit["tokens_used"] == TOKENS
+    assert stats["hits"] == 1 and stats["tokens_saved"] == 1000 and stats["hit_ratio"] == 1.0
+    assert gone is None and expired_stats["expired"] == 1 and expired_stats["entries"] == 0
+
+
+def test_lru_eviction_keeps_recently_used_entries(tmp_path):
+    async def scenario():
+        cache = LLMResponseCache(path=str(tmp_path / "llm.db"), ttl_seconds=60, max_bytes=10_000_000)
+        await cache.put("a", "m", "x" * 400, TOKENS, 0.0)
+        entry_bytes = cache.stats()["bytes"]
+        cache.max_bytes = entry_bytes * 2
+        await cache.put("b", "m", "x" * 400, TOKENS, 0.0)
+        await cache.get("a")
+        await cache.put("c", "m", "x" * 400, TOKENS, 0.0)
+        return [await cache.get(key) is not None for key in ("a", "b", "c")], cache.stats()
+
+    present, stats = asyncio.run(scenario())
+    assert present == [True, False, True]
+    assert stats["evictions"] == 1
+
+
+def test_ai_processor_serves_repeated_extraction_from_cache(tmp_path, monkeypatch):
+    calls = []
+
+    async def fake_completion(self, messages, **params):
+        calls.append(messages)
+        usage = SimpleNamespace(prompt_tokens=900, completion_tokens=100, total_tokens=1000)
+        message = SimpleNamespace(content='{"summary": "ok", "findings": []}')
+        return SimpleNamespace(choices=[SimpleNamespace(message=message)], usage=usage)
+
+    monkeypatch.setattr(AIProcessor, "_run_chat_completion", fake_completion)
+    monkeypatch.setattr(llm_cache, "_cache", LLMResponseCache(path=str(tmp_path / "llm.db"), ttl_seconds=60))
+
+    async def scenario():
+        processor = AIProcessor(api_key="sk-test")
+        kwargs = dict(screenshot_base64="", html="", text_content="texto", schema=GenericListPage)
+        first = await processor.extract_structured_data(**kwargs)
+        second = await processor.extract_structured_data(**kwargs)
+        bypass = await processor.extract_structured_data(**kwargs, use_cache=False)
+        return first, second, bypass
+
+    first, second, bypass = asyncio.run(scenario())
+    assert len(calls) == 2
+    assert first["metadata"]["llm_cache"]["state"] == "miss" and first["metadata"]["cost_usd"] > 0
+    assert second["data"] == first["data"]
+    assert second["metadata"]["cost_usd"] == 0.0
+    assert second["metadata"]["llm_cache"]["state"] == "hit"
+    assert second["metadata"]["llm_cache"]["tokens_saved"] == 1000
+    assert bypass["metadata"]["llm_cache"]["state"] == "bypass"
+
+
+def test_invalid_or_repaired_answers_are_not_cached(tmp_path, monkeypatch):
+    replies = iter([
+        '{"summary": "ok", "items": "nao e lista"}',
+        '{"summary": "ok", "items": [{"title": "a"}, {"title": "b',
+        '{"summary": "ok", "items": [{"title": "a"}]}',
+    ])
+
+    async def fake_completion(self, messages, **params):
+        usage = SimpleNamespace(prompt_tokens=900, completion_tokens=100, total_tokens=1000)
+        message = SimpleNamespace(content=next(replies))
+        return SimpleNamespace(choices=[SimpleNamespace(message=message)], usage=usage)
+
+    monkeypatch.setattr(AIProcessor, "_run_chat_completion", fake_completion)
+    cache = LLMResponseCache(path=str(tmp_path / "llm.db"), ttl_seconds=60)
+    monkeypatch.setattr(llm_cache, "_cache", cache)
+
+    async def scenario():
+        processor = AIProcessor(api_key="sk-test")
+        kwargs = dict(screenshot_base64="", html="", text_content="texto", schema=GenericListPage)
+        results = [await processor.extract_structured_data(**kwargs) for _ in range(4)]
+        return results, cache.stats()
+
+    results, stats = asyncio.run(scenario())
+    states = [result["metadata"]["llm_cache"]["state"] for result in results]
+    # Schema invalido e resposta truncada passam adiante, mas so a terceira (valida) e guardada.
+    assert states == ["miss", "miss", "miss", "hit"]
+    assert results[-1]["data"]["items"] == [{"title": "a"}]
+    assert stats["entries"] == 1
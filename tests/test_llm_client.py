@@ -0,0 +1,70 @@
+import asyncio
+import json
+
+import httpx
+
+from src.core import llm_client
+from src.core.ai_processor import AIProcessor
+from src.core.llm_client import LLMClientPool
+
+
+def test_clients_are_reused_per_key_with_lru_eviction():
+    async def scenario():
+        pool = LLMClientPool(max_clients=2)
+        a = pool.client("sk-a")
+        assert pool.client("sk-a") is a
+        pool.client("sk-b")
+        pool.client("sk-c")
+        assert pool.client("sk-a") is not a
+        assert a._client is pool.client("sk-b")._client
+        return pool.stats()
+
+    stats = asyncio.run(scenario())
+    assert stats["clients_cached"] == 2
+    assert stats["client_evictions"] == 3
+
+
+def test_slot_caps_concurrency_and_tracks_in_flight():
+    async def scenario():
+        pool = LLMClientPool(max_concurrency=2)
+        peak = 0
+
+        async def call():
+            nonlocal peak
+            async with pool.slot():
+                peak = max(peak, pool.in_flight)
+                await asyncio.sleep(0.01)
+
+        await asyncio.gather(*(call() for _ in range(6)))
+        return peak, pool.stats()
+
+    peak, stats = asyncio.run(scenario())
+    assert peak == 2
+    assert stats["in_flight"] == 0 and stats["waiting"] == 0 and stats["calls"] == 6
+
+
+def test_ai_processor_calls_async_client(monkeypatch):
+    requests = []
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        requests.append(json.loads(request.content))
+        return httpx.Response(200, json={
+            "id": "c1", "object": "chat.completion", "created": 0, "model": "m",
+            "choices": [{"index": 0, "finish_reason": "stop",
+                         "message": {"role": "assistant", "content": "{\"ok\": true}"}}],
+            "usage": {"prompt_tokens": 5, "completion_tokens": 2, "total_tokens": 7},
+        })
+
+    async def scenario():
+        pool = LLMClientPool()
+        monkeypatch.setattr(llm_client, "_pool", pool)
+        pool.client()
+        pool._http_client = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+        pool._clients.clear()
+        response = await AIProcessor(api_key="sk-test")._run_chat_completion([{"role": "user", "content": "oi"}])
+        await pool.close()
+        return response
+
+    response = asyncio.run(scenario())
+    assert response.choices[0].message.content == '{"ok": true}'
+    assert requests[0]["response_format"] == {"type": "json_object"}
@@ -0,0 +1,80 @@
+import asyncio
+
+from src.config.settings import settings
+from src.core.errors import ModelScraperError
+from src.core.model_cascade import extract_with_cascade, tier_quality
+from src.models.custom import GenericListPage
+from src.utils.cost_tracker import calculate_cost
+
+
+def _result(data, model, cost):
+    return {
+        "data": data,
+        "metadata": {
+            "model": model,
+            "tokens_used": {"input": 100, "cached_input": 0, "output": 10, "total": 110},
+            "cost_usd": cost,
+            "json_parse": {"direct": 1},
+        },
+    }
+
+
+class FakeExtractor:
+    def __init__(self, text_reply):
+        self.text_reply = text_reply
+        self.calls = []
+
+    async def __call__(self, model=None, with_screenshot=True):
+        self.calls.append((model, with_screenshot))
+        if not with_screenshot:
+            if isinstance(self.text_reply, Exception):
+                raise self.text_reply
+            return _result(self.text_reply, model, 0.001)
+        return _result({"items": [{"title": "via screenshot"}]}, model, 0.01)
+
+
+def _run(extractor, has_screenshot=True):
+    return asyncio.run(extract_with_cascade(extractor, GenericListPage, has_screenshot=has_screenshot))
+
+
+def test_text_tier_is_accepted_when_quality_is_enough(monkeypatch):
+    monkeypatch.setattr(settings, "CASCADE_TEXT_MODEL", "gpt-5-nano")
+    extractor = FakeExtractor({"items": [{"title": "a", "url": "https://x/a"}]})
+    result = _run(extractor)
+    assert extractor.calls == [("gpt-5-nano", False)]
+    cascade = result["metadata"]["cascade"]
+    assert cascade["final_tier"] == "text" and not cascade["escalated"]
+    assert cascade["tiers"][0]["outcome"] == "accepted"
+
+
+def test_empty_records_escalate_and_costs_add_up():
+    extractor = FakeExtractor({"items": []})
+    result = _run(extractor)
+    assert [with_screenshot for _, with_screenshot in extractor.calls] == [False, True]
+    cascade = result["metadata"]["cascade"]
+    assert cascade["reason"] == "low_quality"
+    assert [tier["outcome"] for tier in cascade["tiers"]] == ["escalated", "accepted"]
+    assert result["data"]["items"][0]["title"] == "via screenshot"
+    assert result["metadata"]["cost_usd"] == 0.011
+    assert result["metadata"]["tokens_used"]["total"] == 220
+    assert result["metadata"]["json_parse"] == {"direct": 2}
+
+
+def test_text_tier_error_escalates_but_not_without_target(monkeypatch):
+    extractor = FakeExtractor(ModelScraperError("falhou"))
+    result = _run(extractor)
+    assert result["metadata"]["cascade"]["reason"] == "text_tier_error"
+    assert result["metadata"]["cascade"]["tiers"][0]["outcome"] == "failed"
+
+    # Sem screenshot e com o mesmo modelo nas duas camadas, aceita a unica passada possivel.
+    extractor = FakeExtractor({"items": []})
+    result = _run(extractor, has_screenshot=False)
+    assert len(extractor.calls) == 1
+    assert result["metadata"]["cascade"]["final_tier"] == "text"
+
+
+def test_tier_quality_and_model_pricing():
+    assert tier_quality({"items": "x"}, GenericListPage)[0] == 0.0
+    assert tier_quality({"items": [{"title": "a"}]}, GenericListPage)[0] == 1.0
+    assert calculate_cost(10_000, 1_000, model="gpt-5-nano-2025-08-07") < calculate_cost(10_000, 1_000)
+    assert calculate_cost(10_000, 1_000, model="gpt-5-2025-08-07") > calculate_cost(10_000, 1_000)
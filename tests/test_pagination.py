@@ -0,0 +1,156 @@
+import asyncio
+import time
+from contextlib import asynccontextmanager
+
+from src.core import orchestrator as orchestrator_module
+from tenacity import stop_after_attempt
+
+from src.config.settings import settings
+from src.core.errors import BlockedScraperError, NonRecoverableScraperError
+from src.core.orchestrator import ScraperOrchestrator
+from src.core.pagination import merge_page_results, model_says_last_page
+from src.models.custom import GenericListPage
+
+
+def test_merge_concatenates_lists_without_duplicates():
+    merged = merge_page_results([
+        {"items": [{"title": "A", "url": "https://x.com/a"}], "total_count": 1, "page": 1, "has_next_page": True},
+        {"items": [{"title": "A", "url": "https://x.com/a"}, {"title": "B", "url": "https://x.com/b"}],
+         "total_count": 0, "page": 2, "has_next_page": False},
+    ])
+    assert [item["title"] for item in merged["items"]] == ["A", "B"]
+    assert merged["total_count"] == 2
+    assert merged["page"] == 2 and merged["has_next_page"] is False
+
+
+def test_model_last_page_requires_explicit_false():
+    assert model_says_last_page({"has_next_page": False})
+    assert not model_says_last_page({"items": []})
+
+
+class _FakeSession:
+    def __init__(self, events):
+        self.events = events
+        self.count = 0
+
+    async def capture(self, url, next_page=None, **_):
+        self.count += 1
+        number = self.count
+        self.events.append(("capture_start", number, time.perf_counter()))
+        await asyncio.sleep(0.05)
+        metadata = {"final_url": f"{url}?p={number}", "next_page": {"url": f"{url}?p={number + 1}", "click": False}}
+        return "", "", f"pagina {number}", "", [], metadata
+
+
+class _FakeBrowser:
+    def __init__(self, events):
+        self.session = _FakeSession(events)
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        return None
+
+    @asynccontextmanager
+    async def paginated_session(self, url, block_resources=True):
+        yield self.session
+
+
+def test_paginated_scrape_overlaps_extraction_with_next_capture(monkeypatch):
+    events = []
+    monkeypatch.setattr(orchestrator_module, "BrowserManager", lambda: _FakeBrowser(events))
+    scraper = ScraperOrchestrator(with_storage=False)
+
+    async def fake_extract(captured, schema, system_prompt, extraction_goal, output_format, **options):
+        number = int(captured[2].split()[-1])
+        events.append(("extract_start", number, time.perf_counter()))
+        await asyncio.sleep(0.05)
+        items = [{"title": f"item {number}", "url": f"https://x.com/{number}"}]
+        return {
+            "data": {"items": items, "total_count": 1},
+            "metadata": {"model": "m", "tokens_used": {"input": 10, "output": 2, "total": 12}, "cost_usd": 0.5},
+        }
+
+    monkeypatch.setattr(scraper, "_extract", fake_extract)
+    result = asyncio.run(scraper.scrape("https://x.com/lista", schema=GenericListPage, max_pages=3))
+
+    assert result["success"]
+    assert [item["title"] for item in result["data"]["items"]] == ["item 1", "item 2", "item 3"]
+    assert result["metadata"]["pagination"] == {"max_pages": 3, "pages_extracted": 3, "stop_reason": "max_pages"}
+    assert result["metadata"]["tokens_used"]["total"] == 36
+    starts = {(kind, number): at for kind, number, at in events}
+    # Captura da pagina 2 comeca junto com a extracao da pagina 1, nao depois dela.
+    assert starts[("capture_start", 2)] - starts[("extract_start", 1)] < 0.04
+
+
+def _without_retries(monkeypatch):
+    # Bloqueios sao retentaveis; aqui cada scrape deve valer uma unica tentativa.
+    monkeypatch.setattr(ScraperOrchestrator._scrape_paginated.retry, "stop", stop_after_attempt(1))
+
+
+def test_paginated_scrape_respects_domain_circuit_breaker(monkeypatch):
+    _without_retries(monkeypatch)
+    events = []
+    monkeypatch.setattr(orchestrator_module, "BrowserManager", lambda: _FakeBrowser(events))
+    scraper = ScraperOrchestrator(with_storage=False)
+
+    async def blocked_extract(*args, **options):
+        raise BlockedScraperError("challenge detectado")
+
+    monkeypatch.setattr(scraper, "_extract", blocked_extract)
+
+    async def run():
+        return [await scraper.scrape("https://x.com/lista", schema=GenericListPage, max_pages=2) for _ in range(6)]
+
+    results = asyncio.run(run())
+
+    assert [result["metadata"]["error_type"] for result in results] == ["blocked"] * 6
+    assert ["Circuit breaker" in result["error"] for result in results] == [False] * 4 + [True] * 2
+    # Os scrapes recusados nem chegam a abrir o browser e nao contam como falha.
+    assert len([event for event in events if event[:2] == ("capture_start", 1)]) == 4
+    assert scraper._domain_failure_count["x.com"] == 4
+
+
+def test_circuit_breaker_ignores_extraction_errors_and_half_opens_after_cooldown(monkeypatch):
+    _without_retries(monkeypatch)
+    monkeypatch.setattr(settings, "CIRCUIT_BREAKER_COOLDOWN_SECONDS", 0.05)
+    events = []
+    monkeypatch.setattr(orchestrator_module, "BrowserManager", lambda: _FakeBrowser(events))
+    scraper = ScraperOrchestrator(with_storage=False)
+    errors = [NonRecoverableScraperError("json invalido")] * 5 + [BlockedScraperError("captcha")] * 4
+    outcomes = iter(errors + [BlockedScraperError("captcha"), None])
+
+    async def extract(*args, **options):
+        error = next(outcomes)
+        if error is not None:
+            raise error
+        return {
+            "data": {"items": [{"title": "A", "url": "https://x.com/a"}], "total_count": 1, "has_next_page": False},
+            "metadata": {"model": "m", "tokens_used": {"total": 0}, "cost_usd": 0.0},
+        }
+
+    monkeypatch.setattr(scraper, "_extract", extract)
+
+    async def scrape():
+        return await scraper.scrape("https://x.com/lista", schema=GenericListPage, max_pages=2)
+
+    async def run():
+        results = [await scrape() for _ in errors]
+        refused = await scrape()
+        await asyncio.sleep(0.06)
+        probe_failed = await scrape()
+        refused_again = await scrape()
+        await asyncio.sleep(0.06)
+        recovered = await scrape()
+        return results, refused, probe_failed, refused_again, recovered
+
+    results, refused, probe_failed, refused_again, recovered = asyncio.run(run())
+
+    # Erros de extracao nao contam; so os quatro bloqueios abrem o circuito.
+    assert not any("Circuit breaker" in result["error"] for result in results)
+    assert "Circuit breaker" in refused["error"]
+    assert probe_failed["error"] == "captcha"
+    assert "Circuit breaker" in refused_again["error"]
+    assert recovered["success"]
+    assert scraper._domain_failure_count["x.com"] == 0
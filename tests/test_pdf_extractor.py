@@ -0,0 +1,97 @@
+import asyncio
+import io
+
+from pypdf import PdfWriter
+
+from src.config.settings import settings
+from src.core import browser as browser_module
+from src.core import pdf_extractor
+from src.core.browser import BrowserManager
+from src.core.pdf_extractor import extract_pdf_pages, select_relevant_pages
+
+
+def _blank_pdf(pages: int) -> bytes:
+    writer = PdfWriter()
+    for _ in range(pages):
+        writer.add_blank_page(width=200, height=200)
+    buffer = io.BytesIO()
+    writer.write(buffer)
+    return buffer.getvalue()
+
+
+def test_extract_respects_page_limit(monkeypatch):
+    monkeypatch.setattr(settings, "PDF_MAX_PAGES", 2)
+    result = asyncio.run(extract_pdf_pages(data=_blank_pdf(3)))
+    assert result["page_count"] == 3
+    assert result["pages_extracted"] == 2
+    assert result["truncated"] is True
+    assert result["workers"] == 1
+
+
+def test_extract_splits_pages_across_processes(monkeypatch):
+    monkeypatch.setattr(settings, "PDF_PARALLEL_MIN_PAGES", 2)
+    monkeypatch.setattr(settings, "PDF_WORKERS", 2)
+    try:
+        result = asyncio.run(extract_pdf_pages(data=_blank_pdf(5)))
+    finally:
+        pdf_extractor.shutdown_pdf_executor()
+    assert result["pages_extracted"] == 5
+    assert result["workers"] == 2
+
+
+def test_select_relevant_pages_prefers_goal_terms():
+    pages = ["Capa do relatorio", "Introducao geral", "Tabela de precos e valores", "Anexos"]
+    context = select_relevant_pages(pages, goal="Quais sao os precos?", max_chars=80)
+    assert "[Pagina 1]" in context
+    assert "[Pagina 3]" in context
+    assert "[Pagina 2]" not in context
+
+
+class _FakeRequest:
+    async def all_headers(self):
+        return {":method": "GET", "user-agent": "UA", "accept-encoding": "br", "cookie": "antigo=1"}
+
+
+class _FakeContext:
+    async def cookies(self, urls):
+        return [{"name": "sid", "value": "abc"}, {"name": "lang", "value": "pt"}]
+
+
+class _FakePage:
+    context = _FakeContext()
+
+
+class _ChunkedPdfResponse:
+    url = "https://docs.example.com/relatorio.pdf"
+    status = 200
+    headers = {"content-type": "application/pdf"}
+    request = _FakeRequest()
+
+    async def body(self):
+        raise AssertionError("sem Content-Length o corpo nao pode ir inteiro para a memoria")
+
+
+def test_chunked_pdf_streams_with_session_headers(monkeypatch, tmp_path):
+    downloads = []
+
+    async def fake_download(url, headers=None):
+        downloads.append((url, headers))
+        path = tmp_path / "relatorio.pdf"
+        path.write_bytes(_blank_pdf(2))
+        return str(path)
+
+    monkeypatch.setattr(browser_module, "download_pdf_to_tempfile", fake_download)
+    manager = BrowserManager(session_store=object(), block_detector=object())
+    _, _, _, _, _, metadata = asyncio.run(
+        manager._capture_pdf(
+            url=_ChunkedPdfResponse.url, page=_FakePage(), response=_ChunkedPdfResponse(), resolved_wait_until="load"
+        )
+    )
+
+    assert downloads == [(
+        "https://docs.example.com/relatorio.pdf",
+        {"user-agent": "UA", "cookie": "sid=abc; lang=pt"},
+    )]
+    assert metadata["pdf"]["spooled"] is True
+    assert metadata["pdf"]["bytes"] > 0
+    assert metadata["pdf"]["page_count"] == 2
@@ -0,0 +1,111 @@
+import asyncio
+import json
+import shutil
+import subprocess
+
+import pytest
+
+from src.core import scroll
+from src.core.scroll import CLEANUP_SCRIPT, SMART_SCROLL_SCRIPT, event_driven_scroll
+
+# DOM minimo para rodar o script de scroll no Node: altura do documento,
+# MutationObserver controlado pelo cenario e fetch/XHR para conferir a limpeza.
+NODE_HARNESS = """
+const scenario = process.argv[1];
+let height = 1000;
+let mutationCallback = null;
+let scrolls = 0;
+const originalFetch = async () => {};
+const originalSend = function () {};
+const element = (bottom) => ({ nodeType: 1, getBoundingClientRect: () => ({ bottom }) });
+
+global.window = {
+    innerHeight: 800,
+    innerWidth: 1200,
+    fetch: originalFetch,
+    scrollTo(x, y) {
+        if (y === 0) return;
+        scrolls += 1;
+        if (scenario === "infinite" && scrolls <= 3) {
+            setTimeout(() => {
+                height += 1000;
+                mutationCallback([{ addedNodes: [element(1500)] }]);
+            }, 10);
+        }
+    },
+};
+global.document = {
+    scrollingElement: { get scrollHeight() { return height; } },
+    body: {},
+    documentElement: {},
+    elementFromPoint: () => null,
+};
+global.MutationObserver = class {
+    constructor(callback) { mutationCallback = callback; }
+    observe() {}
+    disconnect() {}
+};
+global.IntersectionObserver = class { observe() {} disconnect() {} };
+global.XMLHttpRequest = function () {};
+XMLHttpRequest.prototype.send = originalSend;
+
+if (scenario === "carousel") {
+    // Slides trocando dentro da viewport a cada 10 ms, sem crescer a pagina.
+    setInterval(() => mutationCallback && mutationCallback([{ addedNodes: [element(400)] }]), 10);
+}
+
+const run = eval(SCRIPT);
+run({ maxSteps: 20, budgetMs: 3000, quietMs: 50, stepTimeoutMs: 500, pollMs: 10 }).then((result) => {
+    console.log(JSON.stringify({
+        ...result,
+        restored: window.fetch === originalFetch && XMLHttpRequest.prototype.send === originalSend,
+        cleanupLeft: "__smartScrollCleanup" in window,
+    }));
+    process.exit(0);
+});
+"""
+
+
+def _run_in_node(scenario):
+    harness = NODE_HARNESS.replace("SCRIPT", json.dumps(SMART_SCROLL_SCRIPT), 1)
+    output = subprocess.run(
+        ["node", "-e", harness, scenario], capture_output=True, text=True, timeout=30, check=True
+    ).stdout
+    return json.loads(output)
+
+
+@pytest.mark.skipif(shutil.which("node") is None, reason="node indisponivel")
+def test_scroll_stops_when_infinite_list_ends():
+    result = _run_in_node("infinite")
+    assert result["steps"] == 4
+    assert result["reason"] == "no_new_content"
+    assert result["addedNodes"] == 3
+    assert result["restored"] and not result["cleanupLeft"]
+
+
+@pytest.mark.skipif(shutil.which("node") is None, reason="node indisponivel")
+def test_mutations_inside_viewport_do_not_count_as_growth():
+    result = _run_in_node("carousel")
+    assert result["steps"] == 1
+    assert result["reason"] == "no_new_content"
+    assert result["elapsedMs"] < 1000
+
+
+class _HangingPage:
+    def __init__(self):
+        self.scripts = []
+
+    async def evaluate(self, script, *args):
+        self.scripts.append(script)
+        if script == SMART_SCROLL_SCRIPT:
+            await asyncio.sleep(5)
+
+
+def test_timeout_restores_page_patches(monkeypatch):
+    monkeypatch.setattr(scroll, "EVALUATE_MARGIN_SECONDS", 0)
+    page = _HangingPage()
+
+    result = asyncio.run(event_driven_scroll(page, max_steps=5, budget_ms=50))
+
+    assert result["stop_reason"] == "timeout"
+    assert page.scripts == [SMART_SCROLL_SCRIPT, CLEANUP_SCRIPT]
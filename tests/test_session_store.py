@@ -0,0 +1,108 @@
+import asyncio
+import gc
+import json
+
+from src.config.settings import settings
+from src.core.orchestrator import ScraperOrchestrator
+from src.core.session_store import SessionStore, get_session_store
+
+
+def test_put_is_write_behind_and_flush_is_atomic(tmp_path):
+    async def scenario():
+        store = SessionStore(directory=str(tmp_path), max_domains=4, flush_interval=3600)
+        store.put("example.com", {"cookies": [{"name": "a"}], "origins": []})
+        assert not (tmp_path / "example.com.json").exists()
+        assert await store.get("example.com") == {"cookies": [{"name": "a"}], "origins": []}
+        await store.close()
+
+    asyncio.run(scenario())
+    saved = json.loads((tmp_path / "example.com.json").read_text(encoding="utf-8"))
+    assert saved["cookies"][0]["name"] == "a"
+    assert not list(tmp_path.glob(".session-*"))
+
+
+def test_missing_domain_reads_disk_once(tmp_path):
+    async def scenario():
+        store = SessionStore(directory=str(tmp_path), max_domains=4, flush_interval=3600)
+        assert await store.get("nada.com") is None
+        assert await store.get("nada.com") is None
+        return store.stats()
+
+    stats = asyncio.run(scenario())
+    assert stats["disk_reads"] == 1
+    assert stats["hits"] == 1
+
+
+def test_lru_eviction_keeps_dirty_state_until_flush(tmp_path):
+    async def scenario():
+        store = SessionStore(directory=str(tmp_path), max_domains=1, flush_interval=3600)
+        store.put("a.com", {"cookies": [], "origins": [], "v": 1})
+        store.put("b.com", {"cookies": [], "origins": [], "v": 2})
+        assert store.stats()["domains_cached"] == 1
+        assert (await store.get("a.com"))["v"] == 1
+        await store.close()
+
+    asyncio.run(scenario())
+    assert json.loads((tmp_path / "a.com.json").read_text(encoding="utf-8"))["v"] == 1
+    assert json.loads((tmp_path / "b.com.json").read_text(encoding="utf-8"))["v"] == 2
+
+
+def test_failed_flush_keeps_domains_dirty(tmp_path, monkeypatch):
+    async def scenario():
+        store = SessionStore(directory=str(tmp_path), max_domains=1, flush_interval=3600)
+        store.put("a.com", {"cookies": [], "origins": [], "v": 1})
+        store.put("b.com", {"cookies": [], "origins": [], "v": 2})
+
+        def broken_write(states):
+            raise OSError("disco cheio")
+
+        monkeypatch.setattr(store, "_write_many", broken_write)
+        try:
+            await store.flush()
+        except OSError:
+            pass
+        assert store.stats()["dirty"] == 2
+        monkeypatch.undo()
+        await store.close()
+        return store.stats()
+
+    stats = asyncio.run(scenario())
+    assert stats["dirty"] == 0
+    assert json.loads((tmp_path / "a.com.json").read_text(encoding="utf-8"))["v"] == 1
+    assert json.loads((tmp_path / "b.com.json").read_text(encoding="utf-8"))["v"] == 2
+
+
+def test_orchestrator_close_flushes_pending_sessions(tmp_path, monkeypatch):
+    monkeypatch.setattr(settings, "SESSION_DIR", str(tmp_path))
+    # Orquestradores de outros testes, ja fora de uso, nao seguram os recursos.
+    gc.collect()
+
+    async def scenario():
+        async with ScraperOrchestrator(with_storage=False):
+            get_session_store().put("loja.com", {"cookies": [{"name": "sid"}], "origins": []})
+
+    asyncio.run(scenario())
+    assert json.loads((tmp_path / "loja.com.json").read_text(encoding="utf-8"))["cookies"][0]["name"] == "sid"
+
+
+def test_cookie_header_filters_by_host_path_and_expiry(tmp_path):
+    cookies = [
+        {"name": "sid", "value": "1", "domain": ".loja.com", "path": "/", "expires": -1, "secure": True},
+        {"name": "cart", "value": "2", "domain": "www.loja.com", "path": "/carrinho", "expires": -1},
+        {"name": "old", "value": "3", "domain": "www.loja.com", "path": "/", "expires": 1},
+        {"name": "ads", "value": "4", "domain": "ads.com", "path": "/", "expires": -1},
+    ]
+
+    async def scenario():
+        store = SessionStore(directory=str(tmp_path), max_domains=4, flush_interval=3600)
+        store.put("loja.com", {"cookies": cookies, "origins": []})
+        header = await store.cookie_header("https://www.loja.com/produtos?id=1")
+        cart = await store.cookie_header("https://www.loja.com/carrinho/itens")
+        none = await store.cookie_header("https://outra.com/")
+        store._flush_task.cancel()
+        return header, cart, none
+
+    header, cart, none = asyncio.run(scenario())
+    assert header == "sid=1"
+    assert cart == "sid=1; cart=2"
+    assert none is None
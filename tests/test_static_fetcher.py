@@ -0,0 +1,87 @@
+import asyncio
+
+from aiohttp import web
+from aiohttp.test_utils import TestServer
+
+from src.core import static_fetcher
+from src.core.session_store import SessionStore
+from src.core.static_fetcher import StaticFetcher, assess_static_html
+from src.utils.html_content import extract_html_content
+
+ARTICLE_HTML = """
+<html><head><title>Noticia</title><script>var x = 1;</script></head>
+<body><main><h1>Titulo da noticia</h1>
+<p>{body}</p>
+<img src="/img/capa.jpg"><img src="data:image/png;base64,AAA">
+</main></body></html>
+"""
+
+SPA_HTML = """
+<html><head><title>App</title></head>
+<body><noscript>You need to enable JavaScript to run this app.</noscript>
+<div id="root"></div><script src="/static/js/main.js"></script></body></html>
+"""
+
+
+def test_extract_html_content_skips_scripts_and_resolves_images():
+    html = ARTICLE_HTML.format(body="Conteudo relevante.")
+    content = extract_html_content(html, base_url="https://site.com/noticias/1")
+    assert content["title"] == "Noticia"
+    assert "var x" not in content["text"]
+    assert "Titulo da noticia" in content["text"]
+    assert content["image_urls"] == ["https://site.com/img/capa.jpg"]
+
+
+def test_server_rendered_page_is_sufficient():
+    html = ARTICLE_HTML.format(body="Texto longo do artigo. " * 80)
+    content = extract_html_content(html, base_url="https://site.com/")
+    assessment = assess_static_html(html, content, status=200)
+    assert assessment["sufficient"] is True
+
+
+def test_spa_shell_escalates_to_browser():
+    content = extract_html_content(SPA_HTML, base_url="https://app.com/")
+    assessment = assess_static_html(SPA_HTML, content, status=200)
+    assert assessment["sufficient"] is False
+    assert assessment["reason"] == "noscript_requires_js"
+    assert content["spa_roots"] == ["root"]
+
+
+def test_error_status_escalates_to_browser():
+    html = ARTICLE_HTML.format(body="Texto longo do artigo. " * 80)
+    content = extract_html_content(html, base_url="https://site.com/")
+    assert assess_static_html(html, content, status=403)["reason"] == "status_403"
+
+
+def test_fast_path_and_revalidation_send_saved_session_cookies(tmp_path, monkeypatch):
+    seen = []
+
+    async def page(request):
+        seen.append(request.headers.get("Cookie"))
+        body = ARTICLE_HTML.format(body="Texto longo do artigo para assinantes. " * 80)
+        return web.Response(text=body, content_type="text/html", headers={"ETag": '"v1"'})
+
+    async def scenario():
+        store = SessionStore(directory=str(tmp_path), max_domains=4, flush_interval=3600)
+        monkeypatch.setattr(static_fetcher, "get_session_store", lambda: store)
+        app = web.Application()
+        app.router.add_get("/artigo", page)
+        server = TestServer(app)
+        await server.start_server()
+        url = str(server.make_url("/artigo"))
+        host = url.split("/")[2]
+        store._remember(host, {"cookies": [{"name": "sid", "value": "abc", "domain": "127.0.0.1", "path": "/"}]})
+        fetcher = StaticFetcher()
+        try:
+            captured, assessment = await fetcher.capture(url)
+            status = await fetcher.revalidate(url, '"v1"', None)
+        finally:
+            await fetcher.close()
+            await server.close()
+        return captured, assessment, status
+
+    captured, assessment, status = asyncio.run(scenario())
+    assert assessment["sufficient"] is True
+    assert captured[5]["html_truncated"] is False
+    assert status == 200
+    assert seen == ["sid=abc", "sid=abc"]
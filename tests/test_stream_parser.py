@@ -0,0 +1,141 @@
+import asyncio
+import json
+
+import httpx
+
+from src.core import llm_client
+from src.core.ai_processor import AIProcessor
+from src.core.errors import BlockedScraperError
+from src.core.llm_client import LLMClientPool
+from src.core.orchestrator import ScraperOrchestrator
+from src.core.pdf_extractor import PAGE_SEPARATOR
+from src.core.stream_parser import IncrementalArrayParser
+from src.core.validator import DataValidator
+from src.models.custom import GuidedExtractionResult
+from src.models.product import ProductListPage
+
+RESPONSE = json.dumps({
+    "objective": "listar",
+    "summary": "Texto com \"aspas\" e {chaves} [colchetes]",
+    "tags": [{"title": "fora da lista de registros"}],
+    "findings": [
+        {"title": "Primeiro }", "extra": {"nested": {"a": [1, 2]}}},
+        {"title": "Segundo \\\" escapado", "url": "https://x.com/2"},
+    ],
+    "total_count": 2,
+})
+
+
+def test_items_are_emitted_as_each_element_closes():
+    parser = IncrementalArrayParser()
+    emitted = []
+    closed_at = []
+    for start in range(0, len(RESPONSE), 3):
+        for item in parser.feed(RESPONSE[start : start + 3]):
+            emitted.append(item)
+            closed_at.append(start)
+
+    assert [field for field, _ in emitted] == ["findings", "findings"]
+    assert emitted[0][1]["extra"] == {"nested": {"a": [1, 2]}}
+    assert emitted[1][1]["title"] == 'Segundo \\" escapado'
+    # O primeiro item sai antes do fim do documento.
+    assert closed_at[0] < len(RESPONSE) - 60
+    assert json.loads(parser.text) == json.loads(RESPONSE)
+
+
+def test_validate_item_uses_item_model_of_field():
+    item = DataValidator.validate_item({"title": 10, "url": "relativa"}, GuidedExtractionResult, "findings")
+    assert item["title"] == "10" and item["url"] is None
+    assert DataValidator.validate_item({"sem_titulo": 1}, GuidedExtractionResult, "findings") is None
+
+
+def test_validate_item_coerces_fields_of_other_item_models():
+    raw = {"name": "Moto G", "price": 999.9, "description": 5, "url": "www.loja.com/p/moto-g"}
+    item = DataValidator.validate_item(raw, ProductListPage, "products")
+    assert item["description"] == "5"
+    assert str(item["url"]) == "https://www.loja.com/p/moto-g"
+    assert DataValidator.validate_item({**raw, "url": "/p/relativa"}, ProductListPage, "products") is None
+
+
+def test_ai_processor_streams_items_before_result(monkeypatch):
+    content = json.dumps({"objective": "o", "findings": [{"title": "a"}, {"title": "b"}], "total_count": 2})
+    pieces = [content[i : i + 7] for i in range(0, len(content), 7)]
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        body = json.loads(request.content)
+        assert body["stream"] is True
+        lines = []
+        for piece in pieces:
+            chunk = {
+                "id": "c", "object": "chat.completion.chunk", "created": 0, "model": "m",
+                "choices": [{"index": 0, "delta": {"content": piece}, "finish_reason": None}],
+            }
+            lines.append(f"data: {json.dumps(chunk)}\n\n")
+        usage_chunk = {
+            "id": "c", "object": "chat.completion.chunk", "created": 0, "model": "m", "choices": [],
+            "usage": {"prompt_tokens": 50, "completion_tokens": 20, "total_tokens": 70,
+                      "prompt_tokens_details": {"cached_tokens": 32}},
+        }
+        lines.append(f"data: {json.dumps(usage_chunk)}\n\n")
+        lines.append("data: [DONE]\n\n")
+        return httpx.Response(200, headers={"content-type": "text/event-stream"}, content="".join(lines))
+
+    async def scenario():
+        pool = LLMClientPool()
+        monkeypatch.setattr(llm_client, "_pool", pool)
+        pool.client()
+        pool._http_client = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+        pool._clients.clear()
+        events = []
+        in_flight = []
+        async for event in AIProcessor(api_key="sk-test").stream_structured_data(
+            screenshot_base64="", html="", text_content="texto", schema=GuidedExtractionResult, use_cache=False
+        ):
+            events.append(event)
+            # Consumidor lento: o stream do modelo segue e libera o slot sem esperar por ele.
+            await asyncio.sleep(0.05)
+            in_flight.append(pool.in_flight)
+        await pool.close()
+        return events, in_flight
+
+    events, in_flight = asyncio.run(scenario())
+    assert in_flight == [0, 0, 0]
+    assert [event["type"] for event in events] == ["item", "item", "result"]
+    assert events[1]["item"] == {"title": "b"}
+    assert events[-1]["data"]["total_count"] == 2
+    assert events[-1]["metadata"]["tokens_used"]["cached_input"] == 32
+
+
+def test_scrape_stream_sends_pdf_pages_and_respects_circuit_breaker(monkeypatch):
+    scraper = ScraperOrchestrator(with_storage=False)
+    captures = []
+    stream_calls = []
+
+    async def fake_capture(url, **_):
+        captures.append(url)
+        metadata = {"final_url": url, "content_type": "application/pdf"}
+        return "", "", PAGE_SEPARATOR.join(["capa", "precos"]), "", [], metadata
+
+    async def fake_stream(**options):
+        stream_calls.append(options)
+        yield {
+            "type": "result",
+            "data": {"objective": "o", "findings": [], "total_count": 0},
+            "metadata": {"model": "m", "tokens_used": {"total": 0}, "cost_usd": 0.0},
+        }
+
+    monkeypatch.setattr(scraper, "_capture", fake_capture)
+    monkeypatch.setattr(scraper.ai_processor, "stream_structured_data", fake_stream)
+
+    async def run(url):
+        return [event async for event in scraper.scrape_stream(url, GuidedExtractionResult)]
+
+    events = asyncio.run(run("https://docs.example.com/a.pdf"))
+    assert events[-1]["success"]
+    assert stream_calls[0]["document_pages"] == ["capa", "precos"]
+
+    for _ in range(4):
+        scraper._record_domain_failure("docs.example.com", BlockedScraperError("captcha"))
+    events = asyncio.run(run("https://docs.example.com/b.pdf"))
+    assert events[-1]["metadata"]["error_type"] == "blocked"
+    assert captures == ["https://docs.example.com/a.pdf"]
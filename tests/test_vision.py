@@ -0,0 +1,20 @@
+from src.core.vision import estimate_vision_tokens, plan_screenshot
+
+
+def test_full_hd_viewport_costs_six_tiles_in_high_detail():
+    assert estimate_vision_tokens(1920, 1080, "high") == 85 + 170 * 6
+    assert estimate_vision_tokens(1920, 1080, "low") == 85
+
+
+def test_plan_downscales_to_fit_budget():
+    plan = plan_screenshot(1920, 1080, budget_tokens=765)
+    assert plan.detail == "high"
+    assert plan.estimated_tokens <= 765
+    assert plan.width < 1920 and plan.height < 1080
+    assert estimate_vision_tokens(plan.width, plan.height, "high") == plan.estimated_tokens
+
+
+def test_tiny_budget_uses_low_detail():
+    plan = plan_screenshot(1920, 1080, budget_tokens=100)
+    assert plan.detail == "low"
+    assert max(plan.width, plan.height) <= 512